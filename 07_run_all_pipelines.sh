@@ -241,6 +241,10 @@ CREATE INDEX idx_final_postcode ON aerospace_supplier_candidates(postcode);
 CREATE INDEX idx_final_source ON aerospace_supplier_candidates(source_table);
 CREATE INDEX idx_final_geom ON aerospace_supplier_candidates USING GIST(geometry);
 
+-- Trigram index for keyword regex filters on name (integrated_aerospace_system.py)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX idx_final_name_trgm ON aerospace_supplier_candidates USING GIN(name gin_trgm_ops);
+
 -- Add constraints
 ALTER TABLE aerospace_supplier_candidates 
   ADD CONSTRAINT chk_score CHECK (aerospace_score >= 40),
@@ -315,6 +319,13 @@ LIMIT 20;
 SQL
 
 echo -e "${GREEN}✓${NC} Final table created"
+
+# Distance to airfields / OEM sites and cluster density; proximity points
+# give geographic credit to candidates without a postcode
+python3 scripts/import/build_spatial_features.py --apply-score
+
+# Report aggregates (candidate_rollup tables) for the weekly/validation reports
+python3 scripts/reports/refresh_rollups.py
 echo ""
 
 # ============================================================================
@@ -102,6 +102,12 @@ if [ "$REPORT_ONLY" = false ]; then
     echo -e "${YELLOW}→${NC} Creating unified table..."
     psql -d uk_osm_full -f create_final_table.sql -q
 
+    echo -e "${YELLOW}→${NC} Computing spatial proximity features..."
+    python3 scripts/import/build_spatial_features.py --apply-score
+
+    echo -e "${YELLOW}→${NC} Refreshing report rollups..."
+    python3 scripts/reports/refresh_rollups.py -q
+
     echo -e "${GREEN}✓${NC} Pipeline execution complete"
     echo ""
 fi
@@ -153,10 +159,10 @@ echo "━━━━━━━━━━━━━━━━━━━━━━━━
 echo ""
 
 echo -e "${YELLOW}→${NC} Checking known supplier coverage..."
-psql -d uk_osm_full -f known_suppliers_check.sql -q > /tmp/coverage_check.txt 2>&1
+python3 scripts/verify/check_coverage.py --sync > /tmp/coverage_check.txt 2>&1
 
 # Extract key coverage metric
-COVERAGE=$(grep "Coverage %" /tmp/coverage_check.txt | awk -F'|' '{print $3}' | tr -d ' ')
+COVERAGE=$(grep "Coverage %" /tmp/coverage_check.txt | awk '{print $3}')
 
 echo "Known Supplier Coverage: ${COVERAGE}"
 echo ""
@@ -3,354 +3,516 @@
 Aerospace Supplier Verification Agent
 Automatically researches and verifies aerospace suppliers from a spreadsheet
 
+Lookups run on an asyncio engine: the independent checks for one company
+run concurrently, several companies are verified in parallel, and
+politeness is enforced by a per-host token bucket instead of fixed sleeps.
+
 Requirements:
-    pip install requests beautifulsoup4 pandas openpyxl selenium
+    pip install httpx beautifulsoup4 pandas openpyxl
 
 Usage:
-    python aerospace_verification_agent.py input.csv output.csv
+    python aerospace_verification_agent.py input.csv output.csv [--concurrency 4] [--rate 1.0]
 """
 
-import requests
+import httpx
 from bs4 import BeautifulSoup
 import pandas as pd
+import asyncio
 import time
-import re
-import json
-from urllib.parse import quote_plus, urljoin
 import sys
+import os
+import argparse
+from collections import OrderedDict
+from urllib.parse import urlsplit
 from typing import Dict, List, Optional
 
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(REPO_ROOT, 'scripts', 'utils'))
+
+from http_cache import HttpCache, DEFAULT_CACHE_DIR, DEFAULT_TTL
+from text_scanner import MultiPatternScanner, load_scoring_patterns, pg_to_python_regex
+from checkpoint import CheckpointStore, company_key, write_results
+from company_registry import CompanyRegistry, DEFAULT_REGISTRY_PATH, AEROSPACE_SIC_CODES, normalize_number
+
+SCORING_PATH = os.path.join(REPO_ROOT, 'scoring.yaml')
+
+SEARCH_URL = "https://www.google.com/search"
+
+AEROSPACE_COMPANIES = [
+    'Airbus', 'Boeing', 'Rolls-Royce', 'BAE Systems', 'Leonardo',
+    'Thales', 'Safran', 'Spirit AeroSystems', 'GKN', 'Meggitt',
+    'Bombardier', 'Embraer', 'Raytheon', 'Lockheed Martin',
+    'Collins Aerospace', 'Honeywell', 'Parker Aerospace'
+]
+
+APPROVAL_KEYWORDS = [
+    'AS9100', 'AS9110', 'AS9120', 'NADCAP', 'EASA Part 21',
+    'FAA approved', 'ISO 9001', 'Rolls-Royce approved',
+    'Airbus approved', 'Boeing approved', 'BAE approved'
+]
+
+
+class TokenBucket:
+    """Async token bucket: `rate` requests per second, bursts up to `capacity`
+    
+    The lock is created in the running event loop, so a bucket (and the
+    host's rate state) survives across asyncio.run() calls.
+    """
+    
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock: Optional[asyncio.Lock] = None
+        self.lock_loop = None
+    
+    def _lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self.lock_loop is not loop:
+            self.lock = asyncio.Lock()
+            self.lock_loop = loop
+        return self.lock
+    
+    async def acquire(self):
+        async with self._lock():
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostRateLimiter:
+    """One token bucket per host; `host_rates` overrides the default rate per host"""
+    
+    def __init__(self, rate: float = 1.0, burst: float = 1.0, host_rates: Optional[Dict[str, float]] = None):
+        self.rate = rate
+        self.burst = burst
+        self.host_rates = host_rates or {}
+        self.buckets: Dict[str, TokenBucket] = {}
+    
+    async def acquire(self, url: str):
+        host = urlsplit(url).netloc.lower()
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.host_rates.get(host, self.rate), self.burst)
+        await self.buckets[host].acquire()
+
+
+def parse_search_links(html: str, num_results: int) -> List[str]:
+    """Extract result URLs from a Google results page"""
+    soup = BeautifulSoup(html, 'html.parser')
+    links = []
+    for div in soup.find_all('div', class_='g'):
+        link = div.find('a')
+        if link and link.get('href'):
+            href = link['href']
+            if href.startswith('http') and 'google.com' not in href:
+                links.append(href)
+                if len(links) >= num_results:
+                    break
+    return links
+
+
+def page_text(html: str) -> str:
+    return BeautifulSoup(html, 'html.parser').get_text()
+
+
+def build_scanner(scoring_path: str = SCORING_PATH) -> MultiPatternScanner:
+    """One scanner for approvals, OEM customers and scoring.yaml tier1_companies"""
+    scanner = MultiPatternScanner()
+    scanner.add_literals('approval', APPROVAL_KEYWORDS)
+    scanner.add_literals('customer', AEROSPACE_COMPANIES)
+    if os.path.exists(scoring_path):
+        for group, patterns in load_scoring_patterns(scoring_path, 'tier1_companies').items():
+            for pattern in patterns:
+                scanner.add('tier1', group, r'\b(?:' + pg_to_python_regex(pattern, anchors_as_boundaries=True) + ')')
+    return scanner
+
+
+def tier1_mentions(hits) -> List[str]:
+    """Distinct tier-1 company names matched on a page (normalised case/spacing)"""
+    mentions = []
+    for hit in hits:
+        name = ' '.join(hit.text.lower().split())
+        if hit.category == 'tier1' and name not in mentions:
+            mentions.append(name)
+    return mentions
+
+
+def score_verification(result: Dict) -> int:
+    score = 0
+    if result['website']:
+        score += 10
+    if result['linkedin']:
+        score += 5
+    if result['as9100_certified']:
+        score += 50
+    elif result['oasis_listed']:
+        score += 20
+    if result['nadcap_accredited']:
+        score += 40
+    if result.get('aerospace_sic'):
+        score += 20
+    score += len(result['key_customers']) * 10
+    score += len(result['approvals']) * 5
+    return score
+
+
+def print_summary(result: Dict):
+    print(f"\n{'─'*60}")
+    print(f"VERIFICATION SUMMARY: {result['company_name']} ({result['companies_house_number']})")
+    print(f"  Website: {'✓ ' + result['website'] if result['website'] else '✗'}")
+    print(f"  LinkedIn: {'✓ ' + result['linkedin'] if result['linkedin'] else '✗'}")
+    print(f"  OASIS: {'✓' if result['oasis_listed'] else '✗'}")
+    print(f"  AS9100: {'✓' if result['as9100_certified'] else '✗'}")
+    print(f"  NADCAP: {'✓' if result['nadcap_accredited'] else '✗'}")
+    print(f"  Customers: {', '.join(result['key_customers']) or 0}")
+    print(f"  Approvals: {', '.join(result['approvals']) or 0}")
+    print(f"  Tier 1 mentions on website: {', '.join(result['tier1_mentions']) or 0}")
+    if result.get('ch_status'):
+        print(f"  Companies House: {result['ch_status']}, SIC {', '.join(result['sic_codes']) or 'none'}"
+              f"{' (aerospace)' if result['aerospace_sic'] else ''}")
+    print(f"  Verification Score: {result['verification_score']}/100+")
+    print(f"{'─'*60}\n")
+
+
 class AerospaceVerificationAgent:
-    """Simple agent to verify aerospace supplier credentials"""
+    """Simple agent to verify aerospace supplier credentials
+    
+    All HTTP goes through fetch(), which waits on the per-host rate limiter.
+    Pages come from the on-disk HttpCache while fresh (and are revalidated
+    with ETag/Last-Modified once stale); within a run each URL is fetched
+    and BeautifulSoup-parsed at most once, and each page is scanned for
+    every approval/customer/tier-1 pattern in a single pass. `search_url`
+    can point at a local mock server (see tests/test_verification_agent.py).
+    """
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+    def __init__(self, concurrency: int = 4, rate: float = 1.0, burst: float = 1.0,
+                 host_rates: Optional[Dict[str, float]] = None, timeout: float = 10.0,
+                 search_url: str = SEARCH_URL, cache: Optional[HttpCache] = None,
+                 memory_pages: int = 512, scanner: Optional[MultiPatternScanner] = None,
+                 registry: Optional[CompanyRegistry] = None):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.search_url = search_url
+        self.limiter = HostRateLimiter(rate, burst, host_rates)
+        self.cache = cache
+        self.memory_pages = memory_pages
+        self.scanner = scanner or build_scanner()
+        self.registry = registry
+        # url -> task fetching the page / parsed text / pattern hits, for the current run
+        self.pages: OrderedDict = OrderedDict()
+        self.texts: OrderedDict = OrderedDict()
+        self.scans: OrderedDict = OrderedDict()
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        }
+        self.client: Optional[httpx.AsyncClient] = None
         self.results = []
+    
+    def _client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            headers=self.headers,
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.concurrency * 6),
+        )
+    
+    def _remember(self, memo: OrderedDict, key: str, value):
+        memo[key] = value
+        memo.move_to_end(key)
+        while len(memo) > self.memory_pages:
+            memo.popitem(last=False)
+    
+    async def fetch(self, url: str, params: Optional[Dict] = None) -> Optional[str]:
+        """GET a page (cached); None on any error or non-200 response
+        
+        Concurrent and repeated requests for the same URL share one download.
+        """
+        key = str(httpx.URL(url, params=params))
+        task = self.pages.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key))
+        self._remember(self.pages, key, task)
+        return await task
+    
+    async def _fetch(self, url: str) -> Optional[str]:
+        entry = self.cache.get(url) if self.cache else None
+        if entry and entry.fresh:
+            return entry.text
         
-    def google_search(self, query: str, num_results: int = 5) -> List[str]:
+        await self.limiter.acquire(url)
+        try:
+            response = await self.client.get(url, headers=entry.validators() if entry else None)
+        except Exception:
+            return None
+        
+        if response.status_code == 304 and entry:
+            self.cache.revalidate(url)
+            return entry.text
+        if response.status_code != 200:
+            return None
+        if self.cache:
+            self.cache.put(
+                url, response.content, response.encoding,
+                response.headers.get('ETag'), response.headers.get('Last-Modified')
+            )
+        return response.text
+    
+    async def fetch_text(self, url: str) -> Optional[str]:
+        """Visible text of a page, parsed once per run"""
+        task = self.texts.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._parse(url))
+        self._remember(self.texts, url, task)
+        return await task
+    
+    async def _parse(self, url: str) -> Optional[str]:
+        html = await self.fetch(url)
+        return page_text(html) if html else None
+    
+    async def scan_page(self, url: str, visible_text: bool = False) -> list:
+        """Pattern hits for a page (raw HTML, or its visible text), scanned once per run"""
+        key = (url, visible_text)
+        task = self.scans.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._scan(url, visible_text))
+        self._remember(self.scans, key, task)
+        return await task
+    
+    async def _scan(self, url: str, visible_text: bool) -> list:
+        text = await (self.fetch_text(url) if visible_text else self.fetch(url))
+        return self.scanner.scan(text) if text else []
+    
+    async def scan_pages(self, website: Optional[str], urls: List[str]) -> list:
+        """Hits from the company website text followed by each result page"""
+        scans = await asyncio.gather(
+            self.scan_page(website, visible_text=True) if website else asyncio.sleep(0, []),
+            *(self.scan_page(url) for url in urls),
+        )
+        return [hit for hits in scans for hit in hits]
+    
+    async def google_search(self, query: str, num_results: int = 5) -> List[str]:
         """Simple Google search scraper"""
         try:
-            url = f"https://www.google.com/search?q={quote_plus(query)}"
-            response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract URLs from search results
-            links = []
-            for div in soup.find_all('div', class_='g'):
-                link = div.find('a')
-                if link and link.get('href'):
-                    href = link['href']
-                    if href.startswith('http') and 'google.com' not in href:
-                        links.append(href)
-                        if len(links) >= num_results:
-                            break
-            
-            return links
+            html = await self.fetch(self.search_url, params={'q': query})
+            return parse_search_links(html, num_results) if html else []
         except Exception as e:
             print(f"Google search error: {e}")
             return []
     
-    def find_company_website(self, company_name: str, companies_house_number: str) -> Optional[str]:
+    async def find_company_website(self, company_name: str, companies_house_number: str) -> Optional[str]:
         """Find company website via Google search"""
-        print(f"  🔍 Finding website for {company_name}...")
         
         # Search with company name and CH number
         query = f"{company_name} {companies_house_number} site:.co.uk OR site:.com"
-        results = self.google_search(query, num_results=3)
+        results = await self.google_search(query, num_results=3)
         
         if results:
             # First result is usually the company website
-            print(f"     ✓ Found: {results[0]}")
             return results[0]
         
         # Fallback: just company name
         query = f"{company_name} UK official website"
-        results = self.google_search(query, num_results=3)
-        
-        if results:
-            print(f"     ✓ Found: {results[0]}")
-            return results[0]
+        results = await self.google_search(query, num_results=3)
         
-        print(f"     ✗ No website found")
-        return None
+        return results[0] if results else None
     
-    def find_linkedin(self, company_name: str) -> Optional[str]:
+    async def find_linkedin(self, company_name: str) -> Optional[str]:
         """Find company LinkedIn profile"""
-        print(f"  🔍 Finding LinkedIn for {company_name}...")
         
         query = f"{company_name} site:linkedin.com/company"
-        results = self.google_search(query, num_results=3)
+        results = await self.google_search(query, num_results=3)
         
         for url in results:
             if 'linkedin.com/company' in url:
-                print(f"     ✓ Found: {url}")
                 return url
-        
-        print(f"     ✗ No LinkedIn found")
         return None
     
-    def check_oasis_as9100(self, company_name: str) -> Dict[str, any]:
+    async def check_oasis_as9100(self, company_name: str) -> Dict[str, any]:
         """Check OASIS database for AS9100 certification"""
-        print(f"  🔍 Checking OASIS for AS9100...")
         
-        # OASIS search endpoint (simplified - actual API may vary)
-        try:
-            # Method 1: Direct search
-            query = f"{company_name} AS9100 OASIS"
-            results = self.google_search(query, num_results=5)
-            
-            oasis_found = False
-            as9100_certified = False
-            
-            for url in results:
-                if 'oasis-open.org' in url or 'eauditnet.com' in url:
-                    oasis_found = True
-                    
-                    # Try to fetch and check content
-                    try:
-                        response = self.session.get(url, timeout=10)
-                        content = response.text.lower()
-                        
-                        if 'as9100' in content or 'as 9100' in content:
-                            as9100_certified = True
-                            print(f"     ✓ AS9100 certified (found in OASIS)")
-                            return {
-                                'oasis_listed': True,
-                                'as9100_certified': True,
-                                'source_url': url
-                            }
-                    except:
-                        pass
-            
-            if oasis_found:
-                print(f"     ~ Found in OASIS (AS9100 status unclear)")
-                return {'oasis_listed': True, 'as9100_certified': False}
-            else:
-                print(f"     ✗ Not found in OASIS")
-                return {'oasis_listed': False, 'as9100_certified': False}
-                
-        except Exception as e:
-            print(f"     ✗ OASIS check failed: {e}")
+        query = f"{company_name} AS9100 OASIS"
+        results = await self.google_search(query, num_results=5)
+        oasis_urls = [url for url in results if 'oasis-open.org' in url or 'eauditnet.com' in url]
+        
+        if not oasis_urls:
             return {'oasis_listed': False, 'as9100_certified': False}
+        
+        pages = await asyncio.gather(*(self.fetch(url) for url in oasis_urls))
+        for url, page in zip(oasis_urls, pages):
+            content = (page or '').lower()
+            if 'as9100' in content or 'as 9100' in content:
+                return {
+                    'oasis_listed': True,
+                    'as9100_certified': True,
+                    'source_url': url
+                }
+        
+        # Found in OASIS, AS9100 status unclear
+        return {'oasis_listed': True, 'as9100_certified': False}
     
-    def check_nadcap(self, company_name: str) -> Dict[str, any]:
+    async def check_nadcap(self, company_name: str) -> Dict[str, any]:
         """Check NADCAP accreditation"""
-        print(f"  🔍 Checking NADCAP...")
         
-        try:
-            # Search for NADCAP accreditation
-            query = f"{company_name} NADCAP accredited"
-            results = self.google_search(query, num_results=5)
-            
-            for url in results:
-                if 'eauditnet.com' in url or 'nadcap' in url.lower():
-                    try:
-                        response = self.session.get(url, timeout=10)
-                        content = response.text.lower()
-                        
-                        if company_name.lower() in content and 'nadcap' in content:
-                            print(f"     ✓ NADCAP accredited")
-                            return {
-                                'nadcap_accredited': True,
-                                'source_url': url
-                            }
-                    except:
-                        pass
-            
-            print(f"     ✗ No NADCAP accreditation found")
-            return {'nadcap_accredited': False}
-            
-        except Exception as e:
-            print(f"     ✗ NADCAP check failed: {e}")
-            return {'nadcap_accredited': False}
+        query = f"{company_name} NADCAP accredited"
+        results = await self.google_search(query, num_results=5)
+        nadcap_urls = [url for url in results if 'eauditnet.com' in url or 'nadcap' in url.lower()]
+        
+        pages = await asyncio.gather(*(self.fetch(url) for url in nadcap_urls))
+        for url, page in zip(nadcap_urls, pages):
+            content = (page or '').lower()
+            if company_name.lower() in content and 'nadcap' in content:
+                return {
+                    'nadcap_accredited': True,
+                    'source_url': url
+                }
+        
+        return {'nadcap_accredited': False}
     
-    def find_key_customers(self, company_name: str, website: Optional[str] = None) -> List[str]:
+    async def find_key_customers(self, company_name: str, website: Optional[str] = None) -> List[str]:
         """Find key aerospace customers mentioned"""
-        print(f"  🔍 Finding key customers...")
-        
-        customers = []
-        aerospace_companies = [
-            'Airbus', 'Boeing', 'Rolls-Royce', 'BAE Systems', 'Leonardo',
-            'Thales', 'Safran', 'Spirit AeroSystems', 'GKN', 'Meggitt',
-            'Bombardier', 'Embraer', 'Raytheon', 'Lockheed Martin',
-            'Collins Aerospace', 'Honeywell', 'Parker Aerospace'
-        ]
         
-        # Check company website if available
-        if website:
-            try:
-                response = self.session.get(website, timeout=10)
-                soup = BeautifulSoup(response.text, 'html.parser')
-                text = soup.get_text().lower()
-                
-                for company in aerospace_companies:
-                    if company.lower() in text:
-                        if company not in customers:
-                            customers.append(company)
-                            
-            except Exception as e:
-                print(f"     ⚠ Could not check website: {e}")
-        
-        # Google search for customer mentions
         query = f'"{company_name}" AND ("supplies" OR "supplier to" OR "approved by") AND (Airbus OR Boeing OR "Rolls-Royce" OR BAE)'
-        results = self.google_search(query, num_results=5)
-        
-        for url in results:
-            try:
-                response = self.session.get(url, timeout=10)
-                text = response.text.lower()
-                
-                for company in aerospace_companies:
-                    if company.lower() in text:
-                        if company not in customers:
-                            customers.append(company)
-            except:
-                pass
-        
-        if customers:
-            print(f"     ✓ Found customers: {', '.join(customers)}")
-        else:
-            print(f"     ✗ No key customers found")
+        results = await self.google_search(query, num_results=5)
         
-        return customers
+        # Company website first, then search hits
+        hits = await self.scan_pages(website, results)
+        return MultiPatternScanner.labels(hits, 'customer')
     
-    def find_approvals(self, company_name: str, website: Optional[str] = None) -> List[str]:
+    async def find_approvals(self, company_name: str, website: Optional[str] = None) -> List[str]:
         """Find aerospace approvals and certifications"""
-        print(f"  🔍 Finding approvals & certifications...")
-        
-        approvals = []
-        approval_keywords = [
-            'AS9100', 'AS9110', 'AS9120', 'NADCAP', 'EASA Part 21',
-            'FAA approved', 'ISO 9001', 'Rolls-Royce approved',
-            'Airbus approved', 'Boeing approved', 'BAE approved'
-        ]
         
-        # Check company website
-        if website:
-            try:
-                response = self.session.get(website, timeout=10)
-                soup = BeautifulSoup(response.text, 'html.parser')
-                text = soup.get_text()
-                
-                for keyword in approval_keywords:
-                    if re.search(keyword, text, re.IGNORECASE):
-                        if keyword not in approvals:
-                            approvals.append(keyword)
-                            
-            except Exception as e:
-                print(f"     ⚠ Could not check website: {e}")
-        
-        # Search for approvals
         query = f'"{company_name}" AND (AS9100 OR NADCAP OR "approved supplier" OR certification)'
-        results = self.google_search(query, num_results=5)
+        results = await self.google_search(query, num_results=5)
         
-        for url in results:
-            try:
-                response = self.session.get(url, timeout=10)
-                text = response.text
-                
-                for keyword in approval_keywords:
-                    if re.search(keyword, text, re.IGNORECASE):
-                        if keyword not in approvals:
-                            approvals.append(keyword)
-            except:
-                pass
-        
-        if approvals:
-            print(f"     ✓ Found approvals: {', '.join(approvals)}")
-        else:
-            print(f"     ✗ No approvals found")
-        
-        return approvals
+        hits = await self.scan_pages(website, results)
+        return MultiPatternScanner.labels(hits, 'approval')
     
-    def verify_supplier(self, company_name: str, companies_house_number: str) -> Dict:
-        """Main verification workflow"""
-        print(f"\n{'='*60}")
-        print(f"Verifying: {company_name} ({companies_house_number})")
-        print(f"{'='*60}")
+    def registry_facts(self, company_name: str, companies_house_number: str) -> Dict:
+        """Status and SIC codes from the local Companies House registry
+        
+        A missing company number is resolved from the name. Empty when no
+        registry is loaded or the company isn't in it.
+        """
+        if not self.registry:
+            return {}
+        number = normalize_number(companies_house_number)
+        if not number or number == 'NAN':
+            number = self.registry.resolve_number(company_name)
+        company = self.registry.company(number) if number else None
+        if company is None:
+            return {}
+        sic_codes = company['sic_codes'].split(';') if company['sic_codes'] else []
+        return {
+            'companies_house_number': company['company_number'],
+            'ch_status': company['status'],
+            'sic_codes': sic_codes,
+            'aerospace_sic': any(code in AEROSPACE_SIC_CODES for code in sic_codes),
+        }
+    
+    async def verify_supplier_async(self, company_name: str, companies_house_number: str) -> Dict:
+        """Main verification workflow
+        
+        Website, LinkedIn, OASIS and NADCAP lookups run concurrently; the
+        customer and approval checks start as soon as the website is known.
+        Registry facts are a local lookup and need no requests.
+        """
+        
+        facts = self.registry_facts(company_name, companies_house_number)
+        companies_house_number = facts.get('companies_house_number', companies_house_number)
+        
+        async def website_dependent():
+            website = await self.find_company_website(company_name, companies_house_number)
+            customers, approvals, site_hits = await asyncio.gather(
+                self.find_key_customers(company_name, website),
+                self.find_approvals(company_name, website),
+                self.scan_page(website, visible_text=True) if website else asyncio.sleep(0, []),
+            )
+            return website, customers, approvals, site_hits
+        
+        (website, customers, approvals, site_hits), linkedin, oasis_data, nadcap_data = await asyncio.gather(
+            website_dependent(),
+            self.find_linkedin(company_name),
+            self.check_oasis_as9100(company_name),
+            self.check_nadcap(company_name),
+        )
         
         result = {
             'company_name': company_name,
             'companies_house_number': companies_house_number,
-            'website': None,
-            'linkedin': None,
-            'oasis_listed': False,
-            'as9100_certified': False,
-            'nadcap_accredited': False,
-            'key_customers': [],
-            'approvals': [],
-            'verification_score': 0
+            'website': website,
+            'linkedin': linkedin,
+            'oasis_listed': oasis_data.get('oasis_listed', False),
+            'as9100_certified': oasis_data.get('as9100_certified', False),
+            'nadcap_accredited': nadcap_data.get('nadcap_accredited', False),
+            'key_customers': customers,
+            'approvals': approvals,
+            'tier1_mentions': tier1_mentions(site_hits),
+            **facts,
         }
+        result['verification_score'] = score_verification(result)
         
-        # Step 1: Find website
-        website = self.find_company_website(company_name, companies_house_number)
-        result['website'] = website
-        if website:
-            result['verification_score'] += 10
-        
-        time.sleep(1)  # Be polite to servers
-        
-        # Step 2: Find LinkedIn
-        linkedin = self.find_linkedin(company_name)
-        result['linkedin'] = linkedin
-        if linkedin:
-            result['verification_score'] += 5
-        
-        time.sleep(1)
-        
-        # Step 3: Check OASIS/AS9100
-        oasis_data = self.check_oasis_as9100(company_name)
-        result['oasis_listed'] = oasis_data.get('oasis_listed', False)
-        result['as9100_certified'] = oasis_data.get('as9100_certified', False)
-        if result['as9100_certified']:
-            result['verification_score'] += 50
-        elif result['oasis_listed']:
-            result['verification_score'] += 20
-        
-        time.sleep(1)
-        
-        # Step 4: Check NADCAP
-        nadcap_data = self.check_nadcap(company_name)
-        result['nadcap_accredited'] = nadcap_data.get('nadcap_accredited', False)
-        if result['nadcap_accredited']:
-            result['verification_score'] += 40
-        
-        time.sleep(1)
-        
-        # Step 5: Find key customers
-        customers = self.find_key_customers(company_name, website)
-        result['key_customers'] = customers
-        result['verification_score'] += len(customers) * 10
-        
-        time.sleep(1)
-        
-        # Step 6: Find approvals
-        approvals = self.find_approvals(company_name, website)
-        result['approvals'] = approvals
-        result['verification_score'] += len(approvals) * 5
-        
-        # Summary
-        print(f"\n{'─'*60}")
-        print(f"VERIFICATION SUMMARY:")
-        print(f"  Website: {'✓' if website else '✗'}")
-        print(f"  LinkedIn: {'✓' if linkedin else '✗'}")
-        print(f"  AS9100: {'✓' if result['as9100_certified'] else '✗'}")
-        print(f"  NADCAP: {'✓' if result['nadcap_accredited'] else '✗'}")
-        print(f"  Customers: {len(customers)}")
-        print(f"  Approvals: {len(approvals)}")
-        print(f"  Verification Score: {result['verification_score']}/100+")
-        print(f"{'─'*60}\n")
-        
+        print_summary(result)
         return result
     
-    def process_spreadsheet(self, input_file: str, output_file: str):
-        """Process entire spreadsheet"""
+    async def verify_many(self, companies: List[tuple], on_result=None) -> List[Dict]:
+        """Verify (company_name, ch_number) pairs, `concurrency` companies at a time
+        
+        Results come back in input order; `on_result(index, result)` is called
+        as each company finishes.
+        """
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def verify(index, company_name, ch_number):
+            async with semaphore:
+                try:
+                    result = await self.verify_supplier_async(company_name, ch_number)
+                except Exception as e:
+                    print(f"✗ Error processing {company_name}: {e}")
+                    result = {
+                        'company_name': company_name,
+                        'companies_house_number': ch_number,
+                        'error': str(e)
+                    }
+            if on_result:
+                on_result(index, result)
+            return result
+        
+        self.pages.clear()
+        self.texts.clear()
+        self.scans.clear()
+        async with self._client() as self.client:
+            return await asyncio.gather(*(
+                verify(i, name, ch) for i, (name, ch) in enumerate(companies)
+            ))
+    
+    def verify_supplier(self, company_name: str, companies_house_number: str) -> Dict:
+        """Verify a single company (blocking)"""
+        return asyncio.run(self.verify_many([(company_name, companies_house_number)]))[0]
+    
+    def process_spreadsheet(self, input_file: str, output_file: str, checkpoint_file: Optional[str] = None,
+                            fresh: bool = False):
+        """Process entire spreadsheet
+        
+        Each result is appended to a JSONL checkpoint (default
+        <output_file>.checkpoint.jsonl) as it completes; a rerun skips
+        companies already verified there. The output (CSV, or Parquet for a
+        .parquet path) is written once at the end.
+        """
+        checkpoint_file = checkpoint_file or f"{output_file}.checkpoint.jsonl"
+        if fresh and os.path.exists(checkpoint_file):
+            os.remove(checkpoint_file)
+        
         print(f"\n🚀 Starting Aerospace Verification Agent")
         print(f"📄 Input: {input_file}")
         print(f"📊 Output: {output_file}")
+        print(f"💾 Checkpoint: {checkpoint_file}")
         
         # Read input
         if input_file.endswith('.csv'):
@@ -358,7 +520,7 @@ class AerospaceVerificationAgent:
         else:
             df = pd.read_excel(input_file)
         
-        print(f"\n📋 Found {len(df)} companies to verify")
+        print(f"\n📋 Found {len(df)} companies to verify ({self.concurrency} at a time)")
         
         # Required columns: company_name, companies_house_number
         if 'company_name' not in df.columns or 'companies_house_number' not in df.columns:
@@ -370,39 +532,38 @@ class AerospaceVerificationAgent:
             if 'company_number' in df.columns:
                 df['companies_house_number'] = df['company_number']
         
-        results = []
-        
-        for idx, row in df.iterrows():
-            company_name = row['company_name']
-            ch_number = str(row['companies_house_number'])
+        companies = [
+            (row['company_name'], str(row['companies_house_number']))
+            for _, row in df.iterrows()
+        ]
+        keys = [company_key(name, ch) for name, ch in companies]
+        
+        with CheckpointStore(checkpoint_file) as store:
+            pending = [
+                company for company, key in zip(companies, keys) if not store.is_done(key)
+            ]
+            if len(pending) < len(companies):
+                print(f"⏩ Resuming: {len(companies) - len(pending)} companies already in checkpoint")
+            
+            completed = len(companies) - len(pending)
+            
+            def on_result(index, result):
+                # Append-only progress: one checkpoint line per company
+                nonlocal completed
+                store.record(company_key(*pending[index]), result)
+                completed += 1
+                print(f"✓ Progress: {completed}/{len(companies)} companies verified\n")
             
-            try:
-                result = self.verify_supplier(company_name, ch_number)
-                results.append(result)
-                
-                # Save progress after each company
-                results_df = pd.DataFrame(results)
-                results_df.to_csv(output_file, index=False)
-                
-                print(f"✓ Progress: {idx + 1}/{len(df)} companies verified\n")
-                
-                # Rate limiting
-                time.sleep(2)
-                
-            except Exception as e:
-                print(f"✗ Error processing {company_name}: {e}")
-                results.append({
-                    'company_name': company_name,
-                    'companies_house_number': ch_number,
-                    'error': str(e)
-                })
+            asyncio.run(self.verify_many(pending, on_result))
+            results = store.results(keys)
         
         # Final save
         results_df = pd.DataFrame(results)
-        results_df['key_customers'] = results_df['key_customers'].apply(lambda x: ', '.join(x) if isinstance(x, list) else '')
-        results_df['approvals'] = results_df['approvals'].apply(lambda x: ', '.join(x) if isinstance(x, list) else '')
+        for column in ('key_customers', 'approvals', 'tier1_mentions'):
+            if column in results_df:
+                results_df[column] = results_df[column].apply(lambda x: ', '.join(x) if isinstance(x, list) else '')
         
-        results_df.to_csv(output_file, index=False)
+        write_results(results_df, output_file)
         
         print(f"\n✅ Complete! Results saved to: {output_file}")
         print(f"\n📊 Summary:")
@@ -411,21 +572,47 @@ class AerospaceVerificationAgent:
         print(f"  AS9100 certified: {results_df['as9100_certified'].sum()}")
         print(f"  NADCAP accredited: {results_df['nadcap_accredited'].sum()}")
         print(f"  Average score: {results_df['verification_score'].mean():.1f}")
+        if self.cache:
+            stats = self.cache.stats()
+            print(f"  Page cache: {stats['hits']} hits, {stats['revalidated']} revalidated, "
+                  f"{stats['misses']} misses, {stats['bytes'] / 1024**2:.1f} MB on disk")
 
 
 def main():
     """Main entry point"""
-    if len(sys.argv) < 3:
-        print("Usage: python aerospace_verification_agent.py input.csv output.csv")
-        print("\nInput file should have columns: company_name, companies_house_number")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="Verify aerospace suppliers listed in a spreadsheet",
+        epilog="Input file should have columns: company_name, companies_house_number",
+    )
+    parser.add_argument('input_file')
+    parser.add_argument('output_file')
+    parser.add_argument('--concurrency', type=int, default=4, help="Companies verified in parallel")
+    parser.add_argument('--rate', type=float, default=1.0, help="Requests per second per host")
+    parser.add_argument('--burst', type=float, default=1.0, help="Token bucket size per host")
+    parser.add_argument('--search-url', default=SEARCH_URL, help="Search endpoint (e.g. a local mock server)")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="On-disk page cache directory")
+    parser.add_argument('--cache-ttl-hours', type=float, default=DEFAULT_TTL / 3600,
+                        help="Serve cached pages without revalidation for this long")
+    parser.add_argument('--cache-max-mb', type=int, default=512, help="Page cache size limit")
+    parser.add_argument('--no-cache', action='store_true', help="Disable the on-disk page cache")
+    parser.add_argument('--checkpoint', help="Checkpoint file (default: <output_file>.checkpoint.jsonl)")
+    parser.add_argument('--fresh', action='store_true', help="Ignore and replace an existing checkpoint")
+    parser.add_argument('--registry', default=DEFAULT_REGISTRY_PATH,
+                        help="Local Companies House registry (scripts/import/import_companies_house.py); used if present")
+    args = parser.parse_args()
     
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
+    cache = None
+    if not args.no_cache:
+        cache = HttpCache(args.cache_dir, ttl=args.cache_ttl_hours * 3600,
+                          max_bytes=args.cache_max_mb * 1024 * 1024)
     
-    agent = AerospaceVerificationAgent()
-    agent.process_spreadsheet(input_file, output_file)
+    agent = AerospaceVerificationAgent(
+        concurrency=args.concurrency, rate=args.rate, burst=args.burst,
+        search_url=args.search_url, cache=cache,
+        registry=CompanyRegistry.open_if_exists(args.registry)
+    )
+    agent.process_spreadsheet(args.input_file, args.output_file, args.checkpoint, args.fresh)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -125,6 +125,10 @@ CREATE INDEX idx_final_postcode ON aerospace_supplier_candidates(postcode);
 CREATE INDEX idx_final_source ON aerospace_supplier_candidates(source_table);
 CREATE INDEX idx_final_geom ON aerospace_supplier_candidates USING GIST(geometry);
 
+-- Trigram index for keyword regex filters on name (integrated_aerospace_system.py)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX idx_final_name_trgm ON aerospace_supplier_candidates USING GIN(name gin_trgm_ops);
+
 \echo 'Indexes created'
 
 -- Add constraints
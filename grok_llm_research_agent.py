@@ -32,11 +32,19 @@ from bs4 import BeautifulSoup
 from groq import Groq
 import pandas as pd
 import time
-import pdfplumber
 from dotenv import load_dotenv
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 import re
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts', 'utils'))
+
+from checkpoint import CheckpointStore, company_key, write_results
+from llm_client import CachedLLMClient, DEFAULT_CACHE_PATH
+from context_ranker import build_context, context_stats
+from filing_extractor import FilingExtractor, DEFAULT_CACHE_DIR as FILING_CACHE_DIR
+from company_registry import CompanyRegistry, DEFAULT_REGISTRY_PATH
 
 # Load environment variables
 load_dotenv()
@@ -44,7 +52,8 @@ load_dotenv()
 class EnhancedLLMAgent:
     """Enhanced agent that uses LLM to research companies with API-first approach"""
     
-    def __init__(self, groq_api_key=None, ch_api_key=None):
+    def __init__(self, groq_api_key=None, ch_api_key=None, cache_path=DEFAULT_CACHE_PATH,
+                 filing_cache_dir=FILING_CACHE_DIR, max_filings=2, registry_path=DEFAULT_REGISTRY_PATH):
         self.groq_api_key = groq_api_key or os.getenv('GROQ_API_KEY')
         if not self.groq_api_key:
             raise ValueError("GROQ_API_KEY not found in .env. Get one from https://console.groq.com/keys")
@@ -52,12 +61,33 @@ class EnhancedLLMAgent:
         self.ch_api_key = ch_api_key or os.getenv('CH_API_KEY')  # Optional
         
         self.client = Groq(api_key=self.groq_api_key)
+        if cache_path:
+            # Identical questions are answered from disk on later runs
+            self.client = CachedLLMClient(self.client, path=cache_path)
         self.model = "llama-3.3-70b-versatile"  # Fast and smart
         
         # Session with retries
         self.session = requests.Session()
         retries = Retry(total=3, backoff_factor=1, status_forcelist=[502, 503, 504])
         self.session.mount('https://', HTTPAdapter(max_retries=retries))
+        
+        # Accounts filings: fetched concurrently, PDF pages parsed in a process pool,
+        # text cached per transaction ID
+        self.filings = FilingExtractor(self.session, cache_dir=filing_cache_dir)
+        self.max_filings = max_filings  # Latest N accounts (2 covers this year and last)
+        
+        # Local Companies House bulk data (scripts/import/import_companies_house.py), if built
+        self.registry = CompanyRegistry.open_if_exists(registry_path)
+    
+    def close(self):
+        """Shut down the filing extraction worker processes"""
+        self.filings.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
     
     def fetch_ch_api(self, endpoint: str, params: dict = None) -> dict:
         """Fetch from Companies House API"""
@@ -83,23 +113,21 @@ class EnhancedLLMAgent:
             for script in soup(["script", "style"]):
                 script.decompose()
             text = ' '.join(chunk.strip() for line in soup.get_text().splitlines() for chunk in line.split("  ") if chunk.strip())
-            return text[:30000]  # Increased limit for more context
+            return text  # Trimmed to relevant chunks in research_company
         except Exception as e:
             return f"Error fetching {url}: {e}"
     
-    def extract_pdf(self, url: str) -> str:
-        """Download and extract text from PDF"""
-        try:
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-            with pdfplumber.open(io.BytesIO(response.content)) as pdf:
-                text = ' '.join(page.extract_text() or '' for page in pdf.pages)
-            return text[:30000]  # Limit for context
-        except Exception as e:
-            return f"Error extracting PDF {url}: {e}"
+    def extract_pdf(self, url: str, filing_id: str = None) -> str:
+        """Download and extract text from a PDF, cached by filing ID (default: the URL)"""
+        record = self.filings.extract(filing_id or url, url)
+        return record.get('error') or record['text']
     
     def get_company_profile(self, ch_number: str) -> dict:
-        """Get company profile via API"""
+        """Get company profile from the local registry, else via API"""
+        if self.registry:
+            profile = self.registry.profile(ch_number)
+            if profile:
+                return profile
         return self.fetch_ch_api(f"company/{ch_number}")
     
     def get_filings(self, ch_number: str, category: str = "accounts") -> list:
@@ -153,7 +181,7 @@ QUESTIONS:
             result['error'] = "Failed to fetch profile"
             return result
         
-        context = json.dumps(profile, indent=2)  # Use API data as primary context
+        sources = [('Companies House profile', json.dumps(profile, indent=2))]  # API data as primary source
         
         # Add basic info
         result['status'] = profile.get('company_status', 'Not found')
@@ -164,21 +192,28 @@ QUESTIONS:
         needs_filings = any(kw in q.lower() for q in questions for kw in ['employee', 'staff', 'headcount', '2023', '2024'])
         if needs_filings:
             print("\n📂 Fetching latest accounts...")
-            filings = self.get_filings(ch_number)
-            if filings:
-                latest = filings[0]  # Assume first is latest
-                doc_url = f"https://find-and-update.company-information.service.gov.uk{latest['pages'][0]['barcode'] if 'pages' in latest else ''}"
+            filings = self.get_filings(ch_number)[:self.max_filings]  # Newest first
+            documents = []
+            for filing in filings:
                 # CH filing URLs are like /company/{num}/filing-history/{transaction_id}/document?format=pdf
-                trans_id = latest['transaction_id']
+                trans_id = filing['transaction_id']
                 doc_url = f"https://find-and-update.company-information.service.gov.uk/company/{ch_number}/filing-history/{trans_id}/document?format=pdf&download=0"
                 print(f"   {doc_url}")
-                if doc_url.endswith('.pdf'):
-                    filing_content = self.extract_pdf(doc_url)
-                else:
-                    filing_content = self.fetch_webpage(doc_url)
-                context += f"\n\nLATEST ACCOUNTS: {filing_content}"
+                documents.append((trans_id, doc_url))
+            for filing, record in zip(filings, self.filings.extract_many(documents)):
+                if record.get('error'):
+                    print(f"   ❌ {record['error']}")
+                    continue
+                print(f"   ✅ {filing.get('date', filing['transaction_id'])}: {record['pages_extracted']}/{record['page_count']} pages, "
+                      f"sections: {', '.join(record['sections']) or 'none'}")
+                sources.append((f"Accounts filed {filing.get('date', '')}".strip(), record['text']))
+        
+        # Step 3: Send only the chunks relevant to the questions
+        context = build_context(sources, questions)
+        stats = context_stats(sources, context)
+        print(f"   📉 Context: {stats['context_chars']:,} of {stats['source_chars']:,} characters")
         
-        # Step 3: Ask all questions in batch
+        # Step 4: Ask all questions in batch
         print("\n❓ Asking questions (batched)...")
         answers = self.ask_llm_batch(questions, context)
         
@@ -191,8 +226,8 @@ QUESTIONS:
         time.sleep(1)  # Base rate limit
         return result
 
-def batch_process_spreadsheet(input_csv: str, output_csv: str, questions: list = None):
-    """Process a spreadsheet of companies"""
+def batch_process_spreadsheet(input_csv: str, output_csv: str, questions: list = None, checkpoint_file: str = None):
+    """Process a spreadsheet of companies; resumable via a JSONL checkpoint (<output_csv>.checkpoint.jsonl)"""
     agent = EnhancedLLMAgent()
     
     if questions is None:
@@ -207,19 +242,27 @@ def batch_process_spreadsheet(input_csv: str, output_csv: str, questions: list =
     df = pd.read_csv(input_csv)
     print(f"\n🚀 Processing {len(df)} companies with {len(questions)} questions...")
     
-    results = []
-    for idx, row in df.iterrows():
-        try:
-            result = agent.research_company(row['company_name'], str(row['companies_house_number']), questions)
-            results.append(result)
-            pd.DataFrame(results).to_csv(output_csv, index=False)
-            print(f"✅ {idx + 1}/{len(df)}")
-            time.sleep(2)  # Increased for safety
-        except Exception as e:
-            print(f"❌ Error at {idx + 1}: {e}")
-            results.append({'company_name': row['company_name'], 'error': str(e)})
+    keys = [company_key(row['company_name'], row['companies_house_number']) for _, row in df.iterrows()]
+    with agent, CheckpointStore(checkpoint_file or f"{output_csv}.checkpoint.jsonl") as store:
+        for (idx, row), key in zip(df.iterrows(), keys):
+            if store.is_done(key):
+                continue
+            try:
+                result = agent.research_company(row['company_name'], str(row['companies_house_number']), questions)
+                store.record(key, result)
+                print(f"✅ {idx + 1}/{len(df)}")
+                time.sleep(2)  # Increased for safety
+            except Exception as e:
+                print(f"❌ Error at {idx + 1}: {e}")
+                store.record(key, {'company_name': row['company_name'], 'error': str(e)})
+        results = store.results(keys)
     
+    write_results(pd.DataFrame(results), output_csv)
     print(f"\n✅ Saved to {output_csv}")
+    if isinstance(agent.client, CachedLLMClient):
+        stats = agent.client.stats()
+        print(f"💾 LLM cache: {stats['hits']} hits, {stats['misses']} misses, "
+              f"~{stats['saved_tokens']} tokens saved")
     return results
 
 def interactive_mode():
@@ -233,7 +276,8 @@ def interactive_mode():
     while (q := input(f"Q{len(questions)+1}: ")):
         questions.append(q)
     if questions:
-        result = agent.research_company(company_name, ch_number, questions)
+        with agent:
+            result = agent.research_company(company_name, ch_number, questions)
         print("\nRESULTS:")
         print(json.dumps(result, indent=2))
 
@@ -250,8 +294,6 @@ def discover_nearby_suppliers(facility_address: str, radius_miles: int = 60, sic
     return []  # Placeholder
 
 if __name__ == "__main__":
-    import sys
-    
     if len(sys.argv) == 1:
         print("\nUsage:")
         print("python agent.py batch input.csv output.csv")
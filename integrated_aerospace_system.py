@@ -7,31 +7,52 @@ Shows impact of different criteria on results in real-time
 """
 
 import os
-import psycopg2
+import re
+import sys
+import time
+import numpy as np
 import pandas as pd
 from groq import Groq
 import requests
 from bs4 import BeautifulSoup
-from typing import Dict, List
-import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from collections import Counter
 from datetime import datetime
 
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(REPO_ROOT, 'scripts', 'utils'))
+
+from osm_utils import load_config
+from db import Database
+from llm_verifier import BatchVerifier, PROMPT_FIELDS
+from llm_client import CachedLLMClient, DEFAULT_CACHE_PATH
+from known_suppliers import AliasMatcher, DEFAULT_MIN_SIMILARITY, load_suppliers
+from scenario_sweep import SWEEP_COLUMNS, ScenarioSweep, envelope_params, parameter_grid
+
 # ============================================================================
 # CONFIGURATION - CHANGE THESE TO SEE IMPACT!
 # ============================================================================
 
-# Database connection
-DB_CONFIG = {
-    'dbname': 'uk_osm_full',
-    'user': 'a',
-    'password': '',
-    'host': 'localhost',
-    'port': 5432
-}
+# Database connection - shared settings from config/config.yaml
+DB_CONFIG = load_config(os.path.join(REPO_ROOT, 'config', 'config.yaml'))['database']
 
 # Groq API
 GROQ_API_KEY = os.environ.get('GROQ_API_KEY')
 
+# LLM verification - candidates are sent in JSON batches, several at once
+LLM_CONFIG = {
+    'model': 'llama-3.3-70b-versatile',
+    'verify_tiers': ['tier1_candidate', 'tier2_candidate'],
+    'max_candidates': None,            # None = verify every candidate in verify_tiers
+    'batch_size': 25,                  # Candidates per request
+    'concurrency': 4,                  # Requests in flight
+    'requests_per_minute': 30,         # Match your Groq plan limits
+    'tokens_per_minute': 6000,
+    'max_retries': 3,                  # Re-asks for missing/malformed results
+    'cache_path': os.path.join(REPO_ROOT, DEFAULT_CACHE_PATH),  # None = no response cache
+    'cache_ttl_days': 30,
+}
+
 # ============================================================================
 # FILTERING CRITERIA - ADJUST THESE TO SEE IMPACT
 # ============================================================================
@@ -67,13 +88,17 @@ CRITERIA = {
     # Try: ['planet_osm_polygon'] or all four
     
     # Limits
-    'max_results': 50,                 # Try: 10, 50, 100
+    'max_results': 50,                 # Try: 10, 50, 100, or None for no limit
+    'fetch_batch_size': 5000,          # Rows per server-side cursor round trip
 }
 
 # ============================================================================
 # KNOWN AEROSPACE SUPPLIERS (Ground Truth)
 # ============================================================================
 
+# Fallback when the known_suppliers registry (config/known_suppliers.csv,
+# synced by scripts/verify/check_coverage.py --sync) is not in the database
+
 KNOWN_SUPPLIERS = [
     {'name': 'Airbus', 'location': 'Bristol', 'postcode': 'BS34'},
     {'name': 'Rolls-Royce', 'location': 'Derby', 'postcode': 'DE24'},
@@ -86,131 +111,127 @@ KNOWN_SUPPLIERS = [
 ]
 
 # ============================================================================
-# SYSTEM CLASS
+# CANDIDATE QUERY
 # ============================================================================
 
-class IntegratedAerospaceSystem:
-    """Complete system: Database → Filter → Verify → Analyze"""
+# Only the filters a criteria set actually uses are emitted: a catch-all
+# "(%(x)s IS NULL OR ...)" form would let the server cache one generic plan,
+# but that plan cannot use the pg_trgm GIN index on name. Keyword lists
+# become one case-insensitive regex that the index can serve.
+CANDIDATE_PREDICATES = [
+    ('min_score', "aerospace_score >= %(min_score)s"),
+    ('max_score', "aerospace_score <= %(max_score)s"),
+    ('tiers', "tier_classification = ANY(%(tiers)s::text[])"),
+    ('require_name', "name IS NOT NULL AND name != ''"),
+    ('require_postcode', "postcode IS NOT NULL"),
+    ('require_website', "website IS NOT NULL"),
+    ('require_industrial_landuse', "landuse_type = 'industrial'"),
+    ('require_industrial_building', "building_type IN ('industrial', 'warehouse', 'factory')"),
+    ('postcode_areas', "LEFT(postcode, 2) = ANY(%(postcode_areas)s::text[])"),
+    ('exclude_postcode_areas',
+     "(postcode IS NULL OR NOT LEFT(postcode, 2) = ANY(%(exclude_postcode_areas)s::text[]))"),
+    ('exclude_pattern', "name !~* %(exclude_pattern)s"),
+    ('required_pattern', "name ~* %(required_pattern)s"),
+    ('source_tables', "source_table = ANY(%(source_tables)s::text[])"),
+]
+
+CANDIDATE_COLUMNS = ['osm_id', 'source_table', 'name', 'aerospace_score', 'tier_classification',
+                     'postcode', 'city', 'website', 'phone', 'landuse_type', 'building_type',
+                     'industrial_type', 'matched_keywords', 'latitude', 'longitude']
+
+
+def candidate_query(params: Dict, columns: List[str] = CANDIDATE_COLUMNS) -> str:
+    """Candidate SELECT for criteria_params() output, with only the filters in use
     
-    def __init__(self, db_config, groq_api_key, criteria):
-        self.db_config = db_config
-        self.groq_client = Groq(api_key=groq_api_key) if groq_api_key else None
-        self.criteria = criteria
-        self.conn = None
-        
-    def connect_db(self):
-        """Connect to PostgreSQL"""
-        try:
-            self.conn = psycopg2.connect(**self.db_config)
-            print("✅ Connected to database")
-            return True
-        except Exception as e:
-            print(f"❌ Database connection failed: {e}")
-            return False
+    compare_scenarios() passes SWEEP_COLUMNS and envelope_params() to fetch
+    the union of all scenarios' candidates (scenario_sweep.py).
+    """
+    where = [sql for key, sql in CANDIDATE_PREDICATES
+             if params.get(key) is not None and params.get(key) is not False]
+    conditions = '\n      AND '.join(where) or 'TRUE'
+    query = f"""
+    SELECT {', '.join(columns)}
+    FROM aerospace_supplier_candidates
+    WHERE {conditions}
+    ORDER BY aerospace_score DESC"""
+    if params.get('max_results'):
+        query += "\n    LIMIT %(max_results)s"
+    return query
+
+
+def keyword_pattern(keywords: List[str]) -> Optional[str]:
+    """Collapse a keyword list into one alternation regex (None if empty)"""
+    if not keywords:
+        return None
+    return '|'.join(re.escape(keyword) for keyword in keywords)
+
+
+def criteria_params(criteria: Dict) -> Dict:
+    """Query parameters for candidate_query() from a criteria dict"""
+    return {
+        'min_score': criteria['min_aerospace_score'],
+        'max_score': criteria['max_aerospace_score'],
+        'tiers': criteria['tier_classifications'] or None,
+        'require_name': bool(criteria['require_name']),
+        'require_postcode': bool(criteria['require_postcode']),
+        'require_website': bool(criteria['require_website']),
+        'require_industrial_landuse': bool(criteria['require_industrial_landuse']),
+        'require_industrial_building': bool(criteria['require_industrial_building']),
+        'postcode_areas': criteria['required_postcode_areas'] or None,
+        'exclude_postcode_areas': criteria['exclude_postcode_areas'] or None,
+        'exclude_pattern': keyword_pattern(criteria['exclude_keywords']),
+        'required_pattern': keyword_pattern(criteria['required_keywords']),
+        'source_tables': criteria['source_tables'] or None,
+        'max_results': criteria.get('max_results') or None,
+    }
+
+# ============================================================================
+# INCREMENTAL ANALYSIS
+# ============================================================================
+
+# Candidate columns kept in memory for LLM verification
+LLM_COLUMNS = ['osm_id', 'source_table', 'aerospace_score', 'tier_classification', *PROMPT_FIELDS]
+
+SCORE_BINS = [0, 60, 80, 100, 120, 150, 200, 300]
+SCORE_LABELS = ['<60', '60-79', '80-99', '100-119', '120-149', '150-199', '200+']
+
+
+def _as_chunks(candidates) -> Iterable[pd.DataFrame]:
+    """Treat a single DataFrame as a one-chunk stream"""
+    return [candidates] if isinstance(candidates, pd.DataFrame) else candidates
+
+
+class CoverageSummary:
+    """Known-supplier coverage accumulated over candidate chunks
     
-    def build_query(self) -> str:
-        """Build SQL query based on criteria"""
-        
-        # Base SELECT
-        query = """
-        SELECT 
-            osm_id,
-            source_table,
-            name,
-            aerospace_score,
-            tier_classification,
-            postcode,
-            city,
-            website,
-            phone,
-            landuse_type,
-            building_type,
-            industrial_type,
-            matched_keywords,
-            latitude,
-            longitude
-        FROM aerospace_supplier_candidates
-        WHERE 1=1
-        """
-        
-        # Score filters
-        query += f"\n  AND aerospace_score >= {self.criteria['min_aerospace_score']}"
-        query += f"\n  AND aerospace_score <= {self.criteria['max_aerospace_score']}"
-        
-        # Tier classification
-        if self.criteria['tier_classifications']:
-            tiers = "', '".join(self.criteria['tier_classifications'])
-            query += f"\n  AND tier_classification IN ('{tiers}')"
-        
-        # Required fields
-        if self.criteria['require_name']:
-            query += "\n  AND name IS NOT NULL AND name != ''"
-        
-        if self.criteria['require_postcode']:
-            query += "\n  AND postcode IS NOT NULL"
-        
-        if self.criteria['require_website']:
-            query += "\n  AND website IS NOT NULL"
-        
-        # Industrial indicators
-        if self.criteria['require_industrial_landuse']:
-            query += "\n  AND landuse_type = 'industrial'"
-        
-        if self.criteria['require_industrial_building']:
-            query += "\n  AND building_type IN ('industrial', 'warehouse', 'factory')"
-        
-        # Geographic filters
-        if self.criteria['required_postcode_areas']:
-            areas = "', '".join(self.criteria['required_postcode_areas'])
-            query += f"\n  AND LEFT(postcode, 2) IN ('{areas}')"
-        
-        if self.criteria['exclude_postcode_areas']:
-            areas = "', '".join(self.criteria['exclude_postcode_areas'])
-            query += f"\n  AND (postcode IS NULL OR LEFT(postcode, 2) NOT IN ('{areas}'))"
-        
-        # Keyword filters
-        if self.criteria['exclude_keywords']:
-            for keyword in self.criteria['exclude_keywords']:
-                query += f"\n  AND LOWER(name) NOT LIKE '%{keyword}%'"
-        
-        if self.criteria['required_keywords']:
-            keyword_conditions = " OR ".join([
-                f"LOWER(name) LIKE '%{kw}%'" for kw in self.criteria['required_keywords']
-            ])
-            query += f"\n  AND ({keyword_conditions})"
-        
-        # Source tables
-        if self.criteria['source_tables']:
-            tables = "', '".join(self.criteria['source_tables'])
-            query += f"\n  AND source_table IN ('{tables}')"
-        
-        # Order and limit
-        query += "\nORDER BY aerospace_score DESC"
-        query += f"\nLIMIT {self.criteria['max_results']}"
-        
-        return query
+    A candidate counts for a supplier under the registry rule of
+    known_suppliers.check_coverage(): one of the supplier's names
+    ('aliases' from the registry, else just 'name') matches a run of whole
+    words in the candidate name (AliasMatcher). Each name is judged on its
+    own, so coverage does not depend on how the candidates are chunked.
+    """
     
-    def fetch_candidates(self) -> pd.DataFrame:
-        """Fetch candidates from database based on criteria"""
-        
-        query = self.build_query()
-        
-        print("\n" + "="*70)
-        print("📊 SQL QUERY GENERATED:")
-        print("="*70)
-        print(query)
-        print("="*70 + "\n")
-        
-        try:
-            df = pd.read_sql_query(query, self.conn)
-            return df
-        except Exception as e:
-            print(f"❌ Query failed: {e}")
-            return pd.DataFrame()
+    def __init__(self, known_suppliers: List[Dict] = None, min_similarity: float = DEFAULT_MIN_SIMILARITY):
+        self.known_suppliers = known_suppliers or KNOWN_SUPPLIERS
+        self.min_similarity = min_similarity
+        self.best_scores = {}
+        self.best_names = {}
     
-    def analyze_coverage(self, candidates_df: pd.DataFrame) -> Dict:
-        """Check how many known suppliers we captured"""
-        
+    def update(self, chunk: pd.DataFrame):
+        if len(chunk) == 0:
+            return
+        matcher = AliasMatcher(chunk['name'].tolist(), self.min_similarity)
+        scores = chunk['aerospace_score'].to_numpy()
+        for supplier in self.known_suppliers:
+            positions = np.nonzero(matcher.supplier_mask(supplier))[0]
+            if len(positions):
+                best = positions[np.argmax(scores[positions])]
+                score = scores[best]
+                if score >= self.best_scores.get(supplier['name'], score):
+                    self.best_scores[supplier['name']] = score
+                    self.best_names[supplier['name']] = matcher.names[best]
+    
+    def report(self) -> Dict:
         print("\n" + "="*70)
         print("🎯 COVERAGE ANALYSIS - Known Suppliers")
         print("="*70)
@@ -218,22 +239,18 @@ class IntegratedAerospaceSystem:
         found_suppliers = []
         missing_suppliers = []
         
-        for supplier in KNOWN_SUPPLIERS:
-            # Check if any candidate matches this known supplier
-            matches = candidates_df[
-                candidates_df['name'].str.contains(supplier['name'], case=False, na=False)
-            ]
-            
-            if len(matches) > 0:
+        for supplier in self.known_suppliers:
+            if supplier['name'] in self.best_scores:
                 found_suppliers.append(supplier)
-                print(f"  ✅ FOUND: {supplier['name']} (Score: {matches.iloc[0]['aerospace_score']})")
+                print(f"  ✅ FOUND: {supplier['name']} as '{self.best_names[supplier['name']]}' "
+                      f"(Score: {self.best_scores[supplier['name']]})")
             else:
                 missing_suppliers.append(supplier)
                 print(f"  ❌ MISSING: {supplier['name']} in {supplier['location']}")
         
-        coverage = len(found_suppliers) / len(KNOWN_SUPPLIERS) * 100
+        coverage = len(found_suppliers) / len(self.known_suppliers) * 100
         
-        print(f"\n  Coverage: {len(found_suppliers)}/{len(KNOWN_SUPPLIERS)} ({coverage:.1f}%)")
+        print(f"\n  Coverage: {len(found_suppliers)}/{len(self.known_suppliers)} ({coverage:.1f}%)")
         print("="*70 + "\n")
         
         return {
@@ -241,160 +258,328 @@ class IntegratedAerospaceSystem:
             'missing': missing_suppliers,
             'coverage_pct': coverage
         }
+
+
+class DistributionSummary:
+    """Result distribution accumulated over candidate chunks"""
     
-    def analyze_distribution(self, candidates_df: pd.DataFrame):
-        """Analyze the distribution of results"""
-        
+    def __init__(self):
+        self.total = 0
+        self.tiers = Counter()
+        self.score_ranges = Counter()
+        self.regions = Counter()
+        self.sources = Counter()
+        self.with_website = 0
+        self.with_phone = 0
+        self.with_postcode = 0
+    
+    def update(self, chunk: pd.DataFrame):
+        if len(chunk) == 0:
+            return
+        self.total += len(chunk)
+        self.tiers.update(chunk['tier_classification'].value_counts().to_dict())
+        score_range = pd.cut(chunk['aerospace_score'], bins=SCORE_BINS, labels=SCORE_LABELS)
+        self.score_ranges.update(score_range.value_counts().to_dict())
+        self.regions.update(chunk['postcode'].str[:2].value_counts().to_dict())
+        self.sources.update(chunk['source_table'].value_counts().to_dict())
+        self.with_website += int(chunk['website'].notna().sum())
+        self.with_phone += int(chunk['phone'].notna().sum())
+        self.with_postcode += int(chunk['postcode'].notna().sum())
+    
+    def report(self):
         print("\n" + "="*70)
         print("📊 RESULT DISTRIBUTION")
         print("="*70)
         
-        if len(candidates_df) == 0:
+        if self.total == 0:
             print("  ⚠️  No candidates found with current criteria!")
             return
         
         # By tier
         print("\n1. BY TIER:")
-        tier_counts = candidates_df['tier_classification'].value_counts()
-        for tier, count in tier_counts.items():
+        for tier, count in self.tiers.most_common():
             print(f"   {tier}: {count}")
         
         # By score range
         print("\n2. BY SCORE RANGE:")
-        score_bins = [0, 60, 80, 100, 120, 150, 200, 300]
-        score_labels = ['<60', '60-79', '80-99', '100-119', '120-149', '150-199', '200+']
-        candidates_df['score_range'] = pd.cut(
-            candidates_df['aerospace_score'], 
-            bins=score_bins, 
-            labels=score_labels
-        )
-        for score_range, count in candidates_df['score_range'].value_counts().sort_index().items():
-            print(f"   {score_range}: {count}")
+        for score_range in SCORE_LABELS:
+            print(f"   {score_range}: {self.score_ranges.get(score_range, 0)}")
         
         # By region
         print("\n3. BY REGION (Top 10):")
-        candidates_df['region'] = candidates_df['postcode'].str[:2]
-        region_counts = candidates_df['region'].value_counts().head(10)
-        for region, count in region_counts.items():
+        for region, count in self.regions.most_common(10):
             print(f"   {region}: {count}")
         
         # By source
         print("\n4. BY SOURCE TABLE:")
-        source_counts = candidates_df['source_table'].value_counts()
-        for source, count in source_counts.items():
+        for source, count in self.sources.most_common():
             source_short = source.replace('planet_osm_', '')
             print(f"   {source_short}: {count}")
         
         # Data completeness
         print("\n5. DATA COMPLETENESS:")
-        print(f"   With website: {candidates_df['website'].notna().sum()} ({candidates_df['website'].notna().sum()/len(candidates_df)*100:.1f}%)")
-        print(f"   With phone: {candidates_df['phone'].notna().sum()} ({candidates_df['phone'].notna().sum()/len(candidates_df)*100:.1f}%)")
-        print(f"   With postcode: {candidates_df['postcode'].notna().sum()} ({candidates_df['postcode'].notna().sum()/len(candidates_df)*100:.1f}%)")
+        print(f"   With website: {self.with_website} ({self.with_website/self.total*100:.1f}%)")
+        print(f"   With phone: {self.with_phone} ({self.with_phone/self.total*100:.1f}%)")
+        print(f"   With postcode: {self.with_postcode} ({self.with_postcode/self.total*100:.1f}%)")
         
         print("\n" + "="*70 + "\n")
+
+
+# ============================================================================
+# SYSTEM CLASS
+# ============================================================================
+
+class IntegratedAerospaceSystem:
+    """Complete system: Database → Filter → Verify → Analyze"""
+    
+    def __init__(self, db_config, groq_api_key, criteria, llm_config=None):
+        self.db_config = db_config
+        self.criteria = criteria
+        self.llm_config = {**LLM_CONFIG, **(llm_config or {})}
+        self.groq_client = Groq(api_key=groq_api_key) if groq_api_key else None
+        if self.groq_client and self.llm_config['cache_path']:
+            # Verdicts are cached per candidate, so re-runs only ask about new ones
+            self.groq_client = CachedLLMClient(
+                self.groq_client, path=self.llm_config['cache_path'],
+                ttl=self.llm_config['cache_ttl_days'] * 24 * 3600,
+            )
+        self.db = Database(db_config)
+        
+    def connect_db(self):
+        """Connect to PostgreSQL"""
+        try:
+            self.db.fetch_one("SELECT 1")
+            print("✅ Connected to database")
+            return True
+        except Exception as e:
+            print(f"❌ Database connection failed: {e}")
+            return False
+    
+    def build_query(self) -> Tuple[str, Dict]:
+        """Build the parameterized candidate query for the current criteria
+        
+        Returns (sql, params); the SQL only contains the filters the
+        criteria use.
+        """
+        
+        params = criteria_params(self.criteria)
+        return candidate_query(params), params
+    
+    def print_query(self, query: str, params: Dict = None):
+        print("\n" + "="*70)
+        print("📊 SQL QUERY GENERATED:")
+        print("="*70)
+        print(query)
+        if params:
+            print("Parameters:")
+            for name, value in params.items():
+                print(f"  {name} = {value!r}")
+        print("="*70 + "\n")
+    
+    def fetch_candidates(self) -> pd.DataFrame:
+        """Fetch candidates from database based on criteria"""
+        
+        query, params = self.build_query()
+        self.print_query(query, params)
+        
+        try:
+            with self.db.connection() as conn:
+                df = pd.read_sql_query(query, conn, params=params)
+            return df
+        except Exception as e:
+            print(f"❌ Query failed: {e}")
+            return pd.DataFrame()
+    
+    def fetch_candidates_stream(self, batch_size: int = None, as_arrow: bool = False) -> Iterator:
+        """Stream candidates in chunks through a named server-side cursor
+        
+        Yields pandas DataFrames (or pyarrow RecordBatches with as_arrow=True)
+        of at most batch_size rows, so memory stays flat however many rows
+        the criteria match.
+        """
+        
+        batch_size = batch_size or self.criteria.get('fetch_batch_size', 5000)
+        query, params = self.build_query()
+        self.print_query(query, params)
+        
+        if as_arrow:
+            import pyarrow as pa
+        
+        with self.db.named_cursor(query, params, itersize=batch_size) as cur:
+            columns = None
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                if columns is None:
+                    columns = [col[0] for col in cur.description]
+                chunk = pd.DataFrame.from_records(rows, columns=columns)
+                yield pa.RecordBatch.from_pandas(chunk, preserve_index=False) if as_arrow else chunk
     
-    def llm_verify_sample(self, candidates_df: pd.DataFrame, sample_size: int = 5):
-        """Use LLM to verify a sample of candidates"""
+    def known_suppliers(self) -> List[Dict]:
+        """Registry suppliers (with aliases) if synced, else KNOWN_SUPPLIERS"""
+        try:
+            return load_suppliers(self.db, self.db_config.get('schema', 'public')) or KNOWN_SUPPLIERS
+        except Exception as e:
+            print(f"⚠️  Known supplier registry unavailable ({e}) - using built-in list")
+            return KNOWN_SUPPLIERS
+    
+    def analyze_coverage(self, candidates: Union[pd.DataFrame, Iterable[pd.DataFrame]]) -> Dict:
+        """Check how many known suppliers we captured
+        
+        Accepts a DataFrame or an iterable of DataFrame chunks (e.g. from
+        fetch_candidates_stream) and scans each chunk once.
+        """
+        
+        coverage = CoverageSummary(self.known_suppliers())
+        for chunk in _as_chunks(candidates):
+            coverage.update(chunk)
+        return coverage.report()
+    
+    def analyze_distribution(self, candidates: Union[pd.DataFrame, Iterable[pd.DataFrame]]):
+        """Analyze the distribution of results (DataFrame or iterable of chunks)"""
+        
+        distribution = DistributionSummary()
+        for chunk in _as_chunks(candidates):
+            distribution.update(chunk)
+        distribution.report()
+        return distribution
+    
+    def llm_verify_candidates(self, candidates_df: pd.DataFrame, sample_size: int = None,
+                              output_file: str = None) -> pd.DataFrame:
+        """Use LLM to verify candidates (all of them unless sample_size is set)
+        
+        Candidates are packed into JSON batches and sent concurrently within
+        the LLM_CONFIG requests/tokens-per-minute budget. Returns the
+        candidates with llm_verdict / llm_reason columns.
+        """
         
         if not self.groq_client:
             print("⚠️  Groq API key not set - skipping LLM verification")
-            return
+            return candidates_df
         
         if len(candidates_df) == 0:
             print("⚠️  No candidates to verify")
-            return
+            return candidates_df
+        
+        sample = candidates_df.head(sample_size) if sample_size else candidates_df
         
         print("\n" + "="*70)
-        print(f"🤖 LLM VERIFICATION - Sample of {min(sample_size, len(candidates_df))} candidates")
+        print(f"🤖 LLM VERIFICATION - {len(sample)} candidates in batches of {self.llm_config['batch_size']}")
         print("="*70 + "\n")
         
-        # Take a sample
-        sample = candidates_df.head(sample_size)
-        
-        verified_count = 0
-        
-        for idx, row in sample.iterrows():
-            print(f"📋 {row['name']}")
-            print(f"   Score: {row['aerospace_score']} | Tier: {row['tier_classification']}")
-            
-            # Quick verification question
-            prompt = f"""Is "{row['name']}" likely to be an aerospace supplier?
-            
-Consider:
-- Name: {row['name']}
-- Location: {row.get('city', 'Unknown')} ({row.get('postcode', 'No postcode')})
-- Landuse: {row.get('landuse_type', 'Unknown')}
-- Building: {row.get('building_type', 'Unknown')}
-
-Answer YES, NO, or MAYBE with a brief reason."""
-            
-            try:
-                response = self.groq_client.chat.completions.create(
-                    model="llama-3.3-70b-versatile",
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.1,
-                    max_tokens=150
-                )
-                
-                answer = response.choices[0].message.content.strip()
-                print(f"   🤖 LLM: {answer}")
-                
-                if answer.upper().startswith('YES'):
-                    verified_count += 1
-                
-            except Exception as e:
-                print(f"   ❌ Error: {e}")
-            
-            print()
-            time.sleep(1)  # Rate limiting
-        
-        precision = verified_count / min(sample_size, len(candidates_df)) * 100
-        print(f"✅ LLM Verification: {verified_count}/{min(sample_size, len(candidates_df))} confirmed ({precision:.1f}%)")
+        verifier = BatchVerifier(
+            self.groq_client,
+            model=self.llm_config['model'],
+            batch_size=self.llm_config['batch_size'],
+            concurrency=self.llm_config['concurrency'],
+            requests_per_minute=self.llm_config['requests_per_minute'],
+            tokens_per_minute=self.llm_config['tokens_per_minute'],
+            max_retries=self.llm_config['max_retries'],
+        )
+        verdicts = verifier.verify(sample.to_dict('records'))
+        
+        verified = sample.copy()
+        verified['llm_verdict'] = [v['verdict'] for v in verdicts]
+        verified['llm_reason'] = [v['reason'] for v in verdicts]
+        
+        # Per-tier breakdown
+        breakdown = verified.groupby('tier_classification')['llm_verdict'].value_counts().unstack(fill_value=0)
+        print(breakdown.to_string())
+        print()
+        
+        for _, row in verified.head(5).iterrows():
+            print(f"📋 {row['name']} (Score: {row['aerospace_score']} | Tier: {row['tier_classification']})")
+            print(f"   🤖 LLM: {row['llm_verdict']} - {row['llm_reason']}")
+        
+        verified_count = (verified['llm_verdict'] == 'YES').sum()
+        precision = verified_count / len(verified) * 100
+        stats = verifier.stats
+        print(f"\n✅ LLM Verification: {verified_count}/{len(verified)} confirmed ({precision:.1f}%)")
+        print(f"   {stats['requests']} requests, {stats['retries']} retries, "
+              f"{stats['tokens']} tokens, {stats['failed_items']} unanswered, "
+              f"{stats['cached_items']} from cache")
+        if output_file:
+            verified.to_csv(output_file, index=False)
+            print(f"💾 LLM verdicts saved to: {output_file}")
         print("="*70 + "\n")
+        
+        return verified
     
-    def compare_scenarios(self, scenarios: List[Dict]):
-        """Compare multiple criteria scenarios side-by-side"""
+    def scan_candidates(self, output_file: str = None, verify_tiers: List[str] = None):
+        """Single streaming pass feeding the coverage and distribution summaries
+        
+        Optionally appends every chunk to output_file as CSV and keeps the
+        rows of the verify_tiers tiers (prompt columns only) for LLM
+        verification.
+        """
+        
+        coverage = CoverageSummary(self.known_suppliers())
+        distribution = DistributionSummary()
+        to_verify = []
+        
+        try:
+            for chunk in self.fetch_candidates_stream():
+                coverage.update(chunk)
+                distribution.update(chunk)
+                if output_file:
+                    chunk.to_csv(output_file, mode='a', header=(distribution.total == len(chunk)), index=False)
+                if verify_tiers:
+                    selected = chunk[chunk['tier_classification'].isin(verify_tiers)]
+                    to_verify.append(selected[[c for c in LLM_COLUMNS if c in selected.columns]])
+        except Exception as e:
+            print(f"❌ Query failed: {e}")
+        
+        verify_df = pd.concat(to_verify, ignore_index=True) if to_verify else pd.DataFrame()
+        return coverage, distribution, verify_df
+    
+    def compare_scenarios(self, scenarios: List[Dict], output_file: str = None, verbose: bool = True):
+        """Compare multiple criteria scenarios side-by-side
+        
+        The union of every scenario's candidates is fetched in one query and
+        each scenario is then evaluated in memory (see ScenarioSweep), so a
+        sweep of hundreds of scenarios costs one round trip.
+        """
         
         print("\n" + "="*70)
         print("🔬 SCENARIO COMPARISON")
         print("="*70 + "\n")
         
-        results = []
-        
-        for i, scenario in enumerate(scenarios, 1):
-            print(f"Running Scenario {i}: {scenario['name']}")
-            
-            # Temporarily update criteria
-            old_criteria = self.criteria.copy()
-            self.criteria.update(scenario['criteria'])
-            
-            # Fetch candidates
-            candidates = self.fetch_candidates()
-            
-            # Analyze
-            coverage = self.analyze_coverage(candidates)
-            
-            # Store results
-            results.append({
-                'scenario': scenario['name'],
-                'total_candidates': len(candidates),
-                'coverage_pct': coverage['coverage_pct'],
-                'tier1_count': len(candidates[candidates['tier_classification'] == 'tier1_candidate']),
-                'tier2_count': len(candidates[candidates['tier_classification'] == 'tier2_candidate']),
-                'with_website': candidates['website'].notna().sum(),
-            })
-            
-            # Restore criteria
-            self.criteria = old_criteria
-            
-            print()
+        # Scenario criteria layered over the current ones
+        param_sets = [criteria_params({**self.criteria, **scenario['criteria']}) for scenario in scenarios]
+        names = [scenario['name'] for scenario in scenarios]
+        
+        started = time.time()
+        try:
+            with self.db.connection() as conn:
+                envelope = envelope_params(param_sets)
+                union = pd.read_sql_query(candidate_query(envelope, SWEEP_COLUMNS), conn, params=envelope)
+        except Exception as e:
+            print(f"❌ Query failed: {e}")
+            return pd.DataFrame()
+        fetched = time.time()
+        
+        sweep = ScenarioSweep(union, self.known_suppliers())
+        comparison_df = sweep.run(param_sets, names)
+        print(f"  {len(union)} candidates fetched in {fetched - started:.1f}s, "
+              f"{len(scenarios)} scenarios evaluated in {time.time() - fetched:.2f}s\n")
+        
+        if verbose:
+            for row in comparison_df.itertuples():
+                print(f"Scenario: {row.scenario}")
+                print(f"  {row.total_candidates} candidates, known suppliers found: "
+                      f"{row.known_found}/{len(sweep.suppliers)} ({row.coverage_pct:.1f}%)\n")
+        
+        comparison_df = comparison_df.drop(columns=['found'])
+        if output_file:
+            comparison_df.to_csv(output_file, index=False)
+            print(f"💾 Scenario grid saved to: {output_file}")
         
         # Summary table
         print("\n" + "="*70)
         print("📊 COMPARISON SUMMARY")
         print("="*70)
         
-        comparison_df = pd.DataFrame(results)
         print(comparison_df.to_string(index=False))
         print("\n" + "="*70 + "\n")
         
@@ -421,13 +606,19 @@ Answer YES, NO, or MAYBE with a brief reason."""
         if not self.connect_db():
             return
         
-        # Fetch candidates
+        # Stream candidates once: coverage, distribution and the CSV export
+        # are all built chunk by chunk
         print("\n🔍 Fetching candidates from database...")
-        candidates = self.fetch_candidates()
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output_file = f"analysis_results_{timestamp}.csv"
+        coverage_summary, distribution, to_verify = self.scan_candidates(
+            output_file=output_file,
+            verify_tiers=self.llm_config['verify_tiers'] if self.groq_client else None,
+        )
         
-        print(f"\n✅ Retrieved {len(candidates)} candidates")
+        print(f"\n✅ Retrieved {distribution.total} candidates")
         
-        if len(candidates) == 0:
+        if distribution.total == 0:
             print("\n⚠️  NO CANDIDATES FOUND!")
             print("\n💡 Try adjusting criteria:")
             print("   - Lower min_aerospace_score")
@@ -436,32 +627,37 @@ Answer YES, NO, or MAYBE with a brief reason."""
             return
         
         # Analyze coverage
-        coverage = self.analyze_coverage(candidates)
+        coverage = coverage_summary.report()
         
         # Analyze distribution
-        self.analyze_distribution(candidates)
+        distribution.report()
         
-        # LLM verification (sample)
+        # LLM verification of every tier-1/tier-2 candidate
         if self.groq_client:
-            self.llm_verify_sample(candidates, sample_size=3)
+            self.llm_verify_candidates(
+                to_verify, sample_size=self.llm_config['max_candidates'],
+                output_file=f"llm_verification_{timestamp}.csv"
+            )
         
-        # Save results
-        output_file = f"analysis_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        candidates.to_csv(output_file, index=False)
         print(f"💾 Results saved to: {output_file}")
         
         # Final summary
         print("\n" + "="*70)
         print("📈 FINAL SUMMARY")
         print("="*70)
-        print(f"  Total Candidates: {len(candidates)}")
+        print(f"  Total Candidates: {distribution.total}")
         print(f"  Known Supplier Coverage: {coverage['coverage_pct']:.1f}%")
-        print(f"  Tier 1: {len(candidates[candidates['tier_classification'] == 'tier1_candidate'])}")
-        print(f"  Tier 2: {len(candidates[candidates['tier_classification'] == 'tier2_candidate'])}")
-        print(f"  With Contact Info: {candidates['website'].notna().sum()}")
+        print(f"  Tier 1: {distribution.tiers['tier1_candidate']}")
+        print(f"  Tier 2: {distribution.tiers['tier2_candidate']}")
+        print(f"  With Contact Info: {distribution.with_website}")
         print("="*70 + "\n")
         
-        return candidates
+        return {
+            'total_candidates': distribution.total,
+            'coverage': coverage,
+            'distribution': distribution,
+            'output_file': output_file,
+        }
 
 
 # ============================================================================
@@ -472,7 +668,7 @@ def example_single_run():
     """Example: Single run with current criteria"""
     
     system = IntegratedAerospaceSystem(DB_CONFIG, GROQ_API_KEY, CRITERIA)
-    candidates = system.run_full_analysis()
+    results = system.run_full_analysis()
 
 
 def example_compare_scenarios():
@@ -539,6 +735,33 @@ def example_test_single_criterion():
         system.compare_scenarios(scenarios)
 
 
+def example_parameter_sweep():
+    """Example: Grid of 200 criteria combinations from a single fetch"""
+    
+    scenarios = parameter_grid({
+        'min_aerospace_score': [40, 50, 60, 70, 80, 90, 100, 120, 150, 200],
+        'tier_classifications': [
+            ['tier1_candidate'],
+            ['tier2_candidate'],
+            ['tier1_candidate', 'tier2_candidate'],
+            ['tier1_candidate', 'tier2_candidate', 'potential_candidate'],
+            [],
+        ],
+        'require_website': [False, True],
+        'require_industrial_landuse': [False, True],
+    })
+    
+    system = IntegratedAerospaceSystem(DB_CONFIG, GROQ_API_KEY, {**CRITERIA, 'max_results': None})
+    
+    if system.connect_db():
+        output_file = f"scenario_sweep_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        grid = system.compare_scenarios(scenarios, output_file=output_file, verbose=False)
+        if len(grid):
+            print("\n💡 BEST COVERAGE PER CANDIDATE COUNT:")
+            best = grid.sort_values(['coverage_pct', 'total_candidates'], ascending=[False, True])
+            print(best.head(10).to_string(index=False))
+
+
 # ============================================================================
 # MAIN
 # ============================================================================
@@ -551,6 +774,7 @@ if __name__ == "__main__":
         print("  python integrated_aerospace_system.py run      # Single run")
         print("  python integrated_aerospace_system.py compare  # Compare scenarios")
         print("  python integrated_aerospace_system.py test     # Test single criterion")
+        print("  python integrated_aerospace_system.py sweep    # 200-scenario parameter sweep")
         print()
         
     elif sys.argv[1] == 'run':
@@ -562,5 +786,8 @@ if __name__ == "__main__":
     elif sys.argv[1] == 'test':
         example_test_single_criterion()
     
+    elif sys.argv[1] == 'sweep':
+        example_parameter_sweep()
+    
     else:
-        print("Unknown command. Use: run, compare, or test")
\ No newline at end of file
+        print("Unknown command. Use: run, compare, test, or sweep")
\ No newline at end of file
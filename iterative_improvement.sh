@@ -30,20 +30,27 @@ echo ""
 # ==============================================================================
 echo -e "${YELLOW}[STEP 1]${NC} Capture baseline metrics..."
 
+# Aggregates come from the candidate_rollup views, refreshed after each pipeline run
+python3 scripts/reports/refresh_rollups.py --if-missing -q
+
 psql -h "$DB_HOST" -p "$DB_PORT" -U "$DB_USER" -d "$DB_NAME" -t -A > "${RESULTS_DIR}/baseline_metrics.txt" <<'SQL'
-SELECT 'total_candidates:' || COUNT(*) FROM aerospace_supplier_candidates
+SELECT 'total_candidates:' || total FROM candidate_rollup_totals
 UNION ALL
-SELECT 'tier1:' || COUNT(*) FROM aerospace_supplier_candidates WHERE tier_classification = 'tier1_candidate'
+SELECT 'tier1:' || tier1 FROM candidate_rollup_totals
 UNION ALL
-SELECT 'tier2:' || COUNT(*) FROM aerospace_supplier_candidates WHERE tier_classification = 'tier2_candidate'
+SELECT 'tier2:' || tier2 FROM candidate_rollup_totals
 UNION ALL
-SELECT 'potential:' || COUNT(*) FROM aerospace_supplier_candidates WHERE tier_classification = 'potential_candidate'
+SELECT 'potential:' || potential FROM candidate_rollup_totals
 UNION ALL
-SELECT 'avg_score:' || ROUND(AVG(aerospace_score)) FROM aerospace_supplier_candidates
+SELECT 'avg_score:' || ROUND(avg_score) FROM candidate_rollup_totals
 UNION ALL
-SELECT 'with_website:' || COUNT(*) FROM aerospace_supplier_candidates WHERE website IS NOT NULL;
+SELECT 'with_website:' || with_website FROM candidate_rollup_totals;
 SQL
 
+# Known-supplier recall, matched through the trigram index on candidate names
+RECALL=$(python3 scripts/verify/check_coverage.py --recall-only --output "${RESULTS_DIR}/known_supplier_coverage.csv")
+echo "known_supplier_recall:${RECALL}%" >> "${RESULTS_DIR}/baseline_metrics.txt"
+
 cat "${RESULTS_DIR}/baseline_metrics.txt"
 echo ""
 
@@ -168,14 +175,12 @@ FROM scenarios;
 \echo '------------------------------------------'
 
 SELECT 
-  LEFT(postcode, 2) as region,
-  COUNT(*) as current_total,
-  COUNT(*) FILTER (WHERE aerospace_score >= 100) as if_stricter,
-  COUNT(*) FILTER (WHERE aerospace_score >= 70) as if_looser
-FROM aerospace_supplier_candidates
-WHERE postcode IS NOT NULL
-GROUP BY region
-HAVING COUNT(*) >= 5
+  region,
+  total as current_total,
+  score_100_plus as if_stricter,
+  score_70_plus as if_looser
+FROM candidate_rollup_regions
+WHERE total >= 5
 ORDER BY current_total DESC
 LIMIT 10;
 
@@ -256,13 +261,11 @@ EOF
 
 psql -h "$DB_HOST" -p "$DB_PORT" -U "$DB_USER" -d "$DB_NAME" -t >> "${RESULTS_DIR}/recommendations.md" <<'SQL'
 SELECT 
-  '- ' || LEFT(postcode, 2) || 
-  ': ' || COUNT(*) || ' candidates (avg score: ' || ROUND(AVG(aerospace_score)) || ')'
-FROM aerospace_supplier_candidates
-WHERE postcode IS NOT NULL
-GROUP BY LEFT(postcode, 2)
-HAVING COUNT(*) >= 10
-ORDER BY AVG(aerospace_score) DESC
+  '- ' || region || 
+  ': ' || total || ' candidates (avg score: ' || ROUND(avg_score) || ')'
+FROM candidate_rollup_regions
+WHERE total >= 10
+ORDER BY avg_score DESC
 LIMIT 15;
 SQL
 
@@ -275,16 +278,13 @@ Current performance:
 EOF
 
 psql -h "$DB_HOST" -p "$DB_PORT" -U "$DB_USER" -d "$DB_NAME" -t >> "${RESULTS_DIR}/recommendations.md" <<'SQL'
-SELECT '- Total candidates: ' || COUNT(*) FROM aerospace_supplier_candidates
+SELECT '- Total candidates: ' || total FROM candidate_rollup_totals
 UNION ALL
-SELECT '- Tier 1: ' || COUNT(*) || ' (' || ROUND(100.0 * COUNT(*) / (SELECT COUNT(*) FROM aerospace_supplier_candidates)) || '%)' 
-FROM aerospace_supplier_candidates WHERE tier_classification = 'tier1_candidate'
+SELECT '- Tier 1: ' || tier1 || ' (' || ROUND(100.0 * tier1 / NULLIF(total, 0)) || '%)' FROM candidate_rollup_totals
 UNION ALL
-SELECT '- Tier 2: ' || COUNT(*) || ' (' || ROUND(100.0 * COUNT(*) / (SELECT COUNT(*) FROM aerospace_supplier_candidates)) || '%)' 
-FROM aerospace_supplier_candidates WHERE tier_classification = 'tier2_candidate'
+SELECT '- Tier 2: ' || tier2 || ' (' || ROUND(100.0 * tier2 / NULLIF(total, 0)) || '%)' FROM candidate_rollup_totals
 UNION ALL
-SELECT '- With contact info: ' || COUNT(*) || ' (' || ROUND(100.0 * COUNT(*) / (SELECT COUNT(*) FROM aerospace_supplier_candidates)) || '%)' 
-FROM aerospace_supplier_candidates WHERE website IS NOT NULL OR phone IS NOT NULL;
+SELECT '- With contact info: ' || with_contact || ' (' || ROUND(100.0 * with_contact / NULLIF(total, 0)) || '%)' FROM candidate_rollup_totals;
 SQL
 
 cat >> "${RESULTS_DIR}/recommendations.md" <<'EOF'
@@ -376,6 +376,16 @@ else
     echo "No previous iteration found (this is the first run)"
 fi
 
+# Precision / recall against the labelled ground truth, and the candidates
+# whose prediction flipped since the previous iteration's rules
+EVAL_ARGS=(--version "${RESULTS_DIR}/full_results.csv" --curve "${RESULTS_DIR}/pr_curve.csv")
+if [ -n "$PREV_ITERATION" ] && [ -f "iterations/${PREV_ITERATION}/full_results.csv" ]; then
+    EVAL_ARGS+=(--baseline "iterations/${PREV_ITERATION}/full_results.csv" --flips "${RESULTS_DIR}/flipped_rows.csv")
+fi
+python3 scripts/verify/evaluate_rules.py "${EVAL_ARGS[@]}" > "${RESULTS_DIR}/evaluation.txt"
+echo -e "${GREEN}✓${NC} Evaluation: ${RESULTS_DIR}/evaluation.txt"
+cat "${RESULTS_DIR}/evaluation.txt"
+
 echo ""
 
 # ==============================================================================
@@ -395,7 +405,11 @@ FILES GENERATED:
 - recommendations.md         : Actionable recommendations
 - full_results.csv           : Complete candidate export
 - tier1_keywords.csv         : High-value keywords extracted
+- known_supplier_coverage.csv: Best match per known supplier
 - comparison.txt             : Comparison to previous run (if available)
+- evaluation.txt             : Precision/recall vs labelled ground truth
+- pr_curve.csv               : Precision/recall at every score threshold
+- flipped_rows.csv           : Candidates gained/lost vs previous run (if available)
 
 QUICK STATS:
 $(cat ${RESULTS_DIR}/baseline_metrics.txt)
@@ -405,10 +419,11 @@ $(head -n 30 ${RESULTS_DIR}/recommendations.md | tail -n 20)
 
 NEXT STEPS:
 1. Review ${RESULTS_DIR}/recommendations.md
-2. Manually validate 20-30 Tier 1 candidates
+2. Manually validate 20-30 Tier 1 candidates, then add them as labels:
+   python3 scripts/verify/label_ground_truth.py <validated sample>.csv
 3. Update scoring.yaml with new keywords/filters
 4. Re-run pipeline: bash 07_run_all_pipelines.sh
-5. Run this script again to measure improvement
+5. Run this script again to measure improvement (see evaluation.txt)
 
 =================================================================
 EOF
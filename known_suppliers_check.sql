@@ -1,110 +1,105 @@
 -- Check coverage of known UK aerospace suppliers
 -- Run: psql -d uk_osm_full -f known_suppliers_check.sql
+--
+-- Reads the known_suppliers registry (seeded from config/known_suppliers.csv by
+-- python3 scripts/verify/check_coverage.py --sync). Supplier aliases are matched
+-- to candidate names with pg_trgm strict word similarity, served by the trigram
+-- index on aerospace_supplier_candidates.name; a whole alias has to match, so
+-- "Senior Aerospace" no longer picks up every name containing "Senior".
+-- known_supplier_in_area() (created by --sync) decides whether a candidate is in
+-- a supplier's postcode areas / districts or site radius.
+-- scripts/verify/check_coverage.py runs the same check from Python.
 
 \echo '========================================================'
 \echo 'KNOWN UK AEROSPACE SUPPLIER COVERAGE CHECK'
 \echo '========================================================'
 \echo ''
 
--- Create temporary table of known major suppliers
-CREATE TEMP TABLE known_aerospace_suppliers AS
-SELECT * FROM (VALUES
-  -- Tier 1 Primes
-  ('Airbus UK', 'Bristol', 'BS', 200),
-  ('Rolls-Royce', 'Derby', 'DE', 200),
-  ('BAE Systems', 'Preston', 'PR', 200),
-  ('Leonardo Helicopters', 'Yeovil', 'BA', 200),
-  ('GKN Aerospace', 'Redditch', 'B9', 200),
-  
-  -- Major Tier 2
-  ('Spirit AeroSystems', 'Belfast', 'BT', 150),
-  ('Meggitt', 'Coventry', 'CV', 150),
-  ('Cobham', 'Wimborne', 'BH', 150),
-  ('Senior Aerospace', 'Various', NULL, 150),
-  ('Gardner Aerospace', 'Various', NULL, 150),
-  ('UTC Aerospace Systems', 'Various', NULL, 150),
-  ('Moog Aircraft', 'Tewkesbury', 'GL', 150),
-  ('Parker Aerospace', 'Various', NULL, 150),
-  
-  -- Significant Tier 2/3
-  ('Marshall Aerospace', 'Cambridge', 'CB', 120),
-  ('Safran Seats', 'Various', NULL, 120),
-  ('Triumph Actuation', 'Various', NULL, 120),
-  ('Collins Aerospace', 'Various', NULL, 120),
-  ('Magellan Aerospace', 'Various', NULL, 120)
-) AS t(company_name, location, postcode_prefix, expected_score);
+BEGIN;
+SET LOCAL pg_trgm.strict_word_similarity_threshold = 0.6;
+
+-- Best-scoring candidate per supplier, preferring matches in its postcode areas
+CREATE TEMP TABLE supplier_matches ON COMMIT DROP AS
+SELECT DISTINCT ON (k.supplier_id)
+  k.supplier_id,
+  c.name,
+  c.aerospace_score,
+  c.tier_classification,
+  c.postcode,
+  known_supplier_in_area(k.postcode_areas, k.latitude, k.longitude, k.radius_km,
+                         c.postcode, c.latitude, c.longitude) as in_area
+FROM known_suppliers k
+JOIN known_supplier_aliases a ON a.supplier_id = k.supplier_id
+JOIN aerospace_supplier_candidates c ON a.alias <<% c.name
+WHERE k.active
+ORDER BY k.supplier_id, in_area DESC NULLS LAST, c.aerospace_score DESC;
 
 \echo '1. COVERAGE ANALYSIS'
 \echo '--------------------'
 \echo 'Checking how many known suppliers we found...'
 \echo ''
 
--- Direct name matches
-SELECT 
-  k.company_name as known_supplier,
+SELECT
+  k.name as known_supplier,
   k.location,
-  k.postcode_prefix,
-  CASE 
-    WHEN c.name IS NOT NULL THEN '✓ FOUND'
+  array_to_string(k.postcode_areas, '/') as postcode_areas,
+  CASE
+    WHEN m.name IS NOT NULL THEN '✓ FOUND'
     ELSE '✗ MISSING'
   END as status,
-  c.aerospace_score,
-  c.tier_classification
-FROM known_aerospace_suppliers k
-LEFT JOIN aerospace_supplier_candidates c
-  ON LOWER(c.name) LIKE '%' || LOWER(SPLIT_PART(k.company_name, ' ', 1)) || '%'
-ORDER BY k.expected_score DESC, k.company_name;
+  m.name as matched_as,
+  m.aerospace_score,
+  m.tier_classification,
+  m.in_area
+FROM known_suppliers k
+LEFT JOIN supplier_matches m ON m.supplier_id = k.supplier_id
+WHERE k.active
+ORDER BY k.expected_score DESC, k.name;
 
 \echo ''
 \echo '2. COVERAGE SUMMARY'
 \echo '-------------------'
 
-SELECT 
+SELECT
   'Total Known Suppliers' as metric,
   COUNT(*)::text as value
-FROM known_aerospace_suppliers
+FROM known_suppliers
+WHERE active
 
 UNION ALL
 
-SELECT 
+SELECT
   'Found in Database' as metric,
-  COUNT(DISTINCT k.company_name)::text as value
-FROM known_aerospace_suppliers k
-INNER JOIN aerospace_supplier_candidates c
-  ON LOWER(c.name) LIKE '%' || LOWER(SPLIT_PART(k.company_name, ' ', 1)) || '%'
+  COUNT(*)::text as value
+FROM supplier_matches
 
 UNION ALL
 
-SELECT 
+SELECT
   'Coverage %' as metric,
-  ROUND(100.0 * COUNT(DISTINCT k.company_name) / 
-    (SELECT COUNT(*) FROM known_aerospace_suppliers))::text || '%' as value
-FROM known_aerospace_suppliers k
-INNER JOIN aerospace_supplier_candidates c
-  ON LOWER(c.name) LIKE '%' || LOWER(SPLIT_PART(k.company_name, ' ', 1)) || '%';
+  ROUND(100.0 * (SELECT COUNT(*) FROM supplier_matches) /
+    NULLIF(COUNT(*), 0))::text || '%' as value
+FROM known_suppliers
+WHERE active;
 
 \echo ''
 \echo '3. NEAR MATCHES (Potential Facilities)'
 \echo '---------------------------------------'
-\echo 'Companies with similar names or in known locations:'
+\echo 'High scorers in the postcode areas or site radius of known suppliers:'
 \echo ''
 
--- Find facilities near known supplier locations
 SELECT DISTINCT
   c.name,
   c.aerospace_score,
   c.postcode,
   c.city,
-  k.company_name as near_to
-FROM aerospace_supplier_candidates c
-CROSS JOIN known_aerospace_suppliers k
-WHERE (
-  -- Same postcode area
-  (k.postcode_prefix IS NOT NULL AND LEFT(c.postcode, 2) = k.postcode_prefix)
-  -- Or partial name match
-  OR LOWER(c.name) LIKE '%' || LOWER(SPLIT_PART(k.company_name, ' ', 1)) || '%'
-)
-AND c.aerospace_score >= 100
+  k.name as near_to
+FROM known_suppliers k
+JOIN aerospace_supplier_candidates c
+  ON known_supplier_in_area(k.postcode_areas, k.latitude, k.longitude, k.radius_km,
+                            c.postcode, c.latitude, c.longitude)
+WHERE k.active
+  AND c.aerospace_score >= 100
 ORDER BY c.aerospace_score DESC
 LIMIT 30;
 
@@ -114,20 +109,19 @@ LIMIT 30;
 \echo 'For suppliers we found, how do scores compare?'
 \echo ''
 
-SELECT 
-  k.company_name,
+SELECT
+  k.name as company_name,
   k.expected_score,
-  COALESCE(MAX(c.aerospace_score), 0) as actual_score,
-  CASE 
-    WHEN MAX(c.aerospace_score) >= k.expected_score THEN '✓ Good'
-    WHEN MAX(c.aerospace_score) >= k.expected_score * 0.7 THEN '~ Close'
-    WHEN MAX(c.aerospace_score) IS NULL THEN '✗ Not Found'
+  COALESCE(m.aerospace_score, 0) as actual_score,
+  CASE
+    WHEN m.aerospace_score >= k.expected_score THEN '✓ Good'
+    WHEN m.aerospace_score >= k.expected_score * 0.7 THEN '~ Close'
+    WHEN m.aerospace_score IS NULL THEN '✗ Not Found'
     ELSE '✗ Too Low'
   END as score_status
-FROM known_aerospace_suppliers k
-LEFT JOIN aerospace_supplier_candidates c
-  ON LOWER(c.name) LIKE '%' || LOWER(SPLIT_PART(k.company_name, ' ', 1)) || '%'
-GROUP BY k.company_name, k.expected_score
+FROM known_suppliers k
+LEFT JOIN supplier_matches m ON m.supplier_id = k.supplier_id
+WHERE k.active
 ORDER BY k.expected_score DESC;
 
 \echo ''
@@ -136,29 +130,33 @@ ORDER BY k.expected_score DESC;
 \echo ''
 
 -- Missing high-value suppliers
-SELECT 
+SELECT
   'Missing High-Value Suppliers:' as recommendation,
   COUNT(*)::text || ' known Tier-1 suppliers not found' as details
-FROM known_aerospace_suppliers k
-LEFT JOIN aerospace_supplier_candidates c
-  ON LOWER(c.name) LIKE '%' || LOWER(SPLIT_PART(k.company_name, ' ', 1)) || '%'
-WHERE k.expected_score >= 150
-  AND c.name IS NULL
+FROM known_suppliers k
+LEFT JOIN supplier_matches m ON m.supplier_id = k.supplier_id
+WHERE k.active
+  AND k.expected_score >= 150
+  AND m.name IS NULL
 
 UNION ALL
 
 -- Check specific locations
-SELECT 
+SELECT
   'Check These Locations:' as recommendation,
-  string_agg(DISTINCT k.location || ' (' || k.postcode_prefix || ')', ', ') as details
-FROM known_aerospace_suppliers k
-LEFT JOIN aerospace_supplier_candidates c
-  ON k.postcode_prefix IS NOT NULL 
-  AND LEFT(c.postcode, 2) = k.postcode_prefix
-  AND c.aerospace_score >= 100
-WHERE k.postcode_prefix IS NOT NULL
-GROUP BY 'Check These Locations:'
-HAVING COUNT(c.*) < 3;
+  string_agg(DISTINCT k.location || ' (' || array_to_string(k.postcode_areas, '/') || ')', ', ') as details
+FROM known_suppliers k
+WHERE k.active
+  AND k.postcode_areas IS NOT NULL
+  AND (
+    SELECT COUNT(*)
+    FROM aerospace_supplier_candidates c
+    WHERE known_supplier_in_area(k.postcode_areas, k.latitude, k.longitude, k.radius_km,
+                                 c.postcode, c.latitude, c.longitude)
+      AND c.aerospace_score >= 100
+  ) < 3;
+
+COMMIT;
 
 \echo ''
 \echo '========================================================'
@@ -170,8 +168,5 @@ HAVING COUNT(c.*) < 3;
 \echo '  2. Low Scores: Review scoring for known suppliers'
 \echo '  3. Location Gaps: Check if geographic bonuses are sufficient'
 \echo ''
-\echo 'Next: Add more known suppliers to this list and re-run'
+\echo 'Next: Add more known suppliers to config/known_suppliers.csv and re-sync'
 \echo ''
-
--- Cleanup
-DROP TABLE known_aerospace_suppliers;
\ No newline at end of file
@@ -12,6 +12,7 @@ Setup:
 """
 
 import os
+import sys
 import json
 import requests
 from bs4 import BeautifulSoup
@@ -19,16 +20,28 @@ from groq import Groq
 import pandas as pd
 import time
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts', 'utils'))
+
+from checkpoint import CheckpointStore, company_key, write_results
+from llm_client import CachedLLMClient, DEFAULT_CACHE_PATH
+from context_ranker import build_context, context_stats
+from company_registry import CompanyRegistry, DEFAULT_REGISTRY_PATH
+
 class SimpleLLMAgent:
     """Simple agent that uses LLM to research companies"""
     
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, cache_path=DEFAULT_CACHE_PATH, registry_path=DEFAULT_REGISTRY_PATH):
         self.api_key = api_key or os.environ.get('GROQ_API_KEY')
         if not self.api_key:
             raise ValueError("GROQ_API_KEY not found. Get one from https://console.groq.com/keys")
         
         self.client = Groq(api_key=self.api_key)
+        if cache_path:
+            # Identical questions are answered from disk on later runs
+            self.client = CachedLLMClient(self.client, path=cache_path)
         self.model = "llama-3.3-70b-versatile"  # Fast and smart
+        # Local Companies House bulk data (scripts/import/import_companies_house.py), if built
+        self.registry = CompanyRegistry.open_if_exists(registry_path)
     
     def fetch_webpage(self, url: str) -> str:
         """Fetch webpage content"""
@@ -47,8 +60,8 @@ class SimpleLLMAgent:
             chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
             text = ' '.join(chunk for chunk in chunks if chunk)
             
-            # Limit to 15000 chars to fit in context
-            return text[:15000]
+            # Whole page; research_company sends only the relevant chunks
+            return text
         except Exception as e:
             return f"Error fetching {url}: {e}"
     
@@ -100,12 +113,21 @@ Provide a clear, concise answer. If the information is not in the context, say "
         
         ch_content = self.fetch_webpage(ch_url)
         
-        # Step 2: Ask each question
+        # Step 2: Keep only the chunks relevant to the questions (shared by all of them)
+        sources = [('Companies House', ch_content)]
+        profile = self.registry.profile(ch_number) if self.registry else {}
+        if profile:
+            sources.insert(0, ('Companies House registry', json.dumps(profile)))
+        context = build_context(sources, questions)
+        stats = context_stats(sources, context)
+        print(f"   📉 Context: {stats['context_chars']:,} of {stats['source_chars']:,} characters")
+        
+        # Step 3: Ask each question
         for i, question in enumerate(questions, 1):
             print(f"\n❓ Question {i}: {question}")
             
             # Let the LLM figure out where to look
-            answer = self.ask_llm(question, ch_content)
+            answer = self.ask_llm(question, context)
             print(f"   💡 Answer: {answer}")
             
             # Store answer with sanitized key
@@ -163,8 +185,13 @@ def example_aerospace_verification():
     return result
 
 
-def batch_process_spreadsheet(input_csv: str, output_csv: str):
-    """Process a spreadsheet of companies"""
+def batch_process_spreadsheet(input_csv: str, output_csv: str, checkpoint_file: str = None):
+    """Process a spreadsheet of companies
+    
+    Results are appended to a JSONL checkpoint (default
+    <output_csv>.checkpoint.jsonl); rerunning skips companies already
+    answered. The output (CSV, or Parquet for .parquet) is written at the end.
+    """
     
     agent = SimpleLLMAgent()
     
@@ -186,32 +213,45 @@ def batch_process_spreadsheet(input_csv: str, output_csv: str):
         print(f"   {i}. {q}")
     print()
     
-    results = []
+    keys = []
     
-    for idx, row in df.iterrows():
-        company_name = row['company_name']
-        ch_number = str(row['companies_house_number'])
-        
-        try:
-            result = agent.research_company(company_name, ch_number, questions)
-            results.append(result)
+    with CheckpointStore(checkpoint_file or f"{output_csv}.checkpoint.jsonl") as store:
+        for idx, row in df.iterrows():
+            company_name = row['company_name']
+            ch_number = str(row['companies_house_number'])
+            key = company_key(company_name, ch_number)
+            keys.append(key)
             
-            # Save progress
-            pd.DataFrame(results).to_csv(output_csv, index=False)
+            if store.is_done(key):
+                print(f"⏩ Skipping {company_name} (already in checkpoint)")
+                continue
             
-            print(f"\n✅ Progress: {idx + 1}/{len(df)}")
-            
-            time.sleep(1)  # Be nice to APIs
-            
-        except Exception as e:
-            print(f"\n❌ Error: {e}")
-            results.append({
-                'company_name': company_name,
-                'companies_house_number': ch_number,
-                'error': str(e)
-            })
+            try:
+                result = agent.research_company(company_name, ch_number, questions)
+                
+                # Save progress
+                store.record(key, result)
+                
+                print(f"\n✅ Progress: {idx + 1}/{len(df)}")
+                
+                time.sleep(1)  # Be nice to APIs
+                
+            except Exception as e:
+                print(f"\n❌ Error: {e}")
+                store.record(key, {
+                    'company_name': company_name,
+                    'companies_house_number': ch_number,
+                    'error': str(e)
+                })
+        
+        results = store.results(keys)
     
+    write_results(pd.DataFrame(results), output_csv)
     print(f"\n✅ Complete! Results saved to: {output_csv}")
+    if isinstance(agent.client, CachedLLMClient):
+        stats = agent.client.stats()
+        print(f"💾 LLM cache: {stats['hits']} hits, {stats['misses']} misses, "
+              f"~{stats['saved_tokens']} tokens saved")
     return results
 
 
@@ -298,8 +338,6 @@ def simple_multi_question():
 # =============================================================================
 
 if __name__ == "__main__":
-    import sys
-    
     if len(sys.argv) == 1:
         # No args - show examples
         print("\nUsage Examples:")
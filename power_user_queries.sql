@@ -3,6 +3,9 @@
 -- ============================================================================
 -- Save as: power_user_queries.sql
 -- Usage: psql -d uk_osm_full -f power_user_queries.sql
+--
+-- Sections 1, 3, 4 and 10 read the candidate_rollup views; run
+-- python3 scripts/reports/refresh_rollups.py first (the pipelines do this).
 
 \timing on
 \pset border 2
@@ -21,17 +24,11 @@
 
 WITH summary AS (
   SELECT 
-    COUNT(*) as total,
-    COUNT(*) FILTER (WHERE tier_classification = 'tier1_candidate') as tier1,
-    COUNT(*) FILTER (WHERE tier_classification = 'tier2_candidate') as tier2,
-    COUNT(*) FILTER (WHERE tier_classification = 'potential_candidate') as potential,
-    COUNT(*) FILTER (WHERE website IS NOT NULL) as with_website,
-    COUNT(*) FILTER (WHERE phone IS NOT NULL) as with_phone,
-    COUNT(*) FILTER (WHERE website IS NOT NULL AND phone IS NOT NULL) as full_contact,
-    ROUND(AVG(aerospace_score)) as avg_score,
-    MAX(aerospace_score) as max_score,
-    COUNT(DISTINCT LEFT(postcode, 2)) FILTER (WHERE postcode IS NOT NULL) as regions_covered
-  FROM aerospace_supplier_candidates
+    total, tier1, tier2, potential, with_website, with_phone, full_contact,
+    ROUND(avg_score) as avg_score,
+    max_score,
+    regions_covered
+  FROM candidate_rollup_totals
 )
 SELECT 
   'Total Candidates' as metric, total::text as value FROM summary
@@ -79,25 +76,23 @@ LIMIT 20;
 \echo ''
 
 SELECT 
-  LEFT(postcode, 2) as region,
-  COUNT(*) as total_candidates,
-  COUNT(*) FILTER (WHERE tier_classification = 'tier1_candidate') as tier1,
-  COUNT(*) FILTER (WHERE tier_classification = 'tier2_candidate') as tier2,
-  COUNT(*) FILTER (WHERE aerospace_score >= 150) as score_150_plus,
-  ROUND(AVG(aerospace_score)) as avg_score,
-  MAX(aerospace_score) as max_score,
-  COUNT(*) FILTER (WHERE website IS NOT NULL)::float / COUNT(*) * 100 as pct_with_web,
+  region,
+  total as total_candidates,
+  tier1,
+  tier2,
+  score_150_plus,
+  ROUND(avg_score) as avg_score,
+  max_score,
+  with_website::float / total * 100 as pct_with_web,
   CASE 
-    WHEN LEFT(postcode, 2) IN ('BS', 'GL') THEN '⭐ Primary (Bristol/Filton)'
-    WHEN LEFT(postcode, 2) IN ('DE') THEN '⭐ Primary (Derby)'
-    WHEN LEFT(postcode, 2) IN ('PR', 'BA') THEN '⭐ Primary (Preston/Yeovil)'
-    WHEN LEFT(postcode, 2) IN ('CB', 'SO', 'BT') THEN '★ Secondary'
+    WHEN region IN ('BS', 'GL') THEN '⭐ Primary (Bristol/Filton)'
+    WHEN region IN ('DE') THEN '⭐ Primary (Derby)'
+    WHEN region IN ('PR', 'BA') THEN '⭐ Primary (Preston/Yeovil)'
+    WHEN region IN ('CB', 'SO', 'BT') THEN '★ Secondary'
     ELSE '· Emerging'
   END as cluster_status
-FROM aerospace_supplier_candidates
-WHERE postcode IS NOT NULL
-GROUP BY LEFT(postcode, 2)
-HAVING COUNT(*) >= 3
+FROM candidate_rollup_regions
+WHERE total >= 3
 ORDER BY total_candidates DESC, avg_score DESC
 LIMIT 25;
 
@@ -110,22 +105,22 @@ LIMIT 25;
 
 SELECT 
   CASE 
-    WHEN aerospace_score >= 250 THEN '250+ (Definitive Prime)'
-    WHEN aerospace_score >= 200 THEN '200-249 (Prime Contractor)'
-    WHEN aerospace_score >= 150 THEN '150-199 (Tier 1)'
-    WHEN aerospace_score >= 120 THEN '120-149 (Strong Tier 2)'
-    WHEN aerospace_score >= 100 THEN '100-119 (Tier 2)'
-    WHEN aerospace_score >= 80 THEN '80-99 (Tier 2 Lower)'
-    WHEN aerospace_score >= 60 THEN '60-79 (Potential)'
-    WHEN aerospace_score >= 40 THEN '40-59 (Review)'
+    WHEN score_band >= 250 THEN '250+ (Definitive Prime)'
+    WHEN score_band >= 200 THEN '200-249 (Prime Contractor)'
+    WHEN score_band >= 150 THEN '150-199 (Tier 1)'
+    WHEN score_band >= 120 THEN '120-149 (Strong Tier 2)'
+    WHEN score_band >= 100 THEN '100-119 (Tier 2)'
+    WHEN score_band >= 80 THEN '80-99 (Tier 2 Lower)'
+    WHEN score_band >= 60 THEN '60-79 (Potential)'
+    WHEN score_band >= 40 THEN '40-59 (Review)'
     ELSE 'Below 40'
   END as score_range,
-  COUNT(*) as count,
-  ROUND(100.0 * COUNT(*) / SUM(COUNT(*)) OVER(), 1) as percentage,
-  REPEAT('█', (COUNT(*) * 50 / MAX(COUNT(*)) OVER())::int) as distribution
-FROM aerospace_supplier_candidates
+  SUM(total) as count,
+  ROUND(100.0 * SUM(total) / SUM(SUM(total)) OVER(), 1) as percentage,
+  REPEAT('█', (SUM(total) * 50 / MAX(SUM(total)) OVER())::int) as distribution
+FROM candidate_rollup_score_bands
 GROUP BY score_range
-ORDER BY MIN(aerospace_score) DESC;
+ORDER BY MIN(score_band) DESC;
 
 -- ============================================================================
 -- 5. KEYWORD INTELLIGENCE (What Works)
@@ -300,15 +295,14 @@ LIMIT 50;
 
 SELECT 
   source_table as "Source",
-  COUNT(*) as "Total",
-  COUNT(*) FILTER (WHERE tier_classification = 'tier1_candidate') as "Tier 1",
-  COUNT(*) FILTER (WHERE tier_classification = 'tier2_candidate') as "Tier 2",
-  ROUND(AVG(aerospace_score)) as "Avg Score",
-  MAX(aerospace_score) as "Max Score",
-  ROUND(100.0 * COUNT(*) FILTER (WHERE website IS NOT NULL) / COUNT(*)) as "% Web"
-FROM aerospace_supplier_candidates
-GROUP BY source_table
-ORDER BY COUNT(*) DESC;
+  total as "Total",
+  tier1 as "Tier 1",
+  tier2 as "Tier 2",
+  ROUND(avg_score) as "Avg Score",
+  max_score as "Max Score",
+  ROUND(100.0 * with_website / total) as "% Web"
+FROM candidate_rollup_sources
+ORDER BY total DESC;
 
 -- ============================================================================
 -- 11. ADVANCED: SCORE DECOMPOSITION
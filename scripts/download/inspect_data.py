@@ -7,10 +7,11 @@ Sampling strategy (best-practice):
   1) Try Python streaming sampler (scripts/utils/xml_stream_sampler.py) — memory-safe.
   2) If missing/fails, try xmlstarlet (fast for small streams).
   3) If both fail, create a filtered PBF as a fallback.
+
+Tag statistics are computed over the whole PBF by profile_tags.py.
 """
 
 import sys
-import os
 import shutil
 sys.path.append('scripts/utils')
 
@@ -136,60 +137,14 @@ def main():
             if not ok:
                 logging.error(f"Failed to extract {name} in any form.")
 
-    # Tag analysis script
-    tag_analysis_script = samples_dir / 'analyze_tags.py'
-    with open(tag_analysis_script, 'w') as f:
-        f.write("""#!/usr/bin/env python3
-import xml.etree.ElementTree as ET
-import collections
-from pathlib import Path
-
-def analyze_tags(xml_file):
-    try:
-        tree = ET.parse(xml_file)
-        root = tree.getroot()
-        all_tags = collections.defaultdict(set)
-        object_counts = collections.defaultdict(int)
-        for elem in root:
-            if elem.tag in ['node', 'way', 'relation']:
-                object_counts[elem.tag] += 1
-                for tag in elem.findall('tag'):
-                    all_tags[tag.get('k')].add(tag.get('v'))
-        print(f"\\n=== Analysis of {xml_file} ===")
-        print(f"Object counts: {dict(object_counts)}")
-        print(f"Total unique keys: {len(all_tags)}")
-        sorted_keys = sorted({k: len(v) for k,v in all_tags.items()}.items(), key=lambda x:x[1], reverse=True)
-        for k,c in sorted_keys[:15]:
-            print(f"  {k}: {c} unique values, sample: {list(all_tags[k])[:3]}")
-        return all_tags, object_counts
-    except Exception as e:
-        print(f"Error analyzing {xml_file}: {e}")
-        return {}, {}
-
-if __name__=="__main__":
-    samples_dir = Path('.')
-    all_keys = set()
-    for xml_file in samples_dir.glob('*_sample.xml'):
-        tags,_ = analyze_tags(xml_file)
-        all_keys.update(tags.keys())
-    print(f"\\n=== SUMMARY ===")
-    print(f"Total unique keys across all samples: {len(all_keys)}")
-    print(f"All keys found: {sorted(list(all_keys))}")
-""")
-
-    # Run tag analysis
-    logging.info("Running tag analysis...")
+    # Tag statistics over the full PBF (single streaming pass, replaces the
+    # old per-sample ElementTree analysis)
+    logging.info("Profiling tag statistics across the full PBF...")
     try:
-        os.chdir(samples_dir)
-        if any(Path('.').glob('*_sample.xml')):
-            run_command('python3 analyze_tags.py > tag_analysis_results.txt')
-            logging.info("Tag analysis saved to data/samples/tag_analysis_results.txt")
-        else:
-            logging.warning("No XML samples found to analyze (likely PBF fallback).")
-        os.chdir('../..')
+        run_command(f'python3 scripts/download/profile_tags.py --pbf "{osm_file}"')
+        logging.info("Tag analysis saved to data/samples/tag_analysis_results.txt")
     except Exception as e:
-        os.chdir('../..')
-        logging.warning(f"Could not run tag analysis: {e}")
+        logging.warning(f"Could not run tag profiling: {e}")
 
     logging.info("Data inspection completed successfully!")
     return True
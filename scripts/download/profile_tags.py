@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+PBF Tag Statistics Profiler
+Streams the complete PBF once with pyosmium and reports tag coverage
+
+The file is split on PBF block boundaries and the blocks are shared out
+between worker processes. Each worker keeps bounded-memory summaries
+(scripts/utils/sketches.py) which are merged in the parent:
+  - per-key frequency by object type
+  - top-k values per key (space-saving, tightened with a count-min sketch)
+  - fraction of tagged objects carrying a name
+  - co-occurrence of aerospace-relevant keys
+
+Writes data/samples/tag_analysis_results.txt (human readable) and
+data/samples/tag_statistics.json (consumed by generate_style.py).
+
+Usage:
+    python3 scripts/download/profile_tags.py [--workers N] [--pbf FILE]
+"""
+
+import sys
+import os
+import json
+import struct
+import argparse
+import itertools
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+sys.path.append('scripts/utils')
+
+from osm_utils import setup_logging, load_config
+from sketches import SpaceSaving, CountMinSketch
+import logging
+from pathlib import Path
+
+OSM_TYPES = ('node', 'way', 'relation')
+
+# Keys whose joint presence drives the aerospace scoring pipelines
+AEROSPACE_KEYS = [
+    'name', 'operator', 'brand', 'website', 'addr:postcode',
+    'landuse', 'building', 'industrial', 'man_made', 'office',
+    'craft', 'aeroway', 'military',
+]
+
+DEFAULT_KEY_CAPACITY = 20000
+DEFAULT_VALUE_CAPACITY = 50
+DEFAULT_BLOCKS_PER_CHUNK = 256
+
+
+# ============================================================================
+# PBF block index
+# ============================================================================
+
+def _read_varint(data: bytes, pos: int):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _parse_blob_header(data: bytes):
+    """Return (type, datasize) from a serialized BlobHeader message."""
+    blob_type, datasize, pos = None, None, 0
+    while pos < len(data):
+        tag, pos = _read_varint(data, pos)
+        field, wire = tag >> 3, tag & 0x07
+        if wire == 0:
+            value, pos = _read_varint(data, pos)
+            if field == 3:
+                datasize = value
+        elif wire == 2:
+            length, pos = _read_varint(data, pos)
+            if field == 1:
+                blob_type = data[pos:pos + length].decode('ascii')
+            pos += length
+        else:
+            raise ValueError(f"Unexpected wire type {wire} in BlobHeader")
+    return blob_type, datasize
+
+
+def scan_pbf_blocks(pbf_path: Path):
+    """Index a PBF file without decompressing it.
+
+    Returns (header_span, data_spans) where each span is (offset, length)
+    covering the length prefix, BlobHeader and Blob of one file block.
+    """
+    header_span = None
+    data_spans = []
+    with open(pbf_path, 'rb') as f:
+        while True:
+            offset = f.tell()
+            prefix = f.read(4)
+            if not prefix:
+                break
+            if len(prefix) < 4:
+                raise ValueError(f"Truncated block length at offset {offset}")
+            header_len = struct.unpack('>I', prefix)[0]
+            blob_type, datasize = _parse_blob_header(f.read(header_len))
+            f.seek(datasize, os.SEEK_CUR)
+            span = (offset, 4 + header_len + datasize)
+            if blob_type == 'OSMHeader':
+                header_span = span
+            elif blob_type == 'OSMData':
+                data_spans.append(span)
+    if header_span is None:
+        raise ValueError(f"No OSMHeader block found in {pbf_path}")
+    return header_span, data_spans
+
+
+def plan_chunks(data_spans, blocks_per_chunk: int):
+    """Group consecutive data blocks into contiguous byte ranges."""
+    chunks = []
+    for i in range(0, len(data_spans), blocks_per_chunk):
+        group = data_spans[i:i + blocks_per_chunk]
+        start = group[0][0]
+        end = group[-1][0] + group[-1][1]
+        chunks.append((start, end - start))
+    return chunks
+
+
+# ============================================================================
+# Statistics
+# ============================================================================
+
+class TagStatistics:
+    """Mergeable bounded-memory tag statistics for one or more PBF chunks."""
+
+    def __init__(self, key_capacity=DEFAULT_KEY_CAPACITY, value_capacity=DEFAULT_VALUE_CAPACITY):
+        self.value_capacity = value_capacity
+        self.objects = dict.fromkeys(OSM_TYPES, 0)
+        self.tagged = dict.fromkeys(OSM_TYPES, 0)
+        self.named = dict.fromkeys(OSM_TYPES, 0)
+        self.keys = SpaceSaving(key_capacity)
+        self.key_types = {}
+        self.values = {}
+        self.pairs = CountMinSketch()
+        self.cooccurrence = {}
+
+    def _drop_keys(self, evicted):
+        for key in evicted or ():
+            self.key_types.pop(key, None)
+            self.values.pop(key, None)
+
+    def add_object(self, osm_type: str, tags):
+        """Record one OSM object given an iterable of (key, value) pairs."""
+        type_idx = OSM_TYPES.index(osm_type)
+        self.objects[osm_type] += 1
+        if not tags:
+            return
+        self.tagged[osm_type] += 1
+
+        present = []
+        for key, value in tags:
+            self.pairs.add(f"{key}={value}")
+            if key in AEROSPACE_KEYS:
+                present.append(key)
+            self._drop_keys(self.keys.add(key))
+            if key not in self.keys:
+                continue
+            self.key_types.setdefault(key, [0, 0, 0])[type_idx] += 1
+            summary = self.values.get(key)
+            if summary is None:
+                summary = self.values[key] = SpaceSaving(self.value_capacity)
+            summary.add(value)
+
+        if 'name' in present:
+            self.named[osm_type] += 1
+        for a, b in itertools.combinations(sorted(present), 2):
+            self.cooccurrence[(a, b)] = self.cooccurrence.get((a, b), 0) + 1
+
+    def merge(self, other: "TagStatistics"):
+        for osm_type in OSM_TYPES:
+            self.objects[osm_type] += other.objects[osm_type]
+            self.tagged[osm_type] += other.tagged[osm_type]
+            self.named[osm_type] += other.named[osm_type]
+        for key, by_type in other.key_types.items():
+            mine = self.key_types.setdefault(key, [0, 0, 0])
+            for i, count in enumerate(by_type):
+                mine[i] += count
+        for key, summary in other.values.items():
+            if key in self.values:
+                self.values[key].merge(summary)
+            else:
+                self.values[key] = summary
+        self._drop_keys(self.keys.merge(other.keys))
+        self.pairs.merge(other.pairs)
+        for pair, count in other.cooccurrence.items():
+            self.cooccurrence[pair] = self.cooccurrence.get(pair, 0) + count
+
+    def top_values(self, key: str, k: int = 10):
+        """Top values for `key` with the tighter of the two overestimates."""
+        summary = self.values.get(key)
+        if summary is None:
+            return []
+        ranked = [
+            (value, min(count, self.pairs.estimate(f"{key}={value}")))
+            for value, count in summary.top()
+        ]
+        ranked.sort(key=lambda vc: vc[1], reverse=True)
+        return ranked[:k]
+
+    def to_dict(self, top_k: int = 10) -> dict:
+        keys = {}
+        for key, total in self.keys.top():
+            by_type = self.key_types.get(key, [0, 0, 0])
+            keys[key] = {
+                'total': total,
+                'error': self.keys.error(key),
+                **dict(zip(OSM_TYPES, by_type)),
+            }
+        cooccurrence = {}
+        for (a, b), count in sorted(self.cooccurrence.items()):
+            cooccurrence.setdefault(a, {})[b] = count
+        return {
+            'objects': self.objects,
+            'tagged_objects': self.tagged,
+            'named_objects': self.named,
+            'keys': keys,
+            'top_values': {key: self.top_values(key, top_k) for key in keys},
+            'cooccurrence': cooccurrence,
+        }
+
+
+def _profile_chunks(pbf_path, header_span, chunks, key_capacity, value_capacity):
+    """Worker: stream the given byte ranges through a pyosmium handler."""
+    import osmium
+
+    stats = TagStatistics(key_capacity, value_capacity)
+
+    def record(osm_type, obj):
+        tags = obj.tags
+        stats.add_object(osm_type, [(t.k, t.v) for t in tags] if len(tags) else None)
+
+    class TagStatsHandler(osmium.SimpleHandler):
+        def node(self, n):
+            record('node', n)
+
+        def way(self, w):
+            record('way', w)
+
+        def relation(self, r):
+            record('relation', r)
+
+    handler = TagStatsHandler()
+    with open(pbf_path, 'rb') as f:
+        f.seek(header_span[0])
+        header = f.read(header_span[1])
+        for offset, length in chunks:
+            # Each chunk is a self-contained PBF: the file header followed
+            # by a run of consecutive data blocks.
+            f.seek(offset)
+            handler.apply_buffer(header + f.read(length), 'pbf')
+    return stats
+
+
+def profile_pbf(pbf_path: Path, workers: int, blocks_per_chunk: int = DEFAULT_BLOCKS_PER_CHUNK,
+                key_capacity: int = DEFAULT_KEY_CAPACITY,
+                value_capacity: int = DEFAULT_VALUE_CAPACITY) -> TagStatistics:
+    """Profile the whole PBF in a single pass split across worker processes."""
+    header_span, data_spans = scan_pbf_blocks(pbf_path)
+    chunks = plan_chunks(data_spans, blocks_per_chunk)
+    logging.info(f"Indexed {len(data_spans):,} data blocks into {len(chunks):,} chunks")
+
+    # Interleave chunks so every worker sees a mix of node, way and relation
+    # blocks (the file is sorted by type and node blocks are much cheaper).
+    assignments = [chunks[i::workers] for i in range(workers)]
+    stats = TagStatistics(key_capacity, value_capacity)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_profile_chunks, str(pbf_path), header_span, assigned,
+                        key_capacity, value_capacity)
+            for assigned in assignments if assigned
+        ]
+        for i, future in enumerate(futures, 1):
+            stats.merge(future.result())
+            logging.info(f"Merged worker {i}/{len(futures)}")
+    return stats
+
+
+# ============================================================================
+# Reporting
+# ============================================================================
+
+def _pct(part: int, whole: int) -> str:
+    return f"{part / whole * 100:.1f}%" if whole else "n/a"
+
+
+def write_text_report(summary: dict, pbf_path: Path, output_file: Path, top_keys: int = 60):
+    objects = summary['objects']
+    tagged = summary['tagged_objects']
+    named = summary['named_objects']
+    keys = summary['keys']
+
+    lines = [
+        f"=== Tag statistics for {pbf_path} ===",
+        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        f"Object counts: {objects}",
+        "",
+        "Tagged / named objects:",
+    ]
+    for osm_type in OSM_TYPES:
+        lines.append(
+            f"  {osm_type:9}: {tagged[osm_type]:>12,} tagged ({_pct(tagged[osm_type], objects[osm_type])}), "
+            f"{named[osm_type]:>12,} named ({_pct(named[osm_type], tagged[osm_type])} of tagged)"
+        )
+
+    total_tagged = sum(tagged.values())
+    lines += ["", f"Total keys tracked: {len(keys)}", "", f"=== Top {top_keys} keys by frequency ==="]
+    for key, info in list(keys.items())[:top_keys]:
+        lines.append(
+            f"  {key:28} {info['total']:>12,} ({_pct(info['total'], total_tagged)} of tagged) "
+            f"node={info['node']:,} way={info['way']:,} relation={info['relation']:,}"
+        )
+
+    lines += ["", "=== Top values for aerospace-relevant keys ==="]
+    for key in AEROSPACE_KEYS:
+        values = summary['top_values'].get(key)
+        if not values:
+            continue
+        sample = ', '.join(f"{value}={count:,}" for value, count in values)
+        lines.append(f"  {key}: {sample}")
+
+    lines += ["", "=== Aerospace key co-occurrence (objects with both keys) ==="]
+    for a, partners in summary['cooccurrence'].items():
+        for b, count in sorted(partners.items(), key=lambda kv: kv[1], reverse=True):
+            lines.append(f"  {a} + {b}: {count:,}")
+
+    output_file.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-pass PBF tag statistics profiler")
+    parser.add_argument('--pbf', help="PBF file (default: <data_dir>/great-britain-latest.osm.pbf)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--blocks-per-chunk', type=int, default=DEFAULT_BLOCKS_PER_CHUNK)
+    parser.add_argument('--key-capacity', type=int, default=DEFAULT_KEY_CAPACITY)
+    parser.add_argument('--value-capacity', type=int, default=DEFAULT_VALUE_CAPACITY)
+    parser.add_argument('--top-k', type=int, default=10, help="Values reported per key")
+    parser.add_argument('--output-dir', default='data/samples')
+    args = parser.parse_args()
+
+    setup_logging()
+    config = load_config()
+
+    pbf_path = Path(args.pbf) if args.pbf else Path(config['download']['data_dir']) / 'great-britain-latest.osm.pbf'
+    if not pbf_path.exists():
+        logging.error(f"OSM file not found: {pbf_path}")
+        return False
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    logging.info(f"Profiling tags in {pbf_path} with {args.workers} workers...")
+    try:
+        stats = profile_pbf(pbf_path, args.workers, args.blocks_per_chunk,
+                            args.key_capacity, args.value_capacity)
+    except Exception as e:
+        logging.error(f"Tag profiling failed: {e}")
+        return False
+
+    summary = stats.to_dict(args.top_k)
+    summary['source'] = str(pbf_path)
+    summary['generated_at'] = datetime.now().isoformat(timespec='seconds')
+
+    json_file = output_dir / 'tag_statistics.json'
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    logging.info(f"Tag statistics saved to {json_file}")
+
+    text_file = output_dir / 'tag_analysis_results.txt'
+    write_text_report(summary, pbf_path, text_file)
+    logging.info(f"Tag analysis saved to {text_file}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
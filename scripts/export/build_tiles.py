@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Candidate Vector Tile Builder
+Pre-renders aerospace_supplier_candidates into an MBTiles vector tile cache
+
+Clusters candidates per zoom level up to --cluster-max-zoom and renders
+individual candidates above it. Re-running only re-renders tiles whose
+candidates changed since the last build (--full rebuilds everything).
+Serve the result with scripts/export/serve_tiles.py.
+
+Usage:
+    python3 scripts/export/build_tiles.py
+    python3 scripts/export/build_tiles.py --max-zoom 15 --workers 8
+    python3 scripts/export/build_tiles.py --full
+"""
+
+import sys
+import time
+import argparse
+sys.path.append('scripts/utils')
+
+from osm_utils import setup_logging, load_config
+from db import get_database, close_database
+from tile_cache import (DEFAULT_CLUSTER_MAX_ZOOM, DEFAULT_MAX_ZOOM, DEFAULT_MIN_ZOOM, DEFAULT_TILE_PATH,
+                        TileArchive, TileBuilder)
+import logging
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the candidate vector tile cache (MBTiles)")
+    parser.add_argument('--output', default=DEFAULT_TILE_PATH)
+    parser.add_argument('--min-zoom', type=int, default=DEFAULT_MIN_ZOOM)
+    parser.add_argument('--max-zoom', type=int, default=DEFAULT_MAX_ZOOM)
+    parser.add_argument('--cluster-max-zoom', type=int, default=DEFAULT_CLUSTER_MAX_ZOOM,
+                        help="Highest zoom rendered as clusters; individual candidates above")
+    parser.add_argument('--workers', type=int, default=4, help="Tiles rendered concurrently (at most database.pool_max)")
+    parser.add_argument('--full', action='store_true', help="Re-render every tile")
+    args = parser.parse_args()
+
+    setup_logging()
+    config = load_config()
+    schema = config['database'].get('schema', 'public')
+    logging.info(f"=== Building candidate tiles into {args.output} ===")
+
+    started = time.time()
+    archive = TileArchive(args.output)
+    builder = TileBuilder(get_database(config), archive, schema=schema,
+                          min_zoom=args.min_zoom, max_zoom=args.max_zoom,
+                          cluster_max_zoom=args.cluster_max_zoom, workers=args.workers)
+    try:
+        stats = builder.build(full=args.full)
+    except Exception as e:
+        logging.error(f"Tile build failed: {e}")
+        return False
+    finally:
+        archive.close()
+        close_database()
+
+    logging.info(f"✓ {stats['tiles']:,} tiles for {stats['candidates']:,} candidates in {time.time() - started:.1f}s: "
+                 f"{stats['rendered']:,} rendered, {stats['unchanged']:,} unchanged, {stats['deleted']:,} deleted")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Aerospace Candidate Exporter
+Streams aerospace_supplier_candidates once and writes every export from that scan
+
+Produces the same files as the old per-query psql exports (all
+candidates, tier 1, tier 2, candidates with contact details and the
+regional summary) from a single server-side cursor, in one or more
+formats at once. The spatial formats (gpkg, geojson) carry the candidate
+geometry in EPSG:4326.
+
+Usage:
+    python3 scripts/export/export_candidates.py
+    python3 scripts/export/export_candidates.py --format csv parquet gpkg
+    python3 scripts/export/export_candidates.py --format csv.gz --output-dir exports/weekly
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime
+sys.path.append('scripts/utils')
+
+from osm_utils import setup_logging, load_config
+from db import get_database, close_database
+from exporter import FORMATS, SPATIAL_FORMATS, GEOMETRY_COLUMN, AggregateSink, MultiSinkExporter, RowSink
+import logging
+import pandas as pd
+
+TABLE = 'aerospace_supplier_candidates'
+
+ALL_COLUMNS = [
+    'osm_id', 'source_table', 'name', 'operator', 'aerospace_score', 'tier_classification',
+    'confidence_level', 'phone', 'email', 'website', 'postcode', 'street_address', 'city',
+    'landuse_type', 'building_type', 'industrial_type', 'office_type', 'description',
+    'keywords', 'latitude', 'longitude', 'created_at',
+]
+TIER_COLUMNS = [
+    'osm_id', 'source_table', 'name', 'aerospace_score', 'confidence_level', 'phone', 'email',
+    'website', 'postcode', 'city', 'keywords', 'landuse_type', 'building_type', 'industrial_type',
+]
+CONTACT_COLUMNS = [
+    'osm_id', 'source_table', 'name', 'aerospace_score', 'tier_classification', 'phone', 'email',
+    'website', 'postcode', 'city', 'keywords',
+]
+
+
+def build_query(schema: str, spatial: bool) -> str:
+    columns = [
+        "array_to_string(matched_keywords, '; ') AS keywords" if c == 'keywords' else c
+        for c in ALL_COLUMNS
+    ]
+    if spatial:
+        columns.append(f"ST_AsBinary(ST_Transform(geometry, 4326)) AS {GEOMETRY_COLUMN}")
+    return f"SELECT {', '.join(columns)} FROM {schema}.{TABLE} ORDER BY aerospace_score DESC"
+
+
+def tier(name: str):
+    return lambda df: df['tier_classification'] == name
+
+
+def has_contact(df: pd.DataFrame) -> pd.Series:
+    return df['website'].notna() | df['phone'].notna() | df['email'].notna()
+
+
+# Regional summary: per postcode area (first two characters), accumulated chunk by chunk
+REGION_COUNTS = ['total_candidates', 'tier1_count', 'tier2_count', 'potential_count',
+                 'score_sum', 'with_website', 'with_phone']
+
+
+def update_regions(state: dict, chunk: pd.DataFrame) -> None:
+    chunk = chunk[chunk['postcode'].notna()]
+    if not len(chunk):
+        return
+    tiers = chunk['tier_classification']
+    parts = pd.DataFrame({
+        'region': chunk['postcode'].str[:2],
+        'total_candidates': 1,
+        'tier1_count': (tiers == 'tier1_candidate').astype(int),
+        'tier2_count': (tiers == 'tier2_candidate').astype(int),
+        'potential_count': (tiers == 'potential_candidate').astype(int),
+        'score_sum': chunk['aerospace_score'].fillna(0),
+        'score_rows': chunk['aerospace_score'].notna().astype(int),
+        'max_score': chunk['aerospace_score'],
+        'with_website': chunk['website'].notna().astype(int),
+        'with_phone': chunk['phone'].notna().astype(int),
+    })
+    grouped = parts.groupby('region').agg({**{c: 'sum' for c in REGION_COUNTS + ['score_rows']},
+                                           'max_score': 'max'})
+    for region, row in grouped.iterrows():
+        totals = state.setdefault(region, dict.fromkeys(REGION_COUNTS + ['score_rows'], 0))
+        for column in REGION_COUNTS + ['score_rows']:
+            totals[column] += row[column]
+        if pd.notna(row['max_score']):
+            totals['max_score'] = max(totals.get('max_score', row['max_score']), row['max_score'])
+
+
+def render_regions(state: dict) -> pd.DataFrame:
+    rows = []
+    for region, totals in state.items():
+        rows.append({
+            'region': region,
+            'total_candidates': int(totals['total_candidates']),
+            'tier1_count': int(totals['tier1_count']),
+            'tier2_count': int(totals['tier2_count']),
+            'potential_count': int(totals['potential_count']),
+            'avg_score': round(totals['score_sum'] / totals['score_rows'], 2) if totals['score_rows'] else None,
+            'max_score': totals.get('max_score'),
+            'with_website': int(totals['with_website']),
+            'with_phone': int(totals['with_phone']),
+        })
+    columns = ['region', 'total_candidates', 'tier1_count', 'tier2_count', 'potential_count',
+               'avg_score', 'max_score', 'with_website', 'with_phone']
+    result = pd.DataFrame(rows, columns=columns)
+    result['max_score'] = result['max_score'].astype('Int64')
+    return result.sort_values('total_candidates', ascending=False, kind='stable')
+
+
+def build_sinks(output_dir: str, formats, timestamp: str):
+    """(label, sink) pairs for every export in every requested format."""
+    sinks = []
+    for fmt in formats:
+        exports = [
+            ('All candidates', 'all_candidates', ALL_COLUMNS, None),
+            ('Tier 1', 'tier1_candidates', TIER_COLUMNS, tier('tier1_candidate')),
+            ('Tier 2', 'tier2_candidates', TIER_COLUMNS, tier('tier2_candidate')),
+            ('With contact info', 'candidates_with_contact', CONTACT_COLUMNS, has_contact),
+        ]
+        for label, name, columns, where in exports:
+            path = os.path.join(output_dir, f"{name}_{timestamp}.{fmt}")
+            sinks.append((label, RowSink(path, columns, where)))
+    sinks.append(('Regions', AggregateSink(os.path.join(output_dir, f"regional_summary_{timestamp}.csv"),
+                                           update_regions, render_regions, {})))
+    return sinks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export aerospace candidates in one table scan")
+    parser.add_argument('--format', nargs='+', choices=FORMATS, default=['csv'], dest='formats',
+                        help="Output format(s); the regional summary is always CSV")
+    parser.add_argument('--output-dir', default='./exports')
+    parser.add_argument('--batch-size', type=int, default=20000, help="Rows fetched per round trip")
+    parser.add_argument('-q', '--quiet', action='store_true', help="Only print the exported files")
+    args = parser.parse_args()
+
+    setup_logging()
+    if args.quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+    config = load_config()
+    schema = config['database'].get('schema', 'public')
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    labelled = build_sinks(args.output_dir, list(dict.fromkeys(args.formats)), timestamp)
+    sinks = [sink for _, sink in labelled]
+    spatial = any(fmt in SPATIAL_FORMATS for fmt in args.formats)
+
+    logging.info(f"=== Exporting {TABLE} ({', '.join(args.formats)}) to {args.output_dir} ===")
+    started = time.time()
+    exporter = MultiSinkExporter(get_database(config), build_query(schema, spatial), batch_size=args.batch_size)
+    try:
+        exporter.run(sinks)
+    except Exception as e:
+        logging.error(f"Export failed: {e}")
+        return False
+    finally:
+        close_database()
+    elapsed = time.time() - started
+
+    for _, sink in labelled:
+        if os.path.exists(sink.path):
+            print(f"✓ Exported: {os.path.basename(sink.path)}")
+
+    if not args.quiet:
+        print()
+        print(f"Files exported to: {args.output_dir}")
+        print(f"Scanned {exporter.scanned:,} rows once in {elapsed:.1f}s")
+        print()
+        print("Records exported:")
+        seen = set()
+        for label, sink in labelled:
+            if label not in seen:
+                seen.add(label)
+                print(f"  - {label}: {sink.rows:,}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
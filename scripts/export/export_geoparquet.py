@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+GeoParquet Exporter
+Partitioned GeoParquet datasets of the candidates and the planet_osm_* subsets
+
+Writes one dataset directory per source under --output-dir, partitioned
+by postcode area or by a lon/lat grid, with WKB geometry in EPSG:4326, a
+bbox covering column and spatially ordered row groups. Read back with
+e.g.
+
+    geopandas.read_parquet('exports/geoparquet/candidates',
+                           filters=[('postcode_area', '=', 'BS')])
+    geopandas.read_parquet('exports/geoparquet/polygon', bbox=(-2.7, 51.4, -2.5, 51.6))
+
+Usage:
+    python3 scripts/export/export_geoparquet.py
+    python3 scripts/export/export_geoparquet.py --source candidates polygon point --partition grid
+    python3 scripts/export/export_geoparquet.py --source polygon --where "aeroway IS NOT NULL"
+"""
+
+import os
+import sys
+import time
+import argparse
+sys.path.append('scripts/utils')
+
+from osm_utils import setup_logging, load_config
+from db import get_database, close_database
+from exporter import GEOMETRY_COLUMN, MultiSinkExporter
+from geoparquet import (DEFAULT_GRID_SIZE, DEFAULT_MAX_BUFFERED_ROWS, DEFAULT_ROW_GROUP_SIZE,
+                        PARTITION_SCHEMES, GeoParquetSink)
+import logging
+
+OSM_COLUMNS = ['osm_id', 'name', 'operator', 'landuse', 'building', 'industrial', 'office',
+               'man_made', 'aeroway', 'military', 'website', '"addr:postcode" AS postcode']
+
+# Industrial / business / aviation features - the population the pipelines score
+INDUSTRIAL_SUBSET = """(landuse IN ('industrial', 'commercial', 'military')
+    OR building IN ('industrial', 'warehouse', 'factory', 'commercial', 'office', 'hangar', 'manufacture')
+    OR industrial IS NOT NULL OR office IS NOT NULL OR aeroway IS NOT NULL
+    OR man_made IN ('works', 'factory') OR military IS NOT NULL)"""
+
+# source -> (table, geometry column, selected columns, default filter)
+SOURCES = {
+    'candidates': ('aerospace_supplier_candidates', 'geometry', [
+        'osm_id', 'source_table', 'name', 'operator', 'aerospace_score', 'tier_classification',
+        'confidence_level', 'phone', 'email', 'website', 'postcode', 'street_address', 'city',
+        'landuse_type', 'building_type', 'industrial_type', 'office_type',
+        "array_to_string(matched_keywords, '; ') AS keywords", 'created_at',
+    ], None),
+    'point': ('planet_osm_point', 'way', OSM_COLUMNS, INDUSTRIAL_SUBSET),
+    'polygon': ('planet_osm_polygon', 'way', OSM_COLUMNS, INDUSTRIAL_SUBSET),
+    'line': ('planet_osm_line', 'way', OSM_COLUMNS, "(aeroway IS NOT NULL OR man_made IS NOT NULL)"),
+}
+
+
+def build_query(schema: str, source: str, where: str = None, order: bool = True) -> str:
+    table, geometry, columns, subset = SOURCES[source]
+    conditions = [f"{geometry} IS NOT NULL", f"NOT ST_IsEmpty({geometry})"]
+    if where or subset:
+        conditions.append(where or subset)
+    sql = (f"SELECT {', '.join(columns)}, ST_AsBinary(ST_Transform({geometry}, 4326)) AS {GEOMETRY_COLUMN} "
+           f"FROM {schema}.{table} WHERE {' AND '.join(conditions)}")
+    if order:
+        # Geohash order keeps each row group (and each partition file) spatially compact
+        sql += f" ORDER BY ST_GeoHash(ST_Transform(ST_Centroid({geometry}), 4326), 8)"
+    return sql
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export candidates and OSM subsets as partitioned GeoParquet")
+    parser.add_argument('--source', nargs='+', choices=list(SOURCES), default=['candidates'], dest='sources')
+    parser.add_argument('--output-dir', default='./exports/geoparquet')
+    parser.add_argument('--partition', choices=PARTITION_SCHEMES, default='postcode',
+                        help="Partition by postcode area, lon/lat grid cell, or not at all")
+    parser.add_argument('--grid-size', type=float, default=DEFAULT_GRID_SIZE, help="Grid cell size in degrees")
+    parser.add_argument('--where', help="SQL filter replacing the default subset for planet_osm_* sources")
+    parser.add_argument('--row-group-size', type=int, default=DEFAULT_ROW_GROUP_SIZE)
+    parser.add_argument('--max-buffered-rows', type=int, default=DEFAULT_MAX_BUFFERED_ROWS,
+                        help="Rows held in memory across all partitions before flushing early")
+    parser.add_argument('--batch-size', type=int, default=20000, help="Rows fetched per round trip")
+    parser.add_argument('--no-order', action='store_true',
+                        help="Skip the geohash sort (faster scan, less selective row-group statistics)")
+    args = parser.parse_args()
+
+    setup_logging()
+    config = load_config()
+    schema = config['database'].get('schema', 'public')
+    database = get_database(config)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    try:
+        for source in args.sources:
+            output = os.path.join(args.output_dir, source)
+            sink = GeoParquetSink(output, partition=args.partition, grid_size=args.grid_size,
+                                  row_group_size=args.row_group_size, max_buffered_rows=args.max_buffered_rows)
+            sql = build_query(schema, source, args.where if source != 'candidates' else None, not args.no_order)
+            logging.info(f"=== Exporting {SOURCES[source][0]} to {output} (partition: {args.partition}) ===")
+            started = time.time()
+            try:
+                MultiSinkExporter(database, sql, batch_size=args.batch_size).run([sink])
+            except Exception as e:
+                logging.error(f"Export of {source} failed: {e}")
+                return False
+            partitions = sink.summary()
+            logging.info(f"✓ {sink.rows:,} rows in {len(partitions)} partition(s) in {time.time() - started:.1f}s")
+            if args.partition != 'none':
+                largest = sorted(partitions.items(), key=lambda kv: -kv[1])[:5]
+                logging.info("  Largest partitions: " + ', '.join(f"{k} ({v:,})" for k, v in largest))
+    finally:
+        close_database()
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Local Vector Tile Server
+Serves the candidate MBTiles cache for testing map viewers
+
+Endpoints:
+    /                      MapLibre GL test page (loads MapLibre from unpkg)
+    /tiles.json            TileJSON for the archive
+    /tiles/{z}/{x}/{y}.pbf one gzip-compressed vector tile (204 if empty)
+
+Usage:
+    python3 scripts/export/serve_tiles.py
+    python3 scripts/export/serve_tiles.py --tiles data/tiles/candidates.mbtiles --port 8090
+"""
+
+import re
+import sys
+import json
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append('scripts/utils')
+
+from osm_utils import setup_logging
+from tile_cache import DEFAULT_TILE_PATH, LAYER_NAME, TileArchive
+import logging
+
+TILE_PATH_RE = re.compile(r'^/tiles/(\d+)/(\d+)/(\d+)\.pbf$')
+
+INDEX_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Aerospace candidates</title>
+<link href="https://unpkg.com/maplibre-gl@4/dist/maplibre-gl.css" rel="stylesheet">
+<script src="https://unpkg.com/maplibre-gl@4/dist/maplibre-gl.js"></script>
+<style>body{margin:0}#map{position:absolute;top:0;bottom:0;width:100%}</style></head>
+<body><div id="map"></div><script>
+const map = new maplibregl.Map({container: 'map', center: [-2.5, 54], zoom: 5, style: {
+  version: 8,
+  sources: {
+    osm: {type: 'raster', tiles: ['https://tile.openstreetmap.org/{z}/{x}/{y}.png'], tileSize: 256,
+          attribution: '&copy; OpenStreetMap contributors'},
+    candidates: {type: 'vector', url: window.location.origin + '/tiles.json'}
+  },
+  layers: [
+    {id: 'osm', type: 'raster', source: 'osm'},
+    {id: 'clusters', type: 'circle', source: 'candidates', 'source-layer': 'LAYER',
+     filter: ['has', 'point_count'],
+     paint: {'circle-color': ['step', ['get', 'max_score'], '#9ecae1', 80, '#fd8d3c', 150, '#d7301f'],
+             'circle-radius': ['interpolate', ['linear'], ['sqrt', ['get', 'point_count']], 1, 5, 30, 30],
+             'circle-opacity': 0.8}},
+    {id: 'candidates', type: 'circle', source: 'candidates', 'source-layer': 'LAYER',
+     filter: ['!', ['has', 'point_count']],
+     paint: {'circle-color': ['match', ['get', 'tier_classification'],
+                              'tier1_candidate', '#d7301f', 'tier2_candidate', '#fd8d3c', '#6baed6'],
+             'circle-radius': 5, 'circle-stroke-width': 1, 'circle-stroke-color': '#fff'}}
+  ]}});
+map.on('click', e => {
+  const f = map.queryRenderedFeatures(e.point, {layers: ['clusters', 'candidates']})[0];
+  if (f) new maplibregl.Popup().setLngLat(e.lngLat)
+    .setHTML('<pre>' + JSON.stringify(f.properties, null, 1) + '</pre>').addTo(map);
+});
+</script></body></html>
+""".replace('LAYER', LAYER_NAME)
+
+
+class TileHandler(BaseHTTPRequestHandler):
+    archive_path = DEFAULT_TILE_PATH
+    _local = threading.local()
+
+    @property
+    def archive(self) -> TileArchive:
+        # One read-only SQLite connection per server thread
+        if getattr(self._local, 'archive', None) is None:
+            self._local.archive = TileArchive(self.archive_path, readonly=True)
+        return self._local.archive
+
+    def _send(self, status: int, body: bytes = b'', content_type: str = None, headers: dict = None):
+        self.send_response(status)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def tilejson(self) -> dict:
+        metadata = self.archive.metadata()
+        host = self.headers.get('Host', f"localhost:{self.server.server_port}")
+        tilejson = {
+            'tilejson': '3.0.0',
+            'name': metadata.get('name'),
+            'tiles': [f"http://{host}/tiles/{{z}}/{{x}}/{{y}}.pbf"],
+            'minzoom': int(metadata.get('minzoom', 0)),
+            'maxzoom': int(metadata.get('maxzoom', 14)),
+        }
+        if metadata.get('bounds'):
+            tilejson['bounds'] = [float(v) for v in metadata['bounds'].split(',')]
+        if metadata.get('center'):
+            tilejson['center'] = [float(v) for v in metadata['center'].split(',')]
+        if metadata.get('json'):
+            tilejson.update(json.loads(metadata['json']))
+        return tilejson
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        match = TILE_PATH_RE.match(path)
+        if match:
+            data = self.archive.get(*(int(v) for v in match.groups()))
+            if data is None:
+                self._send(204)
+            else:
+                self._send(200, data, 'application/vnd.mapbox-vector-tile',
+                           {'Content-Encoding': 'gzip', 'Cache-Control': 'no-cache'})
+        elif path == '/tiles.json':
+            self._send(200, json.dumps(self.tilejson()).encode(), 'application/json')
+        elif path in ('/', '/index.html'):
+            self._send(200, INDEX_HTML.encode(), 'text/html; charset=utf-8')
+        else:
+            self._send(404, b'Not found', 'text/plain')
+
+    def log_message(self, format, *args):
+        logging.debug(f"{self.address_string()} {format % args}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the candidate vector tile cache locally")
+    parser.add_argument('--tiles', default=DEFAULT_TILE_PATH, help="MBTiles archive from build_tiles.py")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    args = parser.parse_args()
+
+    setup_logging()
+    try:
+        TileArchive(args.tiles, readonly=True).metadata()
+    except Exception as e:
+        logging.error(f"Cannot open tile archive {args.tiles}: {e} (run scripts/export/build_tiles.py first)")
+        return False
+
+    TileHandler.archive_path = args.tiles
+    server = ThreadingHTTPServer((args.host, args.port), TileHandler)
+    logging.info(f"Serving {args.tiles} at http://{args.host}:{args.port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Spatial Proximity Features
+Distance to airfields / OEM sites and cluster density for every candidate
+
+Builds aerospace_reference_sites from the planet_osm_* tables (and the
+known_suppliers registry), then fills airfield_distance_m, oem_distance_m,
+cluster_density and proximity_score on the candidate table with GiST
+nearest-neighbour joins; see scripts/utils/spatial_features.py. Band
+points come from the spatial_proximity section of scoring.yaml. With
+--apply-score the 07_pipeline_* scored-view rows just under the candidate
+threshold are featurized too and those the proximity points lift over it
+are added to the table, then the proximity points (above the
+postcode-cluster bonus) are added to aerospace_score and the tiers
+recomputed. Run after the final
+table is created (07_run_all_pipelines.sh and aerospace_master_workflow.sh
+do this).
+
+Usage:
+    python3 scripts/import/build_spatial_features.py --apply-score
+    python3 scripts/import/build_spatial_features.py --reuse-sites
+    python3 scripts/import/build_spatial_features.py --table aerospace_candidates_point
+"""
+
+import sys
+import time
+import argparse
+sys.path.append('scripts/utils')
+
+from osm_utils import setup_logging, load_config
+from db import get_database, close_database
+from known_suppliers import DEFAULT_TABLE, IDENTIFIER_RE
+from spatial_features import (SITES_TABLE, admit_scored_views, apply_proximity_score,
+                              build_reference_sites, compute_features, load_spatial_config)
+import logging
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute spatial proximity features for aerospace candidates")
+    parser.add_argument('--table', default=DEFAULT_TABLE, help="Candidate table to featurize")
+    parser.add_argument('--scoring', default='scoring.yaml', help="Scoring config with spatial_proximity bands")
+    parser.add_argument('--reuse-sites', action='store_true',
+                        help=f"Keep the existing {SITES_TABLE} table instead of rebuilding it")
+    parser.add_argument('--apply-score', action='store_true',
+                        help="Admit scored-view rows proximity lifts over the threshold, "
+                             "add the proximity points to aerospace_score and re-tier")
+    args = parser.parse_args()
+
+    setup_logging()
+    if not IDENTIFIER_RE.match(args.table) or '.' in args.table:
+        logging.error(f"Invalid table name: {args.table!r}")
+        return False
+    spatial = load_spatial_config(args.scoring)
+    config = load_config()
+    schema = config['database'].get('schema', 'public')
+    db = get_database(config)
+
+    started = time.time()
+    try:
+        if not args.reuse_sites:
+            sites = build_reference_sites(db, schema, spatial['oem_pattern'])
+            logging.info(f"✓ {SITES_TABLE}: {sites['airfield']:,} airfield features, "
+                         f"{sites['oem']:,} OEM sites ({time.time() - started:.1f}s)")
+
+        tier2 = spatial['thresholds'].get('tier2_candidate', 80)
+        stats = compute_features(db, schema, args.table, spatial['proximity'], tier_threshold=tier2)
+        logging.info(f"✓ Features for {stats['located']:,} candidates in {stats['seconds']:.1f}s: "
+                     f"{stats['near_airfield']:,} within 10 km of an airfield, "
+                     f"{stats['near_oem']:,} within 20 km of an OEM site, "
+                     f"{stats['credited']:,} with proximity points "
+                     f"({stats['credited_no_postcode']:,} of them without a postcode)")
+
+        if args.apply_score:
+            admitted = admit_scored_views(db, schema, args.table, spatial['proximity'], spatial['thresholds'],
+                                          tier_threshold=tier2)
+            logging.info(f"✓ {admitted['featurized']:,} scored-view rows within reach of the threshold, "
+                         f"{sum(admitted['admitted'].values()):,} admitted "
+                         f"({', '.join(f'{s}: {n:,}' for s, n in admitted['admitted'].items()) or 'none'}) "
+                         f"in {admitted['seconds']:.1f}s")
+            updated = apply_proximity_score(db, schema, args.table, spatial['proximity'], spatial['thresholds'])
+            logging.info(f"✓ aerospace_score updated for {updated:,} candidates")
+    except Exception as e:
+        logging.error(f"Spatial feature stage failed: {e}")
+        return False
+    finally:
+        close_database()
+
+    logging.info(f"Spatial features complete in {time.time() - started:.1f}s")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
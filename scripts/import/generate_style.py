@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Lean osm2pgsql Style File Generator
+Builds a workload-driven style file from measured tag statistics
+
+A key from the source style file is kept as a column when it is:
+  - referenced as a column by the 07_pipeline_* SQL or scoring.yaml, or
+  - hot, i.e. present on at least --min-fraction of tagged objects of that
+    type in data/samples/tag_statistics.json (written by profile_tags.py).
+Every other tag stays available through the hstore (--hstore-all import).
+
+Also estimates the per-row width and table size saved by dropping the
+cold columns, so the saving is known before a multi-hour import.
+
+Usage:
+    python3 scripts/import/generate_style.py [--output config/uk_lean.style]
+"""
+
+import sys
+import re
+import json
+import glob
+import argparse
+sys.path.append('scripts/utils')
+
+from osm_utils import setup_logging, load_config
+import logging
+import yaml
+from pathlib import Path
+
+# Columns osm2pgsql maintains itself; never dropped
+ALWAYS_KEEP = {'z_order', 'way_area'}
+
+# Pseudo-conditions in scoring.yaml that map onto OSM columns
+SCORING_CONDITION_COLUMNS = {
+    'has_website': 'website',
+    'website_contains': 'website',
+    'has_postcode': 'addr:postcode',
+    'building_type': 'building',
+    'name_contains': 'name',
+}
+
+# Rows per style object type: nodes land in planet_osm_point, ways in
+# planet_osm_line/polygon/roads
+TABLES_BY_TYPE = {
+    'node': ['planet_osm_point'],
+    'way': ['planet_osm_line', 'planet_osm_polygon', 'planet_osm_roads'],
+}
+
+HEREDOC_RE = re.compile(r"<<\s*'?SQL'?\s*\n(.*?)\n\s*SQL\s*$", re.DOTALL | re.MULTILINE)
+STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+LINE_COMMENT_RE = re.compile(r"--[^\n]*")
+
+
+def parse_style_file(style_path: Path):
+    """Return style entries as (osm_type, key, data_type, flags) tuples."""
+    entries = []
+    with open(style_path, 'r') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            parts = line.split()
+            if len(parts) < 3:
+                logging.warning(f"Skipping malformed style line: {line}")
+                continue
+            osm_type, key, data_type = parts[:3]
+            flags = parts[3] if len(parts) > 3 else ''
+            entries.append((osm_type, key, data_type, flags))
+    return entries
+
+
+def extract_sql(path: Path) -> str:
+    """SQL text of a file: psql heredocs for shell scripts, else the file."""
+    text = path.read_text(encoding='utf-8', errors='replace')
+    if path.suffix == '.sh':
+        text = '\n'.join(HEREDOC_RE.findall(text))
+    text = LINE_COMMENT_RE.sub('', text)
+    return STRING_LITERAL_RE.sub("''", text)
+
+
+def referenced_sql_columns(sql_files, candidate_keys):
+    """Candidate keys used as column identifiers in the given SQL sources."""
+    sql = '\n'.join(extract_sql(Path(p)) for p in sql_files)
+    referenced = set()
+    for key in candidate_keys:
+        if f'"{key}"' in sql:
+            referenced.add(key)
+        elif ':' not in key and re.search(rf'(?<![\w."]){re.escape(key)}(?![\w"])', sql):
+            referenced.add(key)
+    return referenced
+
+
+def referenced_scoring_columns(scoring_path: Path, candidate_keys):
+    """Candidate keys used in scoring.yaml `conditions` / `override_if` blocks."""
+    with open(scoring_path, 'r') as f:
+        scoring = yaml.safe_load(f)
+
+    referenced = set()
+
+    def collect(node):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                column = SCORING_CONDITION_COLUMNS.get(key, key)
+                if column in candidate_keys:
+                    referenced.add(column)
+                collect(value)
+        elif isinstance(node, list):
+            for item in node:
+                collect(item)
+
+    def walk(node):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key in ('conditions', 'override_if'):
+                    collect(value)
+                else:
+                    walk(value)
+
+    walk(scoring)
+    return referenced
+
+
+def average_value_length(stats: dict, key: str, default: float = 8.0) -> float:
+    """Frequency-weighted mean length of the profiled top values for `key`."""
+    values = stats.get('top_values', {}).get(key) or []
+    total = sum(count for _, count in values)
+    if not total:
+        return default
+    return sum(len(value.encode('utf-8')) * count for value, count in values) / total
+
+
+def key_fraction(stats: dict, key: str, osm_type: str) -> float:
+    tagged = stats['tagged_objects'].get(osm_type, 0)
+    count = stats['keys'].get(key, {}).get(osm_type, 0)
+    return count / tagged if tagged else 0.0
+
+
+def estimate_savings(stats: dict, dropped_by_type: dict) -> dict:
+    """Estimate bytes saved per row and per table family by dropped columns.
+
+    A non-NULL text column costs its value plus a 1-byte varlena header (the
+    value is duplicated in the hstore under --hstore-all); a NULL column
+    costs one bit of the tuple null bitmap.
+    """
+    estimates = {}
+    for osm_type, keys in dropped_by_type.items():
+        rows = stats['tagged_objects'].get(osm_type, 0)
+        payload = sum(
+            stats['keys'].get(key, {}).get(osm_type, 0) * (average_value_length(stats, key) + 1)
+            for key in keys
+        )
+        bitmap = rows * len(keys) / 8
+        total = payload + bitmap
+        estimates[osm_type] = {
+            'tables': TABLES_BY_TYPE.get(osm_type, []),
+            'dropped_columns': len(keys),
+            'rows': rows,
+            'bytes_per_row': total / rows if rows else 0.0,
+            'total_bytes': total,
+        }
+    return estimates
+
+
+def render_style(entries, keep, source_path: Path, min_fraction: float) -> str:
+    lines = [
+        "# OSM2PGSQL Style File - lean, workload-driven column set",
+        f"# Generated by scripts/import/generate_style.py from {source_path}",
+        f"# Columns: keys referenced by the pipelines/scoring or on >= {min_fraction:.1%} of tagged objects.",
+        "# All other tags remain in the hstore (import with --hstore-all).",
+    ]
+    for section, label in (('way', 'Way tags'), ('node', 'Point tags - for nodes (POIs)')):
+        rows = [e for e in entries if e[0] == section and (e[0], e[1]) in keep]
+        if not rows:
+            continue
+        width = max(len(e[1]) for e in rows) + 2
+        lines += ["", f"# {label}"]
+        for osm_type, key, data_type, flags in rows:
+            lines.append(f"{osm_type:<6}{key:<{width}}{data_type:<9}{flags}".rstrip())
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a lean osm2pgsql style file from tag statistics")
+    parser.add_argument('--stats', default='data/samples/tag_statistics.json')
+    parser.add_argument('--source-style', help="Style to slim down (default: import.style_file)")
+    parser.add_argument('--output', default='config/uk_lean.style')
+    parser.add_argument('--scoring', default='scoring.yaml')
+    parser.add_argument('--sql', nargs='*', default=['07_pipeline_*.sh'],
+                        help="Globs of SQL/shell files whose column references must be kept")
+    parser.add_argument('--min-fraction', type=float, default=0.05,
+                        help="Keep unreferenced keys present on at least this fraction of tagged objects")
+    args = parser.parse_args()
+
+    setup_logging()
+    config = load_config()
+
+    source_style = Path(args.source_style or config['import']['style_file'])
+    stats_path = Path(args.stats)
+    if not stats_path.exists():
+        logging.error(f"Tag statistics not found: {stats_path}")
+        logging.error("Run scripts/download/profile_tags.py first")
+        return False
+
+    with open(stats_path, 'r') as f:
+        stats = json.load(f)
+    entries = parse_style_file(source_style)
+    candidate_keys = {key for _, key, _, _ in entries}
+
+    sql_files = sorted({p for pattern in args.sql for p in glob.glob(pattern)})
+    sql_refs = referenced_sql_columns(sql_files, candidate_keys)
+    scoring_refs = referenced_scoring_columns(Path(args.scoring), candidate_keys)
+    required = sql_refs | scoring_refs | ALWAYS_KEEP
+    logging.info(f"Scanned {len(sql_files)} SQL sources: {len(sql_refs)} referenced columns")
+    logging.info(f"scoring.yaml references {len(scoring_refs)} columns")
+
+    keep = set()
+    dropped_by_type = {}
+    for osm_type, key, _, _ in entries:
+        fraction = key_fraction(stats, key, osm_type)
+        if key in required or fraction >= args.min_fraction:
+            keep.add((osm_type, key))
+        else:
+            dropped_by_type.setdefault(osm_type, []).append(key)
+
+    output = Path(args.output)
+    output.write_text(render_style(entries, keep, source_style, args.min_fraction))
+    logging.info(f"Lean style written to {output}: {len(keep)}/{len(entries)} columns kept")
+
+    print("\n" + "=" * 60)
+    print("LEAN STYLE SUMMARY")
+    print("=" * 60)
+    for osm_type, keys in sorted(dropped_by_type.items()):
+        print(f"{osm_type} columns moved to hstore ({len(keys)}): {', '.join(sorted(keys))}")
+    print()
+    for osm_type, est in sorted(estimate_savings(stats, dropped_by_type).items()):
+        print(f"{osm_type:5} -> {', '.join(est['tables'])}")
+        print(f"  Rows (tagged objects): {est['rows']:,}")
+        print(f"  Estimated saving: {est['bytes_per_row']:.1f} bytes/row, "
+              f"{est['total_bytes'] / 1024**3:.2f} GB total")
+    print("=" * 60)
+    print(f"To use it, set import.style_file: {output} in config/config.yaml")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
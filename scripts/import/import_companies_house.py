@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Companies House Bulk Data Importer
+Loads the free "basic company data" snapshot into a local SQLite registry
+
+Download the snapshot (BasicCompanyDataAsOneFile-YYYY-MM-DD.zip, or the
+multi-part BasicCompanyData-*-partN_M.zip files) from
+https://download.companieshouse.gov.uk/en_output.html and point this
+script at the zip(s) or extracted CSV(s). The research and verification
+agents then look up profiles, SIC codes and company numbers locally.
+
+Usage:
+    python3 scripts/import/import_companies_house.py data/raw/BasicCompanyData*.zip
+    python3 scripts/import/import_companies_house.py sample.csv --output data/companies_house.sqlite
+"""
+
+import sys
+import time
+import argparse
+sys.path.append('scripts/utils')
+
+from osm_utils import setup_logging
+from company_registry import AEROSPACE_SIC_CODES, DEFAULT_REGISTRY_PATH, CompanyRegistry, build_registry
+import logging
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import the Companies House bulk company data into SQLite")
+    parser.add_argument('inputs', nargs='+', help="Bulk data CSV or zip file(s)")
+    parser.add_argument('--output', default=DEFAULT_REGISTRY_PATH)
+    parser.add_argument('--batch-size', type=int, default=50000, help="Rows per insert batch")
+    args = parser.parse_args()
+
+    setup_logging()
+    logging.info(f"=== Importing Companies House bulk data into {args.output} ===")
+
+    started = time.time()
+    try:
+        total = build_registry(args.inputs, args.output, args.batch_size)
+    except FileNotFoundError as e:
+        logging.error(f"Input not found: {e.filename}")
+        return False
+    logging.info(f"✓ {total:,} companies imported in {time.time() - started:.1f}s")
+
+    registry = CompanyRegistry(args.output)
+    aerospace = registry.numbers_with_sic(AEROSPACE_SIC_CODES)
+    logging.info(f"Active companies with aerospace SIC codes ({', '.join(AEROSPACE_SIC_CODES)}): {len(aerospace):,}")
+    registry.close()
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
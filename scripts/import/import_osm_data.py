@@ -13,6 +13,7 @@ import threading
 sys.path.append('scripts/utils')
 
 from osm_utils import setup_logging, load_config, run_command, check_disk_space
+from db import get_database, close_database
 import logging
 from pathlib import Path
 
@@ -41,16 +42,8 @@ def check_prerequisites(config):
             return False
     
     # Check database connectivity
-    db_config = config['database']
     try:
-        import psycopg2
-        conn = psycopg2.connect(
-            host=db_config['host'],
-            port=db_config['port'],
-            user=db_config.get('user', 'postgres'),
-            database=db_config['name']
-        )
-        conn.close()
+        get_database(config).fetch_one("SELECT 1")
         logging.info("✓ Database connection verified")
     except Exception as e:
         logging.error(f"Cannot connect to database: {e}")
@@ -186,41 +179,29 @@ def cleanup_post_import(config):
     db_config = config['database']
     
     try:
-        import psycopg2
-        conn = psycopg2.connect(
-            host=db_config['host'],
-            port=db_config['port'],
-            user=db_config.get('user', 'a'),
-            database=db_config['name']
-        )
-        cur = conn.cursor()
-        
-        # Re-enable autovacuum
-        cur.execute(f'ALTER DATABASE "{db_config["name"]}" SET autovacuum = on')
-        
-        # Get basic statistics
-        tables = ['planet_osm_point', 'planet_osm_line', 'planet_osm_polygon', 'planet_osm_roads']
-        total_records = 0
-        
-        for table in tables:
-            try:
-                cur.execute(f"SELECT count(*) FROM {db_config['schema']}.{table}")
-                count = cur.fetchone()[0]
-                total_records += count
-                logging.info(f"  {table}: {count:,} records")
-            except Exception as e:
-                logging.warning(f"Could not count {table}: {e}")
-        
-        logging.info(f"Total records imported: {total_records:,}")
-        
-        # Get database size
-        cur.execute("SELECT pg_size_pretty(pg_database_size(%s))", (db_config['name'],))
-        db_size = cur.fetchone()[0]
-        logging.info(f"Database size: {db_size}")
-        
-        conn.commit()
-        cur.close()
-        conn.close()
+        with get_database(config).cursor() as cur:
+            # Re-enable autovacuum
+            cur.execute(f'ALTER DATABASE "{db_config["name"]}" SET autovacuum = on')
+            
+            # Get basic statistics
+            tables = ['planet_osm_point', 'planet_osm_line', 'planet_osm_polygon', 'planet_osm_roads']
+            total_records = 0
+            
+            for table in tables:
+                try:
+                    cur.execute(f"SELECT count(*) FROM {db_config['schema']}.{table}")
+                    count = cur.fetchone()[0]
+                    total_records += count
+                    logging.info(f"  {table}: {count:,} records")
+                except Exception as e:
+                    logging.warning(f"Could not count {table}: {e}")
+            
+            logging.info(f"Total records imported: {total_records:,}")
+            
+            # Get database size
+            cur.execute("SELECT pg_size_pretty(pg_database_size(%s))", (db_config['name'],))
+            db_size = cur.fetchone()[0]
+            logging.info(f"Database size: {db_size}")
         
         return True
         
@@ -266,8 +247,11 @@ def main():
         return False
     
     # Cleanup
-    if not cleanup_post_import(config):
-        logging.warning("Post-import cleanup had issues, but import completed")
+    try:
+        if not cleanup_post_import(config):
+            logging.warning("Post-import cleanup had issues, but import completed")
+    finally:
+        close_database()
     
     logging.info("=== Import Process Complete ===")
     return True
@@ -8,9 +8,8 @@ import os
 sys.path.append('scripts/utils')
 
 from osm_utils import setup_logging, load_config, run_command
+from db import Database, get_database, close_database
 import logging
-import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 
 def get_current_user():
     """Get current system user."""
@@ -24,37 +23,28 @@ def create_database_user(config):
     
     try:
         # On macOS with Homebrew PostgreSQL, connect as current user who has superuser privileges
-        conn = psycopg2.connect(
-            host=db_config['host'],
-            port=db_config['port'],
-            user=current_user,
-            database='postgres'
-        )
-        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-        cur = conn.cursor()
-        
-        # Check if user exists
-        cur.execute("SELECT 1 FROM pg_user WHERE usename = %s", (db_config['user'],))
-        if not cur.fetchone():
-            logging.info(f"Creating database user: {db_config['user']}")
-            cur.execute(f"CREATE USER {db_config['user']} WITH CREATEDB")
-        else:
-            logging.info(f"Database user {db_config['user']} already exists")
-        
-        cur.close()
-        conn.close()
+        admin_db = Database(db_config, maxconn=1, user=current_user, dbname='postgres')
+        try:
+            with admin_db.cursor(autocommit=True) as cur:
+                # Check if user exists
+                cur.execute("SELECT 1 FROM pg_user WHERE usename = %s", (db_config['user'],))
+                if not cur.fetchone():
+                    logging.info(f"Creating database user: {db_config['user']}")
+                    cur.execute(f"CREATE USER {db_config['user']} WITH CREATEDB")
+                else:
+                    logging.info(f"Database user {db_config['user']} already exists")
+        finally:
+            admin_db.close()
         return True
         
     except Exception as e:
         # Try with the target user directly (may already exist with permissions)
         try:
-            conn = psycopg2.connect(
-                host=db_config['host'],
-                port=db_config['port'],
-                user=db_config['user'],
-                database='postgres'
-            )
-            conn.close()
+            target_db = Database(db_config, maxconn=1, dbname='postgres')
+            try:
+                target_db.fetch_one("SELECT 1")
+            finally:
+                target_db.close()
             logging.info(f"User {db_config['user']} already has access")
             return True
         except:
@@ -68,35 +58,25 @@ def create_database(config):
     
     try:
         # Try to connect as current user first (macOS default)
+        admin_db = Database(db_config, maxconn=1, user=current_user, dbname='postgres')
         try:
-            conn = psycopg2.connect(
-                host=db_config['host'],
-                port=db_config['port'],
-                user=current_user,
-                database='postgres'
-            )
-        except:
+            admin_db.fetch_one("SELECT 1")
+        except Exception:
             # Fallback to target user
-            conn = psycopg2.connect(
-                host=db_config['host'],
-                port=db_config['port'],
-                user=db_config['user'],
-                database='postgres'
-            )
+            admin_db.close()
+            admin_db = Database(db_config, maxconn=1, dbname='postgres')
         
-        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-        cur = conn.cursor()
-        
-        # Check if database exists
-        cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (db_config['name'],))
-        if not cur.fetchone():
-            logging.info(f"Creating database: {db_config['name']}")
-            cur.execute(f"CREATE DATABASE {db_config['name']} OWNER {db_config['user']}")
-        else:
-            logging.info(f"Database {db_config['name']} already exists")
-        
-        cur.close()
-        conn.close()
+        try:
+            with admin_db.cursor(autocommit=True) as cur:
+                # Check if database exists
+                cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (db_config['name'],))
+                if not cur.fetchone():
+                    logging.info(f"Creating database: {db_config['name']}")
+                    cur.execute(f"CREATE DATABASE {db_config['name']} OWNER {db_config['user']}")
+                else:
+                    logging.info(f"Database {db_config['name']} already exists")
+        finally:
+            admin_db.close()
         return True
         
     except Exception as e:
@@ -105,37 +85,25 @@ def create_database(config):
 
 def setup_postgis(config):
     """Enable PostGIS extensions."""
-    db_config = config['database']
-    
     try:
         # Connect to the target database
-        conn = psycopg2.connect(
-            host=db_config['host'],
-            port=db_config['port'],
-            user=db_config.get('user', 'postgres'),
-            database=db_config['name']
-        )
-        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-        cur = conn.cursor()
+        with get_database(config).cursor(autocommit=True) as cur:
+            logging.info("Enabling PostGIS extensions...")
+            
+            # Enable extensions
+            extensions = ['postgis', 'hstore', 'postgis_topology', 'pg_trgm']
+            for ext in extensions:
+                try:
+                    cur.execute(f"CREATE EXTENSION IF NOT EXISTS {ext}")
+                    logging.info(f"✓ {ext} extension enabled")
+                except Exception as e:
+                    logging.warning(f"Could not enable {ext}: {e}")
+            
+            # Verify PostGIS
+            cur.execute("SELECT PostGIS_Full_Version()")
+            version = cur.fetchone()[0]
+            logging.info(f"PostGIS version: {version[:100]}...")
         
-        logging.info("Enabling PostGIS extensions...")
-        
-        # Enable extensions
-        extensions = ['postgis', 'hstore', 'postgis_topology']
-        for ext in extensions:
-            try:
-                cur.execute(f"CREATE EXTENSION IF NOT EXISTS {ext}")
-                logging.info(f"✓ {ext} extension enabled")
-            except Exception as e:
-                logging.warning(f"Could not enable {ext}: {e}")
-        
-        # Verify PostGIS
-        cur.execute("SELECT PostGIS_Full_Version()")
-        version = cur.fetchone()[0]
-        logging.info(f"PostGIS version: {version[:100]}...")
-        
-        cur.close()
-        conn.close()
         return True
         
     except Exception as e:
@@ -147,23 +115,11 @@ def create_schema(config):
     db_config = config['database']
     
     try:
-        conn = psycopg2.connect(
-            host=db_config['host'],
-            port=db_config['port'],
-            user=db_config.get('user', 'postgres'),
-            database=db_config['name']
-        )
-        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-        cur = conn.cursor()
-        
         schema_name = db_config.get('schema', 'osm_raw')
         logging.info(f"Creating schema: {schema_name}")
         
-        cur.execute(f"CREATE SCHEMA IF NOT EXISTS {schema_name}")
-        cur.execute(f"SET search_path = {schema_name}, public")
-        
-        cur.close()
-        conn.close()
+        # search_path for pooled sessions comes from the database config
+        get_database(config).execute(f"CREATE SCHEMA IF NOT EXISTS {schema_name}", autocommit=True)
         return True
         
     except Exception as e:
@@ -172,79 +128,39 @@ def create_schema(config):
 
 def optimize_for_import(config):
     """Optimize PostgreSQL settings for large data import."""
-    db_config = config['database']
-    
-    try:
-        conn = psycopg2.connect(
-            host=db_config['host'],
-            port=db_config['port'],
-            user=db_config.get('user', 'postgres'),
-            database=db_config['name']
-        )
-        cur = conn.cursor()
-        
-        logging.info("Optimizing database for import...")
-        
-        # Temporary settings for import performance
-        # optimization_settings = [
-        #    "SET maintenance_work_mem = '2GB'",
-        #    "SET work_mem = '256MB'",
-        #    "SET synchronous_commit = off",
-        #    "SET full_page_writes = off",
-        #    "SET checkpoint_completion_target = 0.9",
-        #    "SET wal_buffers = '16MB'",
-        #    "SET random_page_cost = 1.1"
-        # ]
-        #
-        # for setting in optimization_settings:
-        #    try:
-        #        cur.execute(setting)
-        #        logging.info(f"Applied: {setting}")
-        #    except Exception as e:
-        #        logging.warning(f"Could not apply setting {setting}: {e}")
-        
-        # Disable autovacuum for target database during import
-        # cur.execute(f'ALTER DATABASE "{db_config["name"]}" SET autovacuum = off')
-        # logging.info("Disabled autovacuum for import")
-        
-        conn.commit()
-        cur.close()
-        conn.close()
-        return True
-        
-    except Exception as e:
-        logging.error(f"Failed to optimize database: {e}")
-        return False
+    logging.info("Optimizing database for import...")
+
+    # Session SETs would not reach osm2pgsql, which opens its own
+    # connections; apply these server-wide (postgresql.conf / ALTER SYSTEM)
+    # if the import needs them:
+    #    maintenance_work_mem = '2GB'
+    #    work_mem = '256MB'
+    #    synchronous_commit = off
+    #    full_page_writes = off
+    #    checkpoint_completion_target = 0.9
+    #    wal_buffers = '16MB'
+    #    random_page_cost = 1.1
+    #
+    # Disable autovacuum for target database during import
+    # ALTER DATABASE "<name>" SET autovacuum = off
+    return True
 
 def test_connection(config):
     """Test database connection and permissions."""
-    db_config = config['database']
-    
     try:
-        conn = psycopg2.connect(
-            host=db_config['host'],
-            port=db_config['port'],
-            user=db_config.get('user', 'postgres'),
-            database=db_config['name']
-        )
-        cur = conn.cursor()
-        
-        # Test basic operations
-        cur.execute("SELECT version()")
-        pg_version = cur.fetchone()[0]
-        
-        cur.execute("SELECT PostGIS_Version()")
-        postgis_version = cur.fetchone()[0]
-        
-        cur.execute("CREATE TABLE test_table (id SERIAL PRIMARY KEY, geom GEOMETRY(POINT, 4326))")
-        cur.execute("INSERT INTO test_table (geom) VALUES (ST_GeomFromText('POINT(0 0)', 4326))")
-        cur.execute("SELECT ST_AsText(geom) FROM test_table")
-        test_result = cur.fetchone()[0]
-        cur.execute("DROP TABLE test_table")
-        
-        conn.commit()
-        cur.close()
-        conn.close()
+        with get_database(config).cursor() as cur:
+            # Test basic operations
+            cur.execute("SELECT version()")
+            pg_version = cur.fetchone()[0]
+            
+            cur.execute("SELECT PostGIS_Version()")
+            postgis_version = cur.fetchone()[0]
+            
+            cur.execute("CREATE TABLE test_table (id SERIAL PRIMARY KEY, geom GEOMETRY(POINT, 4326))")
+            cur.execute("INSERT INTO test_table (geom) VALUES (ST_GeomFromText('POINT(0 0)', 4326))")
+            cur.execute("SELECT ST_AsText(geom) FROM test_table")
+            test_result = cur.fetchone()[0]
+            cur.execute("DROP TABLE test_table")
         
         logging.info(f"✓ PostgreSQL: {pg_version.split(',')[0]}")
         logging.info(f"✓ PostGIS: {postgis_version}")
@@ -271,12 +187,15 @@ def main():
         ("Testing connection", lambda: test_connection(config))
     ]
     
-    for step_name, step_func in steps:
-        logging.info(f"Step: {step_name}")
-        if not step_func():
-            logging.error(f"Failed: {step_name}")
-            return False
-        logging.info(f"✓ Completed: {step_name}")
+    try:
+        for step_name, step_func in steps:
+            logging.info(f"Step: {step_name}")
+            if not step_func():
+                logging.error(f"Failed: {step_name}")
+                return False
+            logging.info(f"✓ Completed: {step_name}")
+    finally:
+        close_database()
     
     logging.info("Database setup completed successfully!")
     return True
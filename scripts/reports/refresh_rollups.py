@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Candidate Rollup Refresh
+Updates the candidate_rollup aggregate table and its report views
+
+Run after each pipeline run (07_run_all_pipelines.sh and
+aerospace_master_workflow.sh do this). Report scripts call it with
+--if-missing so they work on a database that has never been refreshed.
+
+Usage:
+    python3 scripts/reports/refresh_rollups.py
+    python3 scripts/reports/refresh_rollups.py --if-missing -q
+"""
+
+import sys
+import argparse
+sys.path.append('scripts/utils')
+
+from osm_utils import setup_logging, load_config
+from db import get_database, close_database
+from rollups import refresh_rollups, rollups_exist
+import logging
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the candidate rollup tables")
+    parser.add_argument('--if-missing', action='store_true', help="Only build the rollups if they do not exist yet")
+    parser.add_argument('-q', '--quiet', action='store_true')
+    args = parser.parse_args()
+
+    setup_logging()
+    if args.quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+    config = load_config()
+    schema = config['database'].get('schema', 'public')
+    db = get_database(config)
+
+    try:
+        if args.if_missing and rollups_exist(db, schema):
+            logging.info("Rollups already present; nothing to do")
+            return True
+        stats = refresh_rollups(db, schema)
+    except Exception as e:
+        logging.error(f"Rollup refresh failed: {e}")
+        return False
+    finally:
+        close_database()
+
+    logging.info(f"✓ Rollups refreshed: {stats['candidates']:,} candidates in {stats['cells']:,} cells "
+                 f"({stats['cells_inserted']} inserted, {stats['cells_updated']} updated, "
+                 f"{stats['cells_deleted']} deleted) in {stats['seconds']:.2f}s")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Weekly Intelligence Report
+Generates the weekly Markdown report and its CSV exports over one connection
+
+Every report section is gathered by a single query (summary figures come
+from the candidate_rollup views, lists from the candidate table) and
+rendered into scripts/reports/templates/weekly_report.md; the CSV exports
+are COPYed over the same connection. Per-section query and render times
+are logged at the end.
+
+Usage:
+    python3 scripts/reports/weekly_report.py
+    python3 scripts/reports/weekly_report.py --output-dir reports/weekly --no-exports
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import subprocess
+from datetime import date
+sys.path.append('scripts/utils')
+
+from osm_utils import setup_logging, load_config
+from db import get_database, close_database
+from report_engine import ReportEngine, Section, log_timings
+from rollups import refresh_rollups, rollups_exist
+import logging
+
+TABLE = 'aerospace_supplier_candidates'
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'weekly_report.md')
+
+RESIDENTIAL = ("(building_type IN ('house', 'apartments', 'residential') "
+               "OR landuse_type = 'residential')")
+CONSUMER = "LOWER(name) ~* '(cafe|restaurant|hotel|pub|retail)'"
+
+
+def build_sections(schema: str) -> list:
+    candidates = f"{schema}.{TABLE}"
+    return [
+        Section('summary', f"""
+            SELECT total, tier1, tier2, with_contact, regions_covered, ready_for_outreach,
+                   ROUND(100.0 * tier1 / NULLIF(total, 0)) AS tier1_pct,
+                   ROUND(100.0 * tier2 / NULLIF(total, 0)) AS tier2_pct,
+                   ROUND(100.0 * with_contact / NULLIF(total, 0)) AS contact_pct,
+                   ROUND(avg_score) AS avg_score
+            FROM {schema}.candidate_rollup_totals""",
+            "- **Total Candidates:** {total}\n"
+            "- **Tier 1 (High Confidence):** {tier1} ({tier1_pct}%)\n"
+            "- **Tier 2 (Target Segment):** {tier2} ({tier2_pct}%)\n"
+            "- **With Contact Information:** {with_contact} ({contact_pct}%)\n"
+            "- **Geographic Coverage:** {regions_covered} postcode areas\n"
+            "- **Average Confidence Score:** {avg_score}"),
+
+        Section('outreach', f"""
+            SELECT ROW_NUMBER() OVER (ORDER BY aerospace_score DESC) AS rank, name, aerospace_score,
+                   COALESCE('Website: ' || website, 'No website') AS website,
+                   COALESCE(city, 'Unknown') AS city, COALESCE(postcode, 'No postcode') AS postcode
+            FROM {candidates}
+            WHERE aerospace_score >= 120
+              AND (website IS NOT NULL OR phone IS NOT NULL)
+            ORDER BY aerospace_score DESC
+            LIMIT 10""",
+            "**{rank}. {name}**  \n"
+            "   - Score: {aerospace_score} | {website}  \n"
+            "   - Location: {city} ({postcode})  ", joiner='\n\n'),
+
+        Section('research', f"""
+            SELECT name, aerospace_score, COALESCE(city, 'Unknown location') AS location,
+                   COALESCE(city, '') AS city
+            FROM {candidates}
+            WHERE tier_classification IN ('tier1_candidate', 'tier2_candidate')
+              AND website IS NULL
+              AND phone IS NULL
+            ORDER BY aerospace_score DESC
+            LIMIT 10""",
+            "- **{name}** (Score: {aerospace_score}) - {location}  \n"
+            "  → Google: \"{name} {city} aerospace\""),
+
+        Section('top_clusters', f"""
+            SELECT region, total, ROUND(avg_score) AS avg_score, high_quality
+            FROM {schema}.candidate_rollup_regions
+            ORDER BY total DESC
+            LIMIT 5""",
+            "**{region}** - {total} candidates (Avg score: {avg_score}) - {high_quality} high quality"),
+
+        Section('cluster_table', f"""
+            SELECT region, total, tier1, tier2, ROUND(avg_score) AS avg_score,
+                   CASE
+                     WHEN region IN ('BS', 'GL', 'DE', 'PR', 'BA') THEN '⭐ Primary'
+                     WHEN region IN ('CB', 'SO', 'BT', 'LE') THEN '★ Secondary'
+                     ELSE 'Emerging'
+                   END AS status
+            FROM {schema}.candidate_rollup_regions
+            WHERE total >= 5
+            ORDER BY total DESC
+            LIMIT 15""",
+            "| {region} | {total} | {tier1} | {tier2} | {avg_score} | {status} |"),
+
+        Section('score_distribution', f"""
+            SELECT label, SUM(total) AS total, ROUND(SUM(pct_of_total)) AS pct
+            FROM (
+              SELECT total, pct_of_total,
+                     CASE
+                       WHEN score_band >= 200 THEN 1
+                       WHEN score_band >= 150 THEN 2
+                       WHEN score_band >= 100 THEN 3
+                       WHEN score_band >= 80 THEN 4
+                       WHEN score_band >= 60 THEN 5
+                       ELSE 6
+                     END AS ord,
+                     CASE
+                       WHEN score_band >= 200 THEN '200+ (Definitive)'
+                       WHEN score_band >= 150 THEN '150-199 (Tier 1)'
+                       WHEN score_band >= 100 THEN '100-149 (Strong Tier 2)'
+                       WHEN score_band >= 80 THEN '80-99 (Tier 2)'
+                       WHEN score_band >= 60 THEN '60-79 (Potential)'
+                       ELSE '40-59 (Review)'
+                     END AS label
+              FROM {schema}.candidate_rollup_score_bands
+            ) bands
+            GROUP BY ord, label
+            ORDER BY ord""",
+            "- **{label}:** {total} candidates ({pct}%)"),
+
+        Section('completeness', f"""
+            SELECT total, with_website, with_phone, with_postcode, with_city,
+                   ROUND(100.0 * with_website / total) AS website_pct,
+                   ROUND(100.0 * with_phone / total) AS phone_pct,
+                   ROUND(100.0 * with_postcode / total) AS postcode_pct,
+                   ROUND(100.0 * with_city / total) AS city_pct
+            FROM {schema}.candidate_rollup_totals
+            WHERE total > 0""",
+            "- **Website:** {website_pct}% ({with_website}/{total})\n"
+            "- **Phone:** {phone_pct}% ({with_phone}/{total})\n"
+            "- **Postcode:** {postcode_pct}% ({with_postcode}/{total})\n"
+            "- **City:** {city_pct}% ({with_city}/{total})"),
+
+        # Residential and consumer-keyword alerts share one pass over the scored candidates
+        Section('alerts', f"""
+            SELECT alert, count
+            FROM (
+              SELECT COUNT(*) FILTER (WHERE aerospace_score >= 100 AND {RESIDENTIAL}) AS residential,
+                     COUNT(*) FILTER (WHERE {CONSUMER}) AS consumer
+              FROM {candidates}
+              WHERE aerospace_score >= 80
+            ) c,
+            LATERAL (VALUES
+              (1, 'High scores but residential indicators', c.residential),
+              (2, 'High scores but consumer keywords', c.consumer),
+              (3, 'Tier 1 without any contact info',
+               (SELECT COALESCE(SUM(candidates), 0)::bigint FROM {schema}.candidate_rollup
+                WHERE tier_classification = 'tier1_candidate' AND NOT (has_website OR has_phone)))
+            ) a(ord, alert, count)
+            WHERE count > 0
+            ORDER BY ord""",
+            "- **{alert}:** {count} cases"),
+
+        Section('keywords', f"""
+            SELECT kw, COUNT(*) AS mentions, ROUND(AVG(aerospace_score)) AS avg_score
+            FROM (
+              SELECT UNNEST(matched_keywords) AS kw, aerospace_score
+              FROM {candidates}
+              WHERE matched_keywords IS NOT NULL
+                AND tier_classification IN ('tier1_candidate', 'tier2_candidate')
+            ) keyword_freq
+            GROUP BY kw
+            HAVING COUNT(*) >= 3
+            ORDER BY AVG(aerospace_score) DESC, COUNT(*) DESC
+            LIMIT 15""",
+            "- **{kw}** ({mentions} mentions, avg score: {avg_score})"),
+    ]
+
+
+def build_exports(schema: str) -> dict:
+    candidates = f"{schema}.{TABLE}"
+    return {
+        'weekly_outreach_targets': f"""
+            SELECT name, aerospace_score, tier_classification,
+                   website, phone, postcode, city,
+                   array_to_string(matched_keywords, '; ') AS keywords
+            FROM {candidates}
+            WHERE aerospace_score >= 100
+              AND (website IS NOT NULL OR phone IS NOT NULL)
+            ORDER BY aerospace_score DESC
+            LIMIT 50""",
+        'weekly_research_needed': f"""
+            SELECT name, aerospace_score, tier_classification,
+                   postcode, city,
+                   'https://www.google.com/search?q=' || REPLACE(name, ' ', '+') || '+' || COALESCE(city, '') || '+aerospace' AS google_search
+            FROM {candidates}
+            WHERE tier_classification IN ('tier1_candidate', 'tier2_candidate')
+              AND website IS NULL
+            ORDER BY aerospace_score DESC
+            LIMIT 100""",
+        'weekly_quality_review': f"""
+            SELECT name, aerospace_score, tier_classification,
+                   building_type, landuse_type, postcode,
+                   CASE
+                     WHEN building_type IN ('house', 'apartments', 'residential') THEN 'Residential building'
+                     WHEN landuse_type = 'residential' THEN 'Residential landuse'
+                     WHEN LOWER(name) ~* '(cafe|restaurant|hotel|pub)' THEN 'Consumer keyword in name'
+                     WHEN website IS NULL AND phone IS NULL THEN 'No contact info'
+                     ELSE 'Review needed'
+                   END AS issue
+            FROM {candidates}
+            WHERE (
+              (aerospace_score >= 80 AND {RESIDENTIAL})
+              OR (aerospace_score >= 80 AND {CONSUMER})
+              OR (tier_classification = 'tier1_candidate' AND website IS NULL AND phone IS NULL)
+            )
+            ORDER BY aerospace_score DESC""",
+    }
+
+
+def convert_to_html(report_file: str) -> str:
+    html_file = os.path.splitext(report_file)[0] + '.html'
+    subprocess.run(['pandoc', report_file, '-o', html_file, '--standalone',
+                    '--css=https://cdn.jsdelivr.net/npm/water.css@2/out/water.css',
+                    '--metadata', 'title=UK Aerospace Supplier Intelligence Report'], check=True)
+    return html_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the weekly aerospace intelligence report")
+    parser.add_argument('--output-dir', default='./reports/weekly')
+    parser.add_argument('--date', default=date.today().isoformat(), help="Report date used in file names")
+    parser.add_argument('--no-exports', action='store_true', help="Skip the accompanying CSV exports")
+    parser.add_argument('--no-html', action='store_true', help="Skip the pandoc HTML conversion")
+    args = parser.parse_args()
+
+    setup_logging()
+    config = load_config()
+    schema = config['database'].get('schema', 'public')
+    os.makedirs(args.output_dir, exist_ok=True)
+    report_file = os.path.join(args.output_dir, f"aerospace_intel_{args.date}.md")
+
+    with open(TEMPLATE_PATH, encoding='utf-8') as f:
+        engine = ReportEngine(build_sections(schema), f.read())
+
+    logging.info("Generating Weekly Intelligence Report...")
+    started = time.time()
+    db = get_database(config)
+    written = []
+    try:
+        # Rollups are refreshed by the pipelines; build them here only on a fresh database
+        if not rollups_exist(db, schema):
+            refresh_rollups(db, schema)
+
+        with db.cursor() as cur:
+            report, data, timings = engine.render(cur, report_date=args.date,
+                                                  database=config['database']['name'])
+            with open(report_file, 'w', encoding='utf-8') as f:
+                f.write(report)
+            written.append(('Report generated', report_file))
+
+            if not args.no_exports:
+                for name, sql in build_exports(schema).items():
+                    path = os.path.join(args.output_dir, f"{name}_{args.date}.csv")
+                    export_started = time.perf_counter()
+                    with open(path, 'w', encoding='utf-8', newline='') as f:
+                        cur.copy_expert(f"COPY ({sql}) TO STDOUT WITH CSV HEADER", f)
+                    logging.debug(f"{name}: {(time.perf_counter() - export_started) * 1000:.1f} ms")
+                    written.append((name.replace('weekly_', '').replace('_', ' ').capitalize(), path))
+    except Exception as e:
+        logging.error(f"Weekly report failed: {e}")
+        return False
+    finally:
+        close_database()
+
+    if not args.no_html and shutil.which('pandoc'):
+        try:
+            written.append(('HTML report', convert_to_html(report_file)))
+        except subprocess.CalledProcessError as e:
+            logging.warning(f"pandoc conversion failed: {e}")
+
+    for label, path in written:
+        logging.info(f"✓ {label}: {path}")
+    logging.info(f"Section timings (1 query, {time.time() - started:.2f}s total):")
+    log_timings(timings)
+
+    summary = (data['summary'] or [{}])[0]
+    print("")
+    print("========================================")
+    print("WEEKLY REPORT SUMMARY")
+    print("========================================")
+    print("")
+    print(f"Total Candidates: {summary.get('total', 0)}")
+    print(f"Tier 1: {summary.get('tier1', 0)}")
+    print(f"Tier 2: {summary.get('tier2', 0)}")
+    print(f"Ready for Outreach: {summary.get('ready_for_outreach', 0)}")
+    print("")
+    print(f"📄 Full Report: {report_file}")
+    print("")
+    print("Next: Review the markdown report or open the HTML version in your browser.")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
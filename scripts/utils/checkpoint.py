@@ -0,0 +1,101 @@
+"""
+UK OSM Data Processor - Resumable Batch Checkpoints
+
+Append-only JSONL store with one record per company, keyed by Companies
+House number. Batch jobs append each result as it completes (O(1) I/O per
+row), skip keys that already have a successful record when restarted, and
+write the final CSV/Parquet once at the end.
+
+A record line is {"key": ..., "result": {...}}; later lines for the same
+key replace earlier ones, so a failed company retried on resume simply
+gets a newer record.
+"""
+
+import os
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+
+def company_key(company_name: Any, companies_house_number: Any) -> str:
+    """Checkpoint key: the Companies House number, else the company name."""
+    number = '' if companies_house_number is None else str(companies_house_number).strip()
+    if number and number.lower() != 'nan':
+        return number
+    return f"name:{str(company_name).strip().lower()}"
+
+
+class CheckpointStore:
+    """Append-only JSONL checkpoint of per-company results."""
+
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = Path(path)
+        self.fsync = fsync
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self._load()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            # Drop a partial last line left by a crash mid-write
+            end = data.rfind(b'\n') + 1
+            if end < len(data):
+                logging.warning(f"Discarding truncated checkpoint record in {self.path}")
+                f.truncate(end)
+        for number, line in enumerate(data[:end].decode('utf-8').splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                self.records[entry['key']] = entry['result']
+            except (json.JSONDecodeError, KeyError) as e:
+                logging.warning(f"Skipping bad checkpoint line {number} in {self.path}: {e}")
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.records
+
+    def is_done(self, key: str) -> bool:
+        """True if `key` has a record without an error."""
+        record = self.records.get(key)
+        return record is not None and not record.get('error')
+
+    def record(self, key: str, result: Dict[str, Any]) -> None:
+        self.records[key] = result
+        self._file.write(json.dumps({'key': key, 'result': result}, default=str) + '\n')
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def results(self, keys: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Records in `keys` order (default: insertion order)."""
+        if keys is None:
+            return list(self.records.values())
+        return [self.records[key] for key in dict.fromkeys(keys) if key in self.records]
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_results(df: pd.DataFrame, output_file: str) -> None:
+    """Write final results as Parquet (.parquet) or CSV (anything else)."""
+    if str(output_file).endswith('.parquet'):
+        df.to_parquet(output_file, index=False)
+    else:
+        df.to_csv(output_file, index=False)
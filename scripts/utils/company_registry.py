@@ -0,0 +1,349 @@
+"""
+UK OSM Data Processor - Local Companies House Registry
+
+SQLite copy of the Companies House "Free Company Data Product"
+(BasicCompanyDataAsOneFile / BasicCompanyData-*-part*.zip) so profile
+lookups, SIC checks and name -> number resolution run locally instead of
+one API call or web search per company.
+
+Tables:
+  companies    one row per company, indexed by number, normalized name
+               and normalized postcode
+  company_sic  (company_number, sic_code) pairs, indexed by SIC code
+
+Build it with scripts/import/import_companies_house.py.
+"""
+
+import io
+import os
+import re
+import csv
+import time
+import sqlite3
+import zipfile
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+DEFAULT_REGISTRY_PATH = 'data/companies_house.sqlite'
+
+# SIC 2007: manufacture of air and spacecraft / repair and maintenance of aircraft
+AEROSPACE_SIC_CODES = ('30300', '33160')
+
+# Longest first so "public limited company" wins over "limited company"
+LEGAL_SUFFIXES = (
+    'public limited company', 'limited liability partnership', 'community interest company',
+    'limited company', 'limited', 'ltd', 'plc', 'llp', 'cic', 'lp', 'co', 'company',
+    'uk', 'u k', 'the',
+)
+LEGAL_SUFFIX_RE = re.compile(r'(?:\s+(?:' + '|'.join(re.escape(s) for s in LEGAL_SUFFIXES) + r'))+$')
+LEADING_THE_RE = re.compile(r'^the\s+')
+NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+
+SCHEMA = """
+CREATE TABLE companies (
+    company_number TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_norm TEXT NOT NULL,
+    status TEXT,
+    category TEXT,
+    incorporation_date TEXT,
+    dissolution_date TEXT,
+    address_line_1 TEXT,
+    address_line_2 TEXT,
+    post_town TEXT,
+    county TEXT,
+    country TEXT,
+    postcode TEXT,
+    postcode_norm TEXT,
+    sic_codes TEXT,
+    accounts_category TEXT,
+    accounts_last_made_up TEXT,
+    accounts_next_due TEXT,
+    uri TEXT
+);
+CREATE TABLE company_sic (
+    company_number TEXT NOT NULL,
+    sic_code TEXT NOT NULL
+);
+"""
+
+INDEXES = """
+CREATE INDEX idx_companies_name_norm ON companies(name_norm);
+CREATE INDEX idx_companies_postcode_norm ON companies(postcode_norm);
+CREATE INDEX idx_company_sic_code ON company_sic(sic_code, company_number);
+CREATE INDEX idx_company_sic_number ON company_sic(company_number);
+"""
+
+# Bulk CSV header -> companies column (headers are stripped of stray spaces first)
+CSV_COLUMNS = {
+    'CompanyNumber': 'company_number',
+    'CompanyName': 'name',
+    'CompanyStatus': 'status',
+    'CompanyCategory': 'category',
+    'IncorporationDate': 'incorporation_date',
+    'DissolutionDate': 'dissolution_date',
+    'RegAddress.AddressLine1': 'address_line_1',
+    'RegAddress.AddressLine2': 'address_line_2',
+    'RegAddress.PostTown': 'post_town',
+    'RegAddress.County': 'county',
+    'RegAddress.Country': 'country',
+    'RegAddress.PostCode': 'postcode',
+    'Accounts.AccountCategory': 'accounts_category',
+    'Accounts.LastMadeUpDate': 'accounts_last_made_up',
+    'Accounts.NextDueDate': 'accounts_next_due',
+    'URI': 'uri',
+}
+SIC_COLUMNS = tuple(f'SICCode.SicText_{i}' for i in range(1, 5))
+COLUMN_ORDER = ('company_number', 'name', 'name_norm', 'status', 'category', 'incorporation_date',
+                'dissolution_date', 'address_line_1', 'address_line_2', 'post_town', 'county',
+                'country', 'postcode', 'postcode_norm', 'sic_codes', 'accounts_category',
+                'accounts_last_made_up', 'accounts_next_due', 'uri')
+SIC_INDEX = COLUMN_ORDER.index('sic_codes')
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Lowercase alphanumeric tokens with legal suffixes removed.
+
+    "GKN Aerospace Ltd", "GKN AEROSPACE LIMITED" and "GKN Aerospace
+    (UK) Limited" all normalize to "gkn aerospace".
+    """
+    if not isinstance(name, str):  # None / NaN from pandas
+        return ''
+    text = NON_ALNUM_RE.sub(' ', name.lower().replace('&', ' and ')).strip()
+    text = LEADING_THE_RE.sub('', text)
+    stripped = LEGAL_SUFFIX_RE.sub('', text).strip()
+    return stripped or text
+
+
+def normalize_postcode(postcode: Optional[str]) -> str:
+    return re.sub(r'\s+', '', (postcode or '').upper())
+
+
+def normalize_number(number) -> str:
+    """Companies House numbers are 8 characters; spreadsheets drop leading zeros."""
+    text = str(number or '').strip().upper()
+    if text.endswith('.0'):
+        text = text[:-2]
+    return text.zfill(8) if text.isdigit() else text
+
+
+def _open_csv_files(path: str) -> Iterator[io.TextIOBase]:
+    if str(path).lower().endswith('.zip'):
+        with zipfile.ZipFile(path) as archive:
+            for member in archive.namelist():
+                if member.lower().endswith('.csv'):
+                    with archive.open(member) as raw:
+                        yield io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+    else:
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            yield f
+
+
+def read_bulk_rows(paths: Iterable[str]) -> Iterator[Dict[str, str]]:
+    """Rows of the bulk CSV(s) or zip(s), headers stripped of whitespace."""
+    for path in paths:
+        for f in _open_csv_files(path):
+            reader = csv.reader(f)
+            header = [h.strip() for h in next(reader)]
+            for values in reader:
+                yield dict(zip(header, values))
+
+
+def _company_row(raw: Dict[str, str]) -> tuple:
+    row = {column: (raw.get(header) or '').strip() or None for header, column in CSV_COLUMNS.items()}
+    row['company_number'] = normalize_number(row['company_number'])
+    row['name_norm'] = normalize_name(row['name'])
+    row['postcode_norm'] = normalize_postcode(row['postcode']) or None
+    # SicText values look like "30300 - Manufacture of air and spacecraft..."
+    codes = [(raw.get(c) or '').split(' - ', 1)[0].strip() for c in SIC_COLUMNS]
+    row['sic_codes'] = ';'.join(c for c in codes if c and c.lower() != 'none supplied') or None
+    return tuple(row[c] for c in COLUMN_ORDER)
+
+
+def build_registry(csv_paths: Sequence[str], output: str = DEFAULT_REGISTRY_PATH,
+                   batch_size: int = 50000) -> int:
+    """Load bulk CSV/zip file(s) into a fresh SQLite registry at `output`.
+
+    Builds into a temporary file with journaling off and indexes created
+    after the load, then swaps it into place. Returns the row count.
+    """
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_suffix(f'.{os.getpid()}.tmp')
+    tmp.unlink(missing_ok=True)
+    db = sqlite3.connect(tmp)
+    try:
+        db.executescript("PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;" + SCHEMA)
+        insert_company = f"INSERT OR REPLACE INTO companies VALUES ({', '.join('?' * len(COLUMN_ORDER))})"
+        started = time.time()
+        total = 0
+        batch = []
+
+        def flush():
+            db.executemany(insert_company, batch)
+            db.executemany(
+                "INSERT INTO company_sic VALUES (?, ?)",
+                [(row[0], code) for row in batch if row[SIC_INDEX] for code in row[SIC_INDEX].split(';')]
+            )
+            batch.clear()
+
+        for raw in read_bulk_rows(csv_paths):
+            row = _company_row(raw)
+            if not row[0] or not row[1]:
+                continue
+            batch.append(row)
+            total += 1
+            if len(batch) >= batch_size:
+                flush()
+                logging.info(f"  {total:,} companies loaded ({total / (time.time() - started):,.0f}/s)")
+        if batch:
+            flush()
+        logging.info("Creating indexes...")
+        # INSERT OR REPLACE keeps the last row per company: drop SIC rows that only
+        # replaced duplicates had, then repeats of the codes the kept row shares
+        db.execute("""
+            DELETE FROM company_sic WHERE NOT EXISTS (
+                SELECT 1 FROM companies c
+                WHERE c.company_number = company_sic.company_number
+                  AND ';' || c.sic_codes || ';' LIKE '%;' || company_sic.sic_code || ';%'
+            )
+        """)
+        db.execute("""
+            DELETE FROM company_sic WHERE rowid NOT IN (
+                SELECT MIN(rowid) FROM company_sic GROUP BY company_number, sic_code
+            )
+        """)
+        db.executescript(INDEXES + "ANALYZE;")
+        db.commit()
+        db.close()
+        os.replace(tmp, output)
+    finally:
+        db.close()
+        # Only still there if the load or the swap failed: don't leave it behind
+        tmp.unlink(missing_ok=True)
+    return total
+
+
+class CompanyRegistry:
+    """Read-only lookups against a registry built by build_registry()."""
+
+    def __init__(self, path: str = DEFAULT_REGISTRY_PATH):
+        if not Path(path).exists():
+            raise FileNotFoundError(
+                f"Companies House registry not found: {path} "
+                "(build it with scripts/import/import_companies_house.py)"
+            )
+        self.path = path
+        self._db = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+
+    @classmethod
+    def open_if_exists(cls, path: Optional[str] = DEFAULT_REGISTRY_PATH) -> Optional['CompanyRegistry']:
+        """The registry at `path`, or None when it hasn't been built."""
+        return cls(path) if path and Path(path).exists() else None
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM companies").fetchone()[0]
+
+    def company(self, company_number) -> Optional[Dict]:
+        row = self._db.execute(
+            "SELECT * FROM companies WHERE company_number = ?", (normalize_number(company_number),)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def profile(self, company_number) -> Dict:
+        """Company profile in the shape of the Companies House API response ({} if unknown)."""
+        company = self.company(company_number)
+        if company is None:
+            return {}
+        address = {
+            'address_line_1': company['address_line_1'],
+            'address_line_2': company['address_line_2'],
+            'locality': company['post_town'],
+            'region': company['county'],
+            'country': company['country'],
+            'postal_code': company['postcode'],
+        }
+        return {
+            'company_number': company['company_number'],
+            'company_name': company['name'],
+            'company_status': (company['status'] or '').lower() or None,
+            'type': company['category'],
+            'date_of_creation': company['incorporation_date'],
+            'date_of_cessation': company['dissolution_date'],
+            'registered_office_address': {k: v for k, v in address.items() if v},
+            'sic_codes': company['sic_codes'].split(';') if company['sic_codes'] else [],
+            'accounts': {
+                'accounting_category': company['accounts_category'],
+                'last_made_up_to': company['accounts_last_made_up'],
+                'next_due': company['accounts_next_due'],
+            },
+            'source': 'companies_house_bulk',
+        }
+
+    def sic_codes(self, company_number) -> List[str]:
+        rows = self._db.execute(
+            "SELECT sic_code FROM company_sic WHERE company_number = ?", (normalize_number(company_number),)
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def has_sic(self, company_number, codes: Sequence[str] = AEROSPACE_SIC_CODES) -> bool:
+        """True if the company is registered under any of `codes`."""
+        codes = list(codes)
+        row = self._db.execute(
+            f"SELECT 1 FROM company_sic WHERE company_number = ? AND sic_code IN ({', '.join('?' * len(codes))}) LIMIT 1",
+            [normalize_number(company_number), *codes]
+        ).fetchone()
+        return row is not None
+
+    def numbers_with_sic(self, codes: Sequence[str] = AEROSPACE_SIC_CODES, active_only: bool = True) -> List[str]:
+        codes = list(codes)
+        sql = f"""
+            SELECT DISTINCT s.company_number FROM company_sic s
+            JOIN companies c USING (company_number)
+            WHERE s.sic_code IN ({', '.join('?' * len(codes))})
+        """
+        if active_only:
+            sql += " AND c.status = 'Active'"
+        return [r[0] for r in self._db.execute(sql, codes).fetchall()]
+
+    def resolve_name(self, name: str, postcode: Optional[str] = None,
+                     active_only: bool = False) -> List[Dict]:
+        """Companies whose normalized name equals normalize_name(name).
+
+        With `postcode`, same-postcode matches come first. This is an exact
+        index lookup; name_matcher.NameIndex.from_registry() does fuzzy
+        matching.
+        """
+        sql = "SELECT * FROM companies WHERE name_norm = ?"
+        if active_only:
+            sql += " AND status = 'Active'"
+        rows = [dict(r) for r in self._db.execute(sql, (normalize_name(name),)).fetchall()]
+        if postcode:
+            wanted = normalize_postcode(postcode)
+            rows.sort(key=lambda r: (r['postcode_norm'] != wanted, r['status'] != 'Active'))
+        else:
+            rows.sort(key=lambda r: r['status'] != 'Active')
+        return rows
+
+    def resolve_number(self, name: str, postcode: Optional[str] = None) -> Optional[str]:
+        """Best company number for a name, preferring active companies at `postcode`."""
+        matches = self.resolve_name(name, postcode)
+        return matches[0]['company_number'] if matches else None
+
+    def names(self, active_only: bool = True) -> List[tuple]:
+        """(company_number, name, postcode) for every company, e.g. to build a NameIndex."""
+        sql = "SELECT company_number, name, postcode FROM companies"
+        if active_only:
+            sql += " WHERE status = 'Active'"
+        return self._db.execute(sql).fetchall()
+
+    def at_postcode(self, postcode: str) -> List[Dict]:
+        rows = self._db.execute(
+            "SELECT * FROM companies WHERE postcode_norm = ?", (normalize_postcode(postcode),)
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def close(self) -> None:
+        self._db.close()
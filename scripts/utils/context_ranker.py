@@ -0,0 +1,178 @@
+"""
+UK OSM Data Processor - Prompt Context Ranking
+
+Builds a compact LLM context from long Companies House pages, filings and
+PDFs instead of sending their first N characters with every question:
+  - each source is split into overlapping chunks on sentence boundaries
+  - chunks are scored against every question with BM25 (plus a few
+    domain synonyms, e.g. "employees" also matches "persons employed")
+  - the best chunks for each question are taken in turn until the
+    character budget is spent, then emitted in document order
+
+One context is built per company and reused for all of its questions.
+"""
+
+import re
+import math
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+DEFAULT_CHUNK_CHARS = 1000
+DEFAULT_OVERLAP_CHARS = 150
+DEFAULT_MAX_CHARS = 6000
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+SENTENCE_END_RE = re.compile(r'(?<=[.!?;:])\s+')
+
+STOPWORDS = frozenset("""
+a an and are as at be by did do does for from had has have how in is it its
+of on or than that the their this to was were what when where which who why
+with company companies
+""".split())
+
+# Question words -> terms accounts and filings use for the same thing
+QUERY_EXPANSIONS = {
+    'employees': ('employee', 'employed', 'persons', 'staff', 'headcount', 'average'),
+    'employee': ('employees', 'employed', 'persons', 'staff', 'headcount'),
+    'staff': ('employees', 'employed', 'persons', 'headcount'),
+    'turnover': ('revenue', 'sales', 'income'),
+    'revenue': ('turnover', 'sales'),
+    'aerospace': ('aviation', 'aircraft', 'airframe', 'defence', 'engine'),
+    'aviation': ('aerospace', 'aircraft'),
+    'aircraft': ('aerospace', 'aviation'),
+    'business': ('activity', 'activities', 'sic', 'nature', 'principal'),
+    'activity': ('activities', 'sic', 'nature', 'principal'),
+    'dissolved': ('status', 'active', 'liquidation'),
+    'active': ('status', 'dissolved'),
+}
+
+Source = Union[str, Tuple[str, str]]
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def query_terms(question: str) -> List[str]:
+    terms = tokenize(question)
+    expanded = list(terms)
+    for term in terms:
+        expanded.extend(QUERY_EXPANSIONS.get(term, ()))
+    return list(dict.fromkeys(expanded))
+
+
+def split_chunks(text: str, chunk_chars: int = DEFAULT_CHUNK_CHARS,
+                 overlap_chars: int = DEFAULT_OVERLAP_CHARS) -> List[str]:
+    """Split `text` into ~chunk_chars pieces on sentence boundaries.
+
+    Each chunk repeats up to `overlap_chars` from the end of the previous
+    one so figures split from their labels stay together somewhere.
+    Sentences longer than a chunk are cut on whitespace.
+    """
+    sentences = []
+    for sentence in SENTENCE_END_RE.split(' '.join(text.split())):
+        while len(sentence) > chunk_chars:
+            cut = sentence.rfind(' ', 0, chunk_chars)
+            cut = cut if cut > 0 else chunk_chars
+            sentences.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if sentence:
+            sentences.append(sentence)
+
+    chunks, current = [], ''
+    for sentence in sentences:
+        if current and len(current) + 1 + len(sentence) > chunk_chars:
+            chunks.append(current)
+            tail = current[-overlap_chars:] if overlap_chars else ''
+            tail = tail[tail.find(' ') + 1:] if ' ' in tail else ''
+            current = tail
+        current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class BM25:
+    """Okapi BM25 over pre-tokenized documents."""
+
+    def __init__(self, documents: Sequence[List[str]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.freqs = [Counter(doc) for doc in documents]
+        self.lengths = [len(doc) for doc in documents]
+        self.avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        doc_freq = Counter(term for freq in self.freqs for term in freq)
+        n = len(documents)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+
+    def scores(self, terms: Iterable[str]) -> List[float]:
+        terms = [t for t in terms if t in self.idf]
+        results = []
+        for freq, length in zip(self.freqs, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / self.avg_length) if self.avg_length else self.k1
+            score = 0.0
+            for term in terms:
+                tf = freq.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            results.append(score)
+        return results
+
+
+def build_context(sources: Iterable[Source], questions: Sequence[str],
+                  max_chars: int = DEFAULT_MAX_CHARS, chunk_chars: int = DEFAULT_CHUNK_CHARS,
+                  overlap_chars: int = DEFAULT_OVERLAP_CHARS) -> str:
+    """Most relevant chunks of `sources` for `questions`, within max_chars.
+
+    `sources` are texts or (label, text) pairs; chosen chunks are grouped
+    under their label in original order. Falls back to the leading chunks
+    when no question term occurs in any source.
+    """
+    chunks: List[Tuple[int, str, str]] = []  # (source index, label, text)
+    for index, source in enumerate(sources):
+        label, text = source if isinstance(source, tuple) else ('', source)
+        for chunk in split_chunks(text or '', chunk_chars, overlap_chars):
+            chunks.append((index, label, chunk))
+    if not chunks:
+        return ''
+
+    index = BM25([tokenize(chunk) for _, _, chunk in chunks])
+    rankings = []
+    for question in questions:
+        scores = index.scores(query_terms(question))
+        rankings.append([i for i in sorted(range(len(chunks)), key=lambda i: -scores[i]) if scores[i] > 0])
+
+    selected, used = set(), 0
+    # Round-robin over questions so each gets its best chunks before any
+    # question gets its second best
+    for rank in range(max((len(r) for r in rankings), default=0)):
+        for ranking in rankings:
+            if rank < len(ranking) and ranking[rank] not in selected:
+                size = len(chunks[ranking[rank]][2])
+                if used + size <= max_chars:
+                    selected.add(ranking[rank])
+                    used += size
+    if not selected:
+        for i, (_, _, chunk) in enumerate(chunks):
+            if used + len(chunk) > max_chars:
+                break
+            selected.add(i)
+            used += len(chunk)
+
+    parts: List[str] = []
+    current_source = None
+    for i in sorted(selected):
+        source_index, label, chunk = chunks[i]
+        if source_index != current_source and label:
+            parts.append(f"[{label}]")
+        elif parts and i - 1 not in selected:
+            parts.append('...')
+        current_source = source_index
+        parts.append(chunk)
+    return '\n'.join(parts)
+
+
+def context_stats(sources: Iterable[Source], context: str) -> Dict[str, int]:
+    """Characters available vs. sent, for logging the reduction."""
+    total = sum(len((s[1] if isinstance(s, tuple) else s) or '') for s in sources)
+    return {'source_chars': total, 'context_chars': len(context)}
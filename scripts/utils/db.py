@@ -0,0 +1,246 @@
+"""
+UK OSM Data Processor - Shared Database Access
+
+Single source for PostgreSQL connection settings (config/config.yaml,
+`database` section) and a thread-safe connection pool used by every Python
+entry point. Provides:
+  - pooled connections/cursors as context managers
+  - server-side named cursors for streaming large result sets
+  - a per-session statement timeout
+  - per-query timing hooks
+"""
+
+import os
+import time
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import psycopg2
+import psycopg2.extensions
+from psycopg2.pool import ThreadedConnectionPool
+
+from osm_utils import load_config
+
+DEFAULT_APPLICATION_NAME = 'uk-osm-processor'
+DEFAULT_ITERSIZE = 10000
+
+# hook(sql, params, elapsed_seconds, rowcount)
+QueryHook = Callable[[str, Any, float, int], None]
+
+class TimedCursor(psycopg2.extensions.cursor):
+    """Cursor that reports every execute() to the connection's query hooks."""
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            self.connection.report_query(query, vars, time.perf_counter() - start, self.rowcount)
+
+
+class TimedConnection(psycopg2.extensions.connection):
+    """Connection whose cursors are TimedCursors by default."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cursor_factory = TimedCursor
+        self.query_hooks: List[QueryHook] = []
+
+    def report_query(self, query, params, elapsed: float, rowcount: int) -> None:
+        for hook in self.query_hooks:
+            try:
+                hook(query, params, elapsed, rowcount)
+            except Exception as e:
+                logging.debug(f"Query hook failed: {e}")
+
+
+def connection_kwargs(db_config: Dict[str, Any], **overrides) -> Dict[str, Any]:
+    """psycopg2.connect() keyword arguments for a config `database` section.
+
+    `overrides` may replace host, port, user, password or dbname (e.g. to
+    connect to the `postgres` maintenance database during setup).
+    """
+    kwargs = {
+        'host': db_config.get('host', 'localhost'),
+        'port': db_config.get('port', 5432),
+        'user': db_config.get('user', 'postgres'),
+        'dbname': db_config['name'],
+        'application_name': db_config.get('application_name', DEFAULT_APPLICATION_NAME),
+    }
+    password = db_config.get('password') or os.environ.get('PGPASSWORD')
+    if password:
+        kwargs['password'] = password
+    kwargs.update({k: v for k, v in overrides.items() if v is not None})
+
+    options = []
+    timeout_ms = db_config.get('statement_timeout_ms')
+    if timeout_ms:
+        options.append(f"-c statement_timeout={int(timeout_ms)}")
+    schema = db_config.get('schema')
+    if schema and kwargs['dbname'] == db_config['name']:
+        search_path = schema if schema == 'public' else f"{schema},public"
+        options.append(f"-c search_path={search_path}")
+    if options:
+        kwargs['options'] = ' '.join(options)
+    return kwargs
+
+
+def log_slow_queries(threshold_seconds: float = 1.0) -> QueryHook:
+    """Query hook that logs statements slower than `threshold_seconds`."""
+    def hook(query, params, elapsed, rowcount):
+        if elapsed >= threshold_seconds:
+            sql = query.decode() if isinstance(query, bytes) else str(query)
+            logging.info(f"Slow query ({elapsed:.2f}s, {rowcount} rows): {' '.join(sql.split())[:200]}")
+    return hook
+
+
+class QueryTimings:
+    """Query hook that accumulates call counts and total time per statement."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def __call__(self, query, params, elapsed, rowcount):
+        sql = query.decode() if isinstance(query, bytes) else str(query)
+        key = ' '.join(sql.split())[:120]
+        with self._lock:
+            entry = self.stats.setdefault(key, {'calls': 0, 'total_seconds': 0.0})
+            entry['calls'] += 1
+            entry['total_seconds'] += elapsed
+
+    def summary(self, top: int = 10) -> List[Dict[str, Any]]:
+        ranked = sorted(self.stats.items(), key=lambda kv: kv[1]['total_seconds'], reverse=True)
+        return [{'query': q, **s} for q, s in ranked[:top]]
+
+
+class Database:
+    """Thread-safe pooled access to the OSM database."""
+
+    def __init__(self, db_config: Dict[str, Any], minconn: Optional[int] = None,
+                 maxconn: Optional[int] = None, **overrides):
+        self.db_config = db_config
+        self.kwargs = connection_kwargs(db_config, **overrides)
+        self.minconn = minconn if minconn is not None else db_config.get('pool_min', 1)
+        self.maxconn = maxconn if maxconn is not None else db_config.get('pool_max', 8)
+        self.minconn = min(self.minconn, self.maxconn)
+        self.query_hooks: List[QueryHook] = []
+        if db_config.get('slow_query_ms'):
+            self.query_hooks.append(log_slow_queries(db_config['slow_query_ms'] / 1000))
+        self._pool: Optional[ThreadedConnectionPool] = None
+        self._pool_lock = threading.Lock()
+
+    @property
+    def pool(self) -> ThreadedConnectionPool:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadedConnectionPool(
+                        self.minconn, self.maxconn,
+                        connection_factory=TimedConnection, **self.kwargs
+                    )
+        return self._pool
+
+    def add_query_hook(self, hook: QueryHook) -> None:
+        self.query_hooks.append(hook)
+
+    @contextmanager
+    def connection(self, autocommit: bool = False) -> Iterator[TimedConnection]:
+        """Borrow a pooled connection; commits on success, rolls back on error."""
+        conn = self.pool.getconn()
+        conn.query_hooks = self.query_hooks
+        try:
+            conn.autocommit = autocommit
+            yield conn
+            if not autocommit:
+                conn.commit()
+        except Exception:
+            if not conn.closed and not autocommit:
+                conn.rollback()
+            raise
+        finally:
+            if not conn.closed:
+                conn.autocommit = False
+            self.pool.putconn(conn, close=bool(conn.closed))
+
+    @contextmanager
+    def cursor(self, autocommit: bool = False):
+        with self.connection(autocommit=autocommit) as conn:
+            cur = conn.cursor()
+            try:
+                yield cur
+            finally:
+                cur.close()
+
+    def execute(self, sql: str, params: Optional[Sequence] = None, autocommit: bool = False) -> int:
+        with self.cursor(autocommit=autocommit) as cur:
+            cur.execute(sql, params)
+            return cur.rowcount
+
+    def fetch_one(self, sql: str, params: Optional[Sequence] = None):
+        with self.cursor() as cur:
+            cur.execute(sql, params)
+            return cur.fetchone()
+
+    def fetch_all(self, sql: str, params: Optional[Sequence] = None) -> List[tuple]:
+        with self.cursor() as cur:
+            cur.execute(sql, params)
+            return cur.fetchall()
+
+    def fetch_scalar(self, sql: str, params: Optional[Sequence] = None):
+        row = self.fetch_one(sql, params)
+        return row[0] if row else None
+
+    @contextmanager
+    def named_cursor(self, sql: str, params: Optional[Sequence] = None,
+                     itersize: int = DEFAULT_ITERSIZE, name: Optional[str] = None):
+        """Open a server-side cursor over `sql` fetching `itersize` rows per round trip.
+
+        Yields the executed cursor; iterate over it, or use fetchmany(), to
+        stream rows without materialising the full result client-side.
+        """
+        with self.connection() as conn:
+            cur = conn.cursor(name=name or f"osm_{uuid.uuid4().hex[:12]}")
+            cur.itersize = itersize
+            try:
+                cur.execute(sql, params)
+                yield cur
+            finally:
+                cur.close()
+
+    def stream(self, sql: str, params: Optional[Sequence] = None,
+               itersize: int = DEFAULT_ITERSIZE) -> Iterator[tuple]:
+        """Iterate over the rows of `sql` through a server-side cursor."""
+        with self.named_cursor(sql, params, itersize) as cur:
+            yield from cur
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.closeall()
+            self._pool = None
+
+
+_default_database: Optional[Database] = None
+_default_lock = threading.Lock()
+
+
+def get_database(config: Optional[Dict[str, Any]] = None) -> Database:
+    """Process-wide Database for the configured OSM database."""
+    global _default_database
+    if _default_database is None:
+        with _default_lock:
+            if _default_database is None:
+                config = config or load_config()
+                _default_database = Database(config['database'])
+    return _default_database
+
+
+def close_database() -> None:
+    global _default_database
+    with _default_lock:
+        if _default_database is not None:
+            _default_database.close()
+            _default_database = None
@@ -0,0 +1,353 @@
+"""
+UK OSM Data Processor - Single-scan Multi-output Exporter
+
+Streams one query through a server-side cursor and routes every chunk to
+any number of sinks, instead of re-running (and re-sorting) the query
+once per output file:
+  - a RowSink keeps the rows matching its predicate, projects its own
+    columns and writes CSV, gzip CSV, Parquet, GeoPackage or GeoJSON
+    (chosen by file suffix)
+  - an AggregateSink folds rows into a summary written when the scan ends
+  - each sink runs on its own writer thread behind a small bounded queue,
+    so slow writers (GeoPackage) overlap with the scan and with each other
+    while memory stays at a few chunks per sink
+
+Spatial formats need a WKB column (GEOMETRY_COLUMN) in the query, in
+EPSG:4326.
+"""
+
+import os
+import gzip
+import json
+import queue
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import pandas as pd
+
+GEOMETRY_COLUMN = 'geom_wkb'
+DEFAULT_BATCH_SIZE = 20000
+QUEUE_CHUNKS = 4
+
+FORMATS = ('csv', 'csv.gz', 'parquet', 'gpkg', 'geojson')
+SPATIAL_FORMATS = ('gpkg', 'geojson')
+
+# predicate(chunk) -> boolean mask of rows to keep
+Predicate = Callable[[pd.DataFrame], pd.Series]
+
+_DONE = object()
+_ABORT = object()
+
+
+def format_of(path: str) -> str:
+    name = str(path).lower()
+    for fmt in sorted(FORMATS, key=len, reverse=True):
+        if name.endswith('.' + fmt):
+            return fmt
+    raise ValueError(f"Unsupported export format for {path} (expected one of: {', '.join(FORMATS)})")
+
+
+# ============================================================================
+# Format writers - open lazily on the first chunk, append after that
+# ============================================================================
+
+class CsvWriter:
+    def __init__(self, path: str, compress: bool = False):
+        self.path = path
+        self.compress = compress
+        self._file = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        header = self._file is None
+        if header:
+            opener = gzip.open if self.compress else open
+            self._file = opener(self.path, 'wt', newline='', encoding='utf-8')
+        df.to_csv(self._file, header=header, index=False)
+
+    def close(self, columns: Sequence[str]) -> None:
+        if self._file is None:
+            self.write(pd.DataFrame(columns=list(columns)))  # header-only file
+        self._file.close()
+
+    def discard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+def arrow_schema(table):
+    """Schema for a streamed Parquet file, taken from its first chunk.
+
+    Columns that are all-NULL in that chunk become strings rather than the
+    null type, so later chunks with values still cast.
+    """
+    import pyarrow as pa
+    return pa.schema([
+        field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+        for field in table.schema
+    ]).remove_metadata()
+
+
+class ParquetWriter:
+    def __init__(self, path: str):
+        self.path = path
+        self._writer = None
+        self._schema = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self._schema = arrow_schema(table)
+            self._writer = pq.ParquetWriter(self.path, self._schema, compression='zstd')
+        self._writer.write_table(table.cast(self._schema, safe=False))
+
+    def close(self, columns: Sequence[str]) -> None:
+        if self._writer is None:
+            self.write(pd.DataFrame({c: pd.Series(dtype='object') for c in columns}))
+        self._writer.close()
+
+    def discard(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _to_geodataframe(df: pd.DataFrame):
+    import geopandas as gpd
+    import shapely
+    geometry = shapely.from_wkb(df[GEOMETRY_COLUMN].map(lambda v: bytes(v) if v is not None else None))
+    return gpd.GeoDataFrame(df.drop(columns=[GEOMETRY_COLUMN]), geometry=geometry, crs='EPSG:4326')
+
+
+class GeoPackageWriter:
+    def __init__(self, path: str, layer: Optional[str] = None):
+        self.path = path
+        self.layer = layer or Path(path).stem
+        self._started = False
+
+    def write(self, df: pd.DataFrame) -> None:
+        import pyogrio
+        if not len(df):
+            return
+        pyogrio.write_dataframe(_to_geodataframe(df), self.path, layer=self.layer,
+                                driver='GPKG', append=self._started)
+        self._started = True
+
+    def close(self, columns: Sequence[str]) -> None:
+        if not self._started:
+            logging.warning(f"No rows for {self.path}; GeoPackage not written")
+
+    def discard(self) -> None:
+        pass
+
+
+class GeoJSONWriter:
+    """FeatureCollection written feature by feature (never held in memory)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._first = True
+
+    def write(self, df: pd.DataFrame) -> None:
+        import shapely
+        if self._file is None:
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._file.write('{"type": "FeatureCollection", "features": [\n')
+        gdf = _to_geodataframe(df)
+        geometries = shapely.to_geojson(gdf.geometry.values)
+        properties = json.loads(gdf.drop(columns='geometry').to_json(orient='records', date_format='iso'))
+        for geometry, props in zip(geometries, properties):
+            feature = json.dumps({'type': 'Feature', 'properties': props}, ensure_ascii=False)
+            feature = feature[:-1] + f', "geometry": {geometry if geometry is not None else "null"}}}'
+            self._file.write(('' if self._first else ',\n') + feature)
+            self._first = False
+
+    def close(self, columns: Sequence[str]) -> None:
+        if self._file is None:
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._file.write('{"type": "FeatureCollection", "features": [\n')
+        self._file.write('\n]}\n')
+        self._file.close()
+
+    def discard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+def open_writer(path: str):
+    fmt = format_of(path)
+    if fmt == 'csv':
+        return CsvWriter(path)
+    if fmt == 'csv.gz':
+        return CsvWriter(path, compress=True)
+    if fmt == 'parquet':
+        return ParquetWriter(path)
+    if fmt == 'gpkg':
+        return GeoPackageWriter(path)
+    return GeoJSONWriter(path)
+
+
+# ============================================================================
+# Sinks
+# ============================================================================
+
+class Sink:
+    """Base class: consumes chunks on its own thread."""
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self.rows = 0
+        self.error: Optional[BaseException] = None
+        self._queue: queue.Queue = queue.Queue(maxsize=QUEUE_CHUNKS)
+        self._thread: Optional[threading.Thread] = None
+
+    def consume(self, chunk: pd.DataFrame) -> None:
+        raise NotImplementedError
+
+    def finish(self) -> None:
+        raise NotImplementedError
+
+    def discard(self) -> None:
+        """Drop the partial output of an export that did not complete."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _run(self) -> None:
+        while True:
+            chunk = self._queue.get()
+            if chunk is _ABORT:
+                self.discard()
+                return
+            if chunk is _DONE:
+                break
+            if self.error is None:
+                try:
+                    self.consume(chunk)
+                except BaseException as e:  # reported by MultiSinkExporter.run
+                    self.error = e
+        if self.error is None:
+            try:
+                self.finish()
+            except BaseException as e:
+                self.error = e
+        if self.error is not None:
+            self.discard()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name=f"sink:{Path(self.path).name}", daemon=True)
+        self._thread.start()
+
+    def put(self, chunk) -> None:
+        self._queue.put(chunk)
+
+    def join(self, abort: bool = False) -> None:
+        self._queue.put(_ABORT if abort else _DONE)
+        self._thread.join()
+
+
+class RowSink(Sink):
+    """Rows matching `where`, projected to `columns`, written in `path`'s format."""
+
+    def __init__(self, path: str, columns: Optional[Sequence[str]] = None,
+                 where: Optional[Predicate] = None):
+        super().__init__(path)
+        self.format = format_of(path)
+        self.columns = list(columns) if columns else None
+        self.where = where
+        self._writer = open_writer(self.path)
+
+    @property
+    def spatial(self) -> bool:
+        return self.format in SPATIAL_FORMATS
+
+    def output_columns(self, available: Sequence[str]) -> List[str]:
+        columns = self.columns or [c for c in available if c != GEOMETRY_COLUMN]
+        return columns + [GEOMETRY_COLUMN] if self.spatial else columns
+
+    def consume(self, chunk: pd.DataFrame) -> None:
+        if self.where is not None:
+            chunk = chunk[self.where(chunk)]
+        if not len(chunk):
+            return
+        self._writer.write(chunk[self.output_columns(chunk.columns)])
+        self.rows += len(chunk)
+
+    def finish(self) -> None:
+        self._writer.close([c for c in (self.columns or []) if c != GEOMETRY_COLUMN])
+
+    def discard(self) -> None:
+        self._writer.discard()
+        super().discard()
+
+
+class AggregateSink(Sink):
+    """Folds every chunk with `update(state, chunk)`; writes `render(state)` as CSV."""
+
+    def __init__(self, path: str, update: Callable[[Any, pd.DataFrame], None],
+                 render: Callable[[Any], pd.DataFrame], state: Any):
+        super().__init__(path)
+        self.update = update
+        self.render = render
+        self.state = state
+
+    def consume(self, chunk: pd.DataFrame) -> None:
+        self.update(self.state, chunk)
+
+    def finish(self) -> None:
+        result = self.render(self.state)
+        self.rows = len(result)
+        writer = open_writer(self.path)
+        writer.write(result)
+        writer.close(result.columns)
+
+
+# ============================================================================
+# Exporter
+# ============================================================================
+
+class MultiSinkExporter:
+    """Run one query once and feed every chunk to every sink."""
+
+    def __init__(self, db, sql: str, params: Optional[Sequence] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE):
+        self.db = db
+        self.sql = sql
+        self.params = params
+        self.batch_size = batch_size
+        self.scanned = 0
+
+    def chunks(self) -> Iterator[pd.DataFrame]:
+        with self.db.named_cursor(self.sql, self.params, itersize=self.batch_size) as cur:
+            columns = None
+            while True:
+                rows = cur.fetchmany(self.batch_size)
+                if not rows:
+                    break
+                if columns is None:
+                    columns = [col[0] for col in cur.description]
+                yield pd.DataFrame.from_records(rows, columns=columns)
+
+    def run(self, sinks: Sequence[Sink]) -> Dict[str, int]:
+        """Scan once, write every sink; returns {path: rows written}."""
+        for sink in sinks:
+            sink.start()
+        try:
+            for chunk in self.chunks():
+                self.scanned += len(chunk)
+                for sink in sinks:
+                    sink.put(chunk)
+        except BaseException:
+            for sink in sinks:
+                sink.join(abort=True)
+            raise
+        for sink in sinks:
+            sink.join()
+        failed = [sink for sink in sinks if sink.error is not None]
+        for sink in failed:
+            logging.error(f"Export to {sink.path} failed: {sink.error}")
+        if failed:
+            raise RuntimeError(f"{len(failed)} export(s) failed: {', '.join(s.path for s in failed)}")
+        return {sink.path: sink.rows for sink in sinks}
@@ -0,0 +1,221 @@
+"""
+UK OSM Data Processor - Companies House Filing Extraction
+
+Text extraction for accounts filings, the slowest step of company research:
+  - several filings are downloaded concurrently (threads)
+  - PDF pages are extracted in a process pool, a few pages per task, with
+    at most one task per worker in flight
+  - extraction stops submitting pages once the employee-count and
+    turnover sections have both been seen (accounts notes can run to
+    hundreds of pages; the figures are usually in the first few dozen)
+  - extracted text is cached as JSON per filing (transaction) ID, so a
+    filing is never downloaded or parsed twice; an early-stopped record
+    only satisfies extractors that also stop early
+
+Non-PDF documents (HTML/iXBRL accounts) are reduced to visible text and
+cached the same way.
+"""
+
+import os
+import re
+import json
+import logging
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+from bs4 import BeautifulSoup
+
+DEFAULT_CACHE_DIR = 'data/cache/filings'
+PAGES_PER_TASK = 4
+
+# Sections that answer the usual research questions
+SECTION_PATTERNS = {
+    'employees': re.compile(
+        r'average\s+(?:monthly\s+)?number\s+of\s+(?:persons|employees|staff)|'
+        r'number\s+of\s+(?:persons\s+)?employ|employees\s+and\s+directors|staff\s+numbers',
+        re.IGNORECASE),
+    'turnover': re.compile(r'\bturnover\b|\brevenue\b', re.IGNORECASE),
+}
+
+
+def _safe_id(filing_id: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', filing_id)
+
+
+def find_sections(text: str) -> List[str]:
+    return [name for name, pattern in SECTION_PATTERNS.items() if pattern.search(text)]
+
+
+def _page_count(path: str) -> int:
+    import pdfplumber
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+def _extract_pages(path: str, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop) of the PDF at `path` (runs in a worker process)."""
+    import pdfplumber
+    with pdfplumber.open(path) as pdf:
+        texts = []
+        for page in pdf.pages[start:stop]:
+            texts.append(page.extract_text() or '')
+            page.close()  # drop cached layout objects
+        return texts
+
+
+def html_text(html: str) -> str:
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(["script", "style"]):
+        tag.decompose()
+    return ' '.join(soup.get_text(' ').split())
+
+
+class FilingExtractor:
+    """Concurrent, cached, early-stopping text extraction for filings."""
+
+    def __init__(self, session: Optional[requests.Session] = None, cache_dir: str = DEFAULT_CACHE_DIR,
+                 workers: Optional[int] = None, fetch_workers: int = 4,
+                 pages_per_task: int = PAGES_PER_TASK, early_stop: bool = True, timeout: float = 30):
+        self.session = session or requests.Session()
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = workers or os.cpu_count() or 1
+        self.fetch_workers = fetch_workers
+        self.pages_per_task = pages_per_task
+        self.early_stop = early_stop
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def _cache_path(self, filing_id: str) -> Optional[Path]:
+        return self.cache_dir / f"{_safe_id(filing_id)}.json" if self.cache_dir else None
+
+    def cached(self, filing_id: str) -> Optional[Dict]:
+        path = self._cache_path(filing_id)
+        if path is None or not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f"Ignoring unreadable filing cache {path}: {e}")
+            return None
+
+    def _store(self, record: Dict) -> None:
+        path = self._cache_path(record['filing_id'])
+        if path is None:
+            return
+        tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_text(json.dumps(record), encoding='utf-8')
+        os.replace(tmp, path)
+
+    # ------------------------------------------------------------------
+    # Extraction
+    # ------------------------------------------------------------------
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        # extract_many() threads share one pool
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def extract_pdf_file(self, path: str) -> Tuple[List[str], int, List[str]]:
+        """(page texts, total pages, sections found) for a local PDF.
+
+        Page ranges are submitted in order, one per worker at a time; once
+        every SECTION_PATTERNS section has been seen no new ranges are
+        submitted, and only pages extracted up to then are returned.
+        """
+        total = _page_count(path)
+        ranges = [(start, min(start + self.pages_per_task, total))
+                  for start in range(0, total, self.pages_per_task)]
+        pages: Dict[int, List[str]] = {}
+        found: set = set()
+        pool = self._process_pool()
+        pending = {}
+        next_range = 0
+        while next_range < len(ranges) or pending:
+            while next_range < len(ranges) and len(pending) < self.workers:
+                if self.early_stop and len(found) == len(SECTION_PATTERNS):
+                    break
+                start, stop = ranges[next_range]
+                pending[pool.submit(_extract_pages, path, start, stop)] = start
+                next_range += 1
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                start = pending.pop(future)
+                pages[start] = future.result()
+                found.update(find_sections(' '.join(pages[start])))
+        texts = [text for start in sorted(pages) for text in pages[start]]
+        return texts, total, [name for name in SECTION_PATTERNS if name in found]
+
+    def extract(self, filing_id: str, url: str) -> Dict:
+        """Cached extraction record for one filing.
+
+        Keys: filing_id, url, text, pages_extracted, page_count, sections,
+        error (only on failure; failures are not cached). A cached record
+        cut short by early stopping is re-extracted when early_stop is off.
+        """
+        record = self.cached(filing_id)
+        if record is not None and (self.early_stop or record.get('pages_extracted') == record.get('page_count')):
+            return record
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+        except Exception as e:
+            return {'filing_id': filing_id, 'url': url, 'text': '', 'error': f"Error fetching {url}: {e}"}
+
+        content_type = response.headers.get('Content-Type', '')
+        if 'pdf' in content_type or response.content[:5] == b'%PDF-':
+            fd, path = tempfile.mkstemp(suffix='.pdf')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(response.content)
+                texts, total, sections = self.extract_pdf_file(path)
+            except Exception as e:
+                return {'filing_id': filing_id, 'url': url, 'text': '', 'error': f"Error extracting PDF {url}: {e}"}
+            finally:
+                os.unlink(path)
+            record = {
+                'filing_id': filing_id, 'url': url, 'text': '\n'.join(texts),
+                'pages_extracted': len(texts), 'page_count': total, 'sections': sections,
+            }
+        else:
+            text = html_text(response.text)
+            record = {
+                'filing_id': filing_id, 'url': url, 'text': text,
+                'pages_extracted': 1, 'page_count': 1, 'sections': find_sections(text),
+            }
+        self._store(record)
+        return record
+
+    def extract_many(self, filings: Iterable[Tuple[str, str]]) -> List[Dict]:
+        """Extract (filing_id, url) pairs concurrently; records in input order."""
+        filings = list(filings)
+        if len(filings) <= 1:
+            return [self.extract(filing_id, url) for filing_id, url in filings]
+        with ThreadPoolExecutor(max_workers=min(self.fetch_workers, len(filings))) as threads:
+            return list(threads.map(lambda f: self.extract(*f), filings))
+
+    def close(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
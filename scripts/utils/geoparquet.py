@@ -0,0 +1,209 @@
+"""
+UK OSM Data Processor - Partitioned GeoParquet Export
+
+Writes a query's rows as a GeoParquet 1.1 dataset that GIS readers
+(geopandas, DuckDB, QGIS/GDAL) can query without scanning everything:
+  - WKB geometry in EPSG:4326 plus a `bbox` struct column (xmin, ymin,
+    xmax, ymax) declared as the GeoParquet bbox covering
+  - Hive-style partitions by postcode area (`postcode_area=BS/`) or by a
+    lon/lat grid cell (`grid_cell=-3_51/`), so regional reads open only
+    the relevant files
+  - rows arrive spatially ordered (the query sorts by geohash), so each
+    row group covers a compact area and its bbox min/max statistics let
+    readers skip row groups outside a query window
+  - per-partition buffers are flushed as row groups once they reach
+    `row_group_size`, and the largest buffer is flushed early whenever
+    all buffers together exceed `max_buffered_rows`, so memory stays
+    bounded however large the output gets
+
+The dataset is written to `<path>.partial` and moved into place only
+when the scan completes. GeoParquetSink plugs into
+exporter.MultiSinkExporter; the query must select the geometry as
+exporter.GEOMETRY_COLUMN.
+"""
+
+import os
+import re
+import json
+import shutil
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from exporter import GEOMETRY_COLUMN, Sink, arrow_schema
+
+GEOPARQUET_VERSION = '1.1.0'
+PARTITION_SCHEMES = ('postcode', 'grid', 'none')
+PARTITION_COLUMNS = {'postcode': 'postcode_area', 'grid': 'grid_cell'}
+DEFAULT_GRID_SIZE = 0.5          # degrees
+DEFAULT_ROW_GROUP_SIZE = 50000
+DEFAULT_MAX_BUFFERED_ROWS = 500000
+UNKNOWN_PARTITION = 'unknown'
+
+POSTCODE_AREA_RE = re.compile(r'^\s*([A-Za-z]{1,2})\d')
+
+
+def postcode_areas(postcodes: pd.Series) -> pd.Series:
+    """Postcode area (leading letters, e.g. "BS" of "BS34 7QW") per row."""
+    areas = postcodes.fillna('').astype(str).str.extract(POSTCODE_AREA_RE)[0]
+    return areas.str.upper().fillna(UNKNOWN_PARTITION)
+
+
+def grid_cells(bounds: np.ndarray, size: float) -> pd.Series:
+    """"<col>_<row>" of the grid cell holding each bbox centre (floor(deg / size))."""
+    x = np.floor((bounds[:, 0] + bounds[:, 2]) / 2 / size)
+    y = np.floor((bounds[:, 1] + bounds[:, 3]) / 2 / size)
+    valid = np.isfinite(x) & np.isfinite(y)
+    cells = np.full(len(bounds), UNKNOWN_PARTITION, dtype=object)
+    cells[valid] = [f"{int(c)}_{int(r)}" for c, r in zip(x[valid], y[valid])]
+    return pd.Series(cells)
+
+
+def geo_metadata() -> dict:
+    """GeoParquet `geo` file metadata for the `geometry` column.
+
+    Written with the schema before any row is seen, so geometry types are
+    left open (an empty list) and the per-file bbox is omitted; the bbox
+    covering column carries the extents. No "crs" member: the GeoParquet
+    default is OGC:CRS84 (lon/lat WGS84).
+    """
+    return {
+        'version': GEOPARQUET_VERSION,
+        'primary_column': 'geometry',
+        'columns': {'geometry': {
+            'encoding': 'WKB',
+            'geometry_types': [],
+            'covering': {'bbox': {'xmin': ['bbox', 'xmin'], 'ymin': ['bbox', 'ymin'],
+                                  'xmax': ['bbox', 'xmax'], 'ymax': ['bbox', 'ymax']}},
+        }},
+    }
+
+
+class _Partition:
+    """Open Parquet file of one partition and its pending rows."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.writer = None
+        self.pending: List = []
+        self.pending_rows = 0
+        self.rows = 0
+
+
+class GeoParquetSink(Sink):
+    """Partitioned GeoParquet dataset directory fed by MultiSinkExporter."""
+
+    def __init__(self, path: str, partition: str = 'postcode', postcode_column: str = 'postcode',
+                 grid_size: float = DEFAULT_GRID_SIZE, row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+                 max_buffered_rows: int = DEFAULT_MAX_BUFFERED_ROWS, compression: str = 'zstd'):
+        super().__init__(path)
+        if partition not in PARTITION_SCHEMES:
+            raise ValueError(f"partition must be one of {PARTITION_SCHEMES}")
+        self.partition = partition
+        self.partition_column = PARTITION_COLUMNS.get(partition)
+        self.postcode_column = postcode_column
+        self.grid_size = grid_size
+        self.row_group_size = row_group_size
+        self.max_buffered_rows = max(max_buffered_rows, row_group_size)
+        self.compression = compression
+        self.staging = self.path.rstrip('/') + '.partial'
+        self.partitions: Dict[str, _Partition] = {}
+        self._schema = None
+        self._buffered = 0
+
+    def start(self) -> None:
+        shutil.rmtree(self.staging, ignore_errors=True)  # left by an interrupted run
+        super().start()
+
+    # ------------------------------------------------------------------
+    # Chunk handling
+    # ------------------------------------------------------------------
+
+    def _partition_keys(self, chunk: pd.DataFrame, bounds: np.ndarray) -> pd.Series:
+        if self.partition == 'postcode':
+            return postcode_areas(chunk[self.postcode_column]).reset_index(drop=True)
+        if self.partition == 'grid':
+            return grid_cells(bounds, self.grid_size)
+        return pd.Series([None] * len(chunk))
+
+    def _partition(self, key: Optional[str]) -> _Partition:
+        part = self.partitions.get(key)
+        if part is None:
+            directory = self.staging if key is None else os.path.join(self.staging, f"{self.partition_column}={key}")
+            os.makedirs(directory, exist_ok=True)
+            part = self.partitions[key] = _Partition(os.path.join(directory, 'part-0.parquet'))
+        return part
+
+    def consume(self, chunk: pd.DataFrame) -> None:
+        import shapely
+        import pyarrow as pa
+
+        chunk = chunk.reset_index(drop=True)
+        wkb = chunk[GEOMETRY_COLUMN].map(lambda v: bytes(v) if v is not None else None)
+        geometries = shapely.from_wkb(wkb.values)
+        bounds = shapely.bounds(geometries)
+        keys = self._partition_keys(chunk, bounds)
+
+        table = pa.Table.from_pandas(chunk.drop(columns=[GEOMETRY_COLUMN]), preserve_index=False)
+        table = table.append_column('geometry', pa.array(wkb.values, type=pa.binary()))
+        table = table.append_column('bbox', pa.StructArray.from_arrays(
+            [pa.array(bounds[:, i], mask=np.isnan(bounds[:, i])) for i in range(4)],
+            names=['xmin', 'ymin', 'xmax', 'ymax']))
+        if self._schema is None:
+            self._schema = arrow_schema(table).with_metadata({'geo': json.dumps(geo_metadata())})
+
+        for key, rows in keys.groupby(keys, sort=False, dropna=False).indices.items():
+            key = None if self.partition == 'none' else key
+            part = self._partition(key)
+            part.pending.append(table.take(rows))
+            part.pending_rows += len(rows)
+            self._buffered += len(rows)
+            while part.pending_rows >= self.row_group_size:
+                self._flush(part, self.row_group_size)
+        while self._buffered > self.max_buffered_rows:
+            self._flush(max(self.partitions.values(), key=lambda p: p.pending_rows))
+        self.rows += len(chunk)
+
+    def _flush(self, part: _Partition, limit: Optional[int] = None) -> None:
+        """Write up to `limit` pending rows of a partition as one row group."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if not part.pending_rows:
+            return
+        pending = pa.concat_tables(part.pending)
+        rows = min(limit or part.pending_rows, part.pending_rows)
+        if part.writer is None:
+            part.writer = pq.ParquetWriter(part.path, self._schema, compression=self.compression,
+                                           write_statistics=True)
+        part.writer.write_table(pending.slice(0, rows).cast(self._schema, safe=False), row_group_size=rows)
+        rest = pending.slice(rows)
+        part.pending = [rest] if len(rest) else []
+        part.pending_rows -= rows
+        part.rows += rows
+        self._buffered -= rows
+
+    # ------------------------------------------------------------------
+    # Completion
+    # ------------------------------------------------------------------
+
+    def finish(self) -> None:
+        for part in self.partitions.values():
+            while part.pending_rows:
+                self._flush(part, self.row_group_size)
+            part.writer.close()
+            part.writer = None
+        if os.path.isdir(self.path):
+            shutil.rmtree(self.path)
+        if self.partitions:
+            os.replace(self.staging, self.path)
+
+    def discard(self) -> None:
+        for part in self.partitions.values():
+            if part.writer is not None:
+                part.writer.close()
+        shutil.rmtree(self.staging, ignore_errors=True)
+
+    def summary(self) -> Dict[str, int]:
+        """Rows written per partition value."""
+        return {key or '': part.rows for key, part in sorted(self.partitions.items(), key=lambda kv: kv[0] or '')}
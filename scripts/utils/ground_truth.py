@@ -0,0 +1,328 @@
+"""
+UK OSM Data Processor - Ground Truth Evaluation
+
+Labelled examples for judging scoring rule changes, and the metrics:
+  config/ground_truth_labels.csv   one label per candidate row (osm_id,
+                                   source_table) or per company name, with
+                                   where it came from:
+                                     manual  filled-in validation samples
+                                     agent   aerospace_verification_agent.py
+                                             output (positives only)
+                                     llm     llm_verification_*.csv verdicts
+  config/known_suppliers.csv       every known supplier is a positive
+                                   name label (matched by its aliases)
+
+When sources disagree about the same row or name the most trusted one
+wins (LABEL_PRIORITY). A rule-set version is any scored candidate set:
+the live candidate table, another table, or a snapshot such as an
+iteration's full_results.csv. Scoring a version joins the labels to it
+once; precision and recall at every score threshold then come from one
+cumulative sum over the labels sorted by score. A candidate missing from
+a version counts as not predicted.
+
+A row label is matched on (osm_id, source_table), or on osm_id alone when
+the version has no source_table. A name label scores the best candidate
+that one of its aliases matches under the registry's rule
+(known_suppliers.AliasMatcher: pg_trgm strict word similarity of at least
+DEFAULT_MIN_SIMILARITY), as check_coverage and scenario_sweep.py do.
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from company_registry import normalize_name
+from known_suppliers import DEFAULT_SEED_PATH, IDENTIFIER_RE, AliasMatcher, read_seed
+
+DEFAULT_LABELS_PATH = 'config/ground_truth_labels.csv'
+LABEL_COLUMNS = ['osm_id', 'source_table', 'name', 'is_supplier', 'label_source', 'evidence', 'labeled_at']
+LABEL_SOURCES = ('manual', 'agent', 'llm')
+LABEL_PRIORITY = ('manual', 'known_supplier', 'agent', 'llm')
+VERSION_COLUMNS = ['osm_id', 'source_table', 'name', 'aerospace_score', 'tier_classification']
+
+# Verification agent results that count as a confirmed supplier
+AGENT_MIN_SCORE = 50
+
+YES_VALUES = {'yes', 'y', 'true', '1', 'supplier'}
+NO_VALUES = {'no', 'n', 'false', '0', 'not_supplier'}
+
+
+def scoring_thresholds(scoring_path: str = 'scoring.yaml') -> Dict[str, int]:
+    """Tier thresholds from scoring.yaml ({tier: minimum score})."""
+    with open(scoring_path, 'r') as f:
+        thresholds = yaml.safe_load(f).get('thresholds') or {}
+    return {tier: int(score) for tier, score in thresholds.items() if tier.endswith('_candidate')}
+
+
+# ---- label store -----------------------------------------------------------
+
+def read_labels(path: str = DEFAULT_LABELS_PATH) -> pd.DataFrame:
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=LABEL_COLUMNS)
+    labels = pd.read_csv(path, dtype={'source_table': 'string', 'name': 'string'})
+    labels['osm_id'] = labels['osm_id'].astype('Int64')
+    labels['is_supplier'] = labels['is_supplier'].astype(bool)
+    return labels[LABEL_COLUMNS]
+
+
+def write_labels(labels: pd.DataFrame, path: str = DEFAULT_LABELS_PATH) -> None:
+    labels.sort_values(['label_source', 'osm_id', 'name'], na_position='last').to_csv(
+        path, columns=LABEL_COLUMNS, index=False)
+
+
+def _label_keys(labels: pd.DataFrame) -> pd.Series:
+    """Row labels key on (osm_id, source_table), name labels on the normalized name."""
+    by_row = 'row:' + labels['osm_id'].astype('string') + ':' + labels['source_table'].fillna('')
+    by_name = 'name:' + labels['name'].map(normalize_name)
+    return by_row.where(labels['osm_id'].notna(), by_name)
+
+
+def merge_labels(existing: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """Add `new` labels; a new label replaces one from the same source for the same key."""
+    merged = pd.concat([existing, new[LABEL_COLUMNS]], ignore_index=True)
+    keys = _label_keys(merged) + '|' + merged['label_source']
+    return merged[~keys.duplicated(keep='last')].reset_index(drop=True)
+
+
+def _parse_flag(value) -> Optional[bool]:
+    text = str(value).strip().lower()
+    if text in YES_VALUES:
+        return True
+    if text in NO_VALUES:
+        return False
+    return None
+
+
+def _new_labels(frame: pd.DataFrame, is_supplier: pd.Series, source: str, evidence: pd.Series,
+                by_name: bool = False) -> pd.DataFrame:
+    keep = is_supplier.notna()
+    labels = pd.DataFrame({
+        'osm_id': pd.array([pd.NA] * len(frame), dtype='Int64') if by_name
+        else pd.to_numeric(frame['osm_id'], errors='coerce').astype('Int64'),
+        'source_table': frame['source_table'] if 'source_table' in frame and not by_name else pd.NA,
+        'name': frame['name'] if 'name' in frame else pd.NA,
+        'is_supplier': is_supplier,
+        'label_source': source,
+        'evidence': evidence.fillna('').astype(str).str.slice(0, 200),
+        'labeled_at': datetime.now().strftime('%Y-%m-%d'),
+    })[keep]
+    labels['is_supplier'] = labels['is_supplier'].astype(bool)
+    if by_name:
+        return labels[labels['name'].map(normalize_name) != '']
+    return labels[labels['osm_id'].notna()]
+
+
+def labels_from_llm(results: pd.DataFrame) -> pd.DataFrame:
+    """YES/NO verdicts from an llm_verification_*.csv (MAYBE and errors are skipped)."""
+    verdict = results['llm_verdict'].astype(str).str.upper().map({'YES': True, 'NO': False})
+    return _new_labels(results, verdict, 'llm', results.get('llm_reason', pd.Series('', index=results.index)))
+
+
+def labels_from_agent(results: pd.DataFrame, min_score: int = AGENT_MIN_SCORE) -> pd.DataFrame:
+    """Confirmed suppliers from verification agent output, labelled by company name.
+
+    AS9100 / NADCAP or a verification score of at least `min_score` is a
+    positive; a low score is only missing evidence, so no negatives.
+    """
+    results = results.rename(columns={'company_name': 'name'})
+    confirmed = (results['as9100_certified'].fillna(False).astype(bool)
+                 | results['nadcap_accredited'].fillna(False).astype(bool)
+                 | (results['verification_score'].fillna(0) >= min_score))
+    evidence = 'verification_score=' + results['verification_score'].fillna(0).astype(int).astype(str)
+    return _new_labels(results, confirmed.where(confirmed), 'agent', evidence, by_name=True)
+
+
+def labels_from_manual(sample: pd.DataFrame) -> pd.DataFrame:
+    """A validation sample with is_aerospace_supplier filled in (YES/NO; MAYBE skipped)."""
+    flags = sample['is_aerospace_supplier'].map(_parse_flag)
+    return _new_labels(sample, flags, 'manual', sample.get('notes', pd.Series('', index=sample.index)))
+
+
+def detect_label_source(frame: pd.DataFrame) -> str:
+    if 'llm_verdict' in frame:
+        return 'llm'
+    if 'verification_score' in frame:
+        return 'agent'
+    if 'is_aerospace_supplier' in frame:
+        return 'manual'
+    raise ValueError("Unrecognized label file: expected llm_verdict, verification_score "
+                     "or is_aerospace_supplier columns")
+
+
+LABEL_READERS = {'llm': labels_from_llm, 'agent': labels_from_agent, 'manual': labels_from_manual}
+
+
+# ---- versions --------------------------------------------------------------
+
+def load_version(spec: str, db=None, schema: str = 'public') -> pd.DataFrame:
+    """Scored candidates of one rule-set version: a CSV/Parquet snapshot or a table name."""
+    if spec.endswith('.parquet'):
+        frame = pd.read_parquet(spec)
+    elif spec.endswith('.csv'):
+        frame = pd.read_csv(spec, low_memory=False)
+    else:
+        if not IDENTIFIER_RE.match(spec):
+            raise ValueError(f"Invalid table name: {spec!r}")
+        if db is None:
+            raise ValueError(f"A database connection is needed to read {spec}")
+        relation = spec if '.' in spec else f"{schema}.{spec}"
+        with db.connection() as conn, conn.cursor() as cur:
+            cur.execute(f"SELECT {', '.join(VERSION_COLUMNS)} FROM {relation}")
+            frame = pd.DataFrame(cur.fetchall(), columns=VERSION_COLUMNS)
+    missing = {'osm_id', 'name', 'aerospace_score'} - set(frame.columns)
+    if missing:
+        raise ValueError(f"{spec} lacks columns: {', '.join(sorted(missing))}")
+    for column in ('source_table', 'tier_classification'):
+        if column not in frame:
+            frame[column] = None
+    return frame[VERSION_COLUMNS].reset_index(drop=True)
+
+
+# ---- evaluation ------------------------------------------------------------
+
+class GroundTruth:
+    """Resolved labels: one per candidate row or company name."""
+
+    def __init__(self, labels: pd.DataFrame, known_suppliers: Optional[List[Dict]] = None):
+        known = pd.DataFrame([{
+            'osm_id': pd.NA, 'source_table': pd.NA, 'name': s['name'], 'is_supplier': True,
+            'label_source': 'known_supplier', 'evidence': ', '.join(s['aliases']), 'labeled_at': None,
+        } for s in known_suppliers or []], columns=LABEL_COLUMNS)
+        combined = pd.concat([labels, known], ignore_index=True)
+        combined['osm_id'] = combined['osm_id'].astype('Int64')
+        combined['priority'] = combined['label_source'].map({s: i for i, s in enumerate(LABEL_PRIORITY)})
+        combined['key'] = _label_keys(combined)
+        resolved = combined.sort_values('priority', kind='stable').drop_duplicates('key')
+        self.rows = resolved[resolved['osm_id'].notna()].reset_index(drop=True)
+        self.names = resolved[resolved['osm_id'].isna()].reset_index(drop=True)
+        aliases = {s['name']: s['aliases'] for s in known_suppliers or []}
+        self.name_aliases = [
+            aliases.get(name) if source == 'known_supplier' else [normalize_name(name)]
+            for name, source in zip(self.names['name'], self.names['label_source'])
+        ]
+
+    @classmethod
+    def load(cls, labels_path: str = DEFAULT_LABELS_PATH,
+             seed_path: Optional[str] = DEFAULT_SEED_PATH) -> 'GroundTruth':
+        known = read_seed(seed_path) if seed_path and os.path.exists(seed_path) else []
+        return cls(read_labels(labels_path), known)
+
+    def __len__(self) -> int:
+        return len(self.rows) + len(self.names)
+
+    def name_matches(self, names: pd.Series) -> np.ndarray:
+        """(name labels x rows) mask of candidate names matching a label's alias.
+
+        Uses the registry's rule (known_suppliers.AliasMatcher) so labels and
+        coverage checks agree on which rows a company name covers.
+        """
+        matcher = AliasMatcher(names.fillna('').tolist())
+        matches = np.zeros((len(self.names), len(names)), dtype=bool)
+        for i, aliases in enumerate(self.name_aliases):
+            for alias in aliases or []:
+                if alias:
+                    matches[i, matcher.matches(alias)] = True
+        return matches
+
+    def score(self, version: pd.DataFrame) -> pd.DataFrame:
+        """Every label with the version's score for it (NaN = not in the version)."""
+        rows = self.rows[['osm_id', 'source_table', 'name', 'is_supplier', 'label_source']].copy()
+        keyed = version.assign(osm_id=version['osm_id'].astype('Int64'))
+        exact = keyed.groupby(['osm_id', 'source_table'])['aerospace_score'].max()
+        any_table = keyed.groupby('osm_id')['aerospace_score'].max()
+        # Snapshots without source_table can only be matched on osm_id
+        with_table = rows['source_table'].notna() & keyed['source_table'].notna().any()
+        rows['score'] = np.where(
+            with_table,
+            exact.reindex(pd.MultiIndex.from_frame(rows[['osm_id', 'source_table']].fillna(''))).to_numpy(),
+            any_table.reindex(rows['osm_id']).to_numpy(),
+        ).astype(float)
+
+        names = self.names[['osm_id', 'source_table', 'name', 'is_supplier', 'label_source']].copy()
+        matches = self.name_matches(version['name'])
+        scores = version['aerospace_score'].to_numpy(dtype=float)
+        names['score'] = [scores[m].max() if m.any() else np.nan for m in matches]
+        return pd.concat([rows, names], ignore_index=True)
+
+
+def pr_curve(scored: pd.DataFrame) -> pd.DataFrame:
+    """Precision / recall when predicting score >= threshold, at every labelled score."""
+    positives = int(scored['is_supplier'].sum())
+    present = scored[scored['score'].notna()].sort_values('score', ascending=False)
+    tp = present['is_supplier'].to_numpy().cumsum()
+    fp = (~present['is_supplier'].to_numpy()).cumsum()
+    thresholds = present['score'].to_numpy()
+    # Last position of each distinct score: everything scoring >= it is predicted
+    last = np.r_[thresholds[1:] != thresholds[:-1], True] if len(thresholds) else np.array([], dtype=bool)
+    curve = pd.DataFrame({'threshold': thresholds[last], 'tp': tp[last], 'fp': fp[last]})
+    curve['precision'] = curve['tp'] / (curve['tp'] + curve['fp'])
+    curve['recall'] = curve['tp'] / positives if positives else np.nan
+    return curve
+
+
+def metrics_at(scored: pd.DataFrame, threshold: float) -> Dict:
+    predicted = scored['score'].fillna(-np.inf) >= threshold
+    actual = scored['is_supplier'].astype(bool)
+    tp = int((predicted & actual).sum())
+    fp = int((predicted & ~actual).sum())
+    fn = int((~predicted & actual).sum())
+    precision = tp / (tp + fp) if tp + fp else None
+    recall = tp / (tp + fn) if tp + fn else None
+    f1 = 2 * precision * recall / (precision + recall) if precision and recall else None
+    return {'threshold': threshold, 'tp': tp, 'fp': fp, 'fn': fn, 'tn': int((~predicted & ~actual).sum()),
+            'precision': precision, 'recall': recall, 'f1': f1}
+
+
+def average_precision(curve: pd.DataFrame) -> Optional[float]:
+    """Step-wise area under the PR curve (recall gained x precision)."""
+    if curve.empty or curve['recall'].isna().all():
+        return None
+    recall_gain = np.diff(np.r_[0.0, curve['recall'].to_numpy()])
+    return float((recall_gain * curve['precision'].to_numpy()).sum())
+
+
+def _fill_source_table(frame: pd.DataFrame, other: pd.DataFrame) -> pd.DataFrame:
+    """Take source_table from the other version by osm_id when this one has none."""
+    if frame['source_table'].notna().any() or other['source_table'].isna().all():
+        return frame
+    tables = other.dropna(subset=['source_table']).drop_duplicates('osm_id').set_index('osm_id')['source_table']
+    return frame.assign(source_table=frame['osm_id'].map(tables))
+
+
+def flipped_rows(baseline: pd.DataFrame, version: pd.DataFrame, truth: GroundTruth,
+                 threshold: float) -> pd.DataFrame:
+    """Candidates whose score >= threshold prediction differs between two versions.
+
+    `effect` reads from the new version's side: +TP / -TP for suppliers
+    gained or lost, +FP / -FP for non-suppliers, 'unlabelled' otherwise.
+    """
+    key = ['osm_id', 'source_table']
+    baseline, version = _fill_source_table(baseline, version), _fill_source_table(version, baseline)
+    both = baseline.merge(version, on=key, how='outer', suffixes=('_before', '_after'))
+    before = both['aerospace_score_before'].fillna(-np.inf) >= threshold
+    after = both['aerospace_score_after'].fillna(-np.inf) >= threshold
+    flips = both[before != after].copy()
+    flips['name'] = flips['name_after'].fillna(flips['name_before'])
+    flips['change'] = np.where(after[before != after], 'gained', 'lost')
+
+    labels = truth.rows.drop_duplicates('osm_id').set_index('osm_id')['is_supplier']
+    exact = truth.rows.set_index(key)['is_supplier']
+    label = pd.Series(exact.reindex(pd.MultiIndex.from_frame(flips[key])).to_numpy(), index=flips.index)
+    label = label.fillna(pd.Series(labels.reindex(flips['osm_id'].astype('Int64')).to_numpy(), index=flips.index))
+    named = truth.name_matches(flips['name'].reset_index(drop=True))
+    if len(named):
+        by_name = pd.Series(np.where(named.any(axis=0), True, None), index=flips.index)
+        label = label.fillna(by_name)
+    flips['is_supplier'] = label
+    effect = np.select(
+        [label.eq(True) & (flips['change'] == 'gained'), label.eq(True) & (flips['change'] == 'lost'),
+         label.eq(False) & (flips['change'] == 'gained'), label.eq(False) & (flips['change'] == 'lost')],
+        ['+TP', '-TP', '+FP', '-FP'], default='unlabelled')
+    flips['effect'] = effect
+    columns = ['osm_id', 'source_table', 'name', 'aerospace_score_before', 'aerospace_score_after',
+               'tier_classification_before', 'tier_classification_after', 'change', 'is_supplier', 'effect']
+    return flips[columns].sort_values(['effect', 'aerospace_score_after'], ascending=[True, False])
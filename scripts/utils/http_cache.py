@@ -0,0 +1,180 @@
+"""
+UK OSM Data Processor - On-disk HTTP Cache
+
+Content-addressed page cache shared across runs of the research agents:
+  - bodies stored once per SHA-256 under <directory>/objects/
+  - a SQLite index maps each URL to its body, validators and fetch time
+  - entries younger than `ttl` seconds are served without a request;
+    older ones are revalidated with If-None-Match / If-Modified-Since
+  - total body size is bounded; least recently used entries are evicted
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+DEFAULT_CACHE_DIR = 'data/cache/http'
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    url TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    encoding TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at);
+CREATE INDEX IF NOT EXISTS idx_entries_digest ON entries(digest);
+"""
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    body: bytes
+    encoding: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    fresh: bool
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(self.encoding or 'utf-8', errors='replace')
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """Size-bounded, TTL-aware page cache keyed by URL."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.objects = self.directory / 'objects'
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.directory / 'index.sqlite', check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Cached entry for `url` (fresh or stale), or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT digest, encoding, etag, last_modified, fetched_at FROM entries WHERE url = ?",
+                (url,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            digest, encoding, etag, last_modified, fetched_at = row
+            try:
+                body = self._object_path(digest).read_bytes()
+            except FileNotFoundError:
+                self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+                self._db.commit()
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE entries SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+        fresh = time.time() - fetched_at < self.ttl
+        if fresh:
+            self.hits += 1
+        return CacheEntry(url, body, encoding, etag, last_modified, fetched_at, fresh)
+
+    def put(self, url: str, body: bytes, encoding: Optional[str] = None,
+            etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+            tmp.write_bytes(body)
+            os.replace(tmp, path)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, digest, len(body), encoding, etag, last_modified, now, now)
+            )
+            self._db.commit()
+        self.evict()
+
+    def revalidate(self, url: str) -> None:
+        """Mark `url` fresh again after a 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url)
+            )
+            self._db.commit()
+        self.revalidated += 1
+
+    def size(self) -> int:
+        """Bytes of distinct bodies referenced by the index."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM entries)"
+            ).fetchone()
+        return row[0]
+
+    def evict(self) -> int:
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        evicted = 0
+        total = self.size()
+        if total <= self.max_bytes:
+            return 0
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, digest, size FROM entries ORDER BY accessed_at"
+            ).fetchall()
+            for url, digest, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+                shared = self._db.execute(
+                    "SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)
+                ).fetchone()
+                if not shared:
+                    self._object_path(digest).unlink(missing_ok=True)
+                    total -= size
+                evicted += 1
+            self._db.commit()
+        return evicted
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+            'bytes': self.size(),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,350 @@
+"""
+UK OSM Data Processor - Known Supplier Registry
+
+Ground-truth list of UK aerospace suppliers kept in the database, and a
+coverage check of any candidate table against it:
+  known_suppliers         one row per supplier: expected score, tier,
+                          expected postcode areas / districts and an
+                          optional site location with a search radius
+  known_supplier_aliases  normalized names the supplier trades under
+                          (company_registry.normalize_name, so legal
+                          suffixes are dropped)
+
+The seed list is config/known_suppliers.csv; sync_registry() upserts it
+(suppliers dropped from the file are deactivated, not deleted).
+
+check_coverage() joins the aliases to the candidates with pg_trgm's
+strict word similarity (alias <<% name), which the trigram GIN index on
+the candidate name serves, so the check costs one index probe per alias
+rather than a scan per supplier. A whole alias has to match a run of
+words in the name: "Senior Aerospace" does not match "Senior Citizens
+Club". Matches inside a supplier's postcode areas or site radius are
+preferred, and can be required; the known_supplier_in_area() SQL function
+created with the registry holds that rule for known_suppliers_check.sql
+too.
+
+AliasMatcher applies the same rule to names held in memory (streamed
+coverage in integrated_aerospace_system.py, scenario sweeps), so every
+coverage figure counts a supplier as found under the same condition.
+"""
+
+import re
+import csv
+import time
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from company_registry import normalize_name
+
+DEFAULT_SEED_PATH = 'config/known_suppliers.csv'
+DEFAULT_TABLE = 'aerospace_supplier_candidates'
+DEFAULT_MIN_SIMILARITY = 0.6
+# Created by sync_registry(); known_suppliers_check.sql uses it too
+IN_AREA_FUNCTION = 'known_supplier_in_area'
+CLOSE_SCORE_RATIO = 0.7
+
+IDENTIFIER_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$')
+
+# pg_trgm words: runs of alphanumeric characters
+TRGM_WORD_RE = re.compile(r'[^\W_]+')
+
+
+def _optional_float(value: str) -> Optional[float]:
+    return float(value) if value not in (None, '') else None
+
+
+def read_seed(path: str = DEFAULT_SEED_PATH) -> List[Dict[str, Any]]:
+    """Suppliers from the seed CSV; aliases and postcode areas are |-separated."""
+    suppliers = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            name = row['name'].strip()
+            aliases = [name] + [a.strip() for a in (row.get('aliases') or '').split('|') if a.strip()]
+            areas = [a.strip().upper() for a in (row.get('postcode_areas') or '').split('|') if a.strip()]
+            suppliers.append({
+                'name': name,
+                'aliases': list(dict.fromkeys(normalize_name(a) for a in aliases if normalize_name(a))),
+                'location': row.get('location') or None,
+                'postcode_areas': areas or None,
+                'expected_score': int(row['expected_score']) if row.get('expected_score') else None,
+                'tier': row.get('tier') or None,
+                'latitude': _optional_float(row.get('latitude')),
+                'longitude': _optional_float(row.get('longitude')),
+                'radius_km': _optional_float(row.get('radius_km')),
+            })
+    return suppliers
+
+
+def supplier_aliases(supplier: Dict[str, Any]) -> List[str]:
+    """Registry aliases of a supplier, or its normalized name for a plain dict."""
+    return supplier.get('aliases') or [normalize_name(supplier['name'])]
+
+
+def word_trigrams(text: Optional[str]) -> List[frozenset]:
+    """pg_trgm trigrams of each word of `text` (lowercased, padded "  word ")."""
+    if not isinstance(text, str):
+        return []
+    words = []
+    for word in TRGM_WORD_RE.findall(text.lower()):
+        padded = f'  {word} '
+        words.append(frozenset(padded[i:i + 3] for i in range(len(padded) - 2)))
+    return words
+
+
+def strict_word_similarity(alias: str, name: Optional[str]) -> float:
+    """pg_trgm strict_word_similarity(alias, name).
+
+    The best Jaccard similarity between the alias's trigrams and those of
+    any run of whole words in `name`.
+    """
+    target = frozenset().union(*word_trigrams(alias))
+    words = word_trigrams(name)
+    best = 0.0
+    for start in range(len(words)):
+        extent = set()
+        for word in words[start:]:
+            extent |= word
+            shared = len(target & extent)
+            best = max(best, shared / (len(target) + len(extent) - shared))
+    return best
+
+
+class AliasMatcher:
+    """check_coverage()'s alias <<% name rule over a list of names in memory.
+
+    The words of all names are indexed by trigram, so an alias only gets an
+    exact strict_word_similarity() check on names whose words share enough
+    of its trigrams to possibly reach `min_similarity`.
+    """
+
+    def __init__(self, names: Iterable[Optional[str]], min_similarity: float = DEFAULT_MIN_SIMILARITY):
+        self.names = list(names)
+        self.min_similarity = min_similarity
+        vocab: Dict[frozenset, int] = {}
+        flat_words, flat_names = [], []
+        for position, name in enumerate(self.names):
+            for word in set(word_trigrams(name)):
+                flat_words.append(vocab.setdefault(word, len(vocab)))
+                flat_names.append(position)
+        self._flat_words = np.asarray(flat_words, dtype=np.int64)
+        self._flat_names = np.asarray(flat_names, dtype=np.int64)
+        self._postings: Dict[str, List[int]] = {}
+        for word, word_id in vocab.items():
+            for gram in word:
+                self._postings.setdefault(gram, []).append(word_id)
+        self._vocab_size = len(vocab)
+        self._matches: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def matches(self, alias: str) -> np.ndarray:
+        """Positions of the names `alias` matches (memoized per alias)."""
+        cached = self._matches.get(alias)
+        if cached is not None:
+            return cached
+        target = frozenset().union(*word_trigrams(alias))
+        shared = np.zeros(self._vocab_size, dtype=np.int64)
+        for gram in target:
+            shared[self._postings.get(gram, [])] += 1
+        # A run of words shares at most the sum of its words' shared trigrams
+        upper = np.bincount(self._flat_names, weights=shared[self._flat_words], minlength=len(self.names))
+        candidates = np.nonzero(upper >= self.min_similarity * len(target))[0] if target else []
+        found = np.asarray([i for i in candidates
+                            if strict_word_similarity(alias, self.names[i]) >= self.min_similarity],
+                           dtype=np.int64)
+        self._matches[alias] = found
+        return found
+
+    def supplier_mask(self, supplier: Dict[str, Any]) -> np.ndarray:
+        """Boolean mask of the names matching any of the supplier's aliases."""
+        mask = np.zeros(len(self.names), dtype=bool)
+        for alias in supplier_aliases(supplier):
+            mask[self.matches(alias)] = True
+        return mask
+
+
+def registry_ddl(schema: str) -> str:
+    return f"""
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE TABLE IF NOT EXISTS {schema}.known_suppliers (
+            supplier_id SERIAL PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            location TEXT,
+            postcode_areas TEXT[],
+            expected_score INTEGER,
+            tier TEXT,
+            latitude DOUBLE PRECISION,
+            longitude DOUBLE PRECISION,
+            radius_km DOUBLE PRECISION,
+            active BOOLEAN NOT NULL DEFAULT TRUE,
+            updated_at TIMESTAMP DEFAULT NOW()
+        );
+        CREATE TABLE IF NOT EXISTS {schema}.known_supplier_aliases (
+            supplier_id INTEGER NOT NULL REFERENCES {schema}.known_suppliers ON DELETE CASCADE,
+            alias TEXT NOT NULL,
+            PRIMARY KEY (supplier_id, alias)
+        );
+        -- Whether a candidate lies in a supplier's area (NULL if it has none):
+        -- a letters-only area ("B") must equal the postcode's leading letters
+        -- and a district ("B98") its outward code, so BS3 4AB is not in BS34
+        -- and B9 8xx is not in B98; or the candidate is within the site radius.
+        CREATE OR REPLACE FUNCTION {schema}.{IN_AREA_FUNCTION}(
+            areas TEXT[], site_latitude DOUBLE PRECISION, site_longitude DOUBLE PRECISION,
+            radius_km DOUBLE PRECISION, postcode TEXT, latitude DOUBLE PRECISION,
+            longitude DOUBLE PRECISION
+        ) RETURNS BOOLEAN LANGUAGE sql IMMUTABLE AS $fn$
+            SELECT CASE WHEN areas IS NULL AND site_latitude IS NULL THEN NULL
+            ELSE COALESCE(EXISTS (
+                     SELECT 1 FROM unnest(areas) area
+                     WHERE area = CASE WHEN area ~ '^[A-Z]+$'
+                                       THEN substring(UPPER(TRIM(postcode)) FROM '^[A-Z]+')
+                                       ELSE regexp_replace(UPPER(REPLACE(postcode, ' ', '')),
+                                                           '[0-9][A-Z]{{2}}$', '') END), FALSE)
+                 OR COALESCE(111.32 * SQRT(POWER(latitude - site_latitude, 2)
+                             + POWER((longitude - site_longitude) * COS(RADIANS(site_latitude)), 2))
+                             <= radius_km, FALSE)
+            END
+        $fn$;
+    """
+
+
+def sync_registry(db, suppliers: List[Dict[str, Any]], schema: str = 'public') -> Dict[str, int]:
+    """Upsert the seed suppliers and their aliases; deactivate suppliers no longer listed."""
+    columns = ['name', 'location', 'postcode_areas', 'expected_score', 'tier',
+               'latitude', 'longitude', 'radius_km']
+    stats = {'suppliers': 0, 'aliases': 0, 'deactivated': 0}
+    with db.cursor() as cur:
+        cur.execute(registry_ddl(schema))
+        for supplier in suppliers:
+            cur.execute(f"""
+                INSERT INTO {schema}.known_suppliers ({', '.join(columns)})
+                VALUES ({', '.join(f'%({c})s' for c in columns)})
+                ON CONFLICT (name) DO UPDATE SET
+                    {', '.join(f'{c} = EXCLUDED.{c}' for c in columns[1:])},
+                    active = TRUE, updated_at = NOW()
+                RETURNING supplier_id
+            """, supplier)
+            supplier_id = cur.fetchone()[0]
+            cur.execute(f"DELETE FROM {schema}.known_supplier_aliases WHERE supplier_id = %s", (supplier_id,))
+            for alias in supplier['aliases']:
+                cur.execute(f"INSERT INTO {schema}.known_supplier_aliases VALUES (%s, %s)", (supplier_id, alias))
+            stats['suppliers'] += 1
+            stats['aliases'] += len(supplier['aliases'])
+        cur.execute(f"""
+            UPDATE {schema}.known_suppliers SET active = FALSE, updated_at = NOW()
+            WHERE active AND NOT name = ANY(%s)
+        """, ([s['name'] for s in suppliers],))
+        stats['deactivated'] = cur.rowcount
+    return stats
+
+
+def registry_exists(db, schema: str = 'public') -> bool:
+    return db.fetch_scalar("SELECT to_regclass(%s) IS NOT NULL", (f"{schema}.known_suppliers",))
+
+
+def in_area_function_exists(db, schema: str = 'public') -> bool:
+    """Registries synced before the in-area rule was a function need a re-sync."""
+    return db.fetch_scalar("SELECT to_regproc(%s) IS NOT NULL", (f"{schema}.{IN_AREA_FUNCTION}",))
+
+
+def load_suppliers(db, schema: str = 'public') -> List[Dict[str, Any]]:
+    """Active suppliers with their aliases ([] when the registry has not been created)."""
+    if not registry_exists(db, schema):
+        return []
+    rows = db.fetch_all(f"""
+        SELECT k.name, k.location, k.postcode_areas, k.expected_score, k.tier,
+               ARRAY_AGG(a.alias ORDER BY a.alias)
+        FROM {schema}.known_suppliers k
+        JOIN {schema}.known_supplier_aliases a ON a.supplier_id = k.supplier_id
+        WHERE k.active
+        GROUP BY k.supplier_id
+        ORDER BY k.expected_score DESC NULLS LAST, k.name
+    """)
+    return [{
+        'name': name, 'location': location or 'Various',
+        'postcode': areas[0] if areas else None, 'postcode_areas': areas,
+        'expected_score': expected, 'tier': tier, 'aliases': aliases,
+    } for name, location, areas, expected, tier, aliases in rows]
+
+
+def score_status(score: Optional[int], expected: Optional[int]) -> str:
+    if score is None:
+        return 'missing'
+    if not expected or score >= expected:
+        return 'found'
+    return 'close' if score >= expected * CLOSE_SCORE_RATIO else 'low'
+
+
+def check_coverage(db, schema: str = 'public', table: str = DEFAULT_TABLE,
+                   min_similarity: float = DEFAULT_MIN_SIMILARITY, min_score: Optional[int] = None,
+                   require_area: bool = False) -> Dict[str, Any]:
+    """Recall of the active known suppliers in `table` and the best match for each.
+
+    `table` may be any relation with name / aerospace_score /
+    tier_classification / postcode / latitude / longitude columns (e.g. a
+    scenario's output table). `min_score` only counts candidates scoring
+    at least that much; `require_area` drops matches outside a supplier's
+    postcode areas and site radius.
+    """
+    if not IDENTIFIER_RE.match(table):
+        raise ValueError(f"Invalid table name: {table!r}")
+    relation = table if '.' in table else f"{schema}.{table}"
+    started = time.time()
+    in_area = (f"{schema}.{IN_AREA_FUNCTION}(k.postcode_areas, k.latitude, k.longitude, k.radius_km, "
+               "c.postcode, c.latitude, c.longitude)")
+
+    with db.cursor() as cur:
+        cur.execute("SET LOCAL pg_trgm.strict_word_similarity_threshold = %s", (min_similarity,))
+        cur.execute(f"""
+            WITH hits AS (
+                SELECT k.supplier_id, c.name AS matched_name, c.aerospace_score,
+                       c.tier_classification, c.postcode,
+                       strict_word_similarity(a.alias, c.name) AS similarity,
+                       {in_area} AS in_area
+                FROM {schema}.known_suppliers k
+                JOIN {schema}.known_supplier_aliases a ON a.supplier_id = k.supplier_id
+                JOIN {relation} c ON a.alias <<%% c.name
+                WHERE k.active
+                  AND (%(min_score)s::integer IS NULL OR c.aerospace_score >= %(min_score)s::integer)
+            ),
+            best AS (
+                SELECT DISTINCT ON (supplier_id) *, COUNT(*) OVER (PARTITION BY supplier_id) AS hits
+                FROM hits
+                WHERE NOT %(require_area)s OR in_area IS NOT FALSE
+                ORDER BY supplier_id, in_area IS TRUE DESC, aerospace_score DESC, similarity DESC
+            )
+            SELECT k.name, k.tier, k.location, k.postcode_areas, k.expected_score,
+                   b.matched_name, b.aerospace_score, b.tier_classification, b.postcode,
+                   ROUND(b.similarity::numeric, 2), b.in_area, COALESCE(b.hits, 0)
+            FROM {schema}.known_suppliers k
+            LEFT JOIN best b ON b.supplier_id = k.supplier_id
+            WHERE k.active
+            ORDER BY k.expected_score DESC NULLS LAST, k.name
+        """, {'min_score': min_score, 'require_area': require_area})
+        columns = ['name', 'tier', 'location', 'postcode_areas', 'expected_score', 'matched_name',
+                   'aerospace_score', 'tier_classification', 'postcode', 'similarity', 'in_area', 'hits']
+        suppliers = [dict(zip(columns, row)) for row in cur.fetchall()]
+
+    by_tier: Dict[str, List[int]] = {}
+    for s in suppliers:
+        s['status'] = score_status(s['aerospace_score'], s['expected_score'])
+        s['similarity'] = float(s['similarity']) if s['similarity'] is not None else None
+        counts = by_tier.setdefault(s['tier'] or 'unknown', [0, 0])
+        counts[0] += s['status'] != 'missing'
+        counts[1] += 1
+
+    found = [s for s in suppliers if s['status'] != 'missing']
+    result = {
+        'table': relation,
+        'suppliers': suppliers,
+        'found': found,
+        'missing': [s for s in suppliers if s['status'] == 'missing'],
+        'recall': len(found) / len(suppliers) if suppliers else 0.0,
+        'recall_by_tier': {tier: hit / total for tier, (hit, total) in by_tier.items()},
+        'seconds': round(time.time() - started, 3),
+    }
+    logging.debug(f"Coverage of {relation}: {len(found)}/{len(suppliers)} in {result['seconds']}s")
+    return result
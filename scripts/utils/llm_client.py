@@ -0,0 +1,179 @@
+"""
+UK OSM Data Processor - Cached LLM Client
+
+Persistent response cache shared by the research agents and candidate
+verification:
+  - CachedLLMClient wraps any client exposing the OpenAI/Groq interface
+    `client.chat.completions.create(...)` and answers identical requests
+    (same model, temperature, messages and options) from disk
+  - LLMCache is the SQLite store behind it: entries expire after `ttl`
+    seconds, total size is bounded by evicting least recently used rows,
+    and hits/misses plus the tokens and seconds they saved are counted
+  - BatchVerifier also keeps one verdict per candidate in the same store,
+    so re-batching the same candidates after a criteria change still hits
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+DEFAULT_CACHE_PATH = 'data/cache/llm.sqlite'
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT,
+    content TEXT NOT NULL,
+    tokens INTEGER NOT NULL,
+    latency REAL NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at);
+"""
+
+
+def request_key(**request: Any) -> str:
+    """SHA-256 of a completion request (model, temperature, messages, options)."""
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """TTL- and size-bounded SQLite store of LLM responses keyed by request hash."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+        self.saved_tokens = 0
+        self.saved_seconds = 0.0
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached content for `key`, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content, tokens, latency, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[3] >= self.ttl:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+            self.saved_tokens += row[1]
+            self.saved_seconds += row[2]
+        return row[0]
+
+    def put(self, key: str, content: str, model: Optional[str] = None,
+            tokens: int = 0, latency: float = 0.0) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model, content, tokens, latency, len(content.encode('utf-8')), now, now)
+            )
+            self._db.commit()
+        self.evict()
+
+    def size(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently used ones until under max_bytes."""
+        with self._lock:
+            evicted = self._db.execute(
+                "DELETE FROM responses WHERE created_at <= ?", (time.time() - self.ttl,)
+            ).rowcount
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                rows = self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+                for key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    total -= size
+                    evicted += 1
+            self._db.commit()
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'saved_tokens': self.saved_tokens,
+            'saved_seconds': round(self.saved_seconds, 2),
+            'entries': entries,
+            'bytes': self.size(),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class CachedLLMClient:
+    """Drop-in wrapper adding a persistent response cache to an LLM client.
+
+    Exposes `chat.completions.create(...)` like the wrapped client; cached
+    responses carry `cached=True` and a `usage.total_tokens` of 0. Streaming
+    requests are passed through uncached.
+    """
+
+    def __init__(self, client, cache: Optional[LLMCache] = None, **cache_options):
+        self.client = client
+        self.cache = cache if cache is not None else LLMCache(**cache_options)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def cached(self, **request: Any) -> Optional[str]:
+        """Cached content for `request` without calling the API, or None."""
+        return self.cache.get(request_key(**request))
+
+    def create(self, **request: Any):
+        if request.get('stream'):
+            return self.client.chat.completions.create(**request)
+        key = request_key(**request)
+        content = self.cache.get(key)
+        if content is not None:
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+                usage=SimpleNamespace(total_tokens=0),
+                cached=True,
+            )
+        started = time.monotonic()
+        response = self.client.chat.completions.create(**request)
+        content = response.choices[0].message.content
+        if content is not None:
+            usage = getattr(response, 'usage', None)
+            self.cache.put(key, content, model=request.get('model'),
+                           tokens=getattr(usage, 'total_tokens', None) or 0,
+                           latency=time.monotonic() - started)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
@@ -0,0 +1,230 @@
+"""
+UK OSM Data Processor - Batched LLM Candidate Verification
+
+Packs many candidates into one structured-JSON prompt per request and runs
+several batches concurrently under a requests/minute and tokens/minute
+budget. Items missing from, or malformed in, a response are retried in a
+smaller follow-up batch. With a cache (an LLMCache, or the one behind a
+CachedLLMClient) each candidate's verdict is stored on its own, so only
+candidates never seen before are sent.
+
+Works with any client exposing the OpenAI/Groq interface
+`client.chat.completions.create(model=..., messages=..., ...)`; see
+tests/test_llm_verifier.py for an offline stand-in.
+"""
+
+import re
+import json
+import time
+import random
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from llm_client import CachedLLMClient, LLMCache, request_key
+
+DEFAULT_MODEL = 'llama-3.3-70b-versatile'
+VERDICTS = ('YES', 'NO', 'MAYBE')
+
+# Candidate fields sent to the model
+PROMPT_FIELDS = ('name', 'city', 'postcode', 'landuse_type', 'building_type',
+                 'industrial_type', 'matched_keywords')
+
+SYSTEM_PROMPT = """You assess whether UK businesses are likely aerospace suppliers.
+For every candidate in the input, answer YES, NO, or MAYBE with a brief reason.
+Respond with JSON only: {"results": [{"id": <id>, "verdict": "YES|NO|MAYBE", "reason": "<max 15 words>"}]}
+Include exactly one result per input id."""
+
+JSON_BLOCK_RE = re.compile(r'\{.*\}', re.DOTALL)
+TEMPERATURE = 0.1
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+class RateBudget:
+    """Thread-safe sliding 60-second window of requests and tokens."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, window: float = 60.0):
+        self.rpm = requests_per_minute
+        self.tpm = tokens_per_minute
+        self.window = window
+        self.events = deque()  # [timestamp, tokens]
+        self.condition = threading.Condition()
+
+    def _expire(self, now: float) -> None:
+        while self.events and now - self.events[0][0] >= self.window:
+            self.events.popleft()
+
+    def acquire(self, tokens: int) -> list:
+        """Block until a request of `tokens` fits; returns its window entry."""
+        tokens = min(tokens, self.tpm)
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+                used = sum(entry[1] for entry in self.events)
+                if len(self.events) < self.rpm and used + tokens <= self.tpm:
+                    entry = [now, tokens]
+                    self.events.append(entry)
+                    return entry
+                wait = self.window - (now - self.events[0][0]) if self.events else 0.05
+                self.condition.wait(timeout=max(wait, 0.05))
+
+    def settle(self, entry: list, actual_tokens: int) -> None:
+        """Replace an estimate with the usage the API reported."""
+        with self.condition:
+            entry[1] = actual_tokens
+            self.condition.notify_all()
+
+
+def _field(value: Any) -> Any:
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    return value
+
+
+def parse_results(content: str, expected_ids: Sequence[int]) -> Dict[int, Dict[str, str]]:
+    """Valid {id: {verdict, reason}} entries from a model response."""
+    match = JSON_BLOCK_RE.search(content or '')
+    if not match:
+        return {}
+    try:
+        payload = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return {}
+    rows = payload.get('results') if isinstance(payload, dict) else None
+    if not isinstance(rows, list):
+        return {}
+    expected = set(expected_ids)
+    parsed = {}
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        try:
+            item_id = int(row.get('id'))
+        except (TypeError, ValueError):
+            continue
+        verdict = str(row.get('verdict', '')).strip().upper()
+        if item_id in expected and verdict in VERDICTS:
+            parsed[item_id] = {'verdict': verdict, 'reason': str(row.get('reason', '')).strip()}
+    return parsed
+
+
+class BatchVerifier:
+    """Verify candidates in JSON batches with bounded concurrency and budget."""
+
+    def __init__(self, client, model: str = DEFAULT_MODEL, batch_size: int = 25,
+                 concurrency: int = 4, requests_per_minute: int = 30,
+                 tokens_per_minute: int = 6000, max_retries: int = 3,
+                 tokens_per_item: int = 40, cache: Optional[LLMCache] = None):
+        if isinstance(client, CachedLLMClient):
+            # Cache per candidate rather than per batch request
+            cache = cache if cache is not None else client.cache
+            client = client.client
+        self.client = client
+        self.cache = cache
+        self.model = model
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.budget = RateBudget(requests_per_minute, tokens_per_minute)
+        self.max_retries = max_retries
+        self.tokens_per_item = tokens_per_item
+        self.stats = {'requests': 0, 'retries': 0, 'tokens': 0, 'failed_items': 0, 'cached_items': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, **deltas) -> None:
+        with self._stats_lock:
+            for key, value in deltas.items():
+                self.stats[key] += value
+
+    @staticmethod
+    def candidate_fields(record: Dict[str, Any]) -> Dict[str, Any]:
+        return {f: _field(record.get(f)) for f in PROMPT_FIELDS if _field(record.get(f)) is not None}
+
+    def item_key(self, record: Dict[str, Any]) -> str:
+        """Cache key of one candidate's verdict under the current model and prompt."""
+        return request_key(model=self.model, temperature=TEMPERATURE, system=SYSTEM_PROMPT,
+                           candidate=self.candidate_fields(record))
+
+    def build_messages(self, batch: List[tuple]) -> List[Dict[str, str]]:
+        candidates = [{'id': item_id, **self.candidate_fields(record)} for item_id, record in batch]
+        return [
+            {'role': 'system', 'content': SYSTEM_PROMPT},
+            {'role': 'user', 'content': json.dumps({'candidates': candidates}, ensure_ascii=False)},
+        ]
+
+    def _complete(self, messages: List[Dict[str, str]], max_tokens: int) -> tuple:
+        prompt_tokens = sum(estimate_tokens(m['content']) for m in messages)
+        entry = self.budget.acquire(prompt_tokens + max_tokens)
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=TEMPERATURE,
+                max_tokens=max_tokens,
+                response_format={'type': 'json_object'},
+            )
+        except Exception:
+            self.budget.settle(entry, prompt_tokens)
+            raise
+        usage = getattr(response, 'usage', None)
+        used = getattr(usage, 'total_tokens', None) or entry[1]
+        self.budget.settle(entry, used)
+        self._count(requests=1, tokens=used)
+        return response.choices[0].message.content, used
+
+    def _run_batch(self, batch: List[tuple]) -> Dict[int, Dict[str, str]]:
+        results: Dict[int, Dict[str, str]] = {}
+        remaining = list(batch)
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count(retries=1)
+            max_tokens = 50 + self.tokens_per_item * len(remaining)
+            started = time.monotonic()
+            try:
+                content, used = self._complete(self.build_messages(remaining), max_tokens)
+            except Exception as e:
+                # API errors (rate limits, timeouts) back off; malformed
+                # responses below are retried straight away
+                logging.warning(f"LLM batch of {len(remaining)} failed (attempt {attempt + 1}): {e}")
+                time.sleep(min(2 ** attempt, 30) * (0.5 + random.random() / 2))
+                continue
+            parsed = parse_results(content, [item_id for item_id, _ in remaining])
+            results.update(parsed)
+            if self.cache is not None:
+                share = len(remaining)
+                elapsed = time.monotonic() - started
+                for item_id, record in remaining:
+                    if item_id in parsed:
+                        self.cache.put(self.item_key(record), json.dumps(parsed[item_id]),
+                                       model=self.model, tokens=used // share, latency=elapsed / share)
+            remaining = [(item_id, record) for item_id, record in remaining if item_id not in parsed]
+            if not remaining:
+                break
+        for item_id, _ in remaining:
+            results[item_id] = {'verdict': 'ERROR', 'reason': 'No valid response after retries'}
+        self._count(failed_items=len(remaining))
+        return results
+
+    def verify(self, records: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Verdicts for `records` (dicts of candidate fields), in input order."""
+        verdicts: Dict[int, Dict[str, str]] = {}
+        items = []
+        for item_id, record in enumerate(records):
+            cached = self.cache.get(self.item_key(record)) if self.cache is not None else None
+            if cached is not None:
+                verdicts[item_id] = json.loads(cached)
+            else:
+                items.append((item_id, record))
+        self._count(cached_items=len(records) - len(items))
+        batches = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for batch_results in pool.map(self._run_batch, batches):
+                verdicts.update(batch_results)
+        return [verdicts[i] for i in range(len(records))]
+
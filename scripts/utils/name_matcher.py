@@ -0,0 +1,263 @@
+"""
+UK OSM Data Processor - Fuzzy Company Name Matching
+
+Matches free-text business names (OSM candidates, known-supplier lists)
+against a large set of names (other candidates, the Companies House
+registry) without comparing every pair:
+  - names are normalized with company_registry.normalize_name (legal
+    suffixes such as Ltd/Limited/PLC dropped) and common abbreviations
+    expanded, so "GKN Aerospace Ltd" and "GKN AEROSPACE SERVICES LIMITED"
+    share the tokens "gkn aerospace"
+  - a token -> record inverted index (numpy postings) generates
+    candidates from the query's rarer tokens only; common tokens such as
+    "engineering" just add to the score of those candidates
+  - query tokens also match misspelt or variant index tokens through a
+    character-trigram index over the token vocabulary
+  - scores are IDF-weighted: "cosine" compares whole names, "containment"
+    measures how much of the query name appears in the record name
+
+An optional postcode restricts matches to a postcode area ("B"),
+district ("B98"), sector ("B98 0") or full postcode. Outward codes are
+compared exactly, so "B9" does not take in B98 or B90, and "B" does not
+take in BS.
+"""
+
+import re
+import math
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from company_registry import normalize_name, normalize_postcode
+
+# Abbreviations -> the token used in the index
+TOKEN_ALIASES = {
+    'intl': 'international', 'int': 'international',
+    'eng': 'engineering', 'engg': 'engineering', 'engineers': 'engineering',
+    'mfg': 'manufacturing', 'manufacturers': 'manufacturing',
+    'svcs': 'services', 'serv': 'services', 'service': 'services',
+    'tech': 'technology', 'technologies': 'technology',
+    'sys': 'systems', 'system': 'systems',
+    'bros': 'brothers', 'center': 'centre', 'ctr': 'centre',
+    'aero': 'aerospace',
+}
+
+MIN_FUZZY_LENGTH = 4
+DEFAULT_FUZZY_THRESHOLD = 0.7   # trigram Dice similarity for variant tokens
+DEFAULT_MIN_SCORE = 0.5
+MEASURES = ('cosine', 'containment')
+
+AREA_RE = re.compile(r'^[A-Z]{1,2}')
+OUTWARD_CODE_RE = re.compile(r'^[A-Z]{1,2}[0-9][A-Z0-9]?$')
+
+
+def name_tokens(name: Optional[str]) -> List[str]:
+    """Normalized, de-duplicated tokens of a company/business name."""
+    tokens = [TOKEN_ALIASES.get(t, t) for t in normalize_name(name).split()]
+    return list(dict.fromkeys(tokens))
+
+
+def _trigrams(token: str) -> set:
+    padded = f' {token} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class Match:
+    index: int          # position of the record in the indexed names
+    key: Any            # caller-supplied key (e.g. osm_id or company number)
+    name: str
+    score: float
+    postcode: Optional[str] = None
+
+
+class NameIndex:
+    """Token inverted index over a fixed list of names."""
+
+    def __init__(self, names: Sequence[Optional[str]], keys: Optional[Sequence[Any]] = None,
+                 postcodes: Optional[Sequence[Optional[str]]] = None,
+                 fuzzy_threshold: float = DEFAULT_FUZZY_THRESHOLD,
+                 max_candidate_df: Optional[int] = None):
+        self.names = list(names)
+        self.keys = list(keys) if keys is not None else list(range(len(self.names)))
+        self.postcodes = list(postcodes) if postcodes is not None else [None] * len(self.names)
+        self._postcodes_norm = [normalize_postcode(p) if p else '' for p in self.postcodes]
+        # Outward code (district) of each postcode: all but the 3-character inward code
+        self._districts = [p[:-3] if len(p) >= 5 else p for p in self._postcodes_norm]
+        self.fuzzy_threshold = fuzzy_threshold
+        n = len(self.names)
+        # Tokens in more records than this only score candidates, never generate them
+        self.max_candidate_df = max_candidate_df or max(1000, n // 100)
+
+        self.vocab: Dict[str, int] = {}
+        flat_tokens, flat_records = [], []
+        for record, name in enumerate(self.names):
+            for token in name_tokens(name):
+                flat_tokens.append(self.vocab.setdefault(token, len(self.vocab)))
+                flat_records.append(record)
+        flat_tokens = np.asarray(flat_tokens, dtype=np.int64)
+        flat_records = np.asarray(flat_records, dtype=np.int64)
+
+        order = np.argsort(flat_tokens, kind='stable')
+        self._postings = flat_records[order]
+        self._offsets = np.searchsorted(flat_tokens[order], np.arange(len(self.vocab) + 1))
+        self.df = np.diff(self._offsets)
+        self.idf = np.log(1 + (n - self.df + 0.5) / (self.df + 0.5))
+        self._unseen_idf = math.log(1 + (n + 0.5) / 0.5)
+        weights = self.idf[flat_tokens] ** 2 if len(flat_tokens) else np.zeros(0)
+        self._norms = np.sqrt(np.bincount(flat_records, weights=weights, minlength=n))
+
+        # Trigram -> vocabulary token postings, built on first fuzzy lookup
+        self._gram_ids: Optional[Dict[str, int]] = None
+        self._expansions: Dict[str, List[Tuple[int, float]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _postings_of(self, token_id: int) -> np.ndarray:
+        return self._postings[self._offsets[token_id]:self._offsets[token_id + 1]]
+
+    def _build_trigram_index(self) -> None:
+        gram_ids: Dict[str, int] = {}
+        flat_grams, flat_tokens = [], []
+        lengths = np.zeros(len(self.vocab), dtype=np.int64)
+        for token, token_id in self.vocab.items():
+            lengths[token_id] = len(token)
+            if len(token) >= MIN_FUZZY_LENGTH:
+                for gram in _trigrams(token):
+                    flat_grams.append(gram_ids.setdefault(gram, len(gram_ids)))
+                    flat_tokens.append(token_id)
+        flat_grams = np.asarray(flat_grams, dtype=np.int64)
+        order = np.argsort(flat_grams, kind='stable')
+        self._gram_ids = gram_ids
+        self._gram_postings = np.asarray(flat_tokens, dtype=np.int64)[order]
+        self._gram_offsets = np.searchsorted(flat_grams[order], np.arange(len(gram_ids) + 1))
+        self._token_lengths = lengths
+
+    def expand(self, token: str) -> List[Tuple[int, float]]:
+        """(vocab id, similarity) of index tokens matching `token` (memoized)."""
+        cached = self._expansions.get(token)
+        if cached is not None:
+            return cached
+        expansions = []
+        exact = self.vocab.get(token)
+        if exact is not None:
+            expansions.append((exact, 1.0))
+        if self.fuzzy_threshold < 1.0 and len(token) >= MIN_FUZZY_LENGTH:
+            if self._gram_ids is None:
+                self._build_trigram_index()
+            grams = _trigrams(token)
+            ids = [self._gram_ids[g] for g in grams if g in self._gram_ids]
+            if ids:
+                token_ids, shared = np.unique(np.concatenate([
+                    self._gram_postings[self._gram_offsets[g]:self._gram_offsets[g + 1]] for g in ids
+                ]), return_counts=True)
+                # Dice over trigram sets; a padded token of length L has (at most) L trigrams
+                similarity = 2 * shared / (len(grams) + self._token_lengths[token_ids])
+                keep = (similarity >= self.fuzzy_threshold) & (token_ids != (-1 if exact is None else exact))
+                expansions.extend(zip(token_ids[keep].tolist(), similarity[keep].tolist()))
+        self._expansions[token] = expansions
+        return expansions
+
+    def _postcode_test(self, postcode: str) -> Callable[[int], bool]:
+        """Whether a record lies in an area ("B"), district ("B9"), sector ("B9 8") or postcode."""
+        outward, _, inward = postcode.strip().upper().partition(' ')
+        outward, inward = normalize_postcode(outward), normalize_postcode(inward)
+        if outward.isalpha() and not inward:
+            def in_area(record):
+                area = AREA_RE.match(self._postcodes_norm[record])
+                return bool(area) and area.group(0) == outward
+            return in_area
+        if inward or OUTWARD_CODE_RE.match(outward):
+            return lambda record: (self._districts[record] == outward
+                                   and self._postcodes_norm[record][len(outward):].startswith(inward))
+        return lambda record: self._postcodes_norm[record].startswith(outward)
+
+    def match(self, name: Optional[str], postcode: Optional[str] = None, limit: Optional[int] = 5,
+              min_score: float = DEFAULT_MIN_SCORE, measure: str = 'cosine') -> List[Match]:
+        """Records matching `name`, best first.
+
+        `limit=None` returns every record scoring at least `min_score`.
+        """
+        if measure not in MEASURES:
+            raise ValueError(f"measure must be one of {MEASURES}")
+        tokens = name_tokens(name)
+        if not tokens or not len(self):
+            return []
+        expansions = [self.expand(token) for token in tokens]
+        # A token missing from the index weighs as much as its closest variant
+        weights = np.array([
+            self.idf[self.vocab[t]] if t in self.vocab
+            else max((self.idf[i] for i, _ in options), default=self._unseen_idf)
+            for t, options in zip(tokens, expansions)
+        ])
+
+        # Candidates: records containing any of the query's rarer (expanded) tokens
+        all_ids = [token_id for options in expansions for token_id, _ in options]
+        if not all_ids:
+            return []
+        generating = [t for t in all_ids if self.df[t] <= self.max_candidate_df]
+        if not generating:
+            generating = [min(all_ids, key=lambda t: self.df[t])]
+        if len(generating) == 1:
+            candidates = self._postings_of(generating[0])  # already sorted and unique
+        else:
+            candidates = np.unique(np.concatenate([self._postings_of(t) for t in generating]))
+
+        if postcode:
+            in_postcode = self._postcode_test(postcode)
+            keep = [i for i, record in enumerate(candidates) if in_postcode(record)]
+            candidates = candidates[keep]
+            if not len(candidates):
+                return []
+
+        scores = np.zeros(len(candidates))
+        for weight, options in zip(weights, expansions):
+            best = np.zeros(len(candidates))
+            for token_id, similarity in options:
+                postings = self._postings_of(token_id)
+                position = np.searchsorted(postings, candidates)
+                present = postings[np.minimum(position, len(postings) - 1)] == candidates
+                best = np.maximum(best, present * (similarity * self.idf[token_id]))
+            scores += weight * best
+
+        if measure == 'cosine':
+            scores /= float(np.sqrt((weights ** 2).sum())) * self._norms[candidates]
+        else:
+            scores /= float((weights ** 2).sum())
+        np.clip(scores, 0.0, 1.0, out=scores)
+
+        selected = np.nonzero(scores >= min_score)[0]
+        selected = selected[np.argsort(-scores[selected], kind='stable')]
+        if limit is not None:
+            selected = selected[:limit]
+        return [
+            Match(int(candidates[i]), self.keys[candidates[i]], self.names[candidates[i]],
+                  round(float(scores[i]), 4), self.postcodes[candidates[i]])
+            for i in selected
+        ]
+
+    def match_many(self, names: Iterable[Optional[str]], postcodes: Optional[Iterable[Optional[str]]] = None,
+                   **options) -> List[List[Match]]:
+        """match() for each name (and optional postcode area, district or sector), in order.
+
+        Names that normalize to the same tokens (chains, "X Ltd" vs "X
+        Limited") are matched once.
+        """
+        names = list(names)
+        postcodes = list(postcodes) if postcodes is not None else [None] * len(names)
+        seen: Dict[tuple, List[Match]] = {}
+        results = []
+        for name, postcode in zip(names, postcodes):
+            key = (tuple(name_tokens(name)), normalize_postcode(postcode) if postcode else None)
+            if key not in seen:
+                seen[key] = self.match(name, postcode, **options)
+            results.append(seen[key])
+        return results
+
+    @classmethod
+    def from_registry(cls, registry, active_only: bool = True, **options) -> 'NameIndex':
+        """Index every company name in a CompanyRegistry (keys are company numbers)."""
+        rows = registry.names(active_only)
+        return cls([r[1] for r in rows], keys=[r[0] for r in rows], postcodes=[r[2] for r in rows], **options)
@@ -0,0 +1,99 @@
+"""
+UK OSM Data Processor - Report Engine
+
+Builds Markdown reports from SQL sections without one database round trip
+per section:
+  - each Section is a SELECT plus a per-row template
+  - all sections are gathered by a single statement on one pooled
+    connection: every section becomes a json_agg() sub-select of one row,
+    with clock_timestamp() marks in between so the server time spent on
+    each section is still reported
+  - the rendered sections are substituted into a string.Template document
+    ($section_name placeholders)
+"""
+
+import time
+import logging
+from dataclasses import dataclass
+from string import Template
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Rows = List[Dict[str, Any]]
+
+
+@dataclass
+class Section:
+    name: str                   # placeholder name in the document template
+    sql: str                    # SELECT returning the section's rows, in display order
+    row_template: str = ''      # str.format() template applied to each row
+    empty: str = ''             # text used when the query returns no rows
+    joiner: str = '\n'
+    render: Optional[Callable[[Rows], str]] = None  # overrides row_template
+
+    def format(self, rows: Rows) -> str:
+        if not rows:
+            return self.empty
+        if self.render is not None:
+            return self.render(rows)
+        return self.joiner.join(self.row_template.format(**row) for row in rows)
+
+
+class ReportEngine:
+    """Gathers every section in one query and renders them into a template."""
+
+    def __init__(self, sections: List[Section], template: str):
+        names = [s.name for s in sections]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate report section names: {names}")
+        self.sections = sections
+        self.template = Template(template)
+
+    def query(self) -> str:
+        columns = ['clock_timestamp() AS "_started"']
+        for section in self.sections:
+            columns.append(f"""(SELECT COALESCE(json_agg(s), '[]'::json) FROM (
+                {section.sql}
+            ) s) AS "{section.name}\"""")
+            columns.append(f'clock_timestamp() AS "_{section.name}_done"')
+        return "SELECT " + ",\n       ".join(columns)
+
+    def fetch(self, cur) -> Tuple[Dict[str, Rows], Dict[str, float]]:
+        """Run the combined query; returns rows and server milliseconds per section."""
+        cur.execute(self.query())
+        row = dict(zip([d[0] for d in cur.description], cur.fetchone()))
+        data, query_ms = {}, {}
+        previous = row['_started']
+        for section in self.sections:
+            data[section.name] = row[section.name]
+            done = row[f"_{section.name}_done"]
+            query_ms[section.name] = (done - previous).total_seconds() * 1000
+            previous = done
+        return data, query_ms
+
+    def render(self, cur, **values) -> Tuple[str, Dict[str, Rows], List[Dict[str, Any]]]:
+        """Gather and render the report.
+
+        `values` fills the non-section placeholders of the template. Returns
+        the document, the raw section rows and per-section timings.
+        """
+        data, query_ms = self.fetch(cur)
+        rendered, timings = dict(values), []
+        for section in self.sections:
+            started = time.perf_counter()
+            rendered[section.name] = section.format(data[section.name])
+            timings.append({
+                'section': section.name,
+                'rows': len(data[section.name]),
+                'query_ms': query_ms[section.name],
+                'render_ms': (time.perf_counter() - started) * 1000,
+            })
+        return self.template.substitute(rendered), data, timings
+
+
+def log_timings(timings: List[Dict[str, Any]], level: int = logging.INFO) -> None:
+    width = max((len(t['section']) for t in timings), default=0)
+    for t in timings:
+        logging.log(level, f"  {t['section']:<{width}}  query {t['query_ms']:8.1f} ms  "
+                           f"render {t['render_ms']:6.2f} ms  {t['rows']:>5} rows")
+    logging.log(level, f"  {'total':<{width}}  query {sum(t['query_ms'] for t in timings):8.1f} ms  "
+                       f"render {sum(t['render_ms'] for t in timings):6.2f} ms")
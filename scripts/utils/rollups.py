@@ -0,0 +1,189 @@
+"""
+UK OSM Data Processor - Candidate Rollup Tables
+
+Maintains one small aggregate table, candidate_rollup, over
+aerospace_supplier_candidates so reports read pre-computed counts instead
+of re-scanning the candidate table for every figure and percentage:
+  - one row per (postcode area, tier, source table, score band,
+    website/phone/email/city present) cell with the candidate count and
+    score sum/count/min/max
+  - views on top give the shapes the reports use: overall totals,
+    regions, tiers, source tables and score bands, each with its share
+    of the total
+  - a refresh aggregates the candidates once and applies only the
+    differences: new cells are inserted, changed cells updated and
+    vanished cells deleted, all in one transaction, and every refresh is
+    logged in candidate_rollup_refreshes
+
+Empty region / tier / source values are stored as '' (they are part of
+the primary key); the views turn them back into NULL.
+"""
+
+import time
+import logging
+from typing import Any, Dict
+
+CANDIDATE_TABLE = 'aerospace_supplier_candidates'
+
+# Lower bounds of the score bands; every threshold a report filters on is a boundary
+SCORE_BANDS = (250, 200, 150, 120, 100, 80, 70, 60, 40, 0)
+
+CELL_COLUMNS = ['region', 'tier_classification', 'source_table', 'score_band',
+                'has_website', 'has_phone', 'has_email', 'has_city']
+MEASURE_COLUMNS = ['candidates', 'scored', 'score_sum', 'score_min', 'score_max']
+
+
+def score_band_sql(column: str = 'aerospace_score') -> str:
+    cases = ' '.join(f"WHEN {column} >= {floor} THEN {floor}" for floor in SCORE_BANDS if floor)
+    return f"CASE {cases} ELSE 0 END"
+
+
+def rollup_ddl(schema: str) -> str:
+    """Tables and report views (idempotent)."""
+    total = f"NULLIF((SELECT SUM(candidates) FROM {schema}.candidate_rollup), 0)"
+
+    def count(condition: str = None) -> str:
+        if condition:
+            return f"COALESCE(SUM(candidates) FILTER (WHERE {condition}), 0)::bigint"
+        return "COALESCE(SUM(candidates), 0)::bigint"
+
+    breakdown = f"""
+        {count()} AS total,
+        {count("tier_classification = 'tier1_candidate'")} AS tier1,
+        {count("tier_classification = 'tier2_candidate'")} AS tier2,
+        {count("tier_classification = 'potential_candidate'")} AS potential,
+        {count("tier_classification IN ('tier1_candidate', 'tier2_candidate')")} AS high_quality,
+        {count('has_website')} AS with_website,
+        {count('has_phone')} AS with_phone,
+        {count('has_email')} AS with_email,
+        {count('has_website OR has_phone')} AS with_contact,
+        {count('has_website AND has_phone')} AS full_contact,
+        {count("region <> ''")} AS with_postcode,
+        {count('has_city')} AS with_city,
+        {count('score_band >= 150')} AS score_150_plus,
+        {count('score_band >= 100')} AS score_100_plus,
+        {count('score_band >= 70')} AS score_70_plus,
+        {count('score_band >= 100 AND (has_website OR has_phone)')} AS ready_for_outreach,
+        ROUND(SUM(score_sum)::numeric / NULLIF(SUM(scored), 0), 2) AS avg_score,
+        MIN(score_min) AS min_score,
+        MAX(score_max) AS max_score,
+        ROUND(100.0 * SUM(candidates) / {total}, 1) AS pct_of_total"""
+
+    return f"""
+        CREATE TABLE IF NOT EXISTS {schema}.candidate_rollup (
+            region TEXT NOT NULL,
+            tier_classification TEXT NOT NULL,
+            source_table TEXT NOT NULL,
+            score_band INTEGER NOT NULL,
+            has_website BOOLEAN NOT NULL,
+            has_phone BOOLEAN NOT NULL,
+            has_email BOOLEAN NOT NULL,
+            has_city BOOLEAN NOT NULL,
+            candidates BIGINT NOT NULL,
+            scored BIGINT NOT NULL,
+            score_sum BIGINT,
+            score_min INTEGER,
+            score_max INTEGER,
+            PRIMARY KEY ({', '.join(CELL_COLUMNS)})
+        );
+        CREATE TABLE IF NOT EXISTS {schema}.candidate_rollup_refreshes (
+            refreshed_at TIMESTAMP DEFAULT NOW(),
+            candidates BIGINT,
+            cells BIGINT,
+            cells_inserted BIGINT,
+            cells_updated BIGINT,
+            cells_deleted BIGINT,
+            seconds DOUBLE PRECISION
+        );
+
+        CREATE OR REPLACE VIEW {schema}.candidate_rollup_totals AS
+        SELECT {breakdown},
+            COUNT(DISTINCT region) FILTER (WHERE region <> '') AS regions_covered,
+            (SELECT MAX(refreshed_at) FROM {schema}.candidate_rollup_refreshes) AS refreshed_at
+        FROM {schema}.candidate_rollup;
+
+        CREATE OR REPLACE VIEW {schema}.candidate_rollup_regions AS
+        SELECT region, {breakdown}
+        FROM {schema}.candidate_rollup WHERE region <> ''
+        GROUP BY region;
+
+        CREATE OR REPLACE VIEW {schema}.candidate_rollup_tiers AS
+        SELECT NULLIF(tier_classification, '') AS tier_classification, {breakdown}
+        FROM {schema}.candidate_rollup
+        GROUP BY tier_classification;
+
+        CREATE OR REPLACE VIEW {schema}.candidate_rollup_sources AS
+        SELECT NULLIF(source_table, '') AS source_table, {breakdown}
+        FROM {schema}.candidate_rollup
+        GROUP BY source_table;
+
+        CREATE OR REPLACE VIEW {schema}.candidate_rollup_score_bands AS
+        SELECT score_band, {breakdown}
+        FROM {schema}.candidate_rollup
+        GROUP BY score_band;
+    """
+
+
+def refresh_rollups(db, schema: str = 'public', table: str = CANDIDATE_TABLE) -> Dict[str, Any]:
+    """Bring candidate_rollup in line with the candidate table; returns refresh stats."""
+    started = time.time()
+    key = ', '.join(CELL_COLUMNS)
+    same_cell = ' AND '.join(f"r.{c} = n.{c}" for c in CELL_COLUMNS)
+    measures = ', '.join(MEASURE_COLUMNS)
+
+    with db.cursor() as cur:
+        cur.execute(rollup_ddl(schema))
+        cur.execute(f"""
+            CREATE TEMP TABLE rollup_new ON COMMIT DROP AS
+            SELECT COALESCE(LEFT(postcode, 2), '') AS region,
+                   COALESCE(tier_classification, '') AS tier_classification,
+                   COALESCE(source_table, '') AS source_table,
+                   {score_band_sql()} AS score_band,
+                   website IS NOT NULL AS has_website,
+                   phone IS NOT NULL AS has_phone,
+                   email IS NOT NULL AS has_email,
+                   city IS NOT NULL AS has_city,
+                   COUNT(*) AS candidates,
+                   COUNT(aerospace_score) AS scored,
+                   SUM(aerospace_score) AS score_sum,
+                   MIN(aerospace_score) AS score_min,
+                   MAX(aerospace_score) AS score_max
+            FROM {schema}.{table}
+            GROUP BY 1, 2, 3, 4, 5, 6, 7, 8
+        """)
+        cur.execute(f"""
+            DELETE FROM {schema}.candidate_rollup r
+            WHERE NOT EXISTS (SELECT 1 FROM rollup_new n WHERE {same_cell})
+        """)
+        deleted = cur.rowcount
+        cur.execute(f"SELECT COUNT(*) FROM {schema}.candidate_rollup")
+        existing = cur.fetchone()[0]
+        cur.execute(f"""
+            INSERT INTO {schema}.candidate_rollup AS r ({key}, {measures})
+            SELECT {key}, {measures} FROM rollup_new
+            ON CONFLICT ({key}) DO UPDATE SET
+                {', '.join(f'{c} = EXCLUDED.{c}' for c in MEASURE_COLUMNS)}
+            WHERE ({', '.join(f'r.{c}' for c in MEASURE_COLUMNS)})
+                IS DISTINCT FROM ({', '.join(f'EXCLUDED.{c}' for c in MEASURE_COLUMNS)})
+        """)
+        written = cur.rowcount
+        cur.execute(f"SELECT COUNT(*), COALESCE(SUM(candidates), 0) FROM {schema}.candidate_rollup")
+        cells, candidates = cur.fetchone()
+        inserted = cells - existing
+        stats = {
+            'candidates': int(candidates), 'cells': cells, 'cells_inserted': inserted,
+            'cells_updated': written - inserted, 'cells_deleted': deleted,
+            'seconds': round(time.time() - started, 3),
+        }
+        cur.execute(f"""
+            INSERT INTO {schema}.candidate_rollup_refreshes
+                (candidates, cells, cells_inserted, cells_updated, cells_deleted, seconds)
+            VALUES (%(candidates)s, %(cells)s, %(cells_inserted)s, %(cells_updated)s, %(cells_deleted)s, %(seconds)s)
+        """, stats)
+
+    logging.debug(f"Rollup refresh: {stats}")
+    return stats
+
+
+def rollups_exist(db, schema: str = 'public') -> bool:
+    return db.fetch_scalar("SELECT to_regclass(%s) IS NOT NULL", (f"{schema}.candidate_rollup",))
@@ -0,0 +1,169 @@
+"""
+UK OSM Data Processor - Scenario Sweep
+
+Evaluates many candidate-filter scenarios against one fetch:
+  envelope_params()  the loosest candidate_query() parameters covering
+                     every scenario, so one query returns the union of
+                     their candidates
+  ScenarioSweep      holds that union in memory (sorted by score) and
+                     evaluates each scenario's parameters with boolean
+                     masks; masks for list and keyword filters are cached,
+                     so a scenario costs a few array ANDs
+  parameter_grid()   the cartesian product of criteria values, in the
+                     scenario format compare_scenarios() takes
+
+Scenario parameters are the criteria_params() dicts of
+integrated_aerospace_system.py and follow candidate_query()'s semantics,
+including max_results keeping the highest-scoring rows. Known suppliers
+count as found under the registry rule of known_suppliers.check_coverage()
+(AliasMatcher), the same rule CoverageSummary and check_coverage.py use.
+"""
+
+import itertools
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from known_suppliers import AliasMatcher
+
+# Candidate columns the masks need
+SWEEP_COLUMNS = ['name', 'aerospace_score', 'tier_classification', 'postcode', 'website',
+                 'landuse_type', 'building_type', 'source_table']
+
+INDUSTRIAL_BUILDINGS = ('industrial', 'warehouse', 'factory')
+REQUIRE_FLAGS = ('require_name', 'require_postcode', 'require_website',
+                 'require_industrial_landuse', 'require_industrial_building')
+TIER_COLUMNS = {'tier1_candidate': 'tier1_count', 'tier2_candidate': 'tier2_count',
+                'potential_candidate': 'potential_count'}
+
+
+def envelope_params(param_sets: List[Dict]) -> Dict:
+    """candidate_query() parameters whose result contains every scenario's.
+
+    Score bounds widen to the extremes, tier/source lists to their union,
+    and a require_* flag or area/keyword filter is only pushed down when
+    every scenario applies it identically.
+    """
+    first = param_sets[0]
+    envelope = {
+        'min_score': min(p['min_score'] for p in param_sets),
+        'max_score': max(p['max_score'] for p in param_sets),
+        'max_results': None,
+    }
+    for key in ('tiers', 'source_tables'):
+        values = [p[key] for p in param_sets]
+        envelope[key] = None if any(v is None for v in values) else sorted(set().union(*values))
+    for key in REQUIRE_FLAGS:
+        envelope[key] = all(p[key] for p in param_sets)
+    for key in ('postcode_areas', 'exclude_postcode_areas', 'exclude_pattern', 'required_pattern'):
+        envelope[key] = first[key] if all(p[key] == first[key] for p in param_sets) else None
+    return envelope
+
+
+def parameter_grid(axes: Dict[str, List[Any]]) -> List[Dict]:
+    """Scenarios for every combination of the criteria values in `axes`."""
+    keys = list(axes)
+    scenarios = []
+    for values in itertools.product(*(axes[k] for k in keys)):
+        criteria = dict(zip(keys, values))
+        name = ', '.join(f"{k}={v}" for k, v in criteria.items())
+        scenarios.append({'name': name, 'criteria': criteria})
+    return scenarios
+
+
+class ScenarioSweep:
+    """In-memory evaluation of filter scenarios over one candidate set."""
+
+    def __init__(self, candidates: pd.DataFrame, known_suppliers: List[Dict]):
+        frame = candidates.sort_values('aerospace_score', ascending=False, kind='stable')
+        frame = frame.reset_index(drop=True)
+        self.size = len(frame)
+        self.score = frame['aerospace_score'].to_numpy()
+        name = frame['name']
+        self.name = name
+        self.has_name = (name.notna() & (name != '')).to_numpy()
+        self.name_present = name.notna().to_numpy()
+        self.has_postcode = frame['postcode'].notna().to_numpy()
+        self.has_website = frame['website'].notna().to_numpy()
+        self.industrial_landuse = (frame['landuse_type'] == 'industrial').to_numpy()
+        self.industrial_building = frame['building_type'].isin(INDUSTRIAL_BUILDINGS).to_numpy()
+        self.columns = {
+            'tier': frame['tier_classification'],
+            'area': frame['postcode'].str[:2],
+            'source': frame['source_table'],
+        }
+        self.tier_codes, self.tier_labels = pd.factorize(frame['tier_classification'])
+        self._masks: Dict[tuple, np.ndarray] = {}
+
+        self.suppliers = [s['name'] for s in known_suppliers]
+        matcher = AliasMatcher(name.tolist())
+        self.supplier_matches = np.zeros((len(known_suppliers), self.size), dtype=bool)
+        for i, supplier in enumerate(known_suppliers):
+            self.supplier_matches[i] = matcher.supplier_mask(supplier)
+
+    def _isin(self, column: str, values: List[str]) -> np.ndarray:
+        key = (column, tuple(values))
+        if key not in self._masks:
+            self._masks[key] = self.columns[column].isin(values).to_numpy()
+        return self._masks[key]
+
+    def _pattern(self, pattern: str) -> np.ndarray:
+        key = ('pattern', pattern)
+        if key not in self._masks:
+            self._masks[key] = self.name.str.contains(pattern, case=False, regex=True, na=False).to_numpy()
+        return self._masks[key]
+
+    def select(self, params: Dict) -> np.ndarray:
+        """Row positions (highest score first) a scenario's filter keeps."""
+        mask = (self.score >= params['min_score']) & (self.score <= params['max_score'])
+        if params['tiers']:
+            mask &= self._isin('tier', params['tiers'])
+        if params['require_name']:
+            mask &= self.has_name
+        if params['require_postcode']:
+            mask &= self.has_postcode
+        if params['require_website']:
+            mask &= self.has_website
+        if params['require_industrial_landuse']:
+            mask &= self.industrial_landuse
+        if params['require_industrial_building']:
+            mask &= self.industrial_building
+        if params['postcode_areas']:
+            mask &= self._isin('area', params['postcode_areas'])
+        if params['exclude_postcode_areas']:
+            mask &= ~self.has_postcode | ~self._isin('area', params['exclude_postcode_areas'])
+        if params['exclude_pattern']:
+            # name !~* pattern is NULL (row dropped) for a NULL name
+            mask &= self.name_present & ~self._pattern(params['exclude_pattern'])
+        if params['required_pattern']:
+            mask &= self._pattern(params['required_pattern'])
+        if params['source_tables']:
+            mask &= self._isin('source', params['source_tables'])
+        selected = np.flatnonzero(mask)
+        if params.get('max_results'):
+            selected = selected[:params['max_results']]
+        return selected
+
+    def evaluate(self, params: Dict) -> Dict:
+        selected = self.select(params)
+        codes = self.tier_codes[selected]
+        tiers = np.bincount(codes[codes >= 0], minlength=len(self.tier_labels))
+        found = self.supplier_matches[:, selected].any(axis=1)
+        result = {
+            'total_candidates': len(selected),
+            'coverage_pct': 100.0 * found.sum() / len(self.suppliers) if self.suppliers else 0.0,
+            'known_found': int(found.sum()),
+        }
+        for tier, column in TIER_COLUMNS.items():
+            position = self.tier_labels.get_indexer([tier])[0]
+            result[column] = int(tiers[position]) if position >= 0 else 0
+        result['with_website'] = int(self.has_website[selected].sum())
+        result['found'] = [s for s, hit in zip(self.suppliers, found) if hit]
+        return result
+
+    def run(self, scenarios: List[Dict], names: Optional[List[str]] = None) -> pd.DataFrame:
+        """One result row per scenario parameter set."""
+        names = names or [f"scenario_{i}" for i in range(1, len(scenarios) + 1)]
+        rows = [{'scenario': name, **self.evaluate(params)} for name, params in zip(names, scenarios)]
+        return pd.DataFrame(rows)
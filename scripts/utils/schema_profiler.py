@@ -0,0 +1,281 @@
+"""
+UK OSM Data Processor - Schema Profiler
+
+Per-column profile (mode, null fraction, distinct estimate, top-k values)
+for tables and the views built on them, without scanning anything twice:
+  - an analyzed base table is read straight from pg_stats (no scan)
+  - otherwise each base table is sampled once with TABLESAMPLE into a
+    temporary table, and views are profiled by re-creating them as
+    temporary views over those samples (the *_filtered / *_scored views
+    are never evaluated over the full tables)
+  - every column of a relation is profiled by one GROUP BY over the
+    unpivoted sample rows
+  - distinct counts are scaled from the sample with the Haas-Stokes
+    (Duj1) estimator, the one ANALYZE uses
+
+Geometry and binary columns get a null fraction and distinct estimate but
+no mode or top values; pg_stats keeps no common values for (nearly)
+unique columns, so those have no mode either.
+"""
+
+import re
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+SAMPLE_METHODS = ('system', 'bernoulli')
+OPAQUE_TYPES = ('geometry', 'geography', 'raster', 'bytea')
+SAMPLE_PREFIX = 'profile_'
+
+# What can follow a FROM / JOIN item when it has no alias
+ALIAS_RE = re.compile(r'\s+(AS\s+)?"?(\w+)', re.IGNORECASE)
+FROM_KEYWORDS = {'where', 'join', 'inner', 'left', 'right', 'full', 'cross', 'natural', 'on', 'using',
+                 'group', 'having', 'window', 'order', 'limit', 'offset', 'fetch', 'for',
+                 'union', 'intersect', 'except', 'tablesample', 'with'}
+
+
+@dataclass
+class ColumnProfile:
+    table_name: str
+    column_name: str
+    data_type: str
+    mode_value: Optional[str] = None
+    mode_frac: Optional[float] = None
+    null_frac: Optional[float] = None
+    n_distinct: Optional[int] = None
+    top_values: List[str] = field(default_factory=list)
+    top_fracs: List[float] = field(default_factory=list)
+    source: str = 'sample'
+
+
+def estimate_distinct(sampled: int, distinct: int, singletons: int, total: float) -> int:
+    """Haas-Stokes Duj1 estimate of the distinct values in `total` rows."""
+    if sampled <= 0 or distinct == 0:
+        return 0
+    if total <= sampled:
+        return distinct
+    if singletons >= sampled:
+        # Every sampled value is unique: assume the column is too
+        return int(round(total))
+    estimate = sampled * distinct / (sampled - singletons + singletons * sampled / total)
+    return int(round(min(max(estimate, distinct), total)))
+
+
+def rewrite_relation(definition: str, schema: str, relation: str, replacement: str) -> str:
+    """Point the FROM / JOIN references to `relation` in a view definition at `replacement`.
+
+    An unaliased reference keeps the relation's name as its alias:
+    pg_get_viewdef on PostgreSQL <= 15 qualifies columns even in
+    single-table views (planet_osm_polygon.osm_id), which must still resolve.
+    """
+    pattern = (r'\b(FROM|JOIN)(\s+)(?:"?' + re.escape(schema) + r'"?\.)?"?'
+               + re.escape(relation) + r'"?(?=[\s;),]|$)')
+
+    def replace(m: re.Match) -> str:
+        alias = ALIAS_RE.match(definition, m.end())
+        if alias and (alias.group(1) or alias.group(2).lower() not in FROM_KEYWORDS):
+            return f'{m.group(1)}{m.group(2)}{replacement}'
+        return f'{m.group(1)}{m.group(2)}{replacement} AS "{relation}"'
+
+    return re.sub(pattern, replace, definition, flags=re.IGNORECASE)
+
+
+class SchemaProfiler:
+    """Profiles relations in one schema over a single connection."""
+
+    def __init__(self, conn, schema: str = 'public', sample_rows: int = 10000,
+                 method: str = 'system', top: int = 5, use_stats: bool = True, seed: int = 42):
+        if method not in SAMPLE_METHODS:
+            raise ValueError(f"Unknown sample method {method!r}; expected one of {SAMPLE_METHODS}")
+        self.conn = conn
+        self.schema = schema
+        self.sample_rows = sample_rows
+        self.method = method
+        self.top = top
+        self.use_stats = use_stats
+        self.seed = seed
+        # relation -> (temp relation holding/deriving its sample, sampling fraction)
+        self._samples: Dict[str, tuple] = {}
+        self._temp_tables: List[str] = []
+
+    def _fetch(self, sql: str, params=None) -> List[tuple]:
+        with self.conn.cursor() as cur:
+            cur.execute(sql, params)
+            return cur.fetchall() if cur.description else []
+
+    def relation_kind(self, name: str) -> Optional[str]:
+        rows = self._fetch("""
+            SELECT c.relkind FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = %s AND c.relname = %s
+        """, (self.schema, name))
+        return rows[0][0] if rows else None
+
+    def columns(self, name: str) -> List[tuple]:
+        return self._fetch("""
+            SELECT column_name, data_type, udt_name FROM information_schema.columns
+            WHERE table_schema = %s AND table_name = %s
+            ORDER BY ordinal_position
+        """, (self.schema, name))
+
+    def row_estimate(self, name: str) -> float:
+        rows = self._fetch(f"SELECT reltuples FROM pg_class WHERE oid = '{self.schema}.{name}'::regclass")
+        return float(rows[0][0]) if rows else -1.0
+
+    # ---- pg_stats ----------------------------------------------------------
+
+    def from_stats(self, name: str, columns: List[tuple]) -> Optional[List[ColumnProfile]]:
+        """Profiles from pg_stats, or None unless every column has been analyzed."""
+        rows = self._fetch("""
+            SELECT attname, null_frac, n_distinct,
+                   most_common_vals::text::text[], most_common_freqs
+            FROM pg_stats WHERE schemaname = %s AND tablename = %s
+        """, (self.schema, name))
+        stats = {r[0]: r[1:] for r in rows}
+        if not columns or any(col not in stats for col, _, _ in columns):
+            return None
+        total = max(self.row_estimate(name), 0)
+        profiles = []
+        for col, data_type, udt in columns:
+            null_frac, n_distinct, values, freqs = stats[col]
+            # Negative n_distinct is a fraction of the row count
+            distinct = -n_distinct * total * (1 - null_frac) if n_distinct < 0 else n_distinct
+            profile = ColumnProfile(name, col, data_type, null_frac=float(null_frac),
+                                    n_distinct=int(round(distinct)), source='pg_stats')
+            if values and udt not in OPAQUE_TYPES:
+                profile.top_values = list(values[:self.top])
+                profile.top_fracs = [float(f) for f in freqs[:self.top]]
+                profile.mode_value, profile.mode_frac = profile.top_values[0], profile.top_fracs[0]
+            profiles.append(profile)
+        return profiles
+
+    # ---- sampling ----------------------------------------------------------
+
+    def sample(self, name: str) -> tuple:
+        """Temporary relation holding `name`'s sample, and the fraction of rows it covers."""
+        if name in self._samples:
+            return self._samples[name]
+        kind = self.relation_kind(name)
+        if kind in ('v',):
+            result = self._sample_view(name)
+        elif kind in ('r', 'p', 'm'):
+            result = self._sample_table(name)
+        else:
+            raise ValueError(f"{self.schema}.{name} is not a table or view")
+        self._samples[name] = result
+        return result
+
+    def _sample_table(self, name: str) -> tuple:
+        temp = f"{SAMPLE_PREFIX}{name}"[:63]
+        total = self.row_estimate(name)
+        source = f'{self.schema}."{name}"'
+        if total < 0:
+            # Never analyzed: size the table from a 1% block sample instead of counting it
+            total = self._fetch(f"SELECT COUNT(*) * 100 FROM {source} TABLESAMPLE SYSTEM (1)")[0][0]
+        if total <= self.sample_rows:
+            clause = ''
+        else:
+            # Oversample a little so the LIMIT, not the block lottery, sets the size
+            percent = min(100.0, 150.0 * self.sample_rows / total)
+            clause = f"TABLESAMPLE {self.method.upper()} ({percent:.6f}) REPEATABLE ({self.seed})"
+        with self.conn.cursor() as cur:
+            cur.execute(f'DROP TABLE IF EXISTS pg_temp."{temp}" CASCADE')
+            cur.execute(f'CREATE TEMP TABLE "{temp}" AS SELECT * FROM {source} {clause} LIMIT {int(self.sample_rows)}')
+            sampled = cur.rowcount
+        self._temp_tables.append(temp)
+        if not clause:
+            total = sampled
+        fraction = 1.0 if total <= 0 else min(1.0, sampled / total)
+        logging.debug(f"Sampled {sampled:,} of ~{total:,.0f} rows from {name}")
+        return temp, fraction
+
+    def _sample_view(self, name: str) -> tuple:
+        """Re-create the view over the samples of the relations it reads."""
+        definition = self._fetch(f"SELECT pg_get_viewdef('{self.schema}.\"{name}\"'::regclass)")[0][0]
+        referenced = self._fetch("""
+            SELECT DISTINCT c.relname
+            FROM pg_rewrite r
+            JOIN pg_depend d ON d.classid = 'pg_rewrite'::regclass AND d.objid = r.oid
+                            AND d.refclassid = 'pg_class'::regclass
+            JOIN pg_class c ON c.oid = d.refobjid
+            WHERE r.ev_class = %s::regclass AND d.refobjid <> r.ev_class
+        """, (f'{self.schema}."{name}"',))
+        fractions = []
+        for (relation,) in referenced:
+            temp, fraction = self.sample(relation)
+            fractions.append(fraction)
+            definition = rewrite_relation(definition, self.schema, relation, f'pg_temp."{temp}"')
+        temp = f"{SAMPLE_PREFIX}{name}"[:63]
+        with self.conn.cursor() as cur:
+            cur.execute(f'CREATE OR REPLACE TEMP VIEW "{temp}" AS {definition.rstrip().rstrip(";")}')
+        # A join of several samples covers roughly the product of their fractions
+        fraction = 1.0
+        for f in fractions:
+            fraction *= f
+        return temp, fraction
+
+    def from_sample(self, name: str, columns: List[tuple]) -> List[ColumnProfile]:
+        temp, fraction = self.sample(name)
+        cells = ', '.join(
+            f"({i}, md5(s.\"{col}\"::text))" if udt in OPAQUE_TYPES else f"({i}, s.\"{col}\"::text)"
+            for i, (col, _, udt) in enumerate(columns)
+        )
+        rows = self._fetch(f"""
+            WITH freq AS (
+                SELECT c.ord, c.val, COUNT(*) AS n
+                FROM pg_temp."{temp}" s
+                CROSS JOIN LATERAL (VALUES {cells}) c(ord, val)
+                GROUP BY c.ord, c.val
+            )
+            SELECT ord,
+                   SUM(n)::bigint AS sampled,
+                   COALESCE(SUM(n) FILTER (WHERE val IS NULL), 0)::bigint AS nulls,
+                   COUNT(val) AS distinct_values,
+                   COUNT(*) FILTER (WHERE n = 1 AND val IS NOT NULL) AS singletons,
+                   (array_agg(val ORDER BY n DESC, val) FILTER (WHERE val IS NOT NULL))[1:{int(self.top)}],
+                   (array_agg(n ORDER BY n DESC, val) FILTER (WHERE val IS NOT NULL))[1:{int(self.top)}]
+            FROM freq
+            GROUP BY ord
+        """)
+        by_ord = {r[0]: r[1:] for r in rows}
+        profiles = []
+        for i, (col, data_type, udt) in enumerate(columns):
+            profile = ColumnProfile(name, col, data_type)
+            if i in by_ord:
+                sampled, nulls, distinct, singletons, values, counts = by_ord[i]
+                non_null = sampled - nulls
+                total = non_null / fraction if fraction > 0 else non_null
+                profile.null_frac = nulls / sampled
+                profile.n_distinct = estimate_distinct(non_null, distinct, singletons, total)
+                if values and udt not in OPAQUE_TYPES:
+                    profile.top_values = list(values)
+                    profile.top_fracs = [n / sampled for n in counts]
+                    profile.mode_value, profile.mode_frac = values[0], profile.top_fracs[0]
+            profiles.append(profile)
+        return profiles
+
+    # ---- entry points ------------------------------------------------------
+
+    def profile(self, name: str) -> List[ColumnProfile]:
+        started = time.time()
+        columns = self.columns(name)
+        profiles = None
+        if self.use_stats and self.relation_kind(name) in ('r', 'p', 'm'):
+            profiles = self.from_stats(name, columns)
+        if profiles is None:
+            profiles = self.from_sample(name, columns)
+        logging.info(f"  {name}: {len(profiles)} columns from {profiles[0].source if profiles else '-'} "
+                     f"in {time.time() - started:.2f}s")
+        return profiles
+
+    def close(self) -> None:
+        """Drop the temporary samples (and the views built on them)."""
+        try:
+            with self.conn.cursor() as cur:
+                for temp in self._temp_tables:
+                    cur.execute(f'DROP TABLE IF EXISTS pg_temp."{temp}" CASCADE')
+        except Exception as e:
+            # An aborted transaction rolls the samples back anyway
+            logging.debug(f"Could not drop profile samples: {e}")
+        self._temp_tables.clear()
+        self._samples.clear()
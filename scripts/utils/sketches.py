@@ -0,0 +1,133 @@
+"""
+UK OSM Data Processor - Streaming Frequency Sketches
+
+Bounded-memory summaries used when profiling the full PBF:
+  SpaceSaving     - heavy hitters / top-k with per-item overestimate bounds
+  CountMinSketch  - point frequency estimates for arbitrary items
+
+Both are mergeable so per-worker results can be combined in the parent.
+"""
+
+import hashlib
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+class SpaceSaving:
+    """Top-k frequency summary holding at most ~2x `capacity` counters.
+
+    Counters are compacted in batches: once the table reaches twice the
+    capacity only the `capacity` largest are kept and the largest dropped
+    count becomes the floor that new items start from. Every reported count
+    overestimates the true count by at most its recorded error.
+    """
+
+    def __init__(self, capacity: int = 100):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self.counts: Dict[Hashable, int] = {}
+        self.errors: Dict[Hashable, int] = {}
+        self.floor = 0
+        self.total = 0
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self.counts
+
+    def add(self, item: Hashable, count: int = 1) -> Optional[List[Hashable]]:
+        """Count `item`; returns the items evicted by compaction, if any."""
+        self.total += count
+        if item in self.counts:
+            self.counts[item] += count
+            return None
+        self.counts[item] = self.floor + count
+        self.errors[item] = self.floor
+        if self._full():
+            return self._compact()
+        return None
+
+    def _full(self) -> bool:
+        return len(self.counts) >= 2 * self.capacity
+
+    def _compact(self) -> List[Hashable]:
+        ranked = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)
+        evicted = [item for item, _ in ranked[self.capacity:]]
+        if evicted:
+            self.floor = max(self.floor, ranked[self.capacity][1])
+        for item in evicted:
+            del self.counts[item]
+            del self.errors[item]
+        return evicted
+
+    def count(self, item: Hashable) -> int:
+        """Upper bound on the frequency of `item`."""
+        return self.counts.get(item, self.floor)
+
+    def error(self, item: Hashable) -> int:
+        return self.errors.get(item, self.floor)
+
+    def top(self, k: Optional[int] = None) -> List[Tuple[Hashable, int]]:
+        ranked = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)
+        return ranked[:k] if k is not None else ranked
+
+    def merge(self, other: "SpaceSaving") -> List[Hashable]:
+        """Fold another summary into this one; returns evicted items.
+
+        Compacts on the same 2x-capacity rule as add(), so a merged summary
+        keeps the same counters (and error bounds) as one built directly.
+        """
+        for item in set(self.counts) | set(other.counts):
+            mine = self.counts.get(item)
+            theirs = other.counts.get(item)
+            self.counts[item] = (mine if mine is not None else self.floor) + \
+                (theirs if theirs is not None else other.floor)
+            self.errors[item] = self.errors.get(item, self.floor) + \
+                other.errors.get(item, other.floor)
+        self.floor += other.floor
+        self.total += other.total
+        if self._full():
+            return self._compact()
+        return []
+
+
+class CountMinSketch:
+    """Count-min sketch with deterministic blake2b row hashes.
+
+    Rows use Kirsch-Mitzenmacher double hashing (h1 + row * h2) over the
+    two 64-bit halves of one blake2b digest, so a collision in one row
+    says nothing about the others. Hashes do not depend on PYTHONHASHSEED,
+    so sketches built in separate worker processes with the same
+    width/depth can be merged.
+    """
+
+    def __init__(self, width: int = 1 << 16, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.table = [[0] * width for _ in range(depth)]
+        self.total = 0
+
+    def _indexes(self, item: str):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for row in range(self.depth):
+            yield row, (h1 + row * h2) % self.width
+
+    def add(self, item: str, count: int = 1) -> None:
+        self.total += count
+        for row, col in self._indexes(item):
+            self.table[row][col] += count
+
+    def estimate(self, item: str) -> int:
+        return min(self.table[row][col] for row, col in self._indexes(item))
+
+    def merge(self, other: "CountMinSketch") -> None:
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("Cannot merge sketches of different shape")
+        for mine, theirs in zip(self.table, other.table):
+            for col, value in enumerate(theirs):
+                if value:
+                    mine[col] += value
+        self.total += other.total
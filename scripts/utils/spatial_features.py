@@ -0,0 +1,423 @@
+"""
+UK OSM Data Processor - Spatial Proximity Features
+
+Distance-based geographic features for the candidate table, so features
+without a postcode still get geographic credit:
+  aerospace_reference_sites  airfields (aeroway=aerodrome / runway from
+                             planet_osm_polygon, _point and _line) and
+                             prime contractor sites (OSM industrial sites
+                             whose name/operator matches scoring.yaml
+                             tier1_companies.prime_contractors, plus active
+                             known_suppliers with coordinates), in EPSG:27700
+                             with a GiST index per kind
+  candidate columns          airfield_distance_m / nearest_airfield,
+                             oem_distance_m / nearest_oem_site (GiST KNN,
+                             <->), cluster_density (tier 1/2 candidates
+                             within the cluster radius, ST_DWithin) and
+                             proximity_score from the scoring.yaml
+                             spatial_proximity bands
+
+All candidates are featurized by one UPDATE joining a temporary table of
+their points (one ST_Transform each) to the sites with LATERAL nearest-
+neighbour probes. apply_proximity_score() adds the proximity points over
+the postcode-cluster bonus the pipelines already gave, from a base_score
+kept on first application, so re-running the stage does not compound.
+
+The pipelines only keep scored-view rows at the potential_candidate
+threshold, so a feature without a postcode that proximity would lift over
+it never reaches the table. admit_scored_views() featurizes the
+07_pipeline_* scored-view rows within reach of the threshold that are not
+candidates yet and inserts the ones whose proximity points carry them over.
+"""
+
+import time
+from typing import Any, Dict, List, Tuple
+
+import yaml
+
+from text_scanner import load_scoring_patterns
+
+SITES_TABLE = 'aerospace_reference_sites'
+BNG_SRID = 27700
+
+# 07_pipeline_* sources in create-final-table priority order; each has a
+# {source}_aerospace_scored view
+SCORED_VIEW_SOURCES = ('planet_osm_polygon', 'planet_osm_point', 'planet_osm_line', 'planet_osm_roads')
+
+# Classification columns and matched_keywords as each 07_pipeline_* staging
+# insert fills them from its scored view (v)
+STAGING_COLUMNS = {
+    'planet_osm_polygon': {
+        'building_type': 'v.building',
+        'industrial_type': "COALESCE(v.industrial, v.tags->'craft')",
+        'office_type': 'v.office',
+        'keyword_text': "COALESCE(v.name, '') || ' ' || COALESCE(v.operator, '') || ' ' || COALESCE(v.tags::text, '')",
+        'keywords': ('aerospace', 'aviation', 'aircraft', 'defense', 'defence',
+                     'precision', 'engineering', 'manufacturing', 'industrial'),
+    },
+    'planet_osm_point': {
+        'building_type': 'NULL',
+        'industrial_type': "v.tags->'craft'",
+        'office_type': 'v.office',
+        'keyword_text': "COALESCE(v.name, '') || ' ' || COALESCE(v.tags::text, '')",
+        'keywords': ('aerospace', 'aviation', 'aircraft', 'defense', 'precision', 'engineering', 'manufacturing'),
+    },
+    'planet_osm_line': {
+        'building_type': 'v.building',
+        'industrial_type': 'v.industrial',
+        'office_type': 'v.office',
+        'keyword_text': "COALESCE(v.name, '') || ' ' || COALESCE(v.tags::text, '')",
+        'keywords': ('aerospace', 'aviation', 'aircraft', 'runway', 'aeroway', 'industrial', 'manufacturing'),
+    },
+    'planet_osm_roads': {
+        'building_type': 'v.building',
+        'industrial_type': 'v.industrial',
+        'office_type': 'NULL',
+        'keyword_text': "COALESCE(v.name, '') || ' ' || COALESCE(v.tags::text, '')",
+        'keywords': ('aerospace', 'aviation', 'aircraft', 'industrial', 'business park', 'technology', 'aeroway'),
+    },
+}
+
+# Mirrors the "UK AEROSPACE CLUSTERS" bonus in the 07_pipeline_* scored views;
+# only the point and polygon views give it
+CLUSTER_POSTCODE_PATTERN = '^(BA|BS|GL|DE|PR|YO|CB|RG|SL|BH|SO)'
+POSTCODE_BONUS_SOURCES = ('planet_osm_point', 'planet_osm_polygon')
+
+OEM_SITE_CONDITION = """(landuse = 'industrial'
+       OR building IN ('industrial', 'factory', 'warehouse', 'hangar')
+       OR man_made IN ('works', 'factory')
+       OR aeroway IS NOT NULL)"""
+
+FEATURE_COLUMNS = {
+    'airfield_distance_m': 'DOUBLE PRECISION',
+    'nearest_airfield': 'TEXT',
+    'oem_distance_m': 'DOUBLE PRECISION',
+    'nearest_oem_site': 'TEXT',
+    'cluster_density': 'INTEGER',
+    'proximity_score': 'INTEGER',
+    'base_score': 'INTEGER',
+}
+
+
+def load_spatial_config(scoring_path: str = 'scoring.yaml') -> Dict[str, Any]:
+    """spatial_proximity bands, tier thresholds and the prime contractor pattern."""
+    with open(scoring_path, 'r') as f:
+        scoring = yaml.safe_load(f)
+    if 'spatial_proximity' not in scoring:
+        raise ValueError(f"{scoring_path} has no spatial_proximity section")
+    primes = load_scoring_patterns(scoring_path, 'tier1_companies').get('prime_contractors', [])
+    return {
+        'proximity': scoring['spatial_proximity'],
+        'thresholds': scoring.get('thresholds') or {},
+        'oem_pattern': '|'.join(f'({p})' for p in primes) or None,
+    }
+
+
+def band_points(column: str, bands: List[Dict], bound: str, scale: float = 1.0, op: str = '<=') -> str:
+    """CASE giving the points of the first band `column` falls in (0 if none)."""
+    cases = ' '.join(f"WHEN {column} {op} {float(band[bound]) * scale} THEN {int(band['points'])}"
+                     for band in bands)
+    return f"(CASE {cases} ELSE 0 END)" if bands else "0"
+
+
+def proximity_score_sql(proximity: Dict[str, Any], prefix: str = '') -> str:
+    """Capped sum of the airfield, OEM site and cluster band points."""
+    cluster = proximity.get('cluster') or {}
+    total = ' + '.join([
+        band_points(f'{prefix}airfield_distance_m', proximity.get('airfield') or [], 'within_km', 1000),
+        band_points(f'{prefix}oem_distance_m', proximity.get('oem_site') or [], 'within_km', 1000),
+        band_points(f'{prefix}cluster_density', cluster.get('bands') or [], 'min_neighbours', op='>='),
+    ])
+    return f"LEAST({total}, {int(proximity.get('max_points', 1000))})"
+
+
+def max_proximity_points(proximity: Dict[str, Any]) -> int:
+    """Most points any feature can get from the bands (after the cap)."""
+    cluster = proximity.get('cluster') or {}
+    best = sum(max((int(band['points']) for band in bands), default=0)
+               for bands in (proximity.get('airfield') or [], proximity.get('oem_site') or [],
+                             cluster.get('bands') or []))
+    return min(best, int(proximity.get('max_points', 1000)))
+
+
+def tier_sql(score: str, thresholds: Dict[str, int]) -> Tuple[str, str]:
+    """tier_classification and confidence_level CASEs for a score, as in the pipelines."""
+    tier1 = int(thresholds.get('tier1_candidate', 150))
+    tier2 = int(thresholds.get('tier2_candidate', 80))
+    potential = int(thresholds.get('potential_candidate', 40))
+    tier = f"""CASE
+                    WHEN {score} >= {tier1} THEN 'tier1_candidate'
+                    WHEN {score} >= {tier2} THEN 'tier2_candidate'
+                    WHEN {score} >= {potential} THEN 'potential_candidate'
+                    ELSE 'low_probability' END"""
+    confidence = f"""CASE
+                    WHEN {score} >= 150 THEN 'high'
+                    WHEN {score} >= 100 THEN 'medium-high'
+                    WHEN {score} >= 70 THEN 'medium'
+                    ELSE 'low' END"""
+    return tier, confidence
+
+
+def proximity_gain_sql(proximity: Dict[str, Any], prefix: str = '') -> str:
+    """Points proximity adds on top of the pipeline score (less the postcode-cluster bonus).
+
+    The bonus is only deducted for sources whose scored view gave it.
+    """
+    postcode_bonus = int(proximity.get('postcode_bonus', 20))
+    sources = ', '.join(f"'{source}'" for source in POSTCODE_BONUS_SOURCES)
+    return (f"GREATEST(COALESCE({prefix}proximity_score, 0) - CASE WHEN {prefix}postcode ~ %(cluster_postcode)s "
+            f"AND {prefix}source_table IN ({sources}) THEN {postcode_bonus} ELSE 0 END, 0)")
+
+
+def _create_strong_points(cur, relation: str, tier_threshold: int) -> None:
+    """Temp table of tier 1/2 candidate points, indexed for the cluster ST_DWithin."""
+    cur.execute(f"""
+        CREATE TEMP TABLE strong_points ON COMMIT DROP AS
+        SELECT id, ST_Transform(ST_PointOnSurface(geometry), {BNG_SRID}) AS pt
+        FROM {relation}
+        WHERE geometry IS NOT NULL AND NOT ST_IsEmpty(geometry)
+          AND COALESCE(base_score, aerospace_score) >= %s
+    """, (tier_threshold,))
+    cur.execute("CREATE INDEX ON strong_points USING GIST (pt)")
+    cur.execute("ANALYZE strong_points")
+
+
+def _features_sql(points: str, sites: str) -> str:
+    """Nearest airfield / OEM site and cluster density for each (id, pt) of `points`.
+
+    Needs strong_points and a %(radius_m)s parameter.
+    """
+    return f"""
+                SELECT p.id, a.distance AS airfield_distance_m, a.name AS airfield,
+                       o.distance AS oem_distance_m, o.name AS oem, d.n AS cluster_density
+                FROM {points} p
+                LEFT JOIN LATERAL (
+                    SELECT s.name, ST_Distance(s.geom, p.pt) AS distance
+                    FROM {sites} s WHERE s.kind = 'airfield'
+                    ORDER BY s.geom <-> p.pt LIMIT 1
+                ) a ON TRUE
+                LEFT JOIN LATERAL (
+                    SELECT s.name, ST_Distance(s.geom, p.pt) AS distance
+                    FROM {sites} s WHERE s.kind = 'oem'
+                    ORDER BY s.geom <-> p.pt LIMIT 1
+                ) o ON TRUE
+                CROSS JOIN LATERAL (
+                    SELECT COUNT(*)::integer AS n FROM strong_points q
+                    WHERE ST_DWithin(q.pt, p.pt, %(radius_m)s) AND q.id <> p.id
+                ) d"""
+
+
+def build_reference_sites(db, schema: str, oem_pattern: str = None, include_registry: bool = True) -> Dict[str, int]:
+    """(Re)create the airfield / OEM site table from planet_osm_* and the known supplier registry."""
+    sites = f"{schema}.{SITES_TABLE}"
+    parts = [
+        f"""SELECT 'airfield', osm_id, COALESCE(name, operator, aeroway), ST_Transform(way, {BNG_SRID})
+            FROM {schema}.planet_osm_polygon WHERE aeroway IN ('aerodrome', 'runway')""",
+        f"""SELECT 'airfield', osm_id, COALESCE(name, operator, aeroway), ST_Transform(way, {BNG_SRID})
+            FROM {schema}.planet_osm_point WHERE aeroway = 'aerodrome'""",
+        f"""SELECT 'airfield', osm_id, COALESCE(name, operator, aeroway), ST_Transform(way, {BNG_SRID})
+            FROM {schema}.planet_osm_line WHERE aeroway = 'runway'""",
+    ]
+    params = {}
+    if oem_pattern:
+        params['oem_pattern'] = oem_pattern
+        for table in ('planet_osm_polygon', 'planet_osm_point'):
+            parts.append(f"""SELECT 'oem', osm_id, COALESCE(name, operator), ST_Transform(way, {BNG_SRID})
+                FROM {schema}.{table}
+                WHERE (name ~* %(oem_pattern)s OR operator ~* %(oem_pattern)s)
+                  AND {OEM_SITE_CONDITION}""")
+
+    with db.cursor() as cur:
+        if include_registry:
+            cur.execute("SELECT to_regclass(%s) IS NOT NULL", (f"{schema}.known_suppliers",))
+            if cur.fetchone()[0]:
+                parts.append(f"""SELECT 'oem', NULL::bigint, name,
+                        ST_Transform(ST_SetSRID(ST_MakePoint(longitude, latitude), 4326), {BNG_SRID})
+                    FROM {schema}.known_suppliers
+                    WHERE active AND tier = 'prime' AND latitude IS NOT NULL AND longitude IS NOT NULL""")
+        cur.execute(f"DROP TABLE IF EXISTS {sites}")
+        cur.execute(f"""
+            CREATE TABLE {sites} (
+                site_id SERIAL PRIMARY KEY,
+                kind TEXT NOT NULL,
+                osm_id BIGINT,
+                name TEXT,
+                geom GEOMETRY(Geometry, {BNG_SRID}) NOT NULL
+            )
+        """)
+        cur.execute(f"INSERT INTO {sites} (kind, osm_id, name, geom) "
+                    + "\nUNION ALL\n".join(parts), params or None)
+        cur.execute(f"CREATE INDEX ON {sites} USING GIST (geom) WHERE kind = 'airfield'")
+        cur.execute(f"CREATE INDEX ON {sites} USING GIST (geom) WHERE kind = 'oem'")
+        cur.execute(f"ANALYZE {sites}")
+        cur.execute(f"SELECT kind, COUNT(*) FROM {sites} GROUP BY kind")
+        counts = dict(cur.fetchall())
+    return {'airfield': counts.get('airfield', 0), 'oem': counts.get('oem', 0)}
+
+
+def compute_features(db, schema: str, table: str, proximity: Dict[str, Any],
+                     tier_threshold: int = 80) -> Dict[str, Any]:
+    """Fill the proximity columns of every candidate in one bulk join."""
+    relation = f"{schema}.{table}"
+    sites = f"{schema}.{SITES_TABLE}"
+    radius_m = float((proximity.get('cluster') or {}).get('radius_km', 5)) * 1000
+    started = time.time()
+    with db.cursor() as cur:
+        cur.execute(f"ALTER TABLE {relation} "
+                    + ', '.join(f"ADD COLUMN IF NOT EXISTS {c} {t}" for c, t in FEATURE_COLUMNS.items()))
+        cur.execute(f"""
+            CREATE TEMP TABLE candidate_points ON COMMIT DROP AS
+            SELECT id, ST_Transform(ST_PointOnSurface(geometry), {BNG_SRID}) AS pt
+            FROM {relation}
+            WHERE geometry IS NOT NULL AND NOT ST_IsEmpty(geometry)
+        """)
+        located = cur.rowcount
+        _create_strong_points(cur, relation, tier_threshold)
+        cur.execute(f"""
+            UPDATE {relation} c SET
+                airfield_distance_m = f.airfield_distance_m,
+                nearest_airfield = f.airfield,
+                oem_distance_m = f.oem_distance_m,
+                nearest_oem_site = f.oem,
+                cluster_density = f.cluster_density,
+                proximity_score = {proximity_score_sql(proximity, 'f.')}
+            FROM ({_features_sql('candidate_points', sites)}
+            ) f
+            WHERE c.id = f.id
+        """, {'radius_m': radius_m})
+        cur.execute(f"""
+            SELECT COUNT(*) FILTER (WHERE airfield_distance_m <= 10000),
+                   COUNT(*) FILTER (WHERE oem_distance_m <= 20000),
+                   COUNT(*) FILTER (WHERE proximity_score > 0),
+                   COUNT(*) FILTER (WHERE proximity_score > 0 AND postcode IS NULL)
+            FROM {relation}
+        """)
+        near_airfield, near_oem, credited, credited_no_postcode = cur.fetchone()
+    return {
+        'located': located, 'near_airfield': near_airfield, 'near_oem': near_oem,
+        'credited': credited, 'credited_no_postcode': credited_no_postcode,
+        'seconds': round(time.time() - started, 2),
+    }
+
+
+def admit_scored_views(db, schema: str, table: str, proximity: Dict[str, Any],
+                       thresholds: Dict[str, int], tier_threshold: int = 80) -> Dict[str, Any]:
+    """Insert scored-view rows that proximity points lift over the candidate threshold.
+
+    Only rows within max_proximity_points() below potential_candidate that
+    score at least admit_min_base_score from their own tags (so location
+    alone never makes a candidate) and whose osm_id is not a candidate yet
+    (create_final_table de-duplicates on osm_id) are featurized. Admitted rows keep their view score in
+    base_score, so apply_proximity_score() leaves them as inserted.
+    """
+    relation = f"{schema}.{table}"
+    sites = f"{schema}.{SITES_TABLE}"
+    radius_m = float((proximity.get('cluster') or {}).get('radius_km', 5)) * 1000
+    potential = int(thresholds.get('potential_candidate', 40))
+    floor = max(potential - max_proximity_points(proximity), int(proximity.get('admit_min_base_score', 1)))
+    params = {'radius_m': radius_m, 'cluster_postcode': CLUSTER_POSTCODE_PATTERN,
+              'floor': floor, 'potential': potential}
+    tier, confidence = tier_sql('f.score', thresholds)
+    started = time.time()
+    admitted = {}
+    with db.cursor() as cur:
+        sources = []
+        for source in SCORED_VIEW_SOURCES:
+            cur.execute("SELECT to_regclass(%s) IS NOT NULL", (f"{schema}.{source}_aerospace_scored",))
+            if cur.fetchone()[0]:
+                sources.append(source)
+        if not sources or floor >= potential:
+            return {'featurized': 0, 'admitted': admitted, 'seconds': round(time.time() - started, 2)}
+
+        near = "\n                UNION ALL\n".join(f"""
+                SELECT {priority} AS priority, '{source}' AS source_table, v.osm_id,
+                       v.aerospace_score AS base_score, v."addr:postcode" AS postcode,
+                       ST_Transform(ST_PointOnSurface(v.way), {BNG_SRID}) AS pt
+                FROM {schema}.{source}_aerospace_scored v
+                WHERE v.aerospace_score >= %(floor)s AND v.aerospace_score < %(potential)s
+                  AND v.way IS NOT NULL AND NOT ST_IsEmpty(v.way)
+                  AND NOT EXISTS (SELECT 1 FROM {relation} c WHERE c.osm_id = v.osm_id)"""
+                for priority, source in enumerate(sources))
+        # Negative ids keep view rows apart from candidate ids in strong_points
+        cur.execute(f"""
+            CREATE TEMP TABLE view_points ON COMMIT DROP AS
+            SELECT -ROW_NUMBER() OVER () AS id, u.*
+            FROM (
+                SELECT DISTINCT ON (osm_id) * FROM ({near}
+                ) n ORDER BY osm_id, priority
+            ) u
+        """, params)
+        featurized = cur.rowcount
+        _create_strong_points(cur, relation, tier_threshold)
+        cur.execute(f"""
+            CREATE TEMP TABLE view_features ON COMMIT DROP AS
+            SELECT g.*, g.base_score + {proximity_gain_sql(proximity, 'g.')} AS score
+            FROM (
+                SELECT f.*, p.source_table, p.osm_id, p.base_score, p.postcode,
+                       {proximity_score_sql(proximity, 'f.')} AS proximity_score
+                FROM ({_features_sql('view_points', sites)}
+                ) f JOIN view_points p ON p.id = f.id
+            ) g
+        """, params)
+
+        for source in sources:
+            staging = STAGING_COLUMNS[source]
+            keywords = ', '.join(f"('{kw}')" for kw in staging['keywords'])
+            cur.execute(f"""
+                INSERT INTO {relation} (
+                  osm_id, source_table, name, operator, aerospace_score, tier_classification,
+                  confidence_level, phone, email, website, postcode, street_address, city,
+                  landuse_type, building_type, industrial_type, office_type, description,
+                  matched_keywords, tags_raw, way, latitude, longitude, geometry,
+                  airfield_distance_m, nearest_airfield, oem_distance_m, nearest_oem_site,
+                  cluster_density, proximity_score, base_score
+                )
+                SELECT
+                  v.osm_id, f.source_table, COALESCE(v.name, v.operator, v.tags->'brand'), v.operator,
+                  f.score, {tier},
+                  {confidence},
+                  v.tags->'phone', v.tags->'email', v.website, v."addr:postcode", v."addr:street",
+                  COALESCE(v."addr:city", v.tags->'addr:town'),
+                  v.landuse, {staging['building_type']}, {staging['industrial_type']}, {staging['office_type']},
+                  COALESCE(v.tags->'description', v.tags->'note'),
+                  ARRAY(
+                    SELECT kw FROM (VALUES {keywords}) AS t(kw)
+                    WHERE LOWER({staging['keyword_text']}) LIKE '%%' || kw || '%%'
+                  ),
+                  v.tags, v.way,
+                  ST_Y(ST_Centroid(v.way)), ST_X(ST_Centroid(v.way)), v.way::geometry,
+                  f.airfield_distance_m, f.airfield, f.oem_distance_m, f.oem,
+                  f.cluster_density, f.proximity_score, f.base_score
+                FROM view_features f
+                JOIN {schema}.{source}_aerospace_scored v ON v.osm_id = f.osm_id
+                WHERE f.source_table = %(source)s AND f.score >= %(potential)s
+            """, {**params, 'source': source})
+            admitted[source] = cur.rowcount
+    return {'featurized': featurized, 'admitted': admitted, 'seconds': round(time.time() - started, 2)}
+
+
+def apply_proximity_score(db, schema: str, table: str, proximity: Dict[str, Any],
+                          thresholds: Dict[str, int]) -> int:
+    """Add proximity points above the postcode-cluster bonus to aerospace_score; re-tier.
+
+    base_score keeps the pipeline score, so applying again (e.g. with new
+    bands) starts from it rather than compounding.
+    """
+    relation = f"{schema}.{table}"
+    tier, confidence = tier_sql('s.score', thresholds)
+    with db.cursor() as cur:
+        cur.execute(f"""
+            UPDATE {relation} c SET
+                base_score = s.base,
+                aerospace_score = s.score,
+                tier_classification = {tier},
+                confidence_level = {confidence}
+            FROM (
+                SELECT id, COALESCE(base_score, aerospace_score) AS base,
+                       COALESCE(base_score, aerospace_score) + {proximity_gain_sql(proximity)} AS score
+                FROM {relation}
+            ) s
+            WHERE c.id = s.id
+              AND (c.base_score IS NULL OR c.aerospace_score IS DISTINCT FROM s.score)
+        """, {'cluster_postcode': CLUSTER_POSTCODE_PATTERN})
+        return cur.rowcount
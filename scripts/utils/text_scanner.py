@@ -0,0 +1,242 @@
+"""
+UK OSM Data Processor - Multi-pattern Text Scanner
+
+Matches many keyword/regex patterns against a page in one pass:
+  - every pattern contributes its literal prefix(es) to a trie-shaped
+    regex that is searched over the lowercased page (patterns with no
+    usable prefix are added to this gate as-is)
+  - at each gate hit, one regex of optional capturing lookaheads - one per
+    pattern - records every pattern that matches at that position, so
+    overlapping hits (e.g. "Rolls-Royce approved" and "Rolls-Royce") are
+    all reported
+
+Patterns from scoring.yaml are PostgreSQL regexes; pg_to_python_regex()
+translates the parts Python spells differently.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import yaml
+
+PG_WORD_BOUNDARY_RE = re.compile(r'\\[mMy]')
+PG_START_ANCHOR_RE = re.compile(r'(?:^|(?<=[|(]))\^')
+PG_END_ANCHOR_RE = re.compile(r'(?<!\\)\$(?=$|[|)])')
+
+REGEX_META = set('.^$*+?{}[]()|')
+MIN_PREFIX = 2
+
+
+@dataclass(frozen=True)
+class Hit:
+    category: str
+    label: str
+    start: int
+    end: int
+    text: str
+
+
+def pg_to_python_regex(pattern: str, anchors_as_boundaries: bool = False) -> str:
+    """Translate a PostgreSQL ARE pattern to Python `re` syntax.
+
+    \\m, \\M and \\y become \\b. With anchors_as_boundaries, ^ and $ (which
+    anchor to a whole OSM name in SQL) become word boundaries so the pattern
+    can be searched for inside running text.
+    """
+    pattern = PG_WORD_BOUNDARY_RE.sub(r'\\b', pattern)
+    if anchors_as_boundaries:
+        pattern = PG_START_ANCHOR_RE.sub(r'\\b', pattern)
+        pattern = PG_END_ANCHOR_RE.sub(r'\\b', pattern)
+    return pattern
+
+
+def _split_alternatives(pattern: str) -> List[str]:
+    """Top-level |-separated branches of a regex."""
+    branches, current = [], ''
+    depth, in_class, escaped = 0, False, False
+    for ch in pattern:
+        if escaped:
+            escaped = False
+        elif ch == '\\':
+            escaped = True
+        elif in_class:
+            in_class = ch != ']'
+        elif ch == '[':
+            in_class = True
+        elif ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch == '|' and depth == 0:
+            branches.append(current)
+            current = ''
+            continue
+        current += ch
+    branches.append(current)
+    return branches
+
+
+def literal_prefixes(pattern: str) -> Optional[List[str]]:
+    """Lowercase literal text every match of `pattern` must start with.
+
+    One prefix per top-level branch; None if any branch has no literal
+    prefix of at least MIN_PREFIX characters.
+    """
+    while pattern.startswith(('\\b', '^')):
+        pattern = pattern[2:] if pattern.startswith('\\b') else pattern[1:]
+    if pattern.startswith('(?:') and pattern.endswith(')') and _balanced(pattern[3:-1]):
+        return literal_prefixes(pattern[3:-1])
+
+    prefixes = []
+    for branch in _split_alternatives(pattern):
+        while branch.startswith(('\\b', '^')):
+            branch = branch[2:] if branch.startswith('\\b') else branch[1:]
+        prefix, i = '', 0
+        while i < len(branch):
+            if branch[i] == '\\':
+                if i + 1 >= len(branch) or branch[i + 1].isalnum():
+                    break
+                literal, step = branch[i + 1], 2
+            elif branch[i] in REGEX_META:
+                break
+            else:
+                literal, step = branch[i], 1
+            following = branch[i + step:i + step + 1]
+            if following and following in '*?{':
+                break
+            prefix += literal
+            if following == '+':
+                break
+            i += step
+        if len(prefix) < MIN_PREFIX:
+            return None
+        prefixes.append(prefix.lower())
+    return prefixes
+
+
+def _balanced(pattern: str) -> bool:
+    """True if every parenthesis in `pattern` is closed within it."""
+    depth, in_class, escaped = 0, False, False
+    for ch in pattern:
+        if escaped:
+            escaped = False
+        elif ch == '\\':
+            escaped = True
+        elif in_class:
+            in_class = ch != ']'
+        elif ch == '[':
+            in_class = True
+        elif ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+            if depth < 0:
+                return False
+    return depth == 0
+
+
+def trie_regex(words: Iterable[str]) -> str:
+    """Alternation of `words` factored on common prefixes."""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node) -> str:
+        alternatives = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alternatives:
+            return ''
+        body = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+def load_scoring_patterns(scoring_path: str, section: str) -> Dict[str, List[str]]:
+    """{group: [patterns]} for one scoring.yaml section (e.g. tier1_companies)."""
+    with open(scoring_path, 'r') as f:
+        scoring = yaml.safe_load(f)
+    return {
+        group: list(spec.get('patterns', []))
+        for group, spec in (scoring.get(section) or {}).items()
+        if isinstance(spec, dict)
+    }
+
+
+class MultiPatternScanner:
+    """Compile (category, label, regex) patterns once; scan text in one pass."""
+
+    def __init__(self, flags: int = re.IGNORECASE):
+        self.flags = flags
+        self.entries: List[tuple] = []
+        self._gate: Optional[re.Pattern] = None
+        self._captures: Optional[re.Pattern] = None
+        self._case_gate: Optional[re.Pattern] = None
+
+    def add(self, category: str, label: str, pattern: str) -> None:
+        re.compile(pattern, self.flags)  # fail early on a bad pattern
+        self.entries.append((category, label, pattern))
+        self._gate = None
+
+    def add_literals(self, category: str, words: Iterable[str]) -> None:
+        for word in words:
+            self.add(category, word, re.escape(word))
+
+    def _compile(self) -> None:
+        if not self.entries:
+            raise ValueError("No patterns added")
+        prefixes, fallbacks = set(), []
+        for _, _, pattern in self.entries:
+            found = literal_prefixes(pattern)
+            if found:
+                prefixes.update(found)
+            else:
+                fallbacks.append(f'(?:{pattern})')
+        gate = '|'.join(([trie_regex(prefixes)] if prefixes else []) + fallbacks)
+        # The gate only has to find a superset of match positions: prefixes
+        # are lowercase and searched in lowercased text, so only prefix-less
+        # fallback patterns need case-insensitive matching
+        self._gate = re.compile(gate, self.flags | re.IGNORECASE if fallbacks else 0)
+        self._case_gate = re.compile(gate, self.flags | re.IGNORECASE)
+        self._captures = re.compile(''.join(
+            f'(?:(?=(?P<p{i}>{pattern}))|)' for i, (_, _, pattern) in enumerate(self.entries)
+        ), self.flags)
+
+    def scan(self, text: str) -> List[Hit]:
+        """Every pattern hit in `text`, in order of position."""
+        if self._gate is None:
+            self._compile()
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            gate, haystack = self._gate, lowered
+        else:
+            # lower() changed some offsets; search the original text
+            gate, haystack = self._case_gate, text
+
+        hits = []
+        pos = 0
+        while True:
+            match = gate.search(haystack, pos)
+            if match is None:
+                break
+            pos = match.start()
+            captures = self._captures.match(text, pos)
+            for name, value in captures.groupdict().items():
+                if value is None:
+                    continue
+                category, label, _ = self.entries[int(name[1:])]
+                hits.append(Hit(category, label, pos, pos + len(value), value))
+            pos += 1
+        return hits
+
+    @staticmethod
+    def labels(hits: Iterable[Hit], category: str) -> List[str]:
+        """Distinct labels of one category, in order of first occurrence."""
+        seen = []
+        for hit in hits:
+            if hit.category == category and hit.label not in seen:
+                seen.append(hit.label)
+        return seen
@@ -0,0 +1,278 @@
+"""
+UK OSM Data Processor - Vector Tile Cache
+
+Pre-renders aerospace_supplier_candidates as Mapbox Vector Tiles (PostGIS
+ST_AsMVT) into an MBTiles archive, so map viewers fetch one small tile
+per view instead of the whole candidate export:
+  - up to `cluster_max_zoom` candidates are clustered on a pixel grid
+    per tile (point_count, max_score, tier counts, top_name); above it
+    every candidate is its own point feature with its attributes
+  - tile membership is worked out client-side from one pass over the
+    candidates (id, point-on-surface, row fingerprint); each tile
+    stores a digest of its members' fingerprints, so a rebuild renders
+    only tiles whose members changed and deletes tiles left empty
+  - tiles are rendered concurrently on pooled connections and stored
+    gzip-compressed, as MBTiles viewers expect for `pbf`
+
+MBTiles rows use TMS numbering (y flipped); the archive API takes XYZ.
+"""
+
+import os
+import gzip
+import json
+import math
+import hashlib
+import sqlite3
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_TILE_PATH = 'data/tiles/candidates.mbtiles'
+LAYER_NAME = 'candidates'
+DEFAULT_MIN_ZOOM = 4
+DEFAULT_MAX_ZOOM = 14
+DEFAULT_CLUSTER_MAX_ZOOM = 12
+CLUSTER_PIXELS = 48
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+
+WEB_MERCATOR_HALF = 20037508.342789244
+
+# Attributes of unclustered features; also what the row fingerprint covers
+FEATURE_COLUMNS = ['osm_id', 'source_table', 'name', 'aerospace_score', 'tier_classification',
+                   'confidence_level', 'website', 'postcode', 'city']
+
+TileKey = Tuple[int, int, int]
+
+
+def tile_for(x: float, y: float, zoom: int) -> Tuple[int, int]:
+    """XYZ tile holding an EPSG:3857 coordinate at `zoom`."""
+    n = 1 << zoom
+    column = int((x + WEB_MERCATOR_HALF) / (2 * WEB_MERCATOR_HALF) * n)
+    row = int((WEB_MERCATOR_HALF - y) / (2 * WEB_MERCATOR_HALF) * n)
+    return min(max(column, 0), n - 1), min(max(row, 0), n - 1)
+
+
+def tile_width(zoom: int) -> float:
+    """Width of a tile at `zoom` in EPSG:3857 metres."""
+    return 2 * WEB_MERCATOR_HALF / (1 << zoom)
+
+
+def mercator_to_lonlat(x: float, y: float) -> Tuple[float, float]:
+    lon = x / WEB_MERCATOR_HALF * 180
+    lat = math.degrees(2 * math.atan(math.exp(y / WEB_MERCATOR_HALF * math.pi)) - math.pi / 2)
+    return lon, lat
+
+
+class TileArchive:
+    """MBTiles file plus a per-tile digest table for incremental rebuilds."""
+
+    def __init__(self, path: str = DEFAULT_TILE_PATH, readonly: bool = False):
+        self.path = path
+        if readonly:
+            self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS tiles (
+                zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB,
+                PRIMARY KEY (zoom_level, tile_column, tile_row)
+            );
+            CREATE TABLE IF NOT EXISTS tile_digests (
+                zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, digest TEXT,
+                PRIMARY KEY (zoom_level, tile_column, tile_row)
+            );
+        """)
+
+    @staticmethod
+    def _tms_row(zoom: int, y: int) -> int:
+        return (1 << zoom) - 1 - y
+
+    def get(self, zoom: int, x: int, y: int) -> Optional[bytes]:
+        """Stored (gzip-compressed) tile at XYZ coordinates, or None."""
+        row = self.conn.execute(
+            "SELECT tile_data FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+            (zoom, x, self._tms_row(zoom, y))
+        ).fetchone()
+        return row[0] if row else None
+
+    def digests(self) -> Dict[TileKey, str]:
+        rows = self.conn.execute("SELECT zoom_level, tile_column, tile_row, digest FROM tile_digests")
+        return {(z, x, self._tms_row(z, tms_y)): digest for z, x, tms_y, digest in rows}
+
+    def put(self, tile: TileKey, data: Optional[bytes], digest: str) -> None:
+        """Store a rendered tile (None for a tile that renders empty)."""
+        z, x, y = tile
+        key = (z, x, self._tms_row(z, y))
+        if data:
+            self.conn.execute("INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?)", key + (sqlite3.Binary(data),))
+        else:
+            self.conn.execute("DELETE FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?", key)
+        self.conn.execute("INSERT OR REPLACE INTO tile_digests VALUES (?, ?, ?, ?)", key + (digest,))
+
+    def delete(self, tile: TileKey) -> None:
+        z, x, y = tile
+        key = (z, x, self._tms_row(z, y))
+        for table in ('tiles', 'tile_digests'):
+            self.conn.execute(f"DELETE FROM {table} WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?", key)
+
+    def set_metadata(self, values: Dict[str, str]) -> None:
+        self.conn.executemany("INSERT OR REPLACE INTO metadata VALUES (?, ?)",
+                              [(k, str(v)) for k, v in values.items()])
+
+    def metadata(self) -> Dict[str, str]:
+        return dict(self.conn.execute("SELECT name, value FROM metadata"))
+
+    def tile_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM tiles").fetchone()[0]
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class TileBuilder:
+    """Renders candidate tiles from PostGIS into a TileArchive."""
+
+    def __init__(self, db, archive: TileArchive, schema: str = 'public',
+                 table: str = 'aerospace_supplier_candidates',
+                 min_zoom: int = DEFAULT_MIN_ZOOM, max_zoom: int = DEFAULT_MAX_ZOOM,
+                 cluster_max_zoom: int = DEFAULT_CLUSTER_MAX_ZOOM, workers: int = 4):
+        self.db = db
+        self.archive = archive
+        self.table = f"{schema}.{table}"
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.cluster_max_zoom = cluster_max_zoom
+        # Each worker holds a pooled connection; the pool raises rather than waits when exhausted
+        self.workers = min(workers, db.maxconn)
+        if self.workers < workers:
+            logging.warning(f"Rendering with {self.workers} workers: the connection pool allows "
+                            f"{db.maxconn} (raise database.pool_max in config/config.yaml for more)")
+        self.stats = {'tiles': 0, 'rendered': 0, 'unchanged': 0, 'deleted': 0, 'candidates': 0}
+
+    # ------------------------------------------------------------------
+    # Tile membership
+    # ------------------------------------------------------------------
+
+    def load_candidates(self) -> List[tuple]:
+        """(id, x, y, fingerprint) per candidate, x/y of its point-on-surface in EPSG:3857."""
+        fingerprint = ', '.join(FEATURE_COLUMNS)
+        return self.db.fetch_all(f"""
+            SELECT id, ST_X(pt), ST_Y(pt), md5(ROW({fingerprint}, ST_AsBinary(pt))::text)
+            FROM (SELECT *, ST_PointOnSurface(geometry) AS pt FROM {self.table}
+                  WHERE geometry IS NOT NULL AND NOT ST_IsEmpty(geometry)) c
+        """)
+
+    def plan(self, candidates: Sequence[tuple]) -> Dict[TileKey, Tuple[str, List[int]]]:
+        """tile -> (digest of member fingerprints, member ids) for every non-empty tile."""
+        members: Dict[TileKey, List[tuple]] = {}
+        for row_id, x, y, fingerprint in candidates:
+            for zoom in range(self.min_zoom, self.max_zoom + 1):
+                column, row = tile_for(x, y, zoom)
+                members.setdefault((zoom, column, row), []).append((fingerprint, row_id))
+        plan = {}
+        for tile, rows in members.items():
+            rows.sort()
+            digest = hashlib.sha1(f"{self.mode(tile[0])}:".encode() + ''.join(f for f, _ in rows).encode()).hexdigest()
+            plan[tile] = (digest, [row_id for _, row_id in rows])
+        return plan
+
+    def mode(self, zoom: int) -> str:
+        return 'cluster' if zoom <= self.cluster_max_zoom else 'points'
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+
+    def tile_sql(self, zoom: int) -> str:
+        envelope = "ST_TileEnvelope(%s, %s, %s)"
+        mvt_geom = f"ST_AsMVTGeom({{geom}}, {envelope}, {TILE_EXTENT}, {TILE_BUFFER}, true)"
+        if self.mode(zoom) == 'points':
+            return f"""
+                SELECT ST_AsMVT(t, '{LAYER_NAME}', {TILE_EXTENT}, 'geom') FROM (
+                    SELECT {mvt_geom.format(geom='ST_PointOnSurface(geometry)')} AS geom, {', '.join(FEATURE_COLUMNS)}
+                    FROM {self.table} WHERE id = ANY(%s)
+                ) t
+            """
+        return f"""
+            SELECT ST_AsMVT(t, '{LAYER_NAME}', {TILE_EXTENT}, 'geom') FROM (
+                SELECT {mvt_geom.format(geom='ST_Centroid(ST_Collect(pt))')} AS geom,
+                       count(*) AS point_count,
+                       max(aerospace_score) AS max_score,
+                       count(*) FILTER (WHERE tier_classification = 'tier1_candidate') AS tier1_count,
+                       count(*) FILTER (WHERE tier_classification = 'tier2_candidate') AS tier2_count,
+                       (array_agg(name ORDER BY aerospace_score DESC NULLS LAST))[1] AS top_name,
+                       (array_agg(osm_id ORDER BY aerospace_score DESC NULLS LAST))[1] AS top_osm_id
+                FROM (SELECT ST_PointOnSurface(geometry) AS pt, name, osm_id, aerospace_score, tier_classification
+                      FROM {self.table} WHERE id = ANY(%s)) c
+                GROUP BY ST_SnapToGrid(pt, %s)
+            ) t
+        """
+
+    def render(self, tile: TileKey, ids: List[int]) -> Optional[bytes]:
+        """gzip-compressed MVT for a tile, or None if it has no features."""
+        zoom, x, y = tile
+        params = [zoom, x, y, ids]
+        if self.mode(zoom) == 'cluster':
+            params.append(tile_width(zoom) * CLUSTER_PIXELS / 256)
+        data = self.db.fetch_scalar(self.tile_sql(zoom), params)
+        return gzip.compress(bytes(data), mtime=0) if data else None
+
+    def build(self, full: bool = False) -> Dict[str, int]:
+        """Render new and changed tiles, drop tiles left empty; returns stats."""
+        candidates = self.load_candidates()
+        plan = self.plan(candidates)
+        previous = {} if full else self.archive.digests()
+        if full:
+            self.archive.conn.execute("DELETE FROM tiles")
+            self.archive.conn.execute("DELETE FROM tile_digests")
+
+        todo = [(tile, ids) for tile, (digest, ids) in plan.items() if previous.get(tile) != digest]
+        stale = [tile for tile in previous if tile not in plan]
+        self.stats.update(candidates=len(candidates), tiles=len(plan), unchanged=len(plan) - len(todo))
+        logging.info(f"{len(candidates):,} candidates -> {len(plan):,} tiles (z{self.min_zoom}-{self.max_zoom}); "
+                     f"{len(todo):,} to render, {len(stale):,} to delete")
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for done, ((tile, _), data) in enumerate(zip(todo, executor.map(lambda t: self.render(*t), todo)), 1):
+                self.archive.put(tile, data, plan[tile][0])
+                if done % 1000 == 0:
+                    self.archive.commit()
+                    logging.info(f"  Rendered {done:,}/{len(todo):,} tiles")
+        for tile in stale:
+            self.archive.delete(tile)
+        self.stats.update(rendered=len(todo), deleted=len(stale))
+
+        self.archive.set_metadata(self.tilejson_metadata(candidates))
+        self.archive.commit()
+        return self.stats
+
+    def tilejson_metadata(self, candidates: Sequence[tuple]) -> Dict[str, str]:
+        """MBTiles metadata rows (bounds in lon/lat, vector_layers JSON)."""
+        if candidates:
+            west, south = mercator_to_lonlat(min(c[1] for c in candidates), min(c[2] for c in candidates))
+            east, north = mercator_to_lonlat(max(c[1] for c in candidates), max(c[2] for c in candidates))
+        else:
+            west, south, east, north = -8.7, 49.8, 1.8, 60.9  # Great Britain
+        fields = {c: 'String' for c in FEATURE_COLUMNS}
+        fields.update(osm_id='Number', aerospace_score='Number', point_count='Number', max_score='Number',
+                      tier1_count='Number', tier2_count='Number', top_name='String', top_osm_id='Number')
+        return {
+            'name': 'Aerospace supplier candidates',
+            'format': 'pbf',
+            'type': 'overlay',
+            'minzoom': self.min_zoom,
+            'maxzoom': self.max_zoom,
+            'bounds': f"{west:.5f},{south:.5f},{east:.5f},{north:.5f}",
+            'center': f"{(west + east) / 2:.5f},{(south + north) / 2:.5f},{min(self.min_zoom + 2, self.max_zoom)}",
+            'json': json.dumps({'vector_layers': [{
+                'id': LAYER_NAME, 'fields': fields,
+                'minzoom': self.min_zoom, 'maxzoom': self.max_zoom,
+                'description': f"Clustered up to z{self.cluster_max_zoom}, individual candidates above",
+            }]}),
+        }
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Known Supplier Coverage Check
+Recall of the known UK aerospace suppliers in a candidate table, with the misses
+
+Matches the known_suppliers registry (seeded from config/known_suppliers.csv
+with --sync) against the candidates through the trigram index on name;
+see scripts/utils/known_suppliers.py. Cheap enough to run after every
+scoring experiment, e.g. against a scenario's own output table.
+
+Usage:
+    python3 scripts/verify/check_coverage.py --sync
+    python3 scripts/verify/check_coverage.py --min-score 80 --require-area
+    python3 scripts/verify/check_coverage.py --table aerospace_candidates_point --recall-only
+"""
+
+import sys
+import argparse
+import pandas as pd
+sys.path.append('scripts/utils')
+
+from osm_utils import setup_logging, load_config
+from db import get_database, close_database
+from known_suppliers import (DEFAULT_MIN_SIMILARITY, DEFAULT_SEED_PATH, DEFAULT_TABLE,
+                             check_coverage, in_area_function_exists, read_seed, registry_exists,
+                             sync_registry)
+import logging
+
+STATUS_LABELS = {'found': '✓ Good', 'close': '~ Close', 'low': '✗ Too Low', 'missing': '✗ Missing'}
+
+
+def print_report(result: dict) -> None:
+    rows = [{
+        'known_supplier': s['name'],
+        'tier': s['tier'] or '',
+        'expected': s['expected_score'],
+        'status': STATUS_LABELS[s['status']],
+        'matched_as': (s['matched_name'] or '')[:40],
+        'score': s['aerospace_score'] if s['aerospace_score'] is not None else '',
+        'postcode': s['postcode'] or '',
+        'in_area': '' if s['in_area'] is None else ('yes' if s['in_area'] else 'no'),
+        'similarity': s['similarity'] if s['similarity'] is not None else '',
+        'hits': s['hits'],
+    } for s in result['suppliers']]
+    print(f"\nKnown supplier coverage in {result['table']}")
+    print(pd.DataFrame(rows).to_string(index=False))
+    print("")
+    total = len(result['suppliers'])
+    print(f"Coverage %: {round(100 * result['recall'])}% ({len(result['found'])}/{total})")
+    for tier, recall in sorted(result['recall_by_tier'].items()):
+        print(f"  {tier}: {100 * recall:.0f}%")
+    if result['missing']:
+        print("Missing: " + ', '.join(
+            f"{s['name']} ({s['location']})" for s in result['missing']))
+    print(f"Checked in {result['seconds']:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check known aerospace supplier coverage")
+    parser.add_argument('--sync', action='store_true', help="Load the seed CSV into the registry first")
+    parser.add_argument('--seed', default=DEFAULT_SEED_PATH)
+    parser.add_argument('--table', default=DEFAULT_TABLE, help="Candidate table or view to check")
+    parser.add_argument('--min-score', type=int, help="Only count candidates scoring at least this")
+    parser.add_argument('--min-similarity', type=float, default=DEFAULT_MIN_SIMILARITY,
+                        help="pg_trgm strict word similarity an alias needs to match a name")
+    parser.add_argument('--require-area', action='store_true',
+                        help="Ignore matches outside the supplier's postcode areas / site radius")
+    parser.add_argument('--output', help="Write the per-supplier results to this CSV")
+    parser.add_argument('--recall-only', action='store_true', help="Print just the recall percentage")
+    args = parser.parse_args()
+
+    setup_logging()
+    if args.recall_only:
+        logging.getLogger().setLevel(logging.WARNING)
+    config = load_config()
+    schema = config['database'].get('schema', 'public')
+    db = get_database(config)
+
+    try:
+        if args.sync or not registry_exists(db, schema) or not in_area_function_exists(db, schema):
+            stats = sync_registry(db, read_seed(args.seed), schema)
+            logging.info(f"Known supplier registry synced from {args.seed}: {stats['suppliers']} suppliers, "
+                         f"{stats['aliases']} aliases, {stats['deactivated']} deactivated")
+        result = check_coverage(db, schema, table=args.table, min_similarity=args.min_similarity,
+                                min_score=args.min_score, require_area=args.require_area)
+    except Exception as e:
+        logging.error(f"Coverage check failed: {e}")
+        return False
+    finally:
+        close_database()
+
+    if args.output:
+        pd.DataFrame(result['suppliers']).to_csv(args.output, index=False)
+        logging.info(f"✓ Coverage details written to {args.output}")
+    if args.recall_only:
+        print(round(100 * result['recall']))
+    else:
+        print_report(result)
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Scoring Rule Evaluation
+Precision / recall of a scoring rule-set version against the ground truth labels
+
+A version is the live candidate table (default), another table, or a
+scored snapshot such as iterations/<id>/full_results.csv. Reports
+precision, recall and F1 at the scoring.yaml tier thresholds, the full PR
+curve over every labelled score, and - against a --baseline version - the
+candidates whose prediction flipped. Run it before shipping a rule
+change; --min-precision / --min-recall make it fail when the version
+falls short. Labels come from scripts/verify/label_ground_truth.py and
+config/known_suppliers.csv.
+
+Usage:
+    python3 scripts/verify/evaluate_rules.py
+    python3 scripts/verify/evaluate_rules.py --version iterations/B/full_results.csv \\
+        --baseline iterations/A/full_results.csv --flips flipped.csv --curve pr_curve.csv
+    python3 scripts/verify/evaluate_rules.py --version aerospace_candidates_point --min-recall 0.8
+"""
+
+import sys
+import argparse
+import pandas as pd
+sys.path.append('scripts/utils')
+
+from osm_utils import setup_logging, load_config
+from db import get_database, close_database
+from known_suppliers import DEFAULT_SEED_PATH, DEFAULT_TABLE
+from ground_truth import (DEFAULT_LABELS_PATH, GroundTruth, average_precision, flipped_rows,
+                          load_version, metrics_at, pr_curve, scoring_thresholds)
+import logging
+
+
+def is_table(spec: str) -> bool:
+    return not spec.endswith(('.csv', '.parquet'))
+
+
+def metrics_table(scored: pd.DataFrame, thresholds: dict) -> pd.DataFrame:
+    rows = [{'tier': tier, **metrics_at(scored, score)}
+            for tier, score in sorted(thresholds.items(), key=lambda t: -t[1])]
+    return pd.DataFrame(rows).round(3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate a scoring rule-set version against labelled ground truth")
+    parser.add_argument('--version', default=DEFAULT_TABLE, help="Candidate table or scored CSV/Parquet snapshot")
+    parser.add_argument('--baseline', help="Earlier version to diff against")
+    parser.add_argument('--threshold', type=float,
+                        help="Operating score threshold for the diff and gates (default: tier2 threshold)")
+    parser.add_argument('--labels', default=DEFAULT_LABELS_PATH)
+    parser.add_argument('--seed', default=DEFAULT_SEED_PATH, help="Known suppliers counted as positives")
+    parser.add_argument('--scoring', default='scoring.yaml', help="Tier thresholds to report")
+    parser.add_argument('--curve', help="Write the PR curve to this CSV")
+    parser.add_argument('--flips', help="Write the flipped candidates to this CSV")
+    parser.add_argument('--min-precision', type=float, help="Fail below this precision at the threshold")
+    parser.add_argument('--min-recall', type=float, help="Fail below this recall at the threshold")
+    args = parser.parse_args()
+
+    setup_logging()
+    thresholds = scoring_thresholds(args.scoring)
+    threshold = args.threshold if args.threshold is not None else thresholds.get('tier2_candidate', 80)
+    truth = GroundTruth.load(args.labels, args.seed)
+    if not len(truth):
+        logging.error(f"No labels in {args.labels} or {args.seed}")
+        return False
+    labelled = pd.concat([truth.rows, truth.names])
+    logging.info(f"Ground truth: {len(truth)} labels, {int(labelled['is_supplier'].sum())} suppliers "
+                 f"({', '.join(f'{s} {n}' for s, n in labelled['label_source'].value_counts().items())})")
+
+    specs = [args.version] + ([args.baseline] if args.baseline else [])
+    db, schema = None, 'public'
+    try:
+        if any(is_table(spec) for spec in specs):
+            config = load_config()
+            db = get_database(config)
+            schema = config['database'].get('schema', 'public')
+        versions = {spec: load_version(spec, db, schema) for spec in specs}
+    except Exception as e:
+        logging.error(f"Could not load version: {e}")
+        return False
+    finally:
+        if db is not None:
+            close_database()
+
+    results = {}
+    for spec in specs:
+        scored = truth.score(versions[spec])
+        curve = pr_curve(scored)
+        results[spec] = (scored, curve, metrics_at(scored, threshold))
+        print(f"\n{spec} ({len(versions[spec]):,} candidates, "
+              f"{int(scored['score'].notna().sum())}/{len(scored)} labels present)")
+        print(metrics_table(scored, {**thresholds, 'operating': threshold}).to_string(index=False))
+        ap = average_precision(curve)
+        print(f"Average precision: {ap:.3f}" if ap is not None else "Average precision: n/a (no positives)")
+
+    scored, curve, current = results[args.version]
+    if args.curve:
+        curve.to_csv(args.curve, index=False)
+        logging.info(f"✓ PR curve written to {args.curve}")
+
+    if args.baseline:
+        _, _, before = results[args.baseline]
+        for metric in ('precision', 'recall', 'f1'):
+            if current[metric] is not None and before[metric] is not None:
+                print(f"  {metric} at {threshold:g}: {before[metric]:.3f} → {current[metric]:.3f} "
+                      f"({current[metric] - before[metric]:+.3f})")
+        flips = flipped_rows(versions[args.baseline], versions[args.version], truth, threshold)
+        print(f"\nFlipped at score >= {threshold:g}: {int((flips['change'] == 'gained').sum())} gained, "
+              f"{int((flips['change'] == 'lost').sum())} lost")
+        print(flips['effect'].value_counts().to_string())
+        labelled_flips = flips[flips['effect'] != 'unlabelled']
+        if len(labelled_flips):
+            print(labelled_flips.head(20).to_string(index=False))
+        if args.flips:
+            flips.to_csv(args.flips, index=False)
+            logging.info(f"✓ Flipped candidates written to {args.flips}")
+
+    passed = True
+    for metric, minimum in (('precision', args.min_precision), ('recall', args.min_recall)):
+        if minimum is not None and (current[metric] or 0) < minimum:
+            logging.error(f"{metric} {current[metric] or 0:.3f} at {threshold:g} is below {minimum}")
+            passed = False
+    return passed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Ground Truth Labels
+Add verified supplier / non-supplier labels to config/ground_truth_labels.csv
+
+Reads filled-in validation samples (is_aerospace_supplier = YES/NO),
+llm_verification_*.csv files from integrated_aerospace_system.py and
+aerospace_verification_agent.py output; the kind of file is detected from
+its columns. Labels replace earlier ones from the same source for the same
+candidate or name. See scripts/utils/ground_truth.py.
+
+Usage:
+    python3 scripts/verify/label_ground_truth.py exports/validation_sample_20250101_120000.csv
+    python3 scripts/verify/label_ground_truth.py llm_verification_*.csv
+    python3 scripts/verify/label_ground_truth.py verified_suppliers.csv --agent-min-score 60
+    python3 scripts/verify/label_ground_truth.py --summary
+"""
+
+import sys
+import argparse
+import pandas as pd
+sys.path.append('scripts/utils')
+
+from osm_utils import setup_logging
+from ground_truth import (AGENT_MIN_SCORE, DEFAULT_LABELS_PATH, LABEL_READERS, LABEL_SOURCES,
+                          detect_label_source, merge_labels, read_labels, write_labels)
+import logging
+
+
+def print_summary(labels: pd.DataFrame) -> None:
+    if labels.empty:
+        print("No labels yet")
+        return
+    summary = labels.groupby('label_source')['is_supplier'].agg(
+        labels='size', suppliers='sum').assign(non_suppliers=lambda s: s['labels'] - s['suppliers'])
+    print(summary.to_string())
+    print(f"Total: {len(labels)} labels")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add verified labels to the ground truth set")
+    parser.add_argument('files', nargs='*', help="Validation samples, LLM verdicts or agent results (CSV/Excel)")
+    parser.add_argument('--source', choices=LABEL_SOURCES, help="Label source (default: detected from columns)")
+    parser.add_argument('--labels', default=DEFAULT_LABELS_PATH)
+    parser.add_argument('--agent-min-score', type=int, default=AGENT_MIN_SCORE,
+                        help="Agent verification score that confirms a supplier")
+    parser.add_argument('--summary', action='store_true', help="Show label counts per source")
+    args = parser.parse_args()
+
+    setup_logging()
+    labels = read_labels(args.labels)
+    before = len(labels)
+
+    for path in args.files:
+        try:
+            frame = pd.read_csv(path) if path.endswith('.csv') else pd.read_excel(path)
+            source = args.source or detect_label_source(frame)
+            reader = LABEL_READERS[source]
+            new = reader(frame, args.agent_min_score) if source == 'agent' else reader(frame)
+        except Exception as e:
+            logging.error(f"Could not read labels from {path}: {e}")
+            return False
+        labels = merge_labels(labels, new)
+        logging.info(f"{path}: {len(new)} {source} labels "
+                     f"({int(new['is_supplier'].sum())} suppliers, {int((~new['is_supplier']).sum())} not)")
+
+    if args.files:
+        write_labels(labels, args.labels)
+        logging.info(f"✓ {args.labels}: {len(labels)} labels ({len(labels) - before:+d})")
+    if args.summary or not args.files:
+        print_summary(labels)
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
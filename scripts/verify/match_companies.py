@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Match OSM aerospace candidates to Companies House records
+Fuzzy name matching against the local registry, optionally within postcode district
+
+Reads a candidate CSV (e.g. analysis_results_*.csv from
+integrated_aerospace_system.py) and writes it back with the best
+registry match per candidate: company_number, ch_name, ch_postcode and
+match_score. Build the registry first with
+scripts/import/import_companies_house.py.
+
+Usage:
+    python3 scripts/verify/match_companies.py analysis_results.csv matched.csv
+    python3 scripts/verify/match_companies.py analysis_results.csv matched.csv --postcode-scope district
+"""
+
+import sys
+import time
+import argparse
+sys.path.append('scripts/utils')
+
+from osm_utils import setup_logging
+from company_registry import CompanyRegistry, DEFAULT_REGISTRY_PATH
+from name_matcher import NameIndex, DEFAULT_MIN_SCORE
+import logging
+import pandas as pd
+
+
+def postcode_prefix(postcode, scope: str):
+    """Postcode constraint for a candidate: full postcode, its district (outward code), or none"""
+    if scope == 'none' or not isinstance(postcode, str) or not postcode.strip():
+        return None
+    postcode = postcode.strip().upper()
+    if scope == 'district':
+        return postcode.split()[0] if ' ' in postcode else postcode[:-3] or postcode
+    return postcode
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzzy-match candidate names to the Companies House registry")
+    parser.add_argument('input_csv')
+    parser.add_argument('output_csv')
+    parser.add_argument('--registry', default=DEFAULT_REGISTRY_PATH)
+    parser.add_argument('--postcode-scope', choices=['none', 'district', 'full'], default='none',
+                        help="Only match registry companies in the candidate's postcode district / postcode")
+    parser.add_argument('--min-score', type=float, default=DEFAULT_MIN_SCORE)
+    parser.add_argument('--include-dissolved', action='store_true')
+    args = parser.parse_args()
+
+    setup_logging()
+    try:
+        registry = CompanyRegistry(args.registry)
+    except FileNotFoundError as e:
+        logging.error(str(e))
+        return False
+
+    started = time.time()
+    index = NameIndex.from_registry(registry, active_only=not args.include_dissolved)
+    logging.info(f"Indexed {len(index):,} registry names in {time.time() - started:.1f}s")
+
+    candidates = pd.read_csv(args.input_csv)
+    postcodes = candidates['postcode'] if 'postcode' in candidates.columns else [None] * len(candidates)
+    prefixes = [postcode_prefix(p, args.postcode_scope) for p in postcodes]
+
+    started = time.time()
+    results = index.match_many(candidates['name'].fillna('').tolist(), prefixes,
+                               limit=1, min_score=args.min_score)
+    elapsed = time.time() - started
+    best = [matches[0] if matches else None for matches in results]
+    candidates['company_number'] = [m.key if m else None for m in best]
+    candidates['ch_name'] = [m.name if m else None for m in best]
+    candidates['ch_postcode'] = [m.postcode if m else None for m in best]
+    candidates['match_score'] = [m.score if m else None for m in best]
+    candidates.to_csv(args.output_csv, index=False)
+
+    matched = sum(m is not None for m in best)
+    logging.info(f"Matched {matched:,}/{len(candidates):,} candidates in {elapsed:.1f}s "
+                 f"({len(candidates) / max(elapsed, 1e-9):,.0f}/s) -> {args.output_csv}")
+    registry.close()
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
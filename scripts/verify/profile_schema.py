@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Schema Mode Profiler
+Per-column mode, null fraction, distinct estimate and top values for the OSM tables and pipeline views
+
+Analyzed tables are read from pg_stats; everything else is profiled from
+one TABLESAMPLE pass per base table, with the *_filtered / *_scored views
+evaluated over those samples only (scripts/utils/schema_profiler.py).
+The first four CSV columns match the old 0P_schema_modes_all_sample.sh
+output.
+
+Usage:
+    python3 scripts/verify/profile_schema.py
+    python3 scripts/verify/profile_schema.py --no-stats --sample-rows 50000 --method bernoulli
+    python3 scripts/verify/profile_schema.py --tables planet_osm_point planet_osm_point_aerospace_scored
+"""
+
+import sys
+import csv
+import json
+import time
+import argparse
+sys.path.append('scripts/utils')
+
+from osm_utils import setup_logging, load_config
+from db import get_database, close_database
+from schema_profiler import SAMPLE_METHODS, SchemaProfiler
+import logging
+
+DEFAULT_OUTPUT = 'all_tables_schema_modes_sampled.csv'
+DEFAULT_TABLES = [
+    'planet_osm_point',
+    'planet_osm_line',
+    'planet_osm_polygon',
+    'planet_osm_roads',
+    'planet_osm_point_aerospace_filtered',
+    'planet_osm_line_aerospace_filtered',
+    'planet_osm_polygon_aerospace_filtered',
+    'planet_osm_roads_aerospace_filtered',
+    'planet_osm_point_aerospace_scored',
+    'planet_osm_line_aerospace_scored',
+    'planet_osm_polygon_aerospace_scored',
+    'planet_osm_roads_aerospace_scored',
+]
+CSV_COLUMNS = ['table_name', 'column_name', 'data_type', 'mode_value', 'mode_frac',
+               'null_frac', 'n_distinct', 'top_values', 'source']
+
+
+def fraction(value) -> str:
+    return '' if value is None else f"{value:.4f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile column modes of the OSM tables and pipeline views")
+    parser.add_argument('--tables', nargs='+', default=DEFAULT_TABLES)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--sample-rows', type=int, default=10000, help="Rows sampled per base table")
+    parser.add_argument('--method', choices=SAMPLE_METHODS, default='system',
+                        help="TABLESAMPLE method: system reads whole blocks (fast), bernoulli reads every block")
+    parser.add_argument('--top', type=int, default=5, help="Most common values kept per column")
+    parser.add_argument('--no-stats', action='store_true', help="Always sample, even where pg_stats is available")
+    args = parser.parse_args()
+
+    setup_logging()
+    config = load_config()
+    schema = config['database'].get('schema', 'public')
+    logging.info(f"=== Profiling {len(args.tables)} relations in {schema} ===")
+
+    started = time.time()
+    written = 0
+    try:
+        with get_database(config).connection() as conn, \
+                open(args.output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_COLUMNS)
+            profiler = SchemaProfiler(conn, schema, sample_rows=args.sample_rows, method=args.method,
+                                      top=args.top, use_stats=not args.no_stats)
+            try:
+                for table in args.tables:
+                    if profiler.relation_kind(table) is None:
+                        logging.info(f"Skipping {table}: does not exist")
+                        continue
+                    for p in profiler.profile(table):
+                        writer.writerow([
+                            p.table_name, p.column_name, p.data_type, p.mode_value or '',
+                            fraction(p.mode_frac), fraction(p.null_frac),
+                            '' if p.n_distinct is None else p.n_distinct,
+                            json.dumps(p.top_values, ensure_ascii=False) if p.top_values else '',
+                            p.source,
+                        ])
+                        written += 1
+            finally:
+                profiler.close()
+    except Exception as e:
+        logging.error(f"Schema profiling failed: {e}")
+        return False
+    finally:
+        close_database()
+
+    logging.info(f"✓ Written {written} column profiles to {args.output} in {time.time() - started:.1f}s")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
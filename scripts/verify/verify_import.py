@@ -12,25 +12,10 @@ import time
 sys.path.append('scripts/utils')
 
 from osm_utils import setup_logging, load_config
+from db import get_database, close_database
 import logging
-import psycopg2
 from pathlib import Path
 
-def connect_to_database(config):
-    """Create database connection using config.yaml."""
-    db_config = config['database']
-    try:
-        conn = psycopg2.connect(
-            host=db_config['host'],
-            port=db_config['port'],
-            user=db_config['user'],
-            database=db_config['name']
-        )
-        return conn
-    except Exception as e:
-        logging.error(f"Database connection failed: {e}")
-        return None
-
 def detect_actual_schema(conn, config):
     """Detect which schema actually contains OSM data."""
     config_schema = config['database'].get('schema', 'public')
@@ -446,17 +431,8 @@ def generate_verification_report(verification_data, config, schema):
     
     return txt_report_path, json_report_path
 
-def main():
-    setup_logging()
-    config = load_config()
-    
-    logging.info("=== UK OSM Import Verification (CORRECTED) ===")
-    
-    # Connect to database
-    conn = connect_to_database(config)
-    if not conn:
-        return False
-    
+def run_verification(conn, config):
+    """Run all verification steps on an open connection."""
     # Detect actual schema
     actual_schema = detect_actual_schema(conn, config)
     
@@ -512,10 +488,23 @@ def main():
     except Exception as e:
         logging.error(f"Verification failed: {e}")
         return False
-        
+
+def main():
+    setup_logging()
+    config = load_config()
+    
+    logging.info("=== UK OSM Import Verification (CORRECTED) ===")
+    
+    # Autocommit keeps one failed check from aborting the transaction for
+    # every check that follows it
+    try:
+        with get_database(config).connection(autocommit=True) as conn:
+            return run_verification(conn, config)
+    except Exception as e:
+        logging.error(f"Database connection failed: {e}")
+        return False
     finally:
-        if conn:
-            conn.close()
+        close_database()
 
 if __name__ == "__main__":
     success = main()
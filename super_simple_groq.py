@@ -9,15 +9,21 @@ Setup:
 """
 
 import os
+import sys
 import requests
 from bs4 import BeautifulSoup
 from groq import Groq
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts', 'utils'))
+
+from llm_client import CachedLLMClient, DEFAULT_CACHE_PATH
+
 # ============================================================================
 # CONFIGURATION - CHANGE THESE!
 # ============================================================================
 
 GROQ_API_KEY = os.environ.get('GROQ_API_KEY')  # Or paste your key here: "gsk_..."
+CACHE_PATH = DEFAULT_CACHE_PATH  # Answers are reused on re-runs; None to always ask
 
 COMPANY_NAME = "Senior Aerospace Bird Bellows"
 COMPANIES_HOUSE_NUMBER = "00378900"
@@ -43,9 +49,22 @@ def fetch_page(url):
     return ' '.join(text.split())[:15000]  # First 15k characters
 
 
+_client = None
+
+
+def get_client():
+    """Groq client, with the on-disk answer cache unless CACHE_PATH is None"""
+    global _client
+    if _client is None:
+        _client = Groq(api_key=GROQ_API_KEY)
+        if CACHE_PATH:
+            _client = CachedLLMClient(_client, path=CACHE_PATH)
+    return _client
+
+
 def ask_llm(question, context):
     """Ask Groq LLM a question"""
-    client = Groq(api_key=GROQ_API_KEY)
+    client = get_client()
     
     response = client.chat.completions.create(
         model="llama-3.3-70b-versatile",
@@ -83,4 +102,7 @@ if __name__ == "__main__":
         print(f"💡 Answer: {answer}\n")
     
     print("="*70)
+    if isinstance(_client, CachedLLMClient):
+        stats = _client.stats()
+        print(f"💾 LLM cache: {stats['hits']} hits, {stats['misses']} misses")
     print("✅ Done!")
\ No newline at end of file
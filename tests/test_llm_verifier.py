@@ -0,0 +1,110 @@
+"""
+BatchVerifier against an offline stand-in for the Groq client.
+
+FakeLLMClient answers YES for names containing an aerospace keyword and NO
+otherwise; it can return an unparseable response on chosen calls and leave
+chosen names out of their first well-formed response, so the retry path is
+exercised deterministically.
+"""
+
+import json
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'scripts' / 'utils'))
+
+from llm_client import CachedLLMClient, LLMCache  # noqa: E402
+from llm_verifier import BatchVerifier, estimate_tokens  # noqa: E402
+
+RECORDS = [
+    {'name': 'Filton Aerospace Ltd', 'city': 'Bristol', 'postcode': 'BS34 7QQ'},
+    {'name': 'Corner Cafe', 'city': 'Derby'},
+    {'name': 'Precision Castings', 'city': 'Sheffield', 'matched_keywords': ['precision']},
+    {'name': 'Hall Lane Dental', 'city': 'Preston'},
+]
+
+
+class FakeLLMClient:
+    """Keyword verdicts; `malformed_calls` (1-based) get unparseable JSON and
+    `drop_names` are missing from the first well-formed response that
+    includes them."""
+
+    def __init__(self, yes_keywords: Sequence[str] = ('aero', 'aviation', 'aircraft', 'precision'),
+                 malformed_calls: Sequence[int] = (), drop_names: Sequence[str] = ()):
+        self.yes_keywords = [k.lower() for k in yes_keywords]
+        self.malformed_calls = set(malformed_calls)
+        self.drop_names = set(drop_names)
+        self.calls = 0
+        self.batch_sizes: List[int] = []
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model: str, messages: List[Dict[str, str]], **kwargs):
+        candidates = json.loads(messages[-1]['content'])['candidates']
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+            self.batch_sizes.append(len(candidates))
+            malformed = call in self.malformed_calls
+            dropped = set() if malformed else {c['name'] for c in candidates} & self.drop_names
+            self.drop_names -= dropped
+        if malformed:
+            content = '{"results": [ this is not json'
+        else:
+            content = json.dumps({'results': [
+                {'id': c['id'],
+                 'verdict': 'YES' if any(k in c['name'].lower() for k in self.yes_keywords) else 'NO',
+                 'reason': 'keyword heuristic'}
+                for c in candidates if c['name'] not in dropped
+            ]})
+        tokens = sum(estimate_tokens(m['content']) for m in messages) + estimate_tokens(content)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(total_tokens=tokens),
+        )
+
+
+def verifier(client, **options) -> BatchVerifier:
+    return BatchVerifier(client, batch_size=10, concurrency=1, requests_per_minute=1000,
+                         tokens_per_minute=1_000_000, **options)
+
+
+def test_malformed_and_missing_items_are_retried():
+    client = FakeLLMClient(malformed_calls=[1], drop_names=['Precision Castings'])
+    batch = verifier(client)
+
+    verdicts = batch.verify(RECORDS)
+
+    assert [v['verdict'] for v in verdicts] == ['YES', 'NO', 'YES', 'NO']
+    # Malformed: all 4 resent; then the dropped item alone
+    assert client.batch_sizes == [4, 4, 1]
+    assert batch.stats['retries'] == 2
+    assert batch.stats['failed_items'] == 0
+
+
+def test_items_never_answered_are_errors():
+    client = FakeLLMClient(malformed_calls=[1, 2, 3])
+    batch = verifier(client, max_retries=2)
+
+    verdicts = batch.verify(RECORDS[:2])
+
+    assert [v['verdict'] for v in verdicts] == ['ERROR', 'ERROR']
+    assert batch.stats['failed_items'] == 2
+
+
+def test_second_run_is_fully_cached(tmp_path):
+    cache = LLMCache(str(tmp_path / 'llm_cache.sqlite'))
+    client = FakeLLMClient()
+    first = verifier(CachedLLMClient(client, cache=cache)).verify(RECORDS)
+    calls = client.calls
+
+    again = verifier(CachedLLMClient(client, cache=cache))
+    second = again.verify(RECORDS)
+
+    assert second == first
+    assert client.calls == calls
+    assert again.stats['cached_items'] == len(RECORDS)
+    assert again.stats['requests'] == 0
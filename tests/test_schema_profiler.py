@@ -0,0 +1,43 @@
+"""
+View rewriting in the schema profiler (no database needed).
+
+PostgreSQL <= 15 pg_get_viewdef output qualifies every column with its
+relation name, so a sampled view must keep that name as an alias.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'scripts' / 'utils'))
+
+from schema_profiler import rewrite_relation  # noqa: E402
+
+SAMPLE = 'pg_temp."profile_planet_osm_polygon"'
+
+
+def test_qualified_single_table_view_keeps_relation_name_as_alias():
+    definition = (" SELECT planet_osm_polygon.osm_id,\n    planet_osm_polygon.name\n"
+                  "   FROM planet_osm_polygon\n  WHERE planet_osm_polygon.shop IS NULL;")
+    rewritten = rewrite_relation(definition, 'public', 'planet_osm_polygon', SAMPLE)
+    assert f'FROM {SAMPLE} AS "planet_osm_polygon"\n  WHERE' in rewritten
+
+
+def test_schema_qualified_reference_at_end_of_definition():
+    rewritten = rewrite_relation(" SELECT osm_id FROM public.planet_osm_polygon;",
+                                 'public', 'planet_osm_polygon', SAMPLE)
+    assert rewritten == f' SELECT osm_id FROM {SAMPLE} AS "planet_osm_polygon";'
+
+
+def test_existing_alias_is_kept():
+    for alias in ('p', 'AS p', '"p"'):
+        definition = f" SELECT p.osm_id FROM planet_osm_polygon {alias} WHERE p.shop IS NULL"
+        rewritten = rewrite_relation(definition, 'public', 'planet_osm_polygon', SAMPLE)
+        assert rewritten == f" SELECT p.osm_id FROM {SAMPLE} {alias} WHERE p.shop IS NULL"
+
+
+def test_join_without_alias():
+    definition = (" SELECT planet_osm_point.osm_id FROM planet_osm_point\n"
+                  "     JOIN planet_osm_polygon ON planet_osm_polygon.osm_id = planet_osm_point.osm_id")
+    rewritten = rewrite_relation(definition, 'public', 'planet_osm_polygon', SAMPLE)
+    assert f'JOIN {SAMPLE} AS "planet_osm_polygon" ON' in rewritten
+    assert 'FROM planet_osm_point\n' in rewritten
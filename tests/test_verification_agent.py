@@ -0,0 +1,78 @@
+"""
+Verification agent against a local http.server stub (no external requests).
+
+The stub answers every search with one result link; /site is a supplier
+page and /gone returns 404 with the same text, which must not be scanned.
+"""
+
+import http.server
+import sys
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from aerospace_verification_agent import AerospaceVerificationAgent  # noqa: E402
+
+SUPPLIER_PAGE = b"<html><body>AS9100 certified. Approved supplier to Airbus.</body></html>"
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        base = f"http://127.0.0.1:{self.server.server_port}"
+        if path == '/search':
+            status, body = 200, f'<html><div class="g"><a href="{base}/site">Site</a></div></html>'.encode()
+        elif path == '/search-gone':
+            status, body = 200, f'<html><div class="g"><a href="{base}/gone">Gone</a></div></html>'.encode()
+        elif path == '/site':
+            status, body = 200, SUPPLIER_PAGE
+        else:
+            status, body = 404, SUPPLIER_PAGE
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def stub_server():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_two_batches_share_rate_limiter(stub_server):
+    # burst=1 makes lookups queue on the bucket lock, binding it to the running loop
+    agent = AerospaceVerificationAgent(rate=100, burst=1, search_url=f"{stub_server}/search")
+
+    first = agent.verify_supplier('Acme Precision', '01234567')
+    # A second asyncio.run() reuses the per-host buckets created in the first
+    second = agent.verify_supplier('Acme Precision', '01234567')
+
+    for result in (first, second):
+        assert 'error' not in result
+        assert result['website'] == f"{stub_server}/site"
+        assert 'AS9100' in result['approvals']
+        assert 'Airbus' in result['key_customers']
+    assert first['verification_score'] == second['verification_score']
+
+
+def test_non_200_pages_are_not_scanned(stub_server):
+    agent = AerospaceVerificationAgent(rate=200, burst=10, search_url=f"{stub_server}/search-gone")
+
+    result = agent.verify_supplier('Acme Precision', '01234567')
+
+    assert 'error' not in result
+    assert result['approvals'] == []
+    assert result['key_customers'] == []
+    assert result['tier1_mentions'] == []
@@ -20,6 +20,9 @@ echo -e "${BLUE}VALIDATION & REFINEMENT WORKFLOW${NC}"
 echo -e "${BLUE}======================================================${NC}"
 echo ""
 
+# Aggregates come from the candidate_rollup views, refreshed after each pipeline run
+python3 scripts/reports/refresh_rollups.py --if-missing -q
+
 # ==============================================================================
 # PHASE 1: Quality Analysis
 # ==============================================================================
@@ -32,46 +35,43 @@ psql -h "$DB_HOST" -p "$DB_PORT" -U "$DB_USER" -d "$DB_NAME" <<'SQL'
 \echo '-------------------'
 SELECT 
   CASE 
-    WHEN aerospace_score >= 200 THEN '200+ (Definitive)'
-    WHEN aerospace_score >= 150 THEN '150-199 (Tier 1)'
-    WHEN aerospace_score >= 100 THEN '100-149 (Strong Tier 2)'
-    WHEN aerospace_score >= 80 THEN '80-99 (Tier 2)'
-    WHEN aerospace_score >= 60 THEN '60-79 (Potential)'
-    WHEN aerospace_score >= 40 THEN '40-59 (Review)'
+    WHEN score_band >= 200 THEN '200+ (Definitive)'
+    WHEN score_band >= 150 THEN '150-199 (Tier 1)'
+    WHEN score_band >= 100 THEN '100-149 (Strong Tier 2)'
+    WHEN score_band >= 80 THEN '80-99 (Tier 2)'
+    WHEN score_band >= 60 THEN '60-79 (Potential)'
+    WHEN score_band >= 40 THEN '40-59 (Review)'
     ELSE 'Below 40'
   END as score_range,
-  COUNT(*) as count,
-  ROUND(100.0 * COUNT(*) / SUM(COUNT(*)) OVER(), 1) as percentage
-FROM aerospace_supplier_candidates
+  SUM(total) as count,
+  SUM(pct_of_total) as percentage
+FROM candidate_rollup_score_bands
 GROUP BY score_range
-ORDER BY MIN(aerospace_score) DESC;
+ORDER BY MIN(score_band) DESC;
 
 \echo ''
 \echo 'Contact Info Completeness:'
 \echo '--------------------------'
 SELECT 
   tier_classification,
-  COUNT(*) as total,
-  COUNT(*) FILTER (WHERE website IS NOT NULL) as has_website,
-  COUNT(*) FILTER (WHERE phone IS NOT NULL) as has_phone,
-  COUNT(*) FILTER (WHERE postcode IS NOT NULL) as has_postcode,
-  ROUND(100.0 * COUNT(*) FILTER (WHERE website IS NOT NULL) / COUNT(*), 1) as pct_website
-FROM aerospace_supplier_candidates
-GROUP BY tier_classification
+  total,
+  with_website as has_website,
+  with_phone as has_phone,
+  with_postcode as has_postcode,
+  ROUND(100.0 * with_website / total, 1) as pct_website
+FROM candidate_rollup_tiers
 ORDER BY total DESC;
 
 \echo ''
 \echo 'Geographic Distribution:'
 \echo '------------------------'
 SELECT 
-  LEFT(postcode, 2) as region,
-  COUNT(*) as total,
-  COUNT(*) FILTER (WHERE tier_classification = 'tier1_candidate') as tier1,
-  COUNT(*) FILTER (WHERE tier_classification = 'tier2_candidate') as tier2,
-  ROUND(AVG(aerospace_score)) as avg_score
-FROM aerospace_supplier_candidates
-WHERE postcode IS NOT NULL
-GROUP BY region
+  region,
+  total,
+  tier1,
+  tier2,
+  ROUND(avg_score) as avg_score
+FROM candidate_rollup_regions
 ORDER BY total DESC
 LIMIT 15;
 
@@ -110,11 +110,11 @@ WHERE aerospace_score >= 80
 -- Very high scores but no contact info
 SELECT 
   'Score >150 + no contact' as flag_type,
-  COUNT(*) as count
-FROM aerospace_supplier_candidates
-WHERE aerospace_score >= 150
-  AND website IS NULL
-  AND phone IS NULL;
+  COALESCE(SUM(candidates), 0) as count
+FROM candidate_rollup
+WHERE score_band >= 150
+  AND NOT has_website
+  AND NOT has_phone;
 
 \echo ''
 \echo 'Sample Suspicious Records:'
@@ -279,12 +279,12 @@ GROUP BY issue;
 \echo '   Consider web scraping for candidates with high scores but missing:'
 
 SELECT 
-  tier_classification,
-  COUNT(*) FILTER (WHERE website IS NULL) as missing_website,
-  COUNT(*) FILTER (WHERE phone IS NULL) as missing_phone,
-  COUNT(*) FILTER (WHERE city IS NULL) as missing_city
-FROM aerospace_supplier_candidates
-WHERE aerospace_score >= 80
+  NULLIF(tier_classification, '') as tier_classification,
+  SUM(candidates) FILTER (WHERE NOT has_website) as missing_website,
+  SUM(candidates) FILTER (WHERE NOT has_phone) as missing_phone,
+  SUM(candidates) FILTER (WHERE NOT has_city) as missing_city
+FROM candidate_rollup
+WHERE score_band >= 80
 GROUP BY tier_classification;
 
 \echo ''
@@ -294,12 +294,10 @@ GROUP BY tier_classification;
 -- Find areas with known aerospace but low candidate counts
 WITH area_scores AS (
   SELECT 
-    LEFT(postcode, 2) as region,
-    COUNT(*) as candidate_count,
-    AVG(aerospace_score) as avg_score
-  FROM aerospace_supplier_candidates
-  WHERE postcode IS NOT NULL
-  GROUP BY region
+    region,
+    total as candidate_count,
+    avg_score
+  FROM candidate_rollup_regions
 )
 SELECT 
   region,
@@ -397,7 +395,8 @@ echo "     - Mark each: YES/NO/MAYBE in 'is_aerospace_supplier'"
 echo "     - Add notes"
 echo ""
 echo "  2. Calculate Accuracy:"
-echo "     - Count: YES / Total = Precision"
+echo "     - Add the labels: python3 scripts/verify/label_ground_truth.py ./exports/${SAMPLE_FILE}"
+echo "     - Precision/recall per tier: python3 scripts/verify/evaluate_rules.py"
 echo "     - Target: >70% for Tier 2, >90% for Tier 1"
 echo ""
 echo "  3. Identify Patterns:"
@@ -407,7 +406,8 @@ echo ""
 echo "  4. Refine Scoring:"
 echo "     - Add negative keywords for false positives"
 echo "     - Boost scoring for verified patterns"
-echo "     - Re-run pipeline"
+echo "     - Re-run pipeline, then check which labelled rows flipped:"
+echo "       python3 scripts/verify/evaluate_rules.py --version <new>.csv --baseline <old>.csv"
 echo ""
 echo "  5. High Priority:"
 echo "     - Research Tier 1 candidates: ${REVIEW_DIR}/tier1_priority_research.csv"